@@ -0,0 +1,13 @@
+"""
+Benchmarks for the vectorized and batched engines in src/
+
+Each module times an engine against the original implementation it
+replaced. The synthetic data builders (tests/fixtures.py) and those
+row-wise reference implementations live with the tests, so tests/ is put
+on the path here. Run one with `python -m benchmarks.<module>`.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tests'))
@@ -0,0 +1,65 @@
+"""
+BacktestEngine config-grid benchmark
+evaluate_grid against the original row-by-row simulation, one config at a time
+
+    python -m benchmarks.backtest
+"""
+
+import time
+from typing import Dict
+
+import numpy as np
+
+from src.analytics.backtest import BacktestConfig, BacktestEngine
+from fixtures import make_synthetic_predictions
+from test_backtest import run_backtest_rowwise
+
+
+def benchmark_backtest_grid(n_rows: int = 5000, n_configs: int = 200) -> Dict[str, float]:
+    """
+    Compare the row-by-row simulation with evaluate_grid on a config sweep
+
+    Args:
+        n_rows: Number of synthetic predictions
+        n_configs: Number of configs in the sweep (kelly fraction x confidence)
+
+    Returns:
+        Dict with configs/sec for each engine and the speedup factor
+    """
+    engine = BacktestEngine()
+    df = make_synthetic_predictions(n_rows)
+
+    side = int(np.ceil(np.sqrt(n_configs)))
+    grid = BacktestEngine.make_config_grid(
+        BacktestConfig(name="Sweep", max_drawdown_limit=60.0),
+        kelly_fraction=list(np.linspace(0.05, 1.0, side)),
+        min_confidence=list(np.linspace(40, 80, side)),
+    )[:n_configs]
+
+    # The row loop is too slow to run over the whole grid; time a sample
+    sample = grid[::max(1, len(grid) // 10)]
+    start = time.perf_counter()
+    for config in sample:
+        run_backtest_rowwise(engine, df[engine._config_mask(engine.prepare_arrays(df), config)], config)
+    rowwise_secs = (time.perf_counter() - start) / len(sample) * len(grid)
+
+    start = time.perf_counter()
+    engine.evaluate_grid(grid, df)
+    grid_secs = time.perf_counter() - start
+
+    return {
+        'rows': n_rows,
+        'configs': len(grid),
+        'rowwise_configs_per_sec': len(grid) / rowwise_secs,
+        'grid_configs_per_sec': len(grid) / grid_secs,
+        'speedup': rowwise_secs / grid_secs,
+    }
+
+
+if __name__ == "__main__":
+    stats = benchmark_backtest_grid()
+    print(f"Predictions:          {stats['rows']:,}")
+    print(f"Configs:              {stats['configs']:,}")
+    print(f"Row-by-row loop:      {stats['rowwise_configs_per_sec']:,.1f} configs/sec")
+    print(f"Grid engine:          {stats['grid_configs_per_sec']:,.1f} configs/sec")
+    print(f"Speedup:              {stats['speedup']:.1f}x")
@@ -0,0 +1,36 @@
+"""
+Discord signal extraction benchmark
+Messages per second through DiscordSignalExtractor.extract_signal
+
+    python -m benchmarks.discord_signal_extractor
+"""
+
+import time
+from typing import Dict
+
+from src.discord_signal_extractor import DiscordSignalExtractor
+from fixtures import make_synthetic_messages
+
+
+def benchmark_extraction(n: int = 50000) -> Dict[str, float]:
+    """Time signal extraction over synthetic messages"""
+    extractor = DiscordSignalExtractor(symbols=['SPY', 'QQQ', 'AAPL', 'NVDA', 'TSLA', 'AMD', 'META', 'MSFT'])
+    messages = make_synthetic_messages(n)
+
+    started = time.perf_counter()
+    signals = sum(1 for message in messages if extractor.extract_signal(message))
+    elapsed = time.perf_counter() - started
+
+    results = {
+        'messages': n,
+        'signals': signals,
+        'seconds': elapsed,
+        'messages_per_second': n / elapsed,
+    }
+    print(f"Extracted {signals} signals from {n} messages in {elapsed:.2f}s "
+          f"({results['messages_per_second']:,.0f} msg/s)")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_extraction()
@@ -0,0 +1,44 @@
+"""
+KalshiEnsemble slate benchmark
+Sequential predict() calls against one concurrent predict_many() with a
+quorum, using mock model clients
+
+    python -m benchmarks.kalshi_ensemble
+"""
+
+import asyncio
+import json
+import time
+from typing import Dict
+
+from src.ai.kalshi_ensemble import KalshiEnsemble
+from src.ai.model_clients import MockModelClient
+from fixtures import make_synthetic_slate
+
+
+async def benchmark_predict_many(num_markets: int = 300, mode: str = 'balanced') -> Dict:
+    """Time a slate with mock model clients: sequential predict() vs predict_many()"""
+    ensemble = KalshiEnsemble(mode=mode, quorum=2, edge_tolerance=10.0)
+    ensemble.clients = {name: MockModelClient(name) for name in ensemble.models_to_use}
+    slate = make_synthetic_slate(num_markets)
+
+    start = time.perf_counter()
+    for market in slate[:10]:
+        await ensemble.predict(market, use_cache=False)
+    sequential = (time.perf_counter() - start) / 10 * num_markets
+
+    ensemble.clear_cache()
+    start = time.perf_counter()
+    await ensemble.predict_many(slate)
+    batched = time.perf_counter() - start
+
+    return {
+        'markets': num_markets,
+        'sequential_seconds_estimated': round(sequential, 2),
+        'predict_many_seconds': round(batched, 2),
+        'speedup': round(sequential / batched, 1) if batched else None
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(asyncio.run(benchmark_predict_many()), indent=2))
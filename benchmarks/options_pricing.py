@@ -0,0 +1,86 @@
+"""
+Black-Scholes Greeks kernel benchmark
+One bs_greeks batch call against per-strike scalar math
+
+    python -m benchmarks.options_pricing
+"""
+
+import math
+import time
+from typing import Dict
+
+import numpy as np
+from scipy.stats import norm
+
+from src.options_pricing import bs_greeks
+
+
+def benchmark_greeks_kernel(n_strikes: int = 5000, option_type: str = 'put') -> Dict[str, float]:
+    """
+    Compare per-strike scalar Greeks calls against one batch kernel call
+
+    The scalar path mirrors the old per-option code (math.log + scipy norm
+    per strike). Both paths compute price, delta, gamma, theta and vega.
+
+    Args:
+        n_strikes: Number of strikes in the synthetic chain
+        option_type: 'call' or 'put'
+
+    Returns:
+        Dict with strikes/sec for both paths and the speedup factor
+    """
+    rng = np.random.default_rng(11)
+    S = 100.0
+    K = np.linspace(50, 150, n_strikes)
+    T = 30 / 365.0
+    r = 0.045
+    sigma = rng.uniform(0.2, 0.8, n_strikes)
+
+    def scalar_greeks(k: float, vol: float) -> Dict[str, float]:
+        d1 = (math.log(S / k) + (r + 0.5 * vol ** 2) * T) / (vol * math.sqrt(T))
+        d2 = d1 - vol * math.sqrt(T)
+        if option_type == 'put':
+            price = k * math.exp(-r * T) * norm.cdf(-d2) - S * norm.cdf(-d1)
+            delta = norm.cdf(d1) - 1
+            theta = (-S * norm.pdf(d1) * vol / (2 * math.sqrt(T)) + r * k * math.exp(-r * T) * norm.cdf(-d2)) / 365
+        else:
+            price = S * norm.cdf(d1) - k * math.exp(-r * T) * norm.cdf(d2)
+            delta = norm.cdf(d1)
+            theta = (-S * norm.pdf(d1) * vol / (2 * math.sqrt(T)) - r * k * math.exp(-r * T) * norm.cdf(d2)) / 365
+        return {
+            'price': price,
+            'delta': delta,
+            'gamma': norm.pdf(d1) / (S * vol * math.sqrt(T)),
+            'theta': theta,
+            'vega': S * norm.pdf(d1) * math.sqrt(T) / 100,
+        }
+
+    start = time.perf_counter()
+    scalar = [scalar_greeks(k, vol) for k, vol in zip(K, sigma)]
+    scalar_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = bs_greeks(S, K, T, r, sigma, option_type)
+    batch_secs = time.perf_counter() - start
+
+    max_abs_error = max(
+        float(np.max(np.abs(batch[key] - np.array([row[key] for row in scalar]))))
+        for key in ('price', 'delta', 'gamma', 'theta', 'vega')
+    )
+
+    return {
+        'strikes': n_strikes,
+        'scalar_strikes_per_sec': n_strikes / scalar_secs,
+        'batch_strikes_per_sec': n_strikes / batch_secs,
+        'speedup': scalar_secs / batch_secs,
+        'max_abs_error': max_abs_error,
+    }
+
+
+if __name__ == "__main__":
+    stats = benchmark_greeks_kernel()
+    print(f"Strikes priced:       {stats['strikes']:,}")
+    print(f"Per-strike calls:     {stats['scalar_strikes_per_sec']:,.0f} strikes/sec")
+    print(f"Batch kernel:         {stats['batch_strikes_per_sec']:,.0f} strikes/sec")
+    print(f"Speedup:              {stats['speedup']:.1f}x")
+    print(f"Max abs difference:   {stats['max_abs_error']:.2e}")
@@ -0,0 +1,147 @@
+"""
+WebSocketServer fan-out benchmark
+Sequential per-subscriber sends against the per-client send queues, with a
+few slow clients subscribed to the same channel
+
+    python -m benchmarks.realtime_websocket_pipeline
+"""
+
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict
+
+import websockets
+
+from src.utils.realtime_websocket_pipeline import WebSocketServer
+
+logger = logging.getLogger(__name__)
+
+
+async def broadcast_to_channel_sequential(server: WebSocketServer, channel: str, message: Dict[str, Any]):
+    """
+    Original broadcast awaiting each subscriber in turn.
+
+    Args:
+        server: Server whose subscribers receive the message
+        channel: Channel name
+        message: Message data
+    """
+    with server.lock:
+        if channel not in server.subscriptions:
+            return  # No subscribers
+
+        subscribers = list(server.subscriptions[channel])
+
+    # Send to all subscribers
+    for client_id in subscribers:
+        websocket = server.connections.get(client_id)
+        if not websocket:
+            continue
+
+        try:
+            await websocket.send(json.dumps(message))
+            server.stats['messages_sent'] += 1
+
+        except websockets.exceptions.ConnectionClosed:
+            logger.warning(f"Connection closed for client {client_id}")
+            with server.lock:
+                server.connections.pop(client_id, None)
+                server.subscriptions[channel].discard(client_id)
+
+        except Exception as e:
+            logger.error(f"Failed to send message to {client_id}: {e}")
+            server.stats['messages_failed'] += 1
+
+
+class _BenchmarkSocket:
+    """Stand-in connection that takes `delay` seconds per send."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.received = 0
+        self.remote_address = ('benchmark', 0)
+
+    async def send(self, payload: str):
+        await asyncio.sleep(self.delay)
+        self.received += 1
+
+
+def benchmark_broadcast(
+    clients: int = 300,
+    slow_clients: int = 3,
+    messages: int = 100,
+    slow_delay: float = 0.01
+) -> Dict[str, Any]:
+    """
+    Compare sequential and queued fan-out of price ticks.
+
+    Measures how long the fast clients take to receive every message while a
+    few slow clients are subscribed to the same channel.
+
+    Args:
+        clients: Total subscribed clients
+        slow_clients: Clients whose sends take slow_delay seconds
+        messages: Ticks published (cycling through 10 symbols)
+        slow_delay: Seconds per send for slow clients
+
+    Returns:
+        Dict with seconds per strategy, speedup and queued-server stats
+    """
+    ticks = [
+        {'channel': 'prices', 'data': {'symbol': f'SYM{i % 10}', 'price': 100 + i},
+         'timestamp': datetime.now().isoformat()}
+        for i in range(messages)
+    ]
+
+    def connect(server):
+        sockets = [_BenchmarkSocket(slow_delay if i < slow_clients else 0.0) for i in range(clients)]
+        for client_id, websocket in enumerate(sockets):
+            server.connections[client_id] = websocket
+            server.subscriptions['prices'].add(client_id)
+        return sockets[slow_clients:]
+
+    async def run_sequential():
+        server = WebSocketServer()
+        fast = connect(server)
+        started = time.perf_counter()
+        for tick in ticks:
+            await broadcast_to_channel_sequential(server, 'prices', tick)
+        assert all(websocket.received == messages for websocket in fast)
+        return time.perf_counter() - started
+
+    async def run_queued():
+        server = WebSocketServer()
+        fast = connect(server)
+        for client_id, websocket in list(server.connections.items()):
+            server._open_send_queue(client_id, websocket)
+        started = time.perf_counter()
+        for tick in ticks:
+            await server._broadcast_to_channel('prices', tick)
+            await asyncio.sleep(0)
+        while any(websocket.received < messages for websocket in fast):
+            await asyncio.sleep(0)
+        elapsed = time.perf_counter() - started
+        for client_id in list(server.connections):
+            server._remove_client(client_id)
+        return elapsed, server.get_stats()
+
+    sequential = asyncio.run(run_sequential())
+    queued, stats = asyncio.run(run_queued())
+
+    return {
+        'clients': clients,
+        'slow_clients': slow_clients,
+        'messages': messages,
+        'sequential_seconds': sequential,
+        'queued_seconds': queued,
+        'speedup': sequential / queued if queued else float('inf'),
+        'channel_stats': stats['channels']['prices'],
+    }
+
+
+if __name__ == "__main__":
+    for name, value in benchmark_broadcast().items():
+        print(f"{name}: {value}")
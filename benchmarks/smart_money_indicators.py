@@ -0,0 +1,55 @@
+"""
+Smart Money Concepts detector benchmark
+Array detectors against the original per-bar loops
+
+    python -m benchmarks.smart_money_indicators
+"""
+
+import logging
+import time
+from typing import Dict
+
+from src.smart_money_indicators import SmartMoneyIndicators
+from fixtures import make_synthetic_ohlcv
+from test_smart_money_indicators import get_all_smc_indicators_rowwise
+
+
+def benchmark_smc(n_bars: int = 5000) -> Dict[str, float]:
+    """
+    Compare the row-by-row detectors with the array implementation
+
+    Args:
+        n_bars: Number of synthetic bars
+
+    Returns:
+        Dict with bars/sec for each implementation and the speedup factor
+    """
+    smc = SmartMoneyIndicators()
+    df = make_synthetic_ohlcv(n_bars)
+    logging.disable(logging.INFO)
+
+    try:
+        start = time.perf_counter()
+        get_all_smc_indicators_rowwise(smc, df)
+        rowwise_secs = time.perf_counter() - start
+
+        start = time.perf_counter()
+        smc.get_all_smc_indicators(df)
+        array_secs = time.perf_counter() - start
+    finally:
+        logging.disable(logging.NOTSET)
+
+    return {
+        'bars': n_bars,
+        'rowwise_bars_per_sec': n_bars / rowwise_secs,
+        'array_bars_per_sec': n_bars / array_secs,
+        'speedup': rowwise_secs / array_secs,
+    }
+
+
+if __name__ == "__main__":
+    stats = benchmark_smc()
+    print(f"Bars:                 {stats['bars']:,}")
+    print(f"Row-by-row detectors: {stats['rowwise_bars_per_sec']:,.0f} bars/sec")
+    print(f"Array detectors:      {stats['array_bars_per_sec']:,.0f} bars/sec")
+    print(f"Speedup:              {stats['speedup']:.1f}x")
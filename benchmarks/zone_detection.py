@@ -0,0 +1,57 @@
+"""
+Zone detection benchmark
+Prefix-sum ZoneDetector against the original per-swing DataFrame slicing
+
+    python -m benchmarks.zone_detection
+"""
+
+import logging
+import time
+from typing import Dict
+
+from src.zone_detector import ZoneDetector
+from fixtures import make_synthetic_universe
+from test_zone_detector import detect_zones_rowwise
+
+
+def benchmark_zone_detection(n_symbols: int = 500, n_bars: int = 126) -> Dict[str, float]:
+    """
+    Compare per-swing DataFrame slicing with the prefix-sum detector
+
+    Args:
+        n_symbols: Synthetic universe size
+        n_bars: Bars per symbol
+
+    Returns:
+        Dict with symbols/sec for each implementation and the speedup factor
+    """
+    frames = make_synthetic_universe(n_symbols, n_bars)
+    detector = ZoneDetector()
+    previous_level = logging.getLogger('src.zone_detector').level
+    logging.getLogger('src.zone_detector').setLevel(logging.WARNING)
+
+    try:
+        start = time.perf_counter()
+        for symbol, df in frames.items():
+            detect_zones_rowwise(detector, df, symbol)
+        rowwise = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for symbol, df in frames.items():
+            detector.detect_zones(df, symbol)
+        arrays = time.perf_counter() - start
+    finally:
+        logging.getLogger('src.zone_detector').setLevel(previous_level)
+
+    return {
+        'rowwise_symbols_per_sec': n_symbols / rowwise,
+        'array_symbols_per_sec': n_symbols / arrays,
+        'speedup': rowwise / arrays,
+    }
+
+
+if __name__ == "__main__":
+    stats = benchmark_zone_detection()
+    print(f"Per-swing slicing:    {stats['rowwise_symbols_per_sec']:,.1f} symbols/sec")
+    print(f"Prefix-sum detector:  {stats['array_symbols_per_sec']:,.1f} symbols/sec")
+    print(f"Speedup:              {stats['speedup']:.1f}x")
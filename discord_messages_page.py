@@ -297,7 +297,7 @@ class DiscordDB:
                 # Step 3: Extract signals
                 st.write("🔍 Extracting trading signals...")
                 extractor = DiscordSignalExtractor()
-                signals_count = extractor.process_all_messages()
+                signals_count = extractor.process_new_messages()
                 st.write(f"✅ Extracted {signals_count} signals")
 
                 # Step 4: Update quality scores
@@ -42,7 +42,7 @@ print("\n[Step 5/5] Indexing signals into ChromaDB for vector search...")
 from src.signal_vector_search import SignalVectorSearch
 
 vector_search = SignalVectorSearch()
-vector_search.index_all_signals()
+vector_search.index_new_signals()
 print("[OK] Vector embeddings created for semantic similarity search")
 
 print("\n" + "=" * 80)
@@ -22,6 +22,8 @@ from typing import Dict, List, Tuple, Optional
 from datetime import datetime
 import logging
 
+from src.volume_profile_analyzer import nearest_level_bins, rolling_volume_histograms, rolling_bin_size
+
 logger = logging.getLogger(__name__)
 
 
@@ -69,16 +71,11 @@ class VolumeProfileCalculator:
 
         # Create price bins
         price_levels = np.linspace(price_min, price_max, price_bins)
-        volume_at_price = np.zeros(price_bins)
-
-        # Distribute volume across price bins
-        for idx, row in df.iterrows():
-            price = row['close']
-            volume = row['volume']
 
-            # Find nearest price bin
-            bin_idx = np.argmin(np.abs(price_levels - price))
-            volume_at_price[bin_idx] += volume
+        # Distribute volume across price bins (nearest level to each close)
+        bin_idx = nearest_level_bins(df['close'].to_numpy(dtype=np.float64), price_levels)
+        volume_at_price = np.bincount(bin_idx, weights=df['volume'].to_numpy(dtype=np.float64),
+                                      minlength=price_bins)
 
         # Find POC (Point of Control - highest volume)
         poc_idx = np.argmax(volume_at_price)
@@ -90,31 +87,12 @@ class VolumeProfileCalculator:
         value_area_volume = total_volume * self.value_area_pct
 
         # Start from POC and expand until we hit 70% volume
-        va_indices = [poc_idx]
-        current_volume = volume_at_price[poc_idx]
-
-        while current_volume < value_area_volume:
-            # Check above and below POC
-            idx_above = max(va_indices) + 1
-            idx_below = min(va_indices) - 1
-
-            volume_above = volume_at_price[idx_above] if idx_above < price_bins else 0
-            volume_below = volume_at_price[idx_below] if idx_below >= 0 else 0
-
-            # Add the side with more volume
-            if volume_above > volume_below and idx_above < price_bins:
-                va_indices.append(idx_above)
-                current_volume += volume_above
-            elif idx_below >= 0:
-                va_indices.append(idx_below)
-                current_volume += volume_below
-            else:
-                break
+        val_idx, vah_idx = self._expand_value_area(
+            volume_at_price[np.newaxis, :], np.array([poc_idx]), np.array([value_area_volume])
+        )
+        val_idx, vah_idx = int(val_idx[0]), int(vah_idx[0])
 
         # VAH and VAL
-        vah_idx = max(va_indices)
-        val_idx = min(va_indices)
-
         vah_price = price_levels[vah_idx]
         val_price = price_levels[val_idx]
 
@@ -145,6 +123,108 @@ class VolumeProfileCalculator:
             'total_volume': float(total_volume)
         }
 
+    @staticmethod
+    def _expand_value_area(volumes: np.ndarray, poc_idx: np.ndarray, targets: np.ndarray,
+                           lowest: int = 0, highest: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Grow each row's value area outward from its POC, one level at a time
+        toward the side with more volume, until the row reaches its target.
+
+        Levels in [lowest, highest) outside the array's columns are treated as
+        empty, so a band of a larger grid expands as the full grid would.
+
+        Returns:
+            (low index, high index) per row
+        """
+        rows, bins = volumes.shape
+        highest = bins if highest is None else highest
+        row_ids = np.arange(rows)
+        low = poc_idx.copy()
+        high = poc_idx.copy()
+        current = volumes[row_ids, poc_idx].copy()
+
+        active = current < targets
+        while active.any():
+            above = high + 1
+            below = low - 1
+            volume_above = np.where(above < bins, volumes[row_ids, np.clip(above, 0, bins - 1)], 0)
+            volume_below = np.where(below >= 0, volumes[row_ids, np.clip(below, 0, bins - 1)], 0)
+
+            take_above = active & (volume_above > volume_below) & (above < highest)
+            take_below = active & ~take_above & (below >= lowest)
+
+            # Past the array's first column both sides stay empty, so the
+            # area keeps stepping down through empty levels to lowest
+            to_lowest = take_below & (below < 0) & (volume_above == 0)
+
+            high = np.where(take_above, above, high)
+            low = np.where(to_lowest, lowest, np.where(take_below, below, low))
+            current = current + np.where(take_above, volume_above, np.where(take_below, volume_below, 0))
+
+            # Rows that could not grow either way are done
+            active = (take_above | take_below) & ~to_lowest & (current < targets)
+
+        return low, high
+
+    def calculate_rolling_profile(
+        self,
+        df: pd.DataFrame,
+        window: int = 50,
+        price_bins: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Sliding-window POC / VAH / VAL for drawing rolling profile lines
+
+        Uses one fixed grid of price levels over the whole frame; each step
+        adds the entering candle and removes the leaving one.
+
+        Args:
+            df: DataFrame with 'close' and 'volume' columns
+            window: Candles per profile; row i covers the window before it
+            price_bins: Levels in the grid (default: about 50 per typical window range)
+
+        Returns:
+            DataFrame indexed like df with poc, vah, val (NaN before a full window)
+        """
+        columns = ['poc', 'vah', 'val']
+        values = np.full((len(df), len(columns)), np.nan)
+        if len(df) <= window or window <= 0:
+            return pd.DataFrame(values, index=df.index, columns=columns)
+
+        close = df['close'].to_numpy(dtype=np.float64)
+        lows = df['low'].to_numpy(dtype=np.float64) if 'low' in df.columns else close
+        highs = df['high'].to_numpy(dtype=np.float64) if 'high' in df.columns else close
+        price_min, price_max = np.nanmin(lows), np.nanmax(highs)
+
+        if not price_bins:
+            spacing = rolling_bin_size(lows, highs, window, 50)
+            price_bins = int(np.clip(np.ceil((price_max - price_min) / spacing) + 1, 2, 5000)) if spacing else 50
+
+        price_levels = np.linspace(price_min, price_max, price_bins)
+        bin_idx = nearest_level_bins(close, price_levels)
+
+        for t0, col0, hists in rolling_volume_histograms(bin_idx, bin_idx, df['volume'].to_numpy(dtype=np.float64),
+                                                         price_bins, window):
+            rows = np.arange(t0, t0 + len(hists))
+            keep = rows < len(df)
+            rows, hists = rows[keep], hists[keep]
+            if not len(rows) or not hists.shape[1]:
+                continue
+
+            # Sliding sums leave tiny residues in empty levels
+            np.maximum(hists, 0.0, out=hists)
+            poc_idx = np.argmax(hists, axis=1)
+            val_idx, vah_idx = self._expand_value_area(
+                hists, poc_idx, hists.sum(axis=1) * self.value_area_pct,
+                lowest=-col0, highest=price_bins - col0
+            )
+
+            values[rows, 0] = price_levels[col0 + poc_idx]
+            values[rows, 1] = price_levels[col0 + vah_idx]
+            values[rows, 2] = price_levels[col0 + val_idx]
+
+        return pd.DataFrame(values, index=df.index, columns=columns)
+
     def get_trading_signals(
         self,
         current_price: float,
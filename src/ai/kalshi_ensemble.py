@@ -5,7 +5,9 @@ Combines predictions from GPT-4, Claude, Gemini, and local models
 
 import logging
 import asyncio
-from typing import List, Dict, Optional, Literal
+import time
+import hashlib
+from typing import List, Dict, Optional, Literal, Tuple, Union
 from dataclasses import dataclass
 from datetime import datetime
 import json
@@ -72,6 +74,13 @@ class KalshiEnsemble:
     - 'balanced': GPT-4 + Claude + Gemini (default)
     - 'fast': GPT-4 + Gemini (speed optimized)
     - 'cost': Gemini + Llama3 (cost optimized)
+
+    predict_many() scores a whole slate concurrently under per-provider
+    concurrency limits. With a quorum set, a market stops waiting once that
+    many models agree on the outcome with edges within edge_tolerance, and
+    the remaining model calls are cancelled. Consensus results are cached
+    per (market, price bucket, context) for cache_ttl seconds, keeping at
+    most cache_max_size entries.
     """
 
     # Model weights for consensus voting
@@ -90,15 +99,45 @@ class KalshiEnsemble:
         'cost': ['gemini', 'llama3']
     }
 
-    def __init__(self, mode: Literal['premium', 'balanced', 'fast', 'cost'] = 'balanced'):
+    # Concurrent calls per provider in predict_many()
+    PROVIDER_CONCURRENCY = {
+        'gpt4': 8,
+        'claude': 5,
+        'gemini': 10,
+        'llama3': 2
+    }
+
+    def __init__(
+        self,
+        mode: Literal['premium', 'balanced', 'fast', 'cost'] = 'balanced',
+        quorum: Optional[int] = None,
+        edge_tolerance: float = 5.0,
+        price_bucket: float = 0.01,
+        cache_ttl: float = 900.0,
+        cache_max_size: int = 5000,
+        provider_concurrency: Optional[Dict[str, int]] = None
+    ):
         """
         Initialize ensemble with specified mode
 
         Args:
             mode: Operation mode (premium, balanced, fast, cost)
+            quorum: Agreeing models needed to stop early (None = wait for all)
+            edge_tolerance: Max edge spread (percentage points) between agreeing models
+            price_bucket: Yes-price granularity of the result cache
+            cache_ttl: Seconds a consensus result is reused (0 disables caching)
+            cache_max_size: Cached results kept before the oldest are evicted
+            provider_concurrency: Overrides for PROVIDER_CONCURRENCY
         """
         self.mode = mode
         self.models_to_use = self.ENSEMBLE_MODES[mode]
+        self.quorum = quorum
+        self.edge_tolerance = edge_tolerance
+        self.price_bucket = price_bucket
+        self.cache_ttl = cache_ttl
+        self.cache_max_size = cache_max_size
+        self.provider_concurrency = {**self.PROVIDER_CONCURRENCY, **(provider_concurrency or {})}
+        self._cache: Dict[Tuple, Tuple[float, ConsensusPrediction]] = {}
 
         # Initialize model clients
         self.clients = {}
@@ -117,45 +156,147 @@ class KalshiEnsemble:
 
         logger.info(f"Initialized Kalshi Ensemble in '{mode}' mode with models: {self.models_to_use}")
 
-    async def predict(self, market: Dict, context: Optional[Dict] = None) -> ConsensusPrediction:
+    async def predict(
+        self,
+        market: Dict,
+        context: Optional[Dict] = None,
+        use_cache: bool = True
+    ) -> ConsensusPrediction:
         """
         Generate ensemble prediction for a market
 
         Args:
             market: Market data dictionary
             context: Optional contextual data (weather, injuries, etc.)
+            use_cache: Reuse a recent result for the same market and price bucket
 
         Returns:
             ConsensusPrediction with aggregated results
         """
+        key = self._cache_key(market, context)
+        if use_cache:
+            cached = self._cached(key)
+            if cached:
+                return cached
+
+        consensus = await self._predict_market(market, context)
+        self._store(key, consensus)
+        return consensus
+
+    async def predict_many(
+        self,
+        markets: List[Dict],
+        contexts: Optional[List[Optional[Dict]]] = None,
+        use_cache: bool = True
+    ) -> List[Union[ConsensusPrediction, Exception]]:
+        """
+        Generate ensemble predictions for a slate of markets concurrently
+
+        All markets are in flight at once; model calls are limited per
+        provider by provider_concurrency, so the slate takes roughly as long
+        as its slowest calls rather than the sum of all of them. Markets that
+        share a cache key are predicted once.
+
+        Args:
+            markets: Market data dictionaries
+            contexts: Optional context per market (aligned with markets)
+            use_cache: Reuse recent results for the same market and price bucket
+
+        Returns:
+            One entry per market: its ConsensusPrediction, or the exception
+            raised when every model failed
+        """
+        contexts = contexts or [None] * len(markets)
+        semaphores = {
+            model_name: asyncio.Semaphore(self.provider_concurrency.get(model_name, 4))
+            for model_name in self.clients
+        }
+        start_time = time.perf_counter()
+
+        async def run(key: Tuple, market: Dict, context: Optional[Dict]) -> ConsensusPrediction:
+            consensus = await self._predict_market(market, context, semaphores)
+            self._store(key, consensus)
+            return consensus
+
+        results: List[Union[ConsensusPrediction, Exception, None]] = [None] * len(markets)
+        in_flight: Dict[Tuple, asyncio.Future] = {}
+        waiting: List[Tuple[int, asyncio.Future]] = []
+
+        for i, (market, context) in enumerate(zip(markets, contexts)):
+            key = self._cache_key(market, context)
+            cached = self._cached(key) if use_cache else None
+            if cached:
+                results[i] = cached
+                continue
+            if key not in in_flight:
+                in_flight[key] = asyncio.ensure_future(run(key, market, context))
+            waiting.append((i, in_flight[key]))
+
+        outcomes = await asyncio.gather(*(future for _, future in waiting), return_exceptions=True)
+        for (i, _), outcome in zip(waiting, outcomes):
+            results[i] = outcome
+
+        failures = sum(1 for r in results if isinstance(r, Exception))
+        logger.info(
+            f"Ensemble scored {len(markets)} markets ({len(in_flight)} predicted, "
+            f"{len(markets) - len(waiting)} cached, {failures} failed) "
+            f"in {time.perf_counter() - start_time:.1f}s"
+        )
+
+        return results
+
+    async def _predict_market(
+        self,
+        market: Dict,
+        context: Optional[Dict],
+        semaphores: Optional[Dict[str, asyncio.Semaphore]] = None
+    ) -> ConsensusPrediction:
+        """Run the models for one market (stopping at quorum) and build the consensus"""
         start_time = datetime.now()
 
         # Build prompt for all models
         prompt = build_market_analysis_prompt(market, context)
 
+        async def call(model_name: str, client) -> ModelPrediction:
+            if semaphores is None:
+                return await self._get_model_prediction(model_name, client, prompt, market)
+            async with semaphores[model_name]:
+                return await self._get_model_prediction(model_name, client, prompt, market)
+
         # Run predictions in parallel
-        tasks = []
-        for model_name, client in self.clients.items():
-            task = self._get_model_prediction(model_name, client, prompt, market)
-            tasks.append(task)
-
-        # Wait for all predictions
-        predictions = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # Filter out errors
-        valid_predictions = [
-            p for p in predictions
-            if isinstance(p, ModelPrediction)
-        ]
+        tasks = {
+            asyncio.ensure_future(call(model_name, client)): model_name
+            for model_name, client in self.clients.items()
+        }
+
+        valid_predictions = []
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                if task.exception() is not None:
+                    logger.error(f"Model {tasks[task]} failed: {task.exception()}")
+                else:
+                    valid_predictions.append(task.result())
+
+            if pending and self._quorum_reached(valid_predictions):
+                # Cancel stragglers
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                logger.info(
+                    f"Quorum of {self.quorum} reached for {market.get('ticker', 'market')}; "
+                    f"cancelled {', '.join(tasks[t] for t in pending)}"
+                )
+                break
 
         if not valid_predictions:
             logger.error("All models failed to generate predictions")
             raise Exception("Ensemble prediction failed - no valid predictions")
 
-        # Log any errors
-        for i, p in enumerate(predictions):
-            if isinstance(p, Exception):
-                logger.error(f"Model {self.models_to_use[i]} failed: {p}")
+        # Keep model order stable regardless of completion order
+        valid_predictions.sort(key=lambda p: self.models_to_use.index(p.model_name))
 
         # Calculate consensus
         consensus = self._calculate_consensus(valid_predictions)
@@ -181,6 +322,57 @@ class KalshiEnsemble:
             timestamp=datetime.now()
         )
 
+    def _quorum_reached(self, predictions: List[ModelPrediction]) -> bool:
+        """True when quorum models agree on the outcome with edges within edge_tolerance"""
+        if not self.quorum or len(predictions) < self.quorum:
+            return False
+
+        for outcome in ('yes', 'no'):
+            edges = sorted(p.edge_percentage for p in predictions if p.predicted_outcome == outcome)
+            for i in range(len(edges) - self.quorum + 1):
+                if edges[i + self.quorum - 1] - edges[i] <= self.edge_tolerance:
+                    return True
+
+        return False
+
+    def _cache_key(self, market: Dict, context: Optional[Dict]) -> Tuple:
+        """(market, yes-price bucket, context digest)"""
+        market_id = market.get('ticker') or market.get('title', '')
+        price_bucket = int(round(float(market.get('yes_price', 0.5)) / self.price_bucket))
+        context_digest = hashlib.md5(
+            json.dumps(context, sort_keys=True, default=str).encode()
+        ).hexdigest() if context else ''
+        return (market_id, price_bucket, context_digest)
+
+    def _cached(self, key: Tuple) -> Optional[ConsensusPrediction]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] < self.cache_ttl:
+            return entry[1]
+        del self._cache[key]
+        return None
+
+    def _store(self, key: Tuple, consensus: ConsensusPrediction):
+        if self.cache_ttl <= 0:
+            return
+
+        now = time.monotonic()
+        # Re-insert so the dict stays ordered oldest first
+        self._cache.pop(key, None)
+        self._cache[key] = (now, consensus)
+
+        # Evict expired entries, then the oldest beyond the size limit
+        while self._cache:
+            oldest = next(iter(self._cache))
+            if now - self._cache[oldest][0] < self.cache_ttl and len(self._cache) <= self.cache_max_size:
+                break
+            del self._cache[oldest]
+
+    def clear_cache(self):
+        """Drop cached consensus results"""
+        self._cache.clear()
+
     async def _get_model_prediction(
         self,
         model_name: str,
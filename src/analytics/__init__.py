@@ -7,6 +7,7 @@ Modules:
     - metrics: Performance metrics (Brier, Sharpe, ROI, etc.)
     - performance_tracker: Track prediction performance and outcomes
     - backtest: Backtesting framework with Kelly criterion
+    - sweep: Parallel parameter sweeps and walk-forward evaluation
     - feature_store: Versioned feature storage for ML
 """
 
@@ -23,6 +24,7 @@ from .metrics import (
 
 from .performance_tracker import PerformanceTracker
 from .backtest import BacktestEngine, BacktestConfig
+from .sweep import BacktestSweepRunner
 from .feature_store import FeatureStore
 
 __version__ = "1.0.0"
@@ -42,5 +44,6 @@ __all__ = [
     'PerformanceTracker',
     'BacktestEngine',
     'BacktestConfig',
+    'BacktestSweepRunner',
     'FeatureStore',
 ]
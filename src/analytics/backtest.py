@@ -8,11 +8,12 @@ Simulates trading strategies on historical predictions with:
 """
 
 import os
+import itertools
 import psycopg2
 import psycopg2.extras
 import pandas as pd
 import numpy as np
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
 import logging
@@ -262,174 +263,390 @@ class BacktestEngine:
 
         return (pnl, roi_pct)
 
-    def run_backtest(self, config: BacktestConfig) -> Dict:
+    def prepare_arrays(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
         """
-        Run backtest simulation.
+        Convert loaded prediction history into the column arrays used by the
+        simulation core (all numeric, so they can be shared without pickling).
 
         Args:
-            config: Backtest configuration
+            df: DataFrame from load_historical_data, ordered by predicted_at
 
         Returns:
-            Dictionary with backtest results
+            Dict of equal-length NumPy arrays
         """
-        logger.info(f"Starting backtest: {config.name}")
+        market_types = df['market_type'].fillna('').astype(str)
+        categories = sorted(market_types.unique())
 
-        # Load historical data
-        df = self.load_historical_data(config)
+        return {
+            'price': df['market_price'].astype(float).to_numpy(),
+            'edge': df['edge_percentage'].astype(float).fillna(0.0).to_numpy()
+                    if 'edge_percentage' in df else np.zeros(len(df)),
+            'confidence': df['confidence_score'].astype(float).to_numpy(),
+            'probability': df['predicted_probability'].astype(float).to_numpy(),
+            'is_correct': df['is_correct'].fillna(False).astype(bool).to_numpy(),
+            'predicted_at': pd.to_datetime(df['predicted_at']).to_numpy(dtype='datetime64[ns]').astype(np.int64),
+            'market_type_code': pd.Categorical(market_types, categories=categories).codes.astype(np.int16),
+            'market_type_categories': np.array(categories, dtype=object),
+        }
 
-        if df.empty:
-            logger.warning("No historical data found for backtest")
-            return self._empty_results(config)
+    def _config_mask(self, arrays: Dict[str, np.ndarray], config: BacktestConfig) -> np.ndarray:
+        """Rows load_historical_data would return for this config"""
+        price = arrays['price']
+        mask = (price >= config.min_price) & (price <= config.max_price)
 
-        # Initialize tracking
-        capital = config.initial_capital
-        trades = []
-        equity_curve = [capital]
-        returns_list = []
+        if config.min_confidence > 0:
+            mask &= arrays['confidence'] >= config.min_confidence
 
-        # Track performance
-        total_trades = 0
-        winning_trades = 0
-        losing_trades = 0
+        if config.min_edge > 0:
+            mask &= arrays['edge'] >= config.min_edge
 
-        # Simulate each trade
-        for idx, row in df.iterrows():
-            # Calculate position size
-            position_size = self.calculate_position_size(row, capital, config)
+        if config.market_types:
+            categories = list(arrays['market_type_categories'])
+            codes = [categories.index(t) for t in config.market_types if t in categories]
+            mask &= np.isin(arrays['market_type_code'], codes)
 
-            if position_size == 0:
-                continue
+        if config.start_date:
+            mask &= arrays['predicted_at'] >= pd.Timestamp(config.start_date).value
 
-            # Calculate P&L
-            pnl, roi_pct = self.calculate_trade_pnl(row, position_size)
-
-            # Update capital
-            capital_before = capital
-            capital += pnl
-            equity_curve.append(capital)
-
-            # Track returns
-            returns_list.append(pnl / position_size)
-
-            # Record trade
-            is_win = pnl > 0
-            trades.append({
-                'ticker': row['ticker'],
-                'market_type': row['market_type'],
-                'prediction_outcome': row['predicted_outcome'],
-                'actual_outcome': row['actual_outcome'],
-                'confidence_score': row['confidence_score'],
-                'edge_percentage': row.get('edge_percentage', 0),
-                'entry_price': row['market_price'],
-                'position_size': position_size,
-                'position_pct': (position_size / capital_before * 100) if capital_before > 0 else 0,
-                'is_win': is_win,
-                'pnl': pnl,
-                'roi_pct': roi_pct,
-                'trade_date': row['predicted_at'],
-                'settlement_date': row['settled_at'],
-                'capital_before': capital_before,
-                'capital_after': capital,
-            })
+        if config.end_date:
+            mask &= arrays['predicted_at'] <= pd.Timestamp(config.end_date).value
 
-            # Update counters
-            total_trades += 1
-            if is_win:
-                winning_trades += 1
-            else:
-                losing_trades += 1
-
-            # Check drawdown limit
-            if len(equity_curve) > 1:
-                peak = max(equity_curve)
-                current_dd = ((capital - peak) / peak * 100)
-                if current_dd <= -config.max_drawdown_limit:
-                    logger.warning(f"Max drawdown limit reached: {current_dd:.2f}%. Stopping backtest.")
-                    break
-
-        # Calculate performance metrics
-        results = self._calculate_results(
-            config, df, trades, equity_curve, returns_list,
-            total_trades, winning_trades, losing_trades
-        )
+        return mask
 
-        # Store results in database
-        self._store_results(config, results, trades)
+    def _position_fractions(self, arrays: Dict[str, np.ndarray], config: BacktestConfig,
+                            mask: np.ndarray) -> np.ndarray:
+        """
+        Fraction of current capital bet on each row for kelly/proportional
+        sizing (0 where the config skips the row).
 
-        logger.info(f"Backtest complete: {total_trades} trades, Final Capital: ${capital:.2f}")
+        Both sizings are proportional to capital, so the fraction does not
+        depend on the path and can be computed up front.
+        """
+        cap = min(config.max_position_size / 100.0, 1.0)
 
-        return results
+        if config.position_sizing == 'proportional':
+            fractions = np.full(len(mask), min(config.proportional_pct / 100.0, cap))
 
-    def _calculate_results(self, config: BacktestConfig, df: pd.DataFrame,
-                          trades: List[Dict], equity_curve: List[float],
-                          returns_list: List[float], total_trades: int,
-                          winning_trades: int, losing_trades: int) -> Dict:
-        """Calculate comprehensive backtest results"""
+        elif config.position_sizing == 'kelly':
+            price = arrays['price']
+            edge = arrays['edge']
+            valid = (price > 0) & (price < 1) & (edge > 0)
+            odds = np.where(valid, 1.0 / np.where(valid, price, 0.5) - 1.0, 1.0)
+            kelly_pct = np.where(valid, (edge / 100.0) / odds * config.kelly_fraction, 0.0)
+            fractions = np.minimum(np.clip(kelly_pct, 0.0, 0.25), cap)
 
-        if total_trades == 0:
-            return self._empty_results(config)
+        else:
+            raise ValueError(f"Unknown position sizing: {config.position_sizing}")
 
-        final_capital = equity_curve[-1]
-        total_pnl = final_capital - config.initial_capital
-        total_return_pct = (total_pnl / config.initial_capital) * 100
+        return np.where(mask, np.maximum(fractions, 0.0), 0.0)
+
+    def _trade_returns(self, arrays: Dict[str, np.ndarray]) -> np.ndarray:
+        """Return on stake per row: win pays 1/price - 1, loss loses the stake"""
+        price = arrays['price']
+        safe_price = np.where(price > 0, price, np.nan)
+        return np.where(arrays['is_correct'], 1.0 / safe_price - 1.0, -1.0)
+
+    def _simulate_fractional(self, configs: List[BacktestConfig], fractions: np.ndarray,
+                             returns: np.ndarray) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Simulate many fractional-sizing configs at once.
+
+        Equity is initial_capital * cumprod(1 + fraction * return) along each
+        config's row; the drawdown stop uses a running peak.
+
+        Args:
+            configs: Configs (one per row of fractions)
+            fractions: (n_configs, n_rows) capital fractions, 0 = no trade
+            returns: (n_rows,) return on stake
+
+        Returns:
+            Per config: (trade row indices, capital before, position size, capital after)
+        """
+        initial = np.array([c.initial_capital for c in configs], dtype=float)[:, None]
+        limits = np.array([c.max_drawdown_limit for c in configs], dtype=float)[:, None]
+
+        active = fractions > 0
+        factors = np.where(active, 1.0 + fractions * returns, 1.0)
+        equity = initial * np.cumprod(factors, axis=1)
+        before = np.concatenate([initial, equity[:, :-1]], axis=1)
+
+        # Once capital is gone every later position is zero
+        active &= before > 0
+
+        peak = np.maximum(np.maximum.accumulate(equity, axis=1), initial)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drawdown = (equity - peak) / peak * 100
+        breach = active & (drawdown <= -limits)
+
+        n_rows = fractions.shape[1]
+        stop = np.where(breach.any(axis=1), breach.argmax(axis=1), n_rows - 1)
+
+        simulated = []
+        for i in range(len(configs)):
+            idx = np.flatnonzero(active[i, :stop[i] + 1])
+            if stop[i] < n_rows - 1:
+                log = logger.warning if len(configs) == 1 else logger.debug
+                log(f"{configs[i].name}: max drawdown limit reached "
+                               f"({drawdown[i, stop[i]]:.2f}%). Stopping backtest.")
+            simulated.append((idx, before[i, idx], before[i, idx] * fractions[i, idx], equity[i, idx]))
+
+        return simulated
+
+    def _simulate_fixed(self, config: BacktestConfig, mask: np.ndarray,
+                        returns: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Simulate fixed sizing, whose bet is capped by current capital and is
+        therefore path dependent. Runs over arrays with a running peak.
+
+        Returns:
+            (trade row indices, capital before, position size, capital after)
+        """
+        capital = config.initial_capital
+        peak = capital
+        cap = config.max_position_size / 100.0
+
+        rows, before, positions, after = [], [], [], []
+        for i in np.flatnonzero(mask):
+            position = min(config.fixed_bet_size, capital * cap, capital)
+            if position <= 0:
+                continue
+
+            rows.append(i)
+            before.append(capital)
+            positions.append(position)
+            capital += position * returns[i]
+            after.append(capital)
+
+            peak = max(peak, capital)
+            current_dd = (capital - peak) / peak * 100
+            if current_dd <= -config.max_drawdown_limit:
+                logger.warning(f"Max drawdown limit reached: {current_dd:.2f}%. Stopping backtest.")
+                break
+
+        return (np.array(rows, dtype=np.int64), np.array(before, dtype=float),
+                np.array(positions, dtype=float), np.array(after, dtype=float))
+
+    def evaluate_grid(self, configs: List[BacktestConfig], df: Optional[pd.DataFrame] = None,
+                      include_trades: bool = False,
+                      arrays: Optional[Dict[str, np.ndarray]] = None,
+                      row_mask: Optional[np.ndarray] = None) -> List[Dict]:
+        """
+        Evaluate many configs against one loaded dataset.
+
+        Data is loaded once with the loosest filters of the grid; each
+        config's own filters are applied as array masks. Kelly and
+        proportional configs are simulated together as one matrix.
+
+        Args:
+            configs: Configurations to evaluate (e.g. from make_config_grid)
+            df: Prediction history; loaded with the combined filters if both
+                df and arrays are None
+            include_trades: Build per-trade dicts (needed for _store_results,
+                requires df)
+            arrays: Precomputed prepare_arrays(df) output
+            row_mask: Restrict every config to these rows (e.g. a time window)
+
+        Returns:
+            One results dict per config, in the same order
+        """
+        if not configs:
+            return []
+
+        if df is None and arrays is None:
+            df = self.load_historical_data(self.combined_config(configs))
+
+        if arrays is None:
+            if df.empty:
+                return [self._empty_results(config) for config in configs]
+            arrays = self.prepare_arrays(df)
+
+        if len(arrays['price']) == 0:
+            return [self._empty_results(config) for config in configs]
+
+        returns = self._trade_returns(arrays)
+        masks = [self._config_mask(arrays, config) for config in configs]
+        if row_mask is not None:
+            masks = [mask & row_mask for mask in masks]
+
+        simulated = [None] * len(configs)
+        fractional = [i for i, c in enumerate(configs) if c.position_sizing != 'fixed']
+
+        if fractional:
+            fractions = np.vstack([
+                self._position_fractions(arrays, configs[i], masks[i]) for i in fractional
+            ])
+            paths = self._simulate_fractional([configs[i] for i in fractional], fractions, returns)
+            for i, path in zip(fractional, paths):
+                simulated[i] = path
+
+        for i, config in enumerate(configs):
+            if simulated[i] is None:
+                simulated[i] = self._simulate_fixed(config, masks[i], returns)
+
+        return [
+            self._summarize_simulation(config, df, arrays, masks[i], returns,
+                                       *simulated[i], include_trades=include_trades)
+            for i, config in enumerate(configs)
+        ]
+
+    @staticmethod
+    def combined_config(configs: List[BacktestConfig]) -> BacktestConfig:
+        """Loosest filters covering every config (used to load data once)"""
+        market_types = None
+        if all(c.market_types for c in configs):
+            market_types = sorted({t for c in configs for t in c.market_types})
+
+        starts = [c.start_date for c in configs]
+        ends = [c.end_date for c in configs]
+
+        combined = replace(
+            configs[0],
+            name="Combined sweep filters",
+            min_confidence=min(c.min_confidence for c in configs),
+            min_edge=min(c.min_edge for c in configs),
+            min_price=min(c.min_price for c in configs),
+            max_price=max(c.max_price for c in configs),
+            start_date=None if None in starts else min(starts),
+            end_date=None if None in ends else max(ends),
+        )
+        # __post_init__ turns None into the default list, so set it afterwards
+        combined.market_types = market_types
+        return combined
+
+    @staticmethod
+    def make_config_grid(base: BacktestConfig, **param_values) -> List[BacktestConfig]:
+        """
+        Cartesian product of parameter values over a base config.
+
+        Example:
+            make_config_grid(base, kelly_fraction=[0.1, 0.25, 0.5],
+                             min_confidence=[50, 60, 70])
+        """
+        names = list(param_values)
+        grid = []
+        for values in itertools.product(*(param_values[n] for n in names)):
+            params = dict(zip(names, values))
+            label = ', '.join(f"{k}={v}" for k, v in params.items())
+            grid.append(replace(base, name=f"{base.name} [{label}]", **params))
+        return grid
+
+    def _summarize_simulation(self, config: BacktestConfig, df: Optional[pd.DataFrame],
+                              arrays: Dict[str, np.ndarray], mask: np.ndarray,
+                              returns: np.ndarray, rows: np.ndarray,
+                              capital_before: np.ndarray, position_size: np.ndarray,
+                              capital_after: np.ndarray, include_trades: bool = False) -> Dict:
+        """Build the results dict for one simulated config"""
+        if len(rows) == 0 or not mask.any():
+            return self._empty_results(config)
 
-        win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
+        trade_returns = returns[rows]
+        pnl = capital_after - capital_before
+        is_win = pnl > 0
 
-        # Calculate financial metrics
-        trades_df = pd.DataFrame(trades)
-        avg_trade_pnl = trades_df['pnl'].mean()
-        avg_win = trades_df[trades_df['is_win']]['pnl'].mean() if winning_trades > 0 else 0
-        avg_loss = trades_df[~trades_df['is_win']]['pnl'].mean() if losing_trades > 0 else 0
+        total_trades = len(rows)
+        winning_trades = int(is_win.sum())
+        losing_trades = total_trades - winning_trades
 
-        gross_profit = trades_df[trades_df['is_win']]['pnl'].sum() if winning_trades > 0 else 0
-        gross_loss = abs(trades_df[~trades_df['is_win']]['pnl'].sum()) if losing_trades > 0 else 0
-        profit_factor = (gross_profit / gross_loss) if gross_loss > 0 else np.inf
+        equity = np.concatenate([[config.initial_capital], capital_after])
+        final_capital = float(equity[-1])
+        total_pnl = final_capital - config.initial_capital
 
-        # Calculate risk-adjusted metrics
-        returns = np.array(returns_list)
-        equity = np.array(equity_curve)
+        gross_profit = float(pnl[is_win].sum()) if winning_trades > 0 else 0
+        gross_loss = abs(float(pnl[~is_win].sum())) if losing_trades > 0 else 0
 
-        sharpe = calculate_sharpe_ratio(returns, periods_per_year=365) if len(returns) > 1 else 0
-        sortino = calculate_sortino_ratio(returns, periods_per_year=365) if len(returns) > 1 else 0
+        sharpe = calculate_sharpe_ratio(trade_returns, periods_per_year=365) if total_trades > 1 else 0
+        sortino = calculate_sortino_ratio(trade_returns, periods_per_year=365) if total_trades > 1 else 0
+        calmar = calculate_calmar_ratio(trade_returns, equity, periods_per_year=365) if total_trades > 1 else 0
 
         max_dd_pct, start_idx, end_idx = calculate_max_drawdown(equity)
         max_dd_amount = equity[start_idx] - equity[end_idx] if start_idx >= 0 else 0
 
-        calmar = calculate_calmar_ratio(returns, equity, periods_per_year=365) if len(returns) > 1 else 0
+        # Calibration over every row the config would have loaded
+        avg_brier = calculate_brier_score(arrays['probability'][mask], arrays['is_correct'][mask].astype(float))
+        avg_log_loss = calculate_log_loss(arrays['probability'][mask], arrays['is_correct'][mask].astype(float))
 
-        # Calculate calibration metrics
-        predicted_probs = df['predicted_probability'].values
-        actual_outcomes = df['is_correct'].astype(float).values
+        if df is not None:
+            predicted_at = df['predicted_at'][mask]
+        else:
+            predicted_at = pd.to_datetime(arrays['predicted_at'][mask])
 
-        avg_brier = calculate_brier_score(predicted_probs, actual_outcomes)
-        avg_log_loss = calculate_log_loss(predicted_probs, actual_outcomes)
+        trades = []
+        if include_trades and df is not None:
+            trades_df = df.iloc[rows]
+            trades = pd.DataFrame({
+                'ticker': trades_df['ticker'].to_numpy(),
+                'market_type': trades_df['market_type'].to_numpy(),
+                'prediction_outcome': trades_df['predicted_outcome'].to_numpy(),
+                'actual_outcome': trades_df['actual_outcome'].to_numpy(),
+                'confidence_score': trades_df['confidence_score'].to_numpy(),
+                'edge_percentage': arrays['edge'][rows],
+                'entry_price': arrays['price'][rows],
+                'position_size': position_size,
+                'position_pct': position_size / capital_before * 100,
+                'is_win': is_win,
+                'pnl': pnl,
+                'roi_pct': trade_returns * 100,
+                'trade_date': trades_df['predicted_at'].to_numpy(),
+                'settlement_date': trades_df['settled_at'].to_numpy(),
+                'capital_before': capital_before,
+                'capital_after': capital_after,
+            }).to_dict('records')
 
         return {
             'config': config,
-            'start_date': df['predicted_at'].min(),
-            'end_date': df['predicted_at'].max(),
+            'start_date': predicted_at.min(),
+            'end_date': predicted_at.max(),
             'total_trades': total_trades,
             'winning_trades': winning_trades,
             'losing_trades': losing_trades,
-            'win_rate': win_rate,
+            'win_rate': winning_trades / total_trades * 100,
             'final_capital': final_capital,
             'total_pnl': total_pnl,
-            'total_return_pct': total_return_pct,
+            'total_return_pct': (total_pnl / config.initial_capital) * 100,
             'sharpe_ratio': sharpe,
             'sortino_ratio': sortino,
             'calmar_ratio': calmar,
             'max_drawdown_pct': abs(max_dd_pct),
             'max_drawdown_amount': max_dd_amount,
-            'avg_trade_pnl': avg_trade_pnl,
-            'avg_win_amount': avg_win,
-            'avg_loss_amount': avg_loss,
-            'profit_factor': profit_factor,
+            'avg_trade_pnl': float(pnl.mean()),
+            'avg_win_amount': float(pnl[is_win].mean()) if winning_trades > 0 else 0,
+            'avg_loss_amount': float(pnl[~is_win].mean()) if losing_trades > 0 else 0,
+            'profit_factor': (gross_profit / gross_loss) if gross_loss > 0 else np.inf,
             'avg_brier_score': avg_brier,
             'avg_log_loss': avg_log_loss,
             'trades': trades,
-            'equity_curve': equity_curve,
+            'equity_curve': equity.tolist(),
         }
 
+    def run_backtest(self, config: BacktestConfig) -> Dict:
+        """
+        Run backtest simulation.
+
+        Args:
+            config: Backtest configuration
+
+        Returns:
+            Dictionary with backtest results
+        """
+        logger.info(f"Starting backtest: {config.name}")
+
+        # Load historical data
+        df = self.load_historical_data(config)
+
+        if df.empty:
+            logger.warning("No historical data found for backtest")
+            return self._empty_results(config)
+
+        results = self.evaluate_grid([config], df, include_trades=True)[0]
+
+        # Store results in database
+        self._store_results(config, results, results['trades'])
+
+        logger.info(f"Backtest complete: {results['total_trades']} trades, "
+                    f"Final Capital: ${results['final_capital']:.2f}")
+
+        return results
+
     def _empty_results(self, config: BacktestConfig) -> Dict:
         """Return empty results structure"""
         return {
@@ -458,6 +675,75 @@ class BacktestEngine:
             'equity_curve': [config.initial_capital],
         }
 
+    RESULT_COLUMNS = """
+        backtest_name, strategy_name, version,
+        start_date, end_date,
+        initial_capital, position_sizing, kelly_fraction,
+        max_position_size, max_drawdown_limit,
+        min_confidence, min_edge, market_types,
+        total_trades, winning_trades, losing_trades, win_rate,
+        final_capital, total_pnl, total_return_pct,
+        sharpe_ratio, sortino_ratio, calmar_ratio,
+        max_drawdown_pct, max_drawdown_amount,
+        avg_trade_pnl, avg_win_amount, avg_loss_amount, profit_factor,
+        avg_brier_score, avg_log_loss
+    """
+
+    @staticmethod
+    def _result_row(config: BacktestConfig, results: Dict) -> Tuple:
+        """backtest_results values for one run, in RESULT_COLUMNS order"""
+        return (
+            config.name, config.strategy_name, config.version,
+            results['start_date'], results['end_date'],
+            config.initial_capital, config.position_sizing, config.kelly_fraction,
+            config.max_position_size, config.max_drawdown_limit,
+            config.min_confidence, config.min_edge, config.market_types,
+            results['total_trades'], results['winning_trades'], results['losing_trades'],
+            results['win_rate'],
+            results['final_capital'], results['total_pnl'], results['total_return_pct'],
+            results['sharpe_ratio'], results['sortino_ratio'], results['calmar_ratio'],
+            results['max_drawdown_pct'], results['max_drawdown_amount'],
+            results['avg_trade_pnl'], results['avg_win_amount'], results['avg_loss_amount'],
+            results['profit_factor'],
+            results['avg_brier_score'], results['avg_log_loss']
+        )
+
+    def store_results_batch(self, results_list: List[Dict]) -> int:
+        """
+        Store many backtest summaries (no per-trade rows) in one statement.
+
+        Args:
+            results_list: Results dicts, each carrying its 'config'
+
+        Returns:
+            Number of rows stored
+        """
+        if not results_list:
+            return 0
+
+        conn = self.get_connection()
+        cur = conn.cursor()
+
+        try:
+            psycopg2.extras.execute_values(
+                cur,
+                f"INSERT INTO backtest_results ({self.RESULT_COLUMNS}) VALUES %s",
+                [self._result_row(r['config'], r) for r in results_list],
+                page_size=500
+            )
+            conn.commit()
+            logger.info(f"Stored {len(results_list)} backtest results")
+            return len(results_list)
+
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Error storing backtest results batch: {e}")
+            return 0
+
+        finally:
+            cur.close()
+            conn.close()
+
     def _store_results(self, config: BacktestConfig, results: Dict, trades: List[Dict]):
         """Store backtest results in database"""
         conn = self.get_connection()
@@ -465,40 +751,12 @@ class BacktestEngine:
 
         try:
             # Store backtest summary
-            cur.execute("""
-                INSERT INTO backtest_results (
-                    backtest_name, strategy_name, version,
-                    start_date, end_date,
-                    initial_capital, position_sizing, kelly_fraction,
-                    max_position_size, max_drawdown_limit,
-                    min_confidence, min_edge, market_types,
-                    total_trades, winning_trades, losing_trades, win_rate,
-                    final_capital, total_pnl, total_return_pct,
-                    sharpe_ratio, sortino_ratio, calmar_ratio,
-                    max_drawdown_pct, max_drawdown_amount,
-                    avg_trade_pnl, avg_win_amount, avg_loss_amount, profit_factor,
-                    avg_brier_score, avg_log_loss
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s, %s
-                )
+            row = self._result_row(config, results)
+            cur.execute(f"""
+                INSERT INTO backtest_results ({self.RESULT_COLUMNS})
+                VALUES ({', '.join(['%s'] * len(row))})
                 RETURNING id
-            """, (
-                config.name, config.strategy_name, config.version,
-                results['start_date'], results['end_date'],
-                config.initial_capital, config.position_sizing, config.kelly_fraction,
-                config.max_position_size, config.max_drawdown_limit,
-                config.min_confidence, config.min_edge, config.market_types,
-                results['total_trades'], results['winning_trades'], results['losing_trades'],
-                results['win_rate'],
-                results['final_capital'], results['total_pnl'], results['total_return_pct'],
-                results['sharpe_ratio'], results['sortino_ratio'], results['calmar_ratio'],
-                results['max_drawdown_pct'], results['max_drawdown_amount'],
-                results['avg_trade_pnl'], results['avg_win_amount'], results['avg_loss_amount'],
-                results['profit_factor'],
-                results['avg_brier_score'], results['avg_log_loss']
-            ))
+            """, row)
 
             backtest_id = cur.fetchone()[0]
 
@@ -541,6 +799,9 @@ class BacktestEngine:
         """
         Compare multiple strategies.
 
+        Historical data is loaded once for all configs and simulated with
+        evaluate_grid; each config's results are still stored.
+
         Args:
             configs: List of backtest configurations
 
@@ -549,8 +810,10 @@ class BacktestEngine:
         """
         results = []
 
-        for config in configs:
-            backtest_results = self.run_backtest(config)
+        for config, backtest_results in zip(configs, self.evaluate_grid(configs, include_trades=True)):
+            if backtest_results['total_trades'] > 0:
+                self._store_results(config, backtest_results, backtest_results['trades'])
+
             results.append({
                 'Strategy': config.name,
                 'Total Trades': backtest_results['total_trades'],
@@ -3,31 +3,250 @@ Feature Store for Kalshi Prediction Markets
 
 Versioned storage and retrieval of computed features for ML training and prediction.
 Uses PostgreSQL with JSONB for flexible feature storage and fast retrieval.
+
+Reads go through two tiers in front of Postgres:
+- FeatureCache: in-process LRU of per-ticker feature dicts (TTL + entry cap)
+- FeatureSnapshot: columnar .npz snapshot per feature version/set for
+  training-set and batch-prediction pulls (see get_features_matrix)
 """
 
 import os
+import re
+import time
+import threading
 import psycopg2
 import psycopg2.extras
 import pandas as pd
 import numpy as np
 import json
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Dict, Optional, Any
+from typing import Callable, List, Dict, Optional, Any, Tuple
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DEFAULT_SNAPSHOT_DIR = os.getenv(
+    'FEATURE_SNAPSHOT_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                 'data', 'feature_snapshots')
+)
+
+# One JSONB feature as float8: numbers as-is, booleans as 0/1, anything else NULL
+_NUMERIC_FEATURE_SQL = (
+    "CASE jsonb_typeof(features -> {key})"
+    " WHEN 'number' THEN (features ->> {key})::float8"
+    " WHEN 'boolean' THEN (features ->> {key})::boolean::int::float8"
+    " END"
+)
+
+
+def _utc_naive(values) -> np.ndarray:
+    """Timestamps (aware or naive UTC, None allowed) as naive UTC datetime64[ns]"""
+    return pd.to_datetime(pd.Series(list(values), dtype=object), utc=True).dt.tz_localize(None).values
+
+
+def _as_utc(value) -> pd.Timestamp:
+    ts = pd.Timestamp(value)
+    return ts.tz_localize('UTC') if ts.tzinfo is None else ts.tz_convert('UTC')
+
+
+class FeatureCache:
+    """Thread-safe LRU cache with per-entry TTL and a maximum entry count"""
+
+    def __init__(self, max_entries: int = 50000, ttl: float = 900.0):
+        """
+        Args:
+            max_entries: Least recently used entries are evicted past this size
+            ttl: Time to live in seconds (0 or None = no expiry)
+        """
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                if not self.ttl or time.monotonic() - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, predicate: Callable[[str], bool]) -> int:
+        """Drop every key matching predicate; returns the number removed"""
+        with self._lock:
+            keys = [k for k in self._entries if predicate(k)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+
+@dataclass
+class FeatureSnapshot:
+    """
+    Columnar copy of one feature version/set: a dense float64 matrix
+    (rows = markets, columns = numeric features, NaN = missing) plus
+    per-row metadata arrays.
+    """
+    feature_version: str
+    feature_set: str
+    names: List[str]
+    tickers: np.ndarray
+    market_ids: np.ndarray
+    market_types: np.ndarray
+    close_time: np.ndarray      # naive UTC datetime64[ns]
+    computed_at: np.ndarray     # naive UTC datetime64[ns]
+    matrix: np.ndarray
+    skipped_names: List[str] = field(default_factory=list)  # non-numeric features left out
+    _positions: Optional[Dict[str, int]] = field(default=None, repr=False)
+
+    @classmethod
+    def from_rows(cls, feature_version: str, feature_set: str, names: List[str],
+                  rows: List[tuple], skipped_names: Optional[List[str]] = None) -> 'FeatureSnapshot':
+        """Build from (ticker, market_id, market_type, close_time, computed_at, values) rows"""
+        return cls(
+            feature_version=feature_version,
+            feature_set=feature_set,
+            names=list(names),
+            tickers=np.array([r[0] for r in rows], dtype=str),
+            market_ids=np.array([r[1] for r in rows], dtype=np.int64),
+            market_types=np.array([r[2] or '' for r in rows], dtype=str),
+            close_time=_utc_naive(r[3] for r in rows),
+            computed_at=_utc_naive(r[4] for r in rows),
+            matrix=np.array([r[5] for r in rows], dtype=np.float64).reshape(len(rows), len(names)),
+            skipped_names=list(skipped_names or []),
+        )
+
+    @property
+    def row_count(self) -> int:
+        return len(self.tickers)
+
+    @property
+    def max_computed_at(self) -> Optional[pd.Timestamp]:
+        if not self.row_count:
+            return None
+        return pd.Timestamp(self.computed_at.max())
+
+    def row_indices(self, tickers: List[str]) -> np.ndarray:
+        """Row index per ticker, -1 where the snapshot has no row"""
+        if self._positions is None:
+            # Later rows win, matching get_features_bulk for duplicate tickers
+            self._positions = {t: i for i, t in enumerate(self.tickers.tolist())}
+        positions = self._positions
+        return np.fromiter((positions.get(t, -1) for t in tickers), dtype=np.int64, count=len(tickers))
+
+    def select(self, tickers: List[str], names: List[str]) -> np.ndarray:
+        """Dense (len(tickers), len(names)) matrix; unknown tickers/names are NaN"""
+        rows = self.row_indices(tickers)
+        column_of = {n: i for i, n in enumerate(self.names)}
+        cols = np.array([column_of.get(n, -1) for n in names], dtype=np.int64)
+
+        result = self.matrix[np.ix_(np.maximum(rows, 0), np.maximum(cols, 0))] \
+            if self.matrix.size else np.empty((len(rows), len(cols)))
+        result[rows < 0, :] = np.nan
+        result[:, cols < 0] = np.nan
+        return result
+
+    def to_frame(self) -> pd.DataFrame:
+        """Metadata plus one column per feature, in snapshot row order"""
+        df = pd.DataFrame({
+            'ticker': self.tickers.astype(object),
+            'market_id': self.market_ids,
+            'market_type': np.where(self.market_types == '', None, self.market_types.astype(object)),
+            'close_time': pd.DatetimeIndex(self.close_time).tz_localize('UTC'),
+            'computed_at': pd.DatetimeIndex(self.computed_at).tz_localize('UTC'),
+        })
+        features = pd.DataFrame(self.matrix, columns=self.names)
+        return pd.concat([df, features], axis=1)
+
+    def save(self, path: str):
+        """Write atomically as a single .npz (no pickled objects)"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                feature_version=np.array(self.feature_version),
+                feature_set=np.array(self.feature_set),
+                names=np.array(self.names, dtype=str),
+                skipped_names=np.array(self.skipped_names, dtype=str),
+                tickers=self.tickers,
+                market_ids=self.market_ids,
+                market_types=self.market_types,
+                close_time=self.close_time,
+                computed_at=self.computed_at,
+                matrix=self.matrix,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'FeatureSnapshot':
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                feature_version=str(data['feature_version']),
+                feature_set=str(data['feature_set']),
+                names=data['names'].tolist(),
+                tickers=data['tickers'],
+                market_ids=data['market_ids'],
+                market_types=data['market_types'],
+                close_time=data['close_time'],
+                computed_at=data['computed_at'],
+                matrix=data['matrix'],
+                skipped_names=data['skipped_names'].tolist(),
+            )
+
 
 class FeatureStore:
     """Manages feature storage and retrieval with versioning"""
 
-    def __init__(self, db_config: Optional[Dict] = None):
+    def __init__(self, db_config: Optional[Dict] = None, cache_size: int = 50000,
+                 cache_ttl: float = 900.0, snapshot_dir: Optional[str] = DEFAULT_SNAPSHOT_DIR):
         """
         Initialize feature store.
 
         Args:
             db_config: Database configuration dict. If None, uses default.
+            cache_size: Maximum per-ticker entries in the LRU cache
+            cache_ttl: Seconds before a cached entry is re-read from Postgres
+            snapshot_dir: Directory for columnar snapshots (None = memory only)
         """
         self.db_config = db_config or {
             'host': 'localhost',
@@ -36,7 +255,9 @@ class FeatureStore:
             'user': 'postgres',
             'password': os.getenv('DB_PASSWORD')
         }
-        self._cache = {}  # In-memory cache for frequently accessed features
+        self._cache = FeatureCache(max_entries=cache_size, ttl=cache_ttl)
+        self.snapshot_dir = snapshot_dir
+        self._snapshots: Dict[Tuple[str, str], FeatureSnapshot] = {}
 
     def get_connection(self):
         """Get database connection"""
@@ -88,6 +309,11 @@ class FeatureStore:
             ))
 
             conn.commit()
+
+            # Write through so cached reads never see the previous version
+            self._cache.set(self._cache_key(ticker, feature_version, feature_set),
+                            self._deserialize_features(features_json))
+
             logger.debug(f"Stored {feature_count} features for {ticker} ({feature_set} {feature_version})")
             return True
 
@@ -114,12 +340,14 @@ class FeatureStore:
         Returns:
             Dictionary of features or None if not found
         """
-        cache_key = f"{ticker}:{feature_version}:{feature_set}"
+        cache_key = self._cache_key(ticker, feature_version, feature_set)
 
         # Check cache
-        if use_cache and cache_key in self._cache:
-            logger.debug(f"Cache hit for {cache_key}")
-            return self._cache[cache_key]
+        if use_cache:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"Cache hit for {cache_key}")
+                return cached
 
         conn = self.get_connection()
         cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
@@ -141,7 +369,7 @@ class FeatureStore:
 
                 # Update cache
                 if use_cache:
-                    self._cache[cache_key] = features
+                    self._cache.set(cache_key, features)
 
                 return features
 
@@ -152,14 +380,17 @@ class FeatureStore:
             conn.close()
 
     def get_features_bulk(self, tickers: List[str], feature_version: str = "v1.0",
-                         feature_set: str = "base") -> Dict[str, Dict[str, Any]]:
+                         feature_set: str = "base", use_cache: bool = True) -> Dict[str, Dict[str, Any]]:
         """
         Retrieve features for multiple markets at once.
 
+        Cached tickers are served from memory; only misses hit Postgres.
+
         Args:
             tickers: List of market tickers
             feature_version: Version string
             feature_set: Feature set name
+            use_cache: Use in-memory cache if available
 
         Returns:
             Dictionary mapping ticker -> features
@@ -167,6 +398,19 @@ class FeatureStore:
         if not tickers:
             return {}
 
+        features_dict = {}
+        missing = list(tickers)
+        if use_cache:
+            missing = []
+            for ticker in dict.fromkeys(tickers):
+                cached = self._cache.get(self._cache_key(ticker, feature_version, feature_set))
+                if cached is not None:
+                    features_dict[ticker] = cached
+                else:
+                    missing.append(ticker)
+            if not missing:
+                return features_dict
+
         conn = self.get_connection()
         cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
 
@@ -177,15 +421,16 @@ class FeatureStore:
                 WHERE ticker = ANY(%s)
                   AND feature_version = %s
                   AND feature_set = %s
-            """, (tickers, feature_version, feature_set))
+            """, (missing, feature_version, feature_set))
 
             results = cur.fetchall()
 
-            features_dict = {}
             for row in results:
                 ticker = row['ticker']
-                features = dict(row['features'])
-                features_dict[ticker] = self._deserialize_features(features)
+                features = self._deserialize_features(dict(row['features']))
+                features_dict[ticker] = features
+                if use_cache:
+                    self._cache.set(self._cache_key(ticker, feature_version, feature_set), features)
 
             return features_dict
 
@@ -197,20 +442,46 @@ class FeatureStore:
                               feature_set: str = "base",
                               market_type: Optional[str] = None,
                               start_date: Optional[datetime] = None,
-                              end_date: Optional[datetime] = None) -> pd.DataFrame:
+                              end_date: Optional[datetime] = None,
+                              use_snapshot: bool = True) -> pd.DataFrame:
         """
         Get features as a DataFrame for ML training.
 
+        Served from the columnar snapshot when it is current (an unfiltered
+        call builds one) and every feature is numeric; otherwise the JSONB
+        rows are expanded directly.
+
         Args:
             feature_version: Version string
             feature_set: Feature set name
             market_type: Filter by market type
             start_date: Filter by close time >= start_date
             end_date: Filter by close time <= end_date
+            use_snapshot: Allow the columnar snapshot path
 
         Returns:
             DataFrame with features
         """
+        if use_snapshot:
+            snapshot = self.get_snapshot(feature_version, feature_set)
+            if snapshot is None and not (market_type or start_date or end_date):
+                snapshot = self.build_snapshot(feature_version, feature_set)
+
+            if snapshot is not None and not snapshot.skipped_names:
+                if not snapshot.row_count:
+                    return pd.DataFrame()
+
+                mask = np.ones(snapshot.row_count, dtype=bool)
+                if market_type:
+                    mask &= snapshot.market_types == market_type
+                if start_date:
+                    mask &= snapshot.close_time >= _as_utc(start_date).tz_localize(None).to_datetime64()
+                if end_date:
+                    mask &= snapshot.close_time <= _as_utc(end_date).tz_localize(None).to_datetime64()
+
+                # Snapshot rows are already ordered by close_time
+                return snapshot.to_frame()[mask].reset_index(drop=True)
+
         conn = self.get_connection()
 
         query = """
@@ -262,6 +533,196 @@ class FeatureStore:
         finally:
             conn.close()
 
+    def get_features_matrix(self, tickers: List[str], names: Optional[List[str]] = None,
+                            feature_version: str = "v1.0", feature_set: str = "base",
+                            use_snapshot: bool = True) -> np.ndarray:
+        """
+        Dense feature matrix for model training and batch prediction.
+
+        Rows follow tickers and columns follow names. Missing markets,
+        missing features and non-numeric values are NaN; booleans are 0/1.
+        Served from a current columnar snapshot when available, otherwise
+        Postgres extracts the columns directly so no per-row dicts are built.
+
+        Args:
+            tickers: Market tickers (row order)
+            names: Feature names (column order). None = all numeric features
+            feature_version: Version string
+            feature_set: Feature set name
+            use_snapshot: Allow the columnar snapshot path
+
+        Returns:
+            float64 array of shape (len(tickers), len(names))
+        """
+        tickers = list(tickers)
+
+        snapshot = self.get_snapshot(feature_version, feature_set) if use_snapshot else None
+        if names is None:
+            names = snapshot.names if snapshot is not None \
+                else self._snapshot_feature_names(feature_version, feature_set)[0]
+        names = list(names)
+
+        if snapshot is not None:
+            return snapshot.select(tickers, names)
+
+        if not tickers:
+            return np.empty((0, len(names)))
+
+        rows = self._fetch_matrix_rows(names, feature_version, feature_set, tickers=tickers)
+        fetched = FeatureSnapshot.from_rows(feature_version, feature_set, names, rows)
+        return fetched.select(tickers, names)
+
+    def build_snapshot(self, feature_version: str = "v1.0", feature_set: str = "base",
+                       save: bool = True) -> FeatureSnapshot:
+        """
+        Pull a whole feature version/set into a columnar snapshot.
+
+        Args:
+            feature_version: Version string
+            feature_set: Feature set name
+            save: Persist to snapshot_dir (if configured)
+
+        Returns:
+            The new snapshot (also kept in memory)
+        """
+        start = time.perf_counter()
+        names, skipped = self._snapshot_feature_names(feature_version, feature_set)
+        if skipped:
+            logger.info(f"Snapshot {feature_set} {feature_version}: skipping non-numeric features {skipped}")
+
+        rows = self._fetch_matrix_rows(names, feature_version, feature_set)
+        snapshot = FeatureSnapshot.from_rows(feature_version, feature_set, names, rows, skipped)
+
+        if save and self.snapshot_dir:
+            snapshot.save(self._snapshot_path(feature_version, feature_set))
+
+        self._snapshots[(feature_version, feature_set)] = snapshot
+        logger.info(f"Built {feature_set} {feature_version} snapshot: {snapshot.row_count} rows x "
+                    f"{len(names)} features in {time.perf_counter() - start:.2f}s")
+        return snapshot
+
+    def get_snapshot(self, feature_version: str = "v1.0", feature_set: str = "base",
+                     check_current: bool = True) -> Optional[FeatureSnapshot]:
+        """
+        In-memory or on-disk snapshot, or None if missing or stale.
+
+        A snapshot is current when its row count and latest computed_at
+        match the table (one aggregate query).
+        """
+        key = (feature_version, feature_set)
+        snapshot = self._snapshots.get(key)
+
+        if snapshot is None and self.snapshot_dir:
+            path = self._snapshot_path(feature_version, feature_set)
+            if os.path.exists(path):
+                try:
+                    snapshot = FeatureSnapshot.load(path)
+                except Exception as e:
+                    logger.warning(f"Could not load feature snapshot {path}: {e}")
+                    return None
+                self._snapshots[key] = snapshot
+
+        if snapshot is None or not check_current:
+            return snapshot
+
+        row_count, latest = self._snapshot_state(feature_version, feature_set)
+        snapshot_latest = snapshot.max_computed_at
+        if latest is not None:
+            latest = _as_utc(latest).tz_localize(None)
+        if row_count != snapshot.row_count or latest != snapshot_latest:
+            logger.debug(f"Feature snapshot {feature_set} {feature_version} is stale")
+            self._snapshots.pop(key, None)
+            return None
+
+        return snapshot
+
+    def _snapshot_path(self, feature_version: str, feature_set: str) -> str:
+        filename = re.sub(r'[^A-Za-z0-9_.-]', '_', f"{feature_set}_{feature_version}") + '.npz'
+        return os.path.join(self.snapshot_dir, filename)
+
+    def _snapshot_state(self, feature_version: str, feature_set: str) -> Tuple[int, Optional[datetime]]:
+        """(row count, latest computed_at) for a version/set"""
+        conn = self.get_connection()
+        cur = conn.cursor()
+
+        try:
+            cur.execute("""
+                SELECT COUNT(*), MAX(computed_at)
+                FROM feature_store
+                WHERE feature_version = %s
+                  AND feature_set = %s
+            """, (feature_version, feature_set))
+
+            row_count, latest = cur.fetchone()
+            return int(row_count), latest
+
+        finally:
+            cur.close()
+            conn.close()
+
+    def _snapshot_feature_names(self, feature_version: str,
+                                feature_set: str) -> Tuple[List[str], List[str]]:
+        """
+        All feature names for a version/set in stored order, split into
+        (numeric, non-numeric) by the JSONB types actually present.
+        """
+        conn = self.get_connection()
+        cur = conn.cursor()
+
+        try:
+            cur.execute("""
+                SELECT u.name,
+                       bool_and(jsonb_typeof(features -> u.name) IN ('number', 'boolean', 'null'))
+                FROM feature_store,
+                     unnest(feature_names) WITH ORDINALITY AS u(name, pos)
+                WHERE feature_version = %s
+                  AND feature_set = %s
+                GROUP BY u.name
+                ORDER BY MIN(u.pos), u.name
+            """, (feature_version, feature_set))
+
+            numeric, skipped = [], []
+            for name, is_numeric in cur.fetchall():
+                (numeric if is_numeric is not False else skipped).append(name)
+            return numeric, skipped
+
+        finally:
+            cur.close()
+            conn.close()
+
+    def _fetch_matrix_rows(self, names: List[str], feature_version: str, feature_set: str,
+                           tickers: Optional[List[str]] = None) -> List[tuple]:
+        """
+        (ticker, market_id, market_type, close_time, computed_at, values) rows
+        with the named features extracted to a float8[] by Postgres.
+        """
+        params: Dict[str, Any] = {f"f{i}": name for i, name in enumerate(names)}
+        params.update(feature_version=feature_version, feature_set=feature_set)
+        columns = ", ".join(_NUMERIC_FEATURE_SQL.format(key=f"%(f{i})s") for i in range(len(names)))
+
+        query = f"""
+            SELECT ticker, market_id, market_type, close_time, computed_at,
+                   ARRAY[{columns}]::float8[]
+            FROM feature_store
+            WHERE feature_version = %(feature_version)s
+              AND feature_set = %(feature_set)s
+        """
+        if tickers is not None:
+            query += " AND ticker = ANY(%(tickers)s)"
+            params['tickers'] = list(tickers)
+        query += " ORDER BY close_time, id"
+
+        conn = self.get_connection()
+        cur = conn.cursor()
+
+        try:
+            cur.execute(query, params)
+            return cur.fetchall()
+
+        finally:
+            cur.close()
+            conn.close()
+
     def delete_features(self, ticker: str, feature_version: Optional[str] = None,
                        feature_set: Optional[str] = None) -> int:
         """
@@ -421,6 +882,8 @@ class FeatureStore:
             result = cur.fetchone()
             stats['latest_computation'] = result['latest']
 
+            stats['cache'] = self._cache.stats()
+
             return stats
 
         finally:
@@ -434,9 +897,12 @@ class FeatureStore:
 
     def _clear_cache(self, ticker: str):
         """Clear cache entries for a specific ticker"""
-        keys_to_remove = [k for k in self._cache.keys() if k.startswith(f"{ticker}:")]
-        for key in keys_to_remove:
-            del self._cache[key]
+        prefix = f"{ticker}:"
+        self._cache.invalidate(lambda key: key.startswith(prefix))
+
+    @staticmethod
+    def _cache_key(ticker: str, feature_version: str, feature_set: str) -> str:
+        return f"{ticker}:{feature_version}:{feature_set}"
 
     def _serialize_features(self, features: Dict[str, Any]) -> Dict[str, Any]:
         """Convert features to JSON-serializable format"""
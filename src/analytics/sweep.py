@@ -0,0 +1,353 @@
+"""
+Parallel Parameter Sweeps for the Backtesting Engine
+
+Loads prediction history once, places its column arrays in shared memory,
+and evaluates config grids across worker processes:
+- Rolling windows: every config scored on every window
+- Walk-forward: best config per training window, scored on the next test window
+
+Per-config summaries are streamed to backtest_results in batches.
+"""
+
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, replace
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .backtest import BacktestEngine, BacktestConfig
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SweepWindow:
+    """One evaluation window; train bounds are None for rolling sweeps"""
+    test_start: pd.Timestamp
+    test_end: pd.Timestamp
+    train_start: Optional[pd.Timestamp] = None
+    train_end: Optional[pd.Timestamp] = None
+
+    def bounds(self, phase: str) -> Tuple[pd.Timestamp, pd.Timestamp]:
+        """(start, end) of the training window for 'train', else the test window"""
+        if phase == 'train':
+            return self.train_start, self.train_end
+        return self.test_start, self.test_end
+
+    def label(self, phase: str = 'test') -> str:
+        start, end = self.bounds(phase)
+        return f"{start:%Y-%m-%d}..{end:%Y-%m-%d}"
+
+
+def make_windows(start: pd.Timestamp, end: pd.Timestamp, test_days: int,
+                 train_days: Optional[int] = None, step_days: Optional[int] = None,
+                 anchored: bool = False) -> List[SweepWindow]:
+    """
+    Build evaluation windows over [start, end].
+
+    Args:
+        start: First prediction time
+        end: Last prediction time
+        test_days: Length of each evaluation window
+        train_days: Training length before each test window (walk-forward);
+            None for plain rolling windows
+        step_days: Days between window starts (defaults to test_days)
+        anchored: Walk-forward training always starts at start
+
+    Returns:
+        List of SweepWindow
+    """
+    start = pd.Timestamp(start)
+    end = pd.Timestamp(end)
+    test = pd.Timedelta(days=test_days)
+    step = pd.Timedelta(days=step_days or test_days)
+    train = pd.Timedelta(days=train_days) if train_days else None
+
+    windows = []
+    test_start = start + train if train is not None else start
+    while test_start <= end:
+        window = SweepWindow(test_start=test_start, test_end=test_start + test)
+        if train is not None:
+            window.train_start = start if anchored else test_start - train
+            window.train_end = test_start
+        windows.append(window)
+        test_start += step
+
+    return windows
+
+
+class SharedArrays:
+    """
+    Numeric column arrays copied once into shared memory blocks.
+
+    Workers attach by name through spec, so the data is never pickled.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self._blocks: List[shared_memory.SharedMemory] = []
+        self.spec: Dict[str, Tuple[str, Tuple[int, ...], str]] = {}
+        self.extras: Dict[str, np.ndarray] = {}
+
+        for name, array in arrays.items():
+            if array.dtype == object:
+                # Small lookup tables (e.g. market type categories) travel with the spec
+                self.extras[name] = array
+                continue
+
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+            view[...] = array
+            self._blocks.append(block)
+            self.spec[name] = (block.name, array.shape, array.dtype.str)
+
+    @staticmethod
+    def attach(spec: Dict, extras: Dict[str, np.ndarray]) -> Tuple[Dict[str, np.ndarray], List]:
+        """Map shared blocks back to arrays; keep the returned handles alive"""
+        arrays = dict(extras)
+        handles = []
+        for name, (block_name, shape, dtype) in spec.items():
+            block = shared_memory.SharedMemory(name=block_name)
+            handles.append(block)
+            arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        return arrays, handles
+
+    def close(self):
+        """Release and unlink every block"""
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+
+# Worker-process state set by _init_worker
+_worker_arrays: Optional[Dict[str, np.ndarray]] = None
+_worker_handles: List = []
+
+
+def _init_worker(spec: Dict, extras: Dict[str, np.ndarray]):
+    global _worker_arrays, _worker_handles
+    _worker_arrays, _worker_handles = SharedArrays.attach(spec, extras)
+
+
+def _evaluate_task(configs: List[BacktestConfig], window_start: Optional[int],
+                   window_end: Optional[int],
+                   arrays: Optional[Dict[str, np.ndarray]] = None) -> List[Dict]:
+    """Evaluate a chunk of configs on one window [start, end) of predicted_at (ns)"""
+    arrays = arrays if arrays is not None else _worker_arrays
+
+    row_mask = None
+    if window_start is not None:
+        predicted_at = arrays['predicted_at']
+        row_mask = (predicted_at >= window_start) & (predicted_at < window_end)
+
+    results = BacktestEngine().evaluate_grid(configs, arrays=arrays, row_mask=row_mask)
+
+    # Equity curves stay in the worker; only summaries are sent back
+    for result in results:
+        result.pop('equity_curve', None)
+        result.pop('trades', None)
+    return results
+
+
+class BacktestSweepRunner:
+    """Run config sweeps over shared, once-loaded prediction history"""
+
+    def __init__(self, engine: Optional[BacktestEngine] = None,
+                 max_workers: Optional[int] = None,
+                 chunk_size: int = 50, batch_size: int = 200,
+                 store_results: bool = True):
+        """
+        Args:
+            engine: Backtest engine (DB access for loading and storing)
+            max_workers: Worker processes (None = CPU count, 1 = in-process)
+            chunk_size: Configs per worker task
+            batch_size: Results per backtest_results insert
+            store_results: Stream summaries to backtest_results
+        """
+        self.engine = engine or BacktestEngine()
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.store_results = store_results
+
+    def run_rolling(self, configs: List[BacktestConfig], test_days: int,
+                    step_days: Optional[int] = None,
+                    df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        Score every config on every rolling window.
+
+        Args:
+            configs: Configs to sweep
+            test_days: Window length in days
+            step_days: Days between window starts (defaults to test_days)
+            df: Prediction history (loaded once with combined filters if None)
+
+        Returns:
+            DataFrame with one row per (window, config)
+        """
+        df = self._load(configs, df)
+        if df.empty:
+            return pd.DataFrame()
+
+        windows = make_windows(df['predicted_at'].min(), df['predicted_at'].max(),
+                               test_days, step_days=step_days)
+        tasks = [(i, 'window', list(enumerate(configs))) for i in range(len(windows))]
+
+        rows = self._run_tasks(df, windows, tasks)
+        return pd.DataFrame(rows)
+
+    def run_walk_forward(self, configs: List[BacktestConfig], train_days: int, test_days: int,
+                         step_days: Optional[int] = None, anchored: bool = False,
+                         objective: str = 'sharpe_ratio', min_trades: int = 10,
+                         df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        Walk-forward optimization: pick the best config on each training
+        window by objective, then score it out of sample on the test window.
+
+        Args:
+            configs: Candidate configs
+            train_days: Training window length in days
+            test_days: Test window length in days
+            step_days: Days between windows (defaults to test_days)
+            anchored: Grow the training window from the first prediction
+            objective: Results key to maximize (e.g. 'sharpe_ratio', 'total_return_pct')
+            min_trades: Minimum training trades for a config to be eligible
+            df: Prediction history (loaded once with combined filters if None)
+
+        Returns:
+            DataFrame with one row per (window, config) for training and one
+            'test' row per window for the selected config
+        """
+        df = self._load(configs, df)
+        if df.empty:
+            return pd.DataFrame()
+
+        windows = make_windows(df['predicted_at'].min(), df['predicted_at'].max(),
+                               test_days, train_days=train_days, step_days=step_days,
+                               anchored=anchored)
+
+        train_tasks = [(i, 'train', list(enumerate(configs))) for i in range(len(windows))]
+        train_rows = self._run_tasks(df, windows, train_tasks, keep_configs=True)
+
+        test_tasks = []
+        for i, window in enumerate(windows):
+            candidates = [r for r in train_rows
+                          if r['window_index'] == i and r['total_trades'] >= min_trades]
+            if not candidates:
+                logger.info(f"Window {window.label('train')}: no config with {min_trades}+ training trades")
+                continue
+
+            best = max(candidates, key=lambda r: _objective_value(r, objective))
+            test_tasks.append((i, 'test', [(best['config_index'], best['_config'])]))
+
+        test_rows = self._run_tasks(df, windows, test_tasks)
+
+        for row in train_rows:
+            row.pop('_config', None)
+        return pd.DataFrame(train_rows + test_rows)
+
+    def _load(self, configs: List[BacktestConfig], df: Optional[pd.DataFrame]) -> pd.DataFrame:
+        if df is None:
+            df = self.engine.load_historical_data(self.engine.combined_config(configs))
+        return df
+
+    def _run_tasks(self, df: pd.DataFrame, windows: List[SweepWindow], tasks: List[Tuple],
+                   keep_configs: bool = False) -> List[Dict]:
+        """
+        Run (window_index, phase, [(config_index, config), ...]) tasks and
+        stream summaries to the database as they complete.
+        """
+        if not tasks:
+            return []
+
+        arrays = self.engine.prepare_arrays(df)
+
+        # Split each window's configs into worker-sized chunks
+        jobs = []
+        for window_index, phase, indexed_configs in tasks:
+            window = windows[window_index]
+            start, end = window.bounds(phase)
+            window_configs = [
+                replace(c, name=f"{c.name} [{phase} {window.label(phase)}]")
+                for _, c in indexed_configs
+            ]
+            for offset in range(0, len(window_configs), self.chunk_size):
+                chunk = slice(offset, offset + self.chunk_size)
+                jobs.append((window_index, phase, pd.Timestamp(start).value, pd.Timestamp(end).value,
+                             window_configs[chunk], indexed_configs[chunk]))
+
+        rows: List[Dict] = []
+        pending: List[Dict] = []
+
+        def collect(job, results):
+            window_index, phase, _, _, _, originals = job
+            for (config_index, original), result in zip(originals, results):
+                row = _summary_row(windows[window_index], window_index, phase,
+                                   config_index, original, result)
+                if keep_configs:
+                    row['_config'] = original
+                rows.append(row)
+                if result['total_trades'] > 0:
+                    pending.append(result)
+            if self.store_results and len(pending) >= self.batch_size:
+                batch = pending[:]
+                pending.clear()
+                self.engine.store_results_batch(batch)
+
+        if self.max_workers <= 1 or len(jobs) == 1:
+            for job in jobs:
+                collect(job, _evaluate_task(job[4], job[2], job[3], arrays=arrays))
+        else:
+            shared = SharedArrays(arrays)
+            try:
+                with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                         initargs=(shared.spec, shared.extras)) as pool:
+                    futures = {pool.submit(_evaluate_task, job[4], job[2], job[3]): job for job in jobs}
+                    for future in as_completed(futures):
+                        collect(futures[future], future.result())
+            finally:
+                shared.close()
+
+        if self.store_results and pending:
+            self.engine.store_results_batch(pending)
+
+        rows.sort(key=lambda r: (r['window_index'], r['phase'], r['config_index']))
+        return rows
+
+
+def _objective_value(row: Dict, objective: str) -> float:
+    value = row.get(objective)
+    if value is None or not np.isfinite(value):
+        return -np.inf
+    return float(value)
+
+
+def _summary_row(window: SweepWindow, window_index: int, phase: str, config_index: int,
+                 config: BacktestConfig, result: Dict) -> Dict:
+    """Flatten one evaluated config into a sweep results row"""
+    start, end = window.bounds(phase)
+    return {
+        'window_index': window_index,
+        'phase': phase,
+        'window_start': start,
+        'window_end': end,
+        'config_index': config_index,
+        'strategy': config.name,
+        'position_sizing': config.position_sizing,
+        'kelly_fraction': config.kelly_fraction,
+        'min_confidence': config.min_confidence,
+        'min_edge': config.min_edge,
+        'total_trades': result['total_trades'],
+        'win_rate': result['win_rate'],
+        'total_return_pct': result['total_return_pct'],
+        'sharpe_ratio': result['sharpe_ratio'],
+        'sortino_ratio': result['sortino_ratio'],
+        'max_drawdown_pct': result['max_drawdown_pct'],
+        'profit_factor': result['profit_factor'],
+        'final_capital': result['final_capital'],
+    }
@@ -45,6 +45,9 @@ class RiskAnalytics:
     and professional traders.
     """
 
+    MONTE_CARLO_DISTRIBUTIONS = ('normal', 'student_t', 'bootstrap')
+    MONTE_CARLO_CHUNK_VALUES = 2_500_000  # simulated path-days per chunk (~20MB per matrix)
+
     def __init__(self):
         """Initialize risk analytics"""
         self.risk_free_rate = 0.05  # 5% annual (adjust based on current rates)
@@ -302,57 +305,183 @@ class RiskAnalytics:
         annual_return: float = 0.12,
         annual_volatility: float = 0.20,
         days: int = 252,
-        num_simulations: int = 10000
+        num_simulations: int = 10000,
+        distribution: str = 'normal',
+        degrees_of_freedom: float = 4.0,
+        historical_returns: Optional[List[float]] = None,
+        ruin_threshold: float = 0.5,
+        seed: Optional[int] = None,
+        rng: Optional[np.random.Generator] = None,
+        chunk_size: Optional[int] = None,
+        include_paths: bool = False
     ) -> Dict:
         """
         Run Monte Carlo simulation to project portfolio outcomes.
 
+        Paths are simulated as (chunk x days) return matrices, so memory
+        stays bounded by chunk_size regardless of num_simulations.
+
         Args:
             initial_value: Starting portfolio value
             annual_return: Expected annual return (12% = 0.12)
             annual_volatility: Expected volatility (20% = 0.20)
             days: Number of days to simulate
             num_simulations: Number of simulation runs
+            distribution: 'normal', 'student_t' (fat tails, same mean/volatility)
+                or 'bootstrap' (resample historical_returns)
+            degrees_of_freedom: Student-t degrees of freedom (must be > 2)
+            historical_returns: Daily simple returns for 'bootstrap'
+            ruin_threshold: Fraction of initial value that counts as ruin (0.5 = half lost)
+            seed: Seed for a new np.random.Generator (ignored if rng is given)
+            rng: Generator to draw from
+            chunk_size: Paths per chunk (default keeps each matrix near 2.5M values)
+            include_paths: Also return per-path final values, max drawdowns and ruin days
 
         Returns:
-            Statistics on projected outcomes
+            Statistics on projected outcomes, drawdowns and ruin
         """
+        if distribution not in self.MONTE_CARLO_DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution '{distribution}'; "
+                             f"expected one of {self.MONTE_CARLO_DISTRIBUTIONS}")
+        if distribution == 'student_t' and degrees_of_freedom <= 2:
+            raise ValueError("Student-t returns need degrees_of_freedom > 2 for a finite volatility")
+        if distribution == 'bootstrap':
+            if historical_returns is None or len(historical_returns) == 0:
+                raise ValueError("Bootstrap simulation needs historical_returns")
+            historical_returns = np.asarray(historical_returns, dtype=np.float64)
+
+        rng = rng if rng is not None else np.random.default_rng(seed)
+        chunk_size = chunk_size or max(1, self.MONTE_CARLO_CHUNK_VALUES // max(days, 1))
+
         # Convert to daily parameters
         daily_return = annual_return / 252
         daily_vol = annual_volatility / np.sqrt(252)
 
-        # Run simulations
-        final_values = []
+        final_values = np.empty(num_simulations)
+        max_drawdowns = np.empty(num_simulations)
+        ruin_days = np.empty(num_simulations)
 
-        for _ in range(num_simulations):
-            value = initial_value
+        for start in range(0, num_simulations, chunk_size):
+            stop = min(start + chunk_size, num_simulations)
+            returns = self._draw_daily_returns(
+                rng, stop - start, days, distribution, daily_return, daily_vol,
+                degrees_of_freedom, historical_returns
+            )
+            final_values[start:stop], max_drawdowns[start:stop], ruin_days[start:stop] = \
+                self._simulate_paths(returns, initial_value, ruin_threshold)
 
-            for day in range(days):
-                # Generate random daily return
-                daily_change = np.random.normal(daily_return, daily_vol)
-                value *= (1 + daily_change)
-
-            final_values.append(value)
-
-        final_values = np.array(final_values)
+        ruined = ~np.isnan(ruin_days)
+        p5, p25, p50, p75, p95 = np.percentile(final_values, [5, 25, 50, 75, 95])
+        dd1, dd5, dd50 = np.percentile(max_drawdowns, [1, 5, 50])
 
         # Calculate statistics
-        return {
+        results = {
             'initial_value': initial_value,
             'days': days,
             'simulations': num_simulations,
-            'mean_value': np.mean(final_values),
-            'median_value': np.median(final_values),
-            'min_value': np.min(final_values),
-            'max_value': np.max(final_values),
-            'percentile_5': np.percentile(final_values, 5),
-            'percentile_25': np.percentile(final_values, 25),
-            'percentile_75': np.percentile(final_values, 75),
-            'percentile_95': np.percentile(final_values, 95),
-            'probability_profit': np.sum(final_values > initial_value) / num_simulations * 100,
-            'probability_loss': np.sum(final_values < initial_value) / num_simulations * 100
+            'distribution': distribution,
+            'seed': seed,
+            'mean_value': float(np.mean(final_values)),
+            'median_value': float(p50),
+            'min_value': float(np.min(final_values)),
+            'max_value': float(np.max(final_values)),
+            'percentile_5': float(p5),
+            'percentile_25': float(p25),
+            'percentile_75': float(p75),
+            'percentile_95': float(p95),
+            'probability_profit': float(np.sum(final_values > initial_value) / num_simulations * 100),
+            'probability_loss': float(np.sum(final_values < initial_value) / num_simulations * 100),
+            # Drawdowns follow calculate_max_drawdown: negative percentages
+            'max_drawdown': {
+                'mean_pct': float(np.mean(max_drawdowns)),
+                'median_pct': float(dd50),
+                'percentile_5_pct': float(dd5),
+                'percentile_1_pct': float(dd1),
+                'worst_pct': float(np.min(max_drawdowns)),
+            },
+            'ruin': {
+                'threshold_value': initial_value * (1 - ruin_threshold),
+                'probability': float(np.mean(ruined) * 100),
+                'median_days': float(np.median(ruin_days[ruined])) if ruined.any() else None,
+                'mean_days': float(np.mean(ruin_days[ruined])) if ruined.any() else None,
+            }
         }
 
+        if include_paths:
+            results['paths'] = {
+                'final_values': final_values,
+                'max_drawdown_pct': max_drawdowns,
+                'ruin_day': ruin_days,
+            }
+
+        return results
+
+    def _draw_daily_returns(
+        self,
+        rng: np.random.Generator,
+        paths: int,
+        days: int,
+        distribution: str,
+        daily_return: float,
+        daily_vol: float,
+        degrees_of_freedom: float,
+        historical_returns: Optional[np.ndarray]
+    ) -> np.ndarray:
+        """(days x paths) matrix of simple daily returns"""
+        shape = (days, paths)
+
+        if distribution == 'bootstrap':
+            return historical_returns[rng.integers(0, len(historical_returns), size=shape)]
+
+        if distribution == 'student_t':
+            # Rescale so the daily volatility matches the normal case
+            draws = rng.standard_t(degrees_of_freedom, size=shape)
+            draws *= daily_vol / np.sqrt(degrees_of_freedom / (degrees_of_freedom - 2))
+        else:
+            draws = rng.standard_normal(size=shape)
+            draws *= daily_vol
+
+        draws += daily_return
+        return draws
+
+    def _simulate_paths(
+        self,
+        returns: np.ndarray,
+        initial_value: float,
+        ruin_threshold: float
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Compound a (days x paths) return matrix one day-row at a time,
+        tracking running peak, worst drawdown and days above the ruin level.
+
+        Returns:
+            (final values, max drawdown % per path, first ruin day per path or NaN)
+        """
+        paths = returns.shape[1]
+        ruin_level = 1.0 - ruin_threshold
+
+        # Losses beyond -100% are a total loss; the path stays at zero
+        growth = np.maximum(returns, -1.0, out=returns)
+        growth += 1.0
+
+        value = np.ones(paths)
+        peak = np.ones(paths)
+        worst_ratio = np.ones(paths)
+        lowest = np.ones(paths)
+        days_above_ruin = np.zeros(paths, dtype=np.int64)
+        ratio = np.empty(paths)
+
+        for day_growth in growth:
+            value *= day_growth
+            np.maximum(peak, value, out=peak)
+            np.divide(value, peak, out=ratio)
+            np.minimum(worst_ratio, ratio, out=worst_ratio)
+            np.minimum(lowest, value, out=lowest)
+            days_above_ruin += lowest > ruin_level
+
+        ruin_days = np.where(lowest <= ruin_level, days_above_ruin + 1.0, np.nan)
+        return value * initial_value, (worst_ratio - 1.0) * 100, ruin_days
+
     # =========================================================================
     # CONCENTRATION ANALYSIS
     # =========================================================================
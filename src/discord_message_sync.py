@@ -1,19 +1,138 @@
 """
 Discord Message Sync
 Uses DiscordChatExporter to pull messages from Discord channels
+
+Exports are imported as a stream: the messages array is decoded one message
+at a time and rows are COPY'd into a staging table in batches, then merged
+into discord_messages with one statement per batch.
 """
 
+import io
 import os
+import re
 import json
+import time
 import subprocess
 import psycopg2
 import psycopg2.extras
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Any, Dict, IO, Iterator, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+# Escapes for COPY text format
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def _copy_text_row(row: tuple) -> str:
+    """One COPY text-format line; None is written as \\N so it stays distinct from ''"""
+    return '\t'.join(
+        '\\N' if value is None else str(value).translate(_COPY_ESCAPES) for value in row
+    ) + '\n'
+
+
+def _strip_nul(value: Any) -> Any:
+    """Copy of a decoded JSON value with NUL characters removed from strings"""
+    if isinstance(value, str):
+        return value.replace('\x00', '')
+    if isinstance(value, dict):
+        return {key: _strip_nul(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_strip_nul(item) for item in value]
+    return value
+
+
+class DiscordExportReader:
+    """
+    Incremental reader for a DiscordChatExporter JSON file
+
+    Iterating yields the elements of the top-level "messages" array one at
+    a time, reading the file in chunks. Every other top-level key (guild,
+    channel, dateRange, ...) is collected into header as it is passed;
+    DiscordChatExporter writes guild and channel before the messages.
+    """
+
+    def __init__(self, fp: IO[str], chunk_size: int = 1 << 16):
+        self.header: Dict[str, Any] = {}
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+
+    def __iter__(self) -> Iterator[Dict]:
+        self._expect('{')
+        while self._peek() != '}':
+            key = self._value()
+            self._expect(':')
+
+            if key == 'messages':
+                yield from self._array()
+            else:
+                self.header[key] = self._value()
+
+            if self._peek() == ',':
+                self._pos += 1
+
+    def _array(self) -> Iterator[Dict]:
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+
+        while True:
+            yield self._value()
+            separator = self._peek()
+            self._pos += 1
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ValueError(f"Malformed export: expected ',' or ']' but found {separator!r}")
+
+    def _read_more(self) -> bool:
+        if self._pos:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        chunk = self._fp.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf += chunk
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._read_more():
+                return ''
+
+    def _expect(self, char: str):
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"Malformed export: expected {char!r} but found {found!r}")
+        self._pos += 1
+
+    def _value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+                # A value ending at the buffer edge (e.g. a number) may continue
+                if end < len(self._buf) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._read_more()
+
 
 class DiscordMessageSync:
     """Sync Discord messages using DiscordChatExporter"""
@@ -31,6 +150,9 @@ class DiscordMessageSync:
         self.db_user = os.getenv('DB_USER', 'postgres')
         self.db_password = os.getenv('DB_PASSWORD', '')
 
+        # Counts and throughput of the last import_messages() call
+        self.last_import_stats: Dict[str, Any] = {}
+
     def get_connection(self):
         """Get database connection"""
         return psycopg2.connect(
@@ -82,101 +204,81 @@ class DiscordMessageSync:
             logger.error(f"Export failed: {e.stderr}")
             raise
 
-    def import_messages(self, json_file: Path) -> int:
+    # Staging rows are COPY'd in text format; None becomes \N (NULL)
+    STAGING_COLUMNS = (
+        'message_id', 'author_id', 'author_name', 'content',
+        'timestamp', 'edited_timestamp', 'raw_data'
+    )
+
+    def import_messages(self, json_file: Path, batch_size: int = 5000) -> int:
         """
         Import messages from exported JSON file into database
 
+        The file is streamed, so memory stays flat for multi-hundred-MB
+        exports. Each batch is COPY'd into a temporary staging table and
+        merged with one INSERT ... ON CONFLICT. Existing messages are only
+        rewritten when their edited_timestamp changed. Statistics for the
+        run are kept in last_import_stats.
+
         Args:
             json_file: Path to DiscordChatExporter JSON export
+            batch_size: Messages per COPY/merge round trip
 
         Returns:
-            Number of messages imported
+            Number of messages inserted or updated
         """
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
-        # Extract channel info
-        channel_id = data.get('channel', {}).get('id')
-        channel_name = data.get('channel', {}).get('name')
-        server_name = data.get('guild', {}).get('name')
-        server_id = data.get('guild', {}).get('id')
+        started = time.perf_counter()
+        stats = {'messages': 0, 'inserted': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0}
 
         conn = None
         cur = None
-        imported = 0
+        channel_id = None
+        channel_name = None
 
         try:
             conn = self.get_connection()
             cur = conn.cursor()
-
-            # Insert/update channel
+            # TIMESTAMPTZ applies the export's UTC offset on COPY; the merge
+            # then stores it in session time, as binding aware datetimes did
             cur.execute("""
-                INSERT INTO discord_channels (channel_id, channel_name, server_name, server_id, last_sync)
-                VALUES (%s, %s, %s, %s, %s)
-                ON CONFLICT (channel_id) DO UPDATE SET
-                    channel_name = EXCLUDED.channel_name,
-                    server_name = EXCLUDED.server_name,
-                    last_sync = EXCLUDED.last_sync
-            """, (channel_id, channel_name, server_name, server_id, datetime.now()))
-
-            # Import messages
-            messages = data.get('messages', [])
-
-            for msg in messages:
-                try:
-                    message_id = msg.get('id')
-                    author = msg.get('author', {})
-                    author_id = author.get('id')
-                    author_name = author.get('name')
-                    content = msg.get('content', '')
-                    timestamp = msg.get('timestamp')
-                    edited_timestamp = msg.get('timestampEdited')
-
-                    # Skip messages that are only @everyone with no other content
-                    if content.strip() == '@everyone':
+                CREATE TEMP TABLE discord_messages_staging (
+                    message_id BIGINT,
+                    author_id BIGINT,
+                    author_name TEXT,
+                    content TEXT,
+                    timestamp TIMESTAMPTZ,
+                    edited_timestamp TIMESTAMPTZ,
+                    raw_data JSONB
+                ) ON COMMIT DROP
+            """)
+
+            with open(json_file, 'r', encoding='utf-8-sig') as f:
+                reader = DiscordExportReader(f)
+                batch: Dict[str, tuple] = {}
+
+                for msg in reader:
+                    if channel_id is None:
+                        # Channel row first (messages reference it)
+                        channel_id, channel_name = self._upsert_channel(cur, reader.header)
+
+                    stats['messages'] += 1
+                    row = self._staging_row(msg)
+                    if row is None:
+                        stats['skipped'] += 1
                         continue
 
-                    # Parse timestamp
-                    if timestamp:
-                        timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                    if edited_timestamp:
-                        edited_timestamp = datetime.fromisoformat(edited_timestamp.replace('Z', '+00:00'))
-
-                    # Extract attachments, embeds, reactions
-                    attachments = json.dumps(msg.get('attachments', []))
-                    embeds = json.dumps(msg.get('embeds', []))
-                    reactions = json.dumps(msg.get('reactions', []))
-                    mentions = json.dumps(msg.get('mentions', []))
-
-                    cur.execute("""
-                        INSERT INTO discord_messages (
-                            message_id, channel_id, author_id, author_name,
-                            content, timestamp, edited_timestamp,
-                            attachments, embeds, reactions, mentions, raw_data
-                        )
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (message_id) DO UPDATE SET
-                            content = EXCLUDED.content,
-                            edited_timestamp = EXCLUDED.edited_timestamp,
-                            reactions = EXCLUDED.reactions,
-                            raw_data = EXCLUDED.raw_data
-                    """, (
-                        message_id, channel_id, author_id, author_name,
-                        content, timestamp, edited_timestamp,
-                        attachments, embeds, reactions, mentions,
-                        json.dumps(msg)
-                    ))
-
-                    imported += 1
-
-                except Exception as e:
-                    logger.error(f"Error importing message {msg.get('id')}: {e}")
-                    continue
+                    # Last occurrence wins within a batch
+                    batch[row[0]] = row
+                    if len(batch) >= batch_size:
+                        self._merge_batch(cur, channel_id, batch.values(), stats)
+                        batch = {}
 
-            conn.commit()
-            logger.info(f"Imported {imported} messages from {channel_name}")
+                if channel_id is None:
+                    channel_id, channel_name = self._upsert_channel(cur, reader.header)
+                if batch:
+                    self._merge_batch(cur, channel_id, batch.values(), stats)
 
-            return imported
+            conn.commit()
 
         except Exception as e:
             if conn:
@@ -190,6 +292,111 @@ class DiscordMessageSync:
             if conn:
                 conn.close()
 
+        elapsed = time.perf_counter() - started
+        stats['seconds'] = round(elapsed, 3)
+        stats['messages_per_second'] = round(stats['messages'] / elapsed, 1) if elapsed else 0.0
+        self.last_import_stats = stats
+
+        imported = stats['inserted'] + stats['updated']
+        logger.info(
+            f"Imported {imported} messages from {channel_name} "
+            f"({stats['inserted']} new, {stats['updated']} edited, {stats['unchanged']} unchanged, "
+            f"{stats['skipped']} skipped; {stats['messages_per_second']:.0f} msg/s)"
+        )
+
+        return imported
+
+    def _upsert_channel(self, cur, header: Dict) -> tuple:
+        """Insert/update the channel row from the export header"""
+        channel_id = header.get('channel', {}).get('id')
+        channel_name = header.get('channel', {}).get('name')
+        server_name = header.get('guild', {}).get('name')
+        server_id = header.get('guild', {}).get('id')
+
+        cur.execute("""
+            INSERT INTO discord_channels (channel_id, channel_name, server_name, server_id, last_sync)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (channel_id) DO UPDATE SET
+                channel_name = EXCLUDED.channel_name,
+                server_name = EXCLUDED.server_name,
+                last_sync = EXCLUDED.last_sync
+        """, (channel_id, channel_name, server_name, server_id, datetime.now()))
+
+        return channel_id, channel_name
+
+    @staticmethod
+    def _staging_row(msg: Dict) -> Optional[tuple]:
+        """Staging row for a message, or None if it should be skipped"""
+        try:
+            content = (msg.get('content') or '').replace('\x00', '')
+
+            # Skip messages that are only @everyone with no other content
+            if content.strip() == '@everyone':
+                return None
+
+            # Validate timestamps here so one bad message cannot fail a whole COPY
+            timestamp = msg.get('timestamp')
+            edited_timestamp = msg.get('timestampEdited')
+            for value in (timestamp, edited_timestamp):
+                if value:
+                    datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+            author = msg.get('author', {})
+            # Attachments, embeds, reactions and mentions are taken from raw_data in the merge
+            raw_data = json.dumps(msg, ensure_ascii=False)
+            if '\\u0000' in raw_data:
+                # JSONB rejects NUL characters
+                raw_data = json.dumps(_strip_nul(msg), ensure_ascii=False)
+
+            return (
+                int(msg['id']), author.get('id'), author.get('name'), content,
+                timestamp, edited_timestamp, raw_data
+            )
+
+        except Exception as e:
+            logger.error(f"Error importing message {msg.get('id')}: {e}")
+            return None
+
+    def _merge_batch(self, cur, channel_id, rows, stats: Dict):
+        """COPY a batch into staging and merge it into discord_messages"""
+        buffer = io.StringIO(''.join(_copy_text_row(row) for row in rows))
+
+        cur.execute("TRUNCATE discord_messages_staging")
+        cur.copy_expert(
+            f"COPY discord_messages_staging ({', '.join(self.STAGING_COLUMNS)}) "
+            f"FROM STDIN WITH (FORMAT text)",
+            buffer
+        )
+        cur.execute("""
+            INSERT INTO discord_messages (
+                message_id, channel_id, author_id, author_name,
+                content, timestamp, edited_timestamp,
+                attachments, embeds, reactions, mentions, raw_data
+            )
+            SELECT
+                message_id, %s, author_id, author_name,
+                content, timestamp, edited_timestamp,
+                COALESCE(raw_data->'attachments', '[]'::jsonb),
+                COALESCE(raw_data->'embeds', '[]'::jsonb),
+                COALESCE(raw_data->'reactions', '[]'::jsonb),
+                COALESCE(raw_data->'mentions', '[]'::jsonb),
+                raw_data
+            FROM discord_messages_staging
+            ON CONFLICT (message_id) DO UPDATE SET
+                content = EXCLUDED.content,
+                edited_timestamp = EXCLUDED.edited_timestamp,
+                reactions = EXCLUDED.reactions,
+                raw_data = EXCLUDED.raw_data
+            WHERE discord_messages.edited_timestamp IS DISTINCT FROM EXCLUDED.edited_timestamp
+            RETURNING (xmax = 0) AS inserted
+        """, (channel_id,))
+
+        written = [inserted for (inserted,) in cur.fetchall()]
+        inserted = sum(written)
+        stats['inserted'] += inserted
+        stats['updated'] += len(written) - inserted
+        stats['unchanged'] += len(rows) - len(written)
+
     def sync_channel(self, channel_id: str, days_back: int = 7) -> int:
         """
         Full sync: export and import channel messages
@@ -1,20 +1,175 @@
 """
 Discord Trading Signal Extractor
 Extracts structured trading data from Discord messages for AVA's RAG system
+
+Extraction is incremental: a message-id watermark (plus an edited-timestamp
+watermark for edited messages) is stored per channel next to the signals, so
+a run after a sync only reads messages imported since the last run. Patterns are compiled
+once, setup/sentiment keywords are matched in a single pass, standalone
+tickers are checked against the stocks table, and signals are upserted in
+batches that commit together with the watermark.
 """
 import re
-from typing import Dict, List, Optional
+import time
+import logging
+from typing import Dict, Iterable, List, Optional, Set
 from datetime import datetime
 import psycopg2
 import psycopg2.extras
 import os
 
+logger = logging.getLogger(__name__)
+
+DOLLAR_TICKER_RE = re.compile(r'\$([A-Z]{1,5})\b')
+STANDALONE_TICKER_RE = re.compile(r'\b([A-Z]{2,5})\b')
+
+# Used to filter standalone tickers only when no symbol set is available
+COMMON_WORDS = {'DD', 'CEO', 'FDA', 'IPO', 'ATH', 'ATL', 'BUY', 'SELL', 'CALL', 'PUT'}
+
+# Option patterns: "AAPL 150C 12/15", "SPY 450P exp 1/20"
+STRIKE_RE = re.compile(r'(\d+(?:\.\d+)?)\s*([CP])\b', re.IGNORECASE)
+EXPIRATION_RES = [
+    re.compile(r'exp(?:iry)?\s*(\d{1,2}[/-]\d{1,2})', re.IGNORECASE),  # exp 12/15
+    re.compile(r'(\d{1,2}[/-]\d{1,2})\s*exp', re.IGNORECASE),  # 12/15 exp
+    re.compile(r'DTE\s*(\d+)', re.IGNORECASE),  # DTE 7
+]
+
+# Price patterns, tried in order of priority
+PRICE_RES = {
+    'entry': [
+        re.compile(r'entry[:\s]+\$?(\d+(?:\.\d{2})?)', re.IGNORECASE),
+        re.compile(r'buy[:\s]+\$?(\d+(?:\.\d{2})?)', re.IGNORECASE),
+        re.compile(r'@\s*\$?(\d+(?:\.\d{2})?)', re.IGNORECASE),
+    ],
+    'target': [
+        re.compile(r'target[:\s]+\$?(\d+(?:\.\d{2})?)', re.IGNORECASE),
+        re.compile(r'tp[:\s]+\$?(\d+(?:\.\d{2})?)', re.IGNORECASE),
+        re.compile(r'pt[:\s]+\$?(\d+(?:\.\d{2})?)', re.IGNORECASE),
+    ],
+    'stop_loss': [
+        re.compile(r'stop[:\s]+\$?(\d+(?:\.\d{2})?)', re.IGNORECASE),
+        re.compile(r'sl[:\s]+\$?(\d+(?:\.\d{2})?)', re.IGNORECASE),
+    ],
+}
+
+# Checked in order; the first setup with a keyword hit wins
+SETUP_KEYWORDS = {
+    'earnings_play': ['earnings', 'er play', 'beat', 'miss'],
+    'breakout': ['breakout', 'breaking out', 'breach', 'breakthrough'],
+    'pullback': ['pullback', 'dip', 'retrace', 'bounce'],
+    'reversal': ['reversal', 'reversing', 'bottom', 'top'],
+    'momentum': ['momentum', 'strong move', 'trending'],
+    'swing': ['swing', 'multiday', 'position'],
+    'day_trade': ['day trade', 'scalp', 'quick'],
+    'gap_play': ['gap up', 'gap down', 'gapping'],
+    'catalyst': ['catalyst', 'news', 'announcement'],
+}
+
+SENTIMENT_KEYWORDS = {
+    'bullish': ['bullish', 'long', 'call', 'buy', 'moon', 'rocket', 'breakout', 'strong'],
+    'bearish': ['bearish', 'short', 'put', 'sell', 'dump', 'breakdown', 'weak'],
+}
+
+NEW_MESSAGES_QUERY = """
+    SELECT
+        m.message_id,
+        m.channel_id,
+        m.content,
+        m.author_name,
+        m.timestamp,
+        m.edited_timestamp
+    FROM discord_messages m
+    LEFT JOIN discord_signal_channel_state s ON s.channel_id = m.channel_id
+    WHERE m.message_id > COALESCE(s.last_message_id, 0)
+       OR m.edited_timestamp > COALESCE(s.last_edited_timestamp, %(epoch)s)
+    ORDER BY m.message_id
+"""
+
+# Watermarks only move forward (GREATEST ignores NULL)
+SAVE_STATE_SQL = """
+    INSERT INTO discord_signal_channel_state (channel_id, last_message_id, last_edited_timestamp)
+    VALUES %s
+    ON CONFLICT (channel_id) DO UPDATE SET
+        last_message_id = GREATEST(discord_signal_channel_state.last_message_id, EXCLUDED.last_message_id),
+        last_edited_timestamp = GREATEST(discord_signal_channel_state.last_edited_timestamp,
+                                         EXCLUDED.last_edited_timestamp),
+        updated_at = NOW()
+"""
+
+SIGNAL_COLUMNS = [
+    'message_id', 'channel_id', 'author', 'timestamp', 'content',
+    'tickers', 'primary_ticker', 'setup_type', 'sentiment',
+    'entry', 'target', 'stop_loss', 'option_strike', 'option_type',
+    'option_expiration', 'confidence',
+]
+
+UPSERT_SIGNALS_SQL = f"""
+    INSERT INTO discord_trading_signals ({', '.join(SIGNAL_COLUMNS)})
+    VALUES %s
+    ON CONFLICT (message_id) DO UPDATE SET
+        {', '.join(f'{col} = EXCLUDED.{col}' for col in SIGNAL_COLUMNS[1:])},
+        extracted_at = NOW()
+"""
+
+
+class KeywordAutomaton:
+    """
+    Matches a set of labelled keywords in one pass over the text
+
+    Keywords match at the start of a word ('top' hits "topping" but not
+    "stop"). All keywords share one compiled pattern ordered longest first,
+    so the match at a position is the longest keyword there; the shorter
+    keywords that also start there are its prefixes and are reported with it.
+    """
+
+    def __init__(self, groups: Dict[str, Iterable[str]]):
+        """
+        Args:
+            groups: Label -> keywords belonging to it
+        """
+        self.labels: Dict[str, List[str]] = {}
+        for label, keywords in groups.items():
+            for keyword in keywords:
+                self.labels.setdefault(keyword.lower(), []).append(label)
+
+        keywords = sorted(self.labels, key=len, reverse=True)
+        self._pattern = re.compile(r'\b(?=(' + '|'.join(map(re.escape, keywords)) + '))')
+        self._outputs = {
+            keyword: [prefix for prefix in keywords if keyword.startswith(prefix)]
+            for keyword in keywords
+        }
+
+    def scan(self, text: str) -> Dict[str, int]:
+        """Number of distinct keywords found per label"""
+        found: Set[str] = set()
+        for keyword in self._pattern.findall(text.lower()):
+            found.update(self._outputs[keyword])
+
+        counts: Dict[str, int] = {}
+        for keyword in found:
+            for label in self.labels[keyword]:
+                counts[label] = counts.get(label, 0) + 1
+        return counts
+
+
+KEYWORDS = KeywordAutomaton({**SETUP_KEYWORDS, **SENTIMENT_KEYWORDS})
+
 
 class DiscordSignalExtractor:
     """Extract structured trading signals from Discord messages"""
 
-    def __init__(self):
+    EPOCH = datetime(1970, 1, 1)
+
+    def __init__(self, symbols: Optional[Iterable[str]] = None, batch_size: int = 1000):
+        """
+        Args:
+            symbols: Valid ticker symbols (None = load from the stocks table on first run)
+            batch_size: Messages per cursor fetch and per signal upsert
+        """
         self.db_password = os.getenv('DB_PASSWORD')
+        self.symbols: Optional[Set[str]] = {s.upper() for s in symbols} if symbols else None
+        self.batch_size = batch_size
+        self.last_run_stats: Dict = {}
 
     def get_connection(self):
         """Get database connection"""
@@ -27,21 +182,17 @@ class DiscordSignalExtractor:
         )
 
     def extract_tickers(self, content: str) -> List[str]:
-        """Extract stock tickers from message"""
-        # Patterns: $TICKER, TICKER (2-5 caps), or common formats
-        tickers = set()
-
-        # $TICKER format
-        dollar_tickers = re.findall(r'\$([A-Z]{1,5})\b', content)
-        tickers.update(dollar_tickers)
-
-        # Standalone tickers (2-5 uppercase letters)
-        # But filter out common words
-        common_words = {'DD', 'CEO', 'FDA', 'IPO', 'ATH', 'ATL', 'BUY', 'SELL', 'CALL', 'PUT'}
-        standalone = re.findall(r'\b([A-Z]{2,5})\b', content)
-        for ticker in standalone:
-            if ticker not in common_words and len(ticker) <= 5:
-                tickers.add(ticker)
+        """Extract stock tickers from message, in order of appearance"""
+        # $TICKER format is explicit and always accepted
+        tickers = dict.fromkeys(DOLLAR_TICKER_RE.findall(content))
+
+        # Standalone tickers (2-5 uppercase letters) must be known symbols
+        for ticker in STANDALONE_TICKER_RE.findall(content):
+            if self.symbols is not None:
+                if ticker in self.symbols:
+                    tickers[ticker] = None
+            elif ticker not in COMMON_WORDS:
+                tickers[ticker] = None
 
         return list(tickers)
 
@@ -49,24 +200,14 @@ class DiscordSignalExtractor:
         """Extract option contract details"""
         option_info = {}
 
-        # Option patterns: "AAPL 150C 12/15", "SPY 450P exp 1/20"
         # Strike + Call/Put
-        strike_pattern = r'(\d+(?:\.\d+)?)\s*([CP])\b'
-        strike_match = re.search(strike_pattern, content, re.IGNORECASE)
-
+        strike_match = STRIKE_RE.search(content)
         if strike_match:
             option_info['strike'] = float(strike_match.group(1))
             option_info['type'] = 'CALL' if strike_match.group(2).upper() == 'C' else 'PUT'
 
-        # Expiration patterns
-        exp_patterns = [
-            r'exp(?:iry)?\s*(\d{1,2}[/-]\d{1,2})',  # exp 12/15
-            r'(\d{1,2}[/-]\d{1,2})\s*exp',  # 12/15 exp
-            r'DTE\s*(\d+)',  # DTE 7
-        ]
-
-        for pattern in exp_patterns:
-            exp_match = re.search(pattern, content, re.IGNORECASE)
+        for pattern in EXPIRATION_RES:
+            exp_match = pattern.search(content)
             if exp_match:
                 option_info['expiration'] = exp_match.group(1)
                 break
@@ -75,80 +216,35 @@ class DiscordSignalExtractor:
 
     def extract_prices(self, content: str) -> Dict[str, Optional[float]]:
         """Extract entry, target, and stop prices"""
-        prices = {
-            'entry': None,
-            'target': None,
-            'stop_loss': None
-        }
-
-        # Entry patterns
-        entry_patterns = [
-            r'entry[:\s]+\$?(\d+(?:\.\d{2})?)',
-            r'buy[:\s]+\$?(\d+(?:\.\d{2})?)',
-            r'@\s*\$?(\d+(?:\.\d{2})?)',
-        ]
-        for pattern in entry_patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                prices['entry'] = float(match.group(1))
-                break
-
-        # Target patterns
-        target_patterns = [
-            r'target[:\s]+\$?(\d+(?:\.\d{2})?)',
-            r'tp[:\s]+\$?(\d+(?:\.\d{2})?)',
-            r'pt[:\s]+\$?(\d+(?:\.\d{2})?)',
-        ]
-        for pattern in target_patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                prices['target'] = float(match.group(1))
-                break
-
-        # Stop loss patterns
-        stop_patterns = [
-            r'stop[:\s]+\$?(\d+(?:\.\d{2})?)',
-            r'sl[:\s]+\$?(\d+(?:\.\d{2})?)',
-        ]
-        for pattern in stop_patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                prices['stop_loss'] = float(match.group(1))
-                break
+        prices = {}
+        for field, patterns in PRICE_RES.items():
+            prices[field] = None
+            for pattern in patterns:
+                match = pattern.search(content)
+                if match:
+                    prices[field] = float(match.group(1))
+                    break
 
         return prices
 
-    def determine_setup_type(self, content: str) -> str:
+    def determine_setup_type(self, content: str, keyword_counts: Optional[Dict[str, int]] = None) -> str:
         """Determine trading setup type"""
-        content_lower = content.lower()
-
-        setup_keywords = {
-            'earnings_play': ['earnings', 'er play', 'beat', 'miss'],
-            'breakout': ['breakout', 'breaking out', 'breach', 'breakthrough'],
-            'pullback': ['pullback', 'dip', 'retrace', 'bounce'],
-            'reversal': ['reversal', 'reversing', 'bottom', 'top'],
-            'momentum': ['momentum', 'strong move', 'trending'],
-            'swing': ['swing', 'multiday', 'position'],
-            'day_trade': ['day trade', 'scalp', 'quick'],
-            'gap_play': ['gap up', 'gap down', 'gapping'],
-            'catalyst': ['catalyst', 'news', 'announcement'],
-        }
+        if keyword_counts is None:
+            keyword_counts = KEYWORDS.scan(content)
 
-        for setup_type, keywords in setup_keywords.items():
-            if any(kw in content_lower for kw in keywords):
+        for setup_type in SETUP_KEYWORDS:
+            if keyword_counts.get(setup_type):
                 return setup_type
 
         return 'general'
 
-    def determine_sentiment(self, content: str) -> str:
+    def determine_sentiment(self, content: str, keyword_counts: Optional[Dict[str, int]] = None) -> str:
         """Determine bullish/bearish sentiment"""
-        content_lower = content.lower()
+        if keyword_counts is None:
+            keyword_counts = KEYWORDS.scan(content)
 
-        bullish_words = ['bullish', 'long', 'call', 'buy', 'moon', 'rocket', 'breakout', 'strong']
-        bearish_words = ['bearish', 'short', 'put', 'sell', 'dump', 'breakdown', 'weak']
-
-        bullish_count = sum(1 for word in bullish_words if word in content_lower)
-        bearish_count = sum(1 for word in bearish_words if word in content_lower)
+        bullish_count = keyword_counts.get('bullish', 0)
+        bearish_count = keyword_counts.get('bearish', 0)
 
         if bullish_count > bearish_count:
             return 'bullish'
@@ -204,8 +300,9 @@ class DiscordSignalExtractor:
 
         option_info = self.extract_option_info(content)
         prices = self.extract_prices(content)
-        setup_type = self.determine_setup_type(content)
-        sentiment = self.determine_sentiment(content)
+        keyword_counts = KEYWORDS.scan(content)
+        setup_type = self.determine_setup_type(content, keyword_counts)
+        sentiment = self.determine_sentiment(content, keyword_counts)
 
         # Build signal
         signal = {
@@ -232,25 +329,8 @@ class DiscordSignalExtractor:
         # Only return if confidence >= 40% (has at least ticker + one other component)
         return signal if signal['confidence'] >= 40 else None
 
-    def process_all_messages(self) -> int:
-        """Process all Discord messages and extract signals"""
-        conn = self.get_connection()
-        cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-
-        # Get all messages
-        cur.execute("""
-            SELECT
-                m.message_id,
-                m.channel_id,
-                m.content,
-                m.author_name,
-                m.timestamp
-            FROM discord_messages m
-            ORDER BY m.timestamp DESC
-        """)
-        messages = cur.fetchall()
-
-        # Create table if not exists
+    def ensure_schema(self, cur):
+        """Create the signals and watermark tables if they do not exist"""
         cur.execute("""
             CREATE TABLE IF NOT EXISTS discord_trading_signals (
                 id SERIAL PRIMARY KEY,
@@ -286,46 +366,173 @@ class DiscordSignalExtractor:
             ON discord_trading_signals(timestamp DESC)
         """)
 
-        conn.commit()
-
-        # Extract and store signals
-        signals_added = 0
-        for message in messages:
-            signal = self.extract_signal(dict(message))
-            if signal:
-                try:
-                    cur.execute("""
-                        INSERT INTO discord_trading_signals (
-                            message_id, channel_id, author, timestamp, content,
-                            tickers, primary_ticker, setup_type, sentiment,
-                            entry, target, stop_loss, option_strike, option_type,
-                            option_expiration, confidence
-                        )
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (message_id) DO UPDATE SET
-                            confidence = EXCLUDED.confidence,
-                            extracted_at = NOW()
-                    """, (
-                        signal['message_id'], signal['channel_id'], signal['author'],
-                        signal['timestamp'], signal['content'], signal['tickers'],
-                        signal['primary_ticker'], signal['setup_type'], signal['sentiment'],
-                        signal['entry'], signal['target'], signal['stop_loss'],
-                        signal['option_strike'], signal['option_type'],
-                        signal['option_expiration'], signal['confidence']
-                    ))
-                    signals_added += 1
-                except Exception as e:
-                    print(f"Error storing signal: {e}")
-                    continue
-
-        conn.commit()
-        cur.close()
-        conn.close()
-
-        return signals_added
+        # Lets the edited-message half of NEW_MESSAGES_QUERY use an index
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_discord_messages_edited
+            ON discord_messages(edited_timestamp)
+            WHERE edited_timestamp IS NOT NULL
+        """)
+
+        # Watermarks per channel: channels are synced one at a time, so a
+        # channel synced later can add ids below another channel's newest id
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS discord_signal_channel_state (
+                channel_id BIGINT PRIMARY KEY,
+                last_message_id BIGINT NOT NULL DEFAULT 0,
+                last_edited_timestamp TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT NOW()
+            )
+        """)
+
+    def load_symbols(self, cur) -> Optional[Set[str]]:
+        """Ticker symbols from the stocks table (None if unavailable)"""
+        try:
+            cur.execute("SELECT symbol FROM stocks WHERE symbol IS NOT NULL")
+            symbols = {row[0].strip().upper() for row in cur.fetchall()}
+        except psycopg2.Error as e:
+            cur.connection.rollback()
+            logger.warning(f"Could not load symbols, falling back to common-word filter: {e}")
+            return None
 
+        return symbols or None
+
+    def load_state(self, cur) -> Dict[int, Dict]:
+        """Watermarks from the last run, by channel id"""
+        cur.execute("""
+            SELECT channel_id, last_message_id, last_edited_timestamp
+            FROM discord_signal_channel_state
+        """)
+        return {
+            channel_id: {'last_message_id': last_message_id, 'last_edited_timestamp': last_edited}
+            for channel_id, last_message_id, last_edited in cur.fetchall()
+        }
+
+    def save_state(self, cur, state: Dict[int, Dict]):
+        """Advance per-channel watermarks; commits together with the caller's transaction"""
+        if not state:
+            return
+        values = [
+            (channel_id, marks.get('last_message_id', 0), marks.get('last_edited_timestamp'))
+            for channel_id, marks in state.items()
+        ]
+        psycopg2.extras.execute_values(cur, SAVE_STATE_SQL, values)
+
+    def reset(self):
+        """Forget the watermarks so the next run re-extracts every message"""
+        conn = self.get_connection()
+        try:
+            cur = conn.cursor()
+            self.ensure_schema(cur)
+            cur.execute("DELETE FROM discord_signal_channel_state")
+            conn.commit()
+            cur.close()
+        finally:
+            conn.close()
+
+    def process_new_messages(self) -> int:
+        """
+        Extract signals from messages added or edited since the last run
+
+        Discord message ids grow with time within a channel, so a sync only
+        adds ids above that channel's watermark. Backfilled history older
+        than the watermark needs process_all_messages().
+
+        Returns:
+            Number of signals upserted
+        """
+        started = time.perf_counter()
+        messages = 0
+        signals_upserted = 0
+        batches = 0
+
+        conn = self.get_connection()
+        try:
+            cur = conn.cursor()
+            self.ensure_schema(cur)
+            conn.commit()
+
+            if self.symbols is None:
+                self.symbols = self.load_symbols(cur)
+
+            # Newest edit seen per channel; saved after the full pass
+            newest_edits: Dict[int, datetime] = {}
+            channels: Set[int] = set()
+
+            # WITH HOLD keeps the server-side cursor open across the per-batch commits
+            reader = conn.cursor(name='discord_signal_extractor', withhold=True,
+                                 cursor_factory=psycopg2.extras.RealDictCursor)
+            reader.itersize = self.batch_size
+            reader.execute(NEW_MESSAGES_QUERY, {'epoch': self.EPOCH})
+
+            while True:
+                rows = reader.fetchmany(self.batch_size)
+                if not rows:
+                    break
+
+                values = []
+                batch_state: Dict[int, Dict] = {}
+                for row in rows:
+                    channel_id = row['channel_id']
+                    if channel_id is not None:
+                        edited = row.get('edited_timestamp')
+                        if edited is not None and edited > newest_edits.get(channel_id, self.EPOCH):
+                            newest_edits[channel_id] = edited
+
+                        # Rows arrive in id order, so every id up to here is processed
+                        batch_state[channel_id] = {'last_message_id': row['message_id']}
+
+                    signal = self.extract_signal(dict(row))
+                    if signal:
+                        values.append(tuple(signal[col] for col in SIGNAL_COLUMNS))
+
+                if values:
+                    psycopg2.extras.execute_values(cur, UPSERT_SIGNALS_SQL, values, page_size=self.batch_size)
+
+                self.save_state(cur, batch_state)
+                conn.commit()
+                channels.update(batch_state)
+
+                messages += len(rows)
+                signals_upserted += len(values)
+                batches += 1
+
+            reader.close()
+
+            # Edits are spread over all ids, so these marks move only after a full pass
+            if newest_edits:
+                self.save_state(cur, {
+                    channel_id: {'last_message_id': 0, 'last_edited_timestamp': edited}
+                    for channel_id, edited in newest_edits.items()
+                })
+                conn.commit()
+            cur.close()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        elapsed = time.perf_counter() - started
+        self.last_run_stats = {
+            'messages': messages,
+            'signals': signals_upserted,
+            'batches': batches,
+            'messages_per_second': messages / elapsed if elapsed > 0 else 0.0,
+            'channels': len(channels),
+        }
+        return signals_upserted
+
+    def process_all_messages(self) -> int:
+        """Re-extract signals from every Discord message"""
+        self.reset()
+        return self.process_new_messages()
 
 if __name__ == "__main__":
+    import sys
+
     extractor = DiscordSignalExtractor()
-    count = extractor.process_all_messages()
+    if "--full" in sys.argv:
+        count = extractor.process_all_messages()
+    else:
+        count = extractor.process_new_messages()
     print(f"Extracted {count} trading signals from Discord messages")
@@ -4,29 +4,61 @@ Fetches options for 7, 14, 21, 30, 45 DTE with delta calculations
 
 import os
 import logging
+import threading
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import robin_stocks.robinhood as rh
+import robin_stocks.robinhood.helper as rh_helper
+import robin_stocks.robinhood.urls as rh_urls
 import numpy as np
-from scipy.stats import norm
-import math
+
+from src.options_pricing import bs_delta, strike_for_delta
+from src.services.rate_limiter import get_rate_limiter
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Robinhood's marketdata endpoint accepts up to this many instruments per request
+MARKET_DATA_BATCH_SIZE = 50
+
+TARGET_PUT_DELTA = -0.30  # 30 delta CSPs
+DEFAULT_IV_ESTIMATE = 0.35  # Used for strike selection before real IV is known
+
 
 class EnhancedOptionsFetcher:
     """Fetches options data with multiple expirations and Greeks"""
 
-    def __init__(self):
+    def __init__(self, strike_selection: str = 'analytic'):
+        """
+        Args:
+            strike_selection: 'analytic' inverts delta to a target strike and
+                refines it with the real IV of its neighbouring contracts;
+                'scan' prices every OTM strike at the default IV estimate
+        """
+        if strike_selection not in ('analytic', 'scan'):
+            raise ValueError(f"Unknown strike_selection: {strike_selection}")
+
+        self.strike_selection = strike_selection
+        self.strike_neighbors = 3  # Contracts fetched around the analytic strike
         self.logged_in = False
         self.risk_free_rate = 0.045  # Current risk-free rate (~4.5%)
+        self.rate_limiter = get_rate_limiter()
+        self.rate_limit_timeout = 120  # Max seconds to wait for a Robinhood token
+        self._login_lock = threading.Lock()
 
     def login_robinhood(self):
         """Login to Robinhood once"""
         if self.logged_in:
             return True
 
+        with self._login_lock:
+            if self.logged_in:
+                return True
+            return self._login()
+
+    def _login(self) -> bool:
+        """Perform the Robinhood login (caller holds _login_lock)"""
         try:
             username = os.getenv('ROBINHOOD_USERNAME')
             password = os.getenv('ROBINHOOD_PASSWORD')
@@ -60,26 +92,230 @@ class EnhancedOptionsFetcher:
         option_type: 'call' or 'put'
         """
         try:
-            if T <= 0 or sigma <= 0 or S <= 0 or K <= 0:
-                return 0.0
-
-            d1 = (math.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * math.sqrt(T))
-
-            if option_type == 'put':
-                delta = norm.cdf(d1) - 1
-            else:
-                delta = norm.cdf(d1)
-
-            return round(delta, 4)
+            return round(float(bs_delta(S, K, T, r, sigma, option_type)), 4)
 
         except Exception as e:
             logger.debug(f"Delta calculation error: {e}")
             return 0.0
 
-    def get_all_expirations_data(self, symbol: str, target_dtes: List[int] = [7, 14, 21, 30, 45]) -> List[Dict]:
+    def _rh_call(self, func, *args, **kwargs):
+        """Call a Robinhood endpoint after drawing from the Robinhood token budget"""
+        if not self.rate_limiter.wait_if_needed('robinhood', timeout=self.rate_limit_timeout):
+            raise TimeoutError("Robinhood rate budget exhausted")
+        return func(*args, **kwargs)
+
+    def get_option_market_data_batch(self, options: List[Dict]) -> Dict[str, Dict]:
+        """
+        Fetch market data for many option instruments in batched requests
+
+        robin_stocks' get_option_market_data_by_id makes two round trips per
+        contract (instrument lookup + market data). The marketdata endpoint
+        accepts a comma-separated list of instrument URLs, so one request
+        covers up to MARKET_DATA_BATCH_SIZE contracts.
+
+        Args:
+            options: Option instrument dicts (need 'id' and 'url')
+
+        Returns:
+            Dict mapping option id -> market data dict
+        """
+        by_url = {opt['url']: opt['id'] for opt in options if opt and opt.get('url')}
+        urls = list(by_url)
+        market_data = {}
+
+        for i in range(0, len(urls), MARKET_DATA_BATCH_SIZE):
+            chunk = urls[i:i + MARKET_DATA_BATCH_SIZE]
+            try:
+                rows = self._rh_call(
+                    rh_helper.request_get,
+                    rh_urls.marketdata_options_url(),
+                    'results',
+                    {'instruments': ','.join(chunk)}
+                )
+            except Exception as e:
+                logger.warning(f"Batched market data request failed: {e}")
+                continue
+
+            for row in rows or []:
+                if not row:
+                    continue
+                option_id = row.get('instrument_id') or by_url.get(row.get('instrument'))
+                if option_id:
+                    market_data[option_id] = row
+
+        return market_data
+
+    def _find_puts(self, symbol: str, expiration: str) -> List[Dict]:
+        """
+        List put instruments for one expiration without per-contract market data
+
+        find_options_by_expiration fetches market data for every strike; strike
+        selection only needs the instrument list, so use find_tradable_options
+        and batch market data for the chosen contracts afterwards.
+        """
+        puts = self._rh_call(
+            rh.options.find_tradable_options,
+            symbol,
+            expiration,
+            optionType='put'
+        )
+        return [p for p in (puts or []) if p and p.get('expiration_date') == expiration]
+
+    def _select_target_put(self, puts: List[Dict], current_price: float, actual_dte: int,
+                           target_delta: float = TARGET_PUT_DELTA) -> Optional[Dict]:
+        """Find the OTM put with delta closest to target_delta (scan mode)"""
+        # IMPORTANT: For CSPs, strike MUST be below current stock price (OTM)
+        strikes = np.array([float(put.get('strike_price') or 0) for put in puts])
+
+        # CRITICAL FIX: Only consider strikes BELOW stock price for CSPs
+        # CSPs should be out-of-the-money (OTM), meaning strike < stock price
+        candidates = np.flatnonzero((strikes > 0) & (strikes < current_price))
+        if candidates.size == 0:
+            return None
+
+        # Price every candidate strike in one call with a default IV estimate;
+        # the real IV comes with market data
+        deltas = np.round(bs_delta(
+            S=current_price,
+            K=strikes[candidates],
+            T=actual_dte / 365.0,
+            r=0.045,  # Risk-free rate
+            sigma=DEFAULT_IV_ESTIMATE,
+            option_type='put'
+        ), 4)
+
+        return puts[candidates[np.argmin(np.abs(deltas - target_delta))]]
+
+    def _candidate_puts(self, puts: List[Dict], current_price: float, actual_dte: int,
+                        target_delta: float = TARGET_PUT_DELTA) -> List[Dict]:
+        """
+        Pick the contracts whose market data is needed to choose the target put
+
+        In analytic mode the delta formula is inverted to the target strike at
+        the default IV, the sorted OTM strike ladder is binary-searched for it
+        and the strike_neighbors closest contracts are returned for refinement
+        with their real IV. Scan mode returns the single scan pick.
+        """
+        if self.strike_selection == 'scan':
+            best_put = self._select_target_put(puts, current_price, actual_dte, target_delta)
+            return [best_put] if best_put else []
+
+        # IMPORTANT: For CSPs, strike MUST be below current stock price (OTM)
+        otm = [(float(put.get('strike_price') or 0), put) for put in puts]
+        otm = sorted((item for item in otm if 0 < item[0] < current_price), key=lambda item: item[0])
+        if not otm:
+            return []
+
+        strikes = np.array([strike for strike, _ in otm])
+        target_strike = float(strike_for_delta(
+            current_price, actual_dte / 365.0, self.risk_free_rate,
+            DEFAULT_IV_ESTIMATE, target_delta, 'put'
+        ))
+        if not np.isfinite(target_strike):
+            target_strike = strikes[-1]
+
+        # Window of strike_neighbors strikes centred on the nearest ladder strike
+        i = int(np.searchsorted(strikes, target_strike))
+        if i == len(strikes) or (i > 0 and target_strike - strikes[i - 1] <= strikes[i] - target_strike):
+            i -= 1
+        lo = max(0, min(i - self.strike_neighbors // 2, len(strikes) - self.strike_neighbors))
+
+        return [put for _, put in otm[lo:lo + self.strike_neighbors]]
+
+    def _refine_with_market_iv(self, candidates: List[Dict], market_data: Dict[str, Dict],
+                               current_price: float, actual_dte: int,
+                               target_delta: float = TARGET_PUT_DELTA) -> Optional[tuple]:
+        """
+        Choose the candidate whose delta at its own market IV is closest to target
+
+        Returns:
+            (put, market data) or None if no candidate has market data
+        """
+        priced = [(put, market_data[put['id']]) for put in candidates if put['id'] in market_data]
+        if not priced:
+            return None
+        if len(priced) == 1:
+            return priced[0]
+
+        strikes = np.array([float(put.get('strike_price') or 0) for put, _ in priced])
+        ivs = np.array([float(data.get('implied_volatility') or 0) for _, data in priced])
+        ivs = np.where(ivs > 0, ivs, DEFAULT_IV_ESTIMATE)
+
+        deltas = bs_delta(current_price, strikes, actual_dte / 365.0, self.risk_free_rate, ivs, 'put')
+
+        return priced[int(np.argmin(np.abs(deltas - target_delta)))]
+
+    def _build_expiration_result(self, target_dte: int, actual_dte: int, expiration: str,
+                                 put: Dict, data: Dict, current_price: float) -> Dict:
+        """Compute returns, delta and risk metrics for a selected put"""
+        strike_price = float(put.get('strike_price', 0))
+        bid = float(data.get('bid_price') or 0)
+        ask = float(data.get('ask_price') or 0)
+        mid = (bid + ask) / 2
+        premium = mid * 100
+        volume = int(data.get('volume') or 0)
+        oi = int(data.get('open_interest') or 0)
+        iv = float(data.get('implied_volatility') or 0)
+
+        # Calculate returns
+        capital = strike_price * 100
+        premium_pct = (premium / capital * 100) if capital > 0 else 0
+        T_years = actual_dte / 365.0
+        monthly_return = (premium_pct / actual_dte * 30) if actual_dte > 0 else 0
+        annual_return = (premium_pct / actual_dte * 365) if actual_dte > 0 else 0
+
+        # Calculate delta
+        delta = self.calculate_delta(
+            S=current_price,
+            K=strike_price,
+            T=T_years,
+            r=self.risk_free_rate,
+            sigma=iv,
+            option_type='put'
+        )
+
+        # Calculate probability of profit (based on delta)
+        # For puts, probability of profit ≈ 1 + delta (since delta is negative)
+        prob_profit = round((1 + delta) * 100, 1)
+
+        # Calculate break-even
+        breakeven = strike_price - (premium / 100)
+
+        # Downside protection
+        downside_protection = ((current_price - breakeven) / current_price * 100)
+
+        return {
+            'target_dte': target_dte,
+            'actual_dte': actual_dte,
+            'expiration_date': expiration,
+            'strike_price': strike_price,
+            'current_price': current_price,
+            'bid': bid,
+            'ask': ask,
+            'mid': mid,
+            'premium': premium,
+            'premium_pct': premium_pct,
+            'monthly_return': monthly_return,
+            'annual_return': annual_return,
+            'delta': delta,
+            'prob_profit': prob_profit,
+            'iv': iv * 100,
+            'volume': volume,
+            'open_interest': oi,
+            'breakeven': breakeven,
+            'downside_protection': downside_protection,
+            'strike_to_spot': (strike_price / current_price - 1) * 100  # % OTM
+        }
+
+    def get_all_expirations_data(self, symbol: str, target_dtes: List[int] = [7, 14, 21, 30, 45],
+                                 max_workers: int = 4) -> List[Dict]:
         """
         Get options data for multiple expirations
 
+        Put instruments for each target expiration are listed concurrently,
+        then market data for all selected contracts is fetched in one
+        batched request.
+
         Returns list of dicts with all expiration data
         """
         if not self.login_robinhood():
@@ -87,7 +323,7 @@ class EnhancedOptionsFetcher:
 
         try:
             # Get current price
-            quote = rh.stocks.get_stock_quote_by_symbol(symbol)
+            quote = self._rh_call(rh.stocks.get_stock_quote_by_symbol, symbol)
             if not quote:
                 return []
 
@@ -96,7 +332,7 @@ class EnhancedOptionsFetcher:
                 return []
 
             # Get all available expirations
-            chains = rh.options.get_chains(symbol)
+            chains = self._rh_call(rh.options.get_chains, symbol)
             if not chains:
                 return []
 
@@ -104,146 +340,57 @@ class EnhancedOptionsFetcher:
             if not all_exp_dates:
                 return []
 
-            results = []
+            now = datetime.now()
+            exp_dates = {x: datetime.strptime(x, '%Y-%m-%d') for x in all_exp_dates}
 
             # For each target DTE, find closest expiration
+            targets = []
             for target_dte in target_dtes:
-                target_date = datetime.now() + timedelta(days=target_dte)
+                target_date = now + timedelta(days=target_dte)
 
                 # Find closest expiration to target
-                closest_exp = min(
-                    all_exp_dates,
-                    key=lambda x: abs((datetime.strptime(x, '%Y-%m-%d') - target_date).days)
-                )
-
-                exp_date = datetime.strptime(closest_exp, '%Y-%m-%d')
-                actual_dte = (exp_date - datetime.now()).days
+                closest_exp = min(all_exp_dates, key=lambda x: abs((exp_dates[x] - target_date).days))
+                actual_dte = (exp_dates[closest_exp] - now).days
 
                 # Skip if too far from target (>5 days difference for weekly, >10 for monthly)
                 max_diff = 5 if target_dte <= 14 else 10
                 if abs(actual_dte - target_dte) > max_diff:
                     continue
 
-                # Get put options for this expiration
-                puts = rh.options.find_options_by_expiration(
-                    symbol,
-                    closest_exp,
-                    optionType='put'
-                )
-
-                if not puts:
-                    continue
-
-                # Find strike with delta closest to -0.30 (30 delta)
-                # First, calculate delta for each put and find closest to -0.30
-                # IMPORTANT: For CSPs, strike MUST be below current stock price (OTM)
-                target_delta = -0.30
-                best_put = None
-                best_delta_diff = float('inf')
-
-                for put in puts:
-                    strike = float(put.get('strike_price', 0))
-                    if strike <= 0:
-                        continue
-
-                    # CRITICAL FIX: Only consider strikes BELOW stock price for CSPs
-                    # CSPs should be out-of-the-money (OTM), meaning strike < stock price
-                    if strike >= current_price:
-                        continue  # Skip ITM and ATM strikes
-
-                    # Calculate time to expiration in years
-                    T = actual_dte / 365.0
-
-                    # Use IV from market if available, otherwise estimate
-                    # We'll do a quick estimate first, then refine after getting market data
-                    estimated_iv = 0.35  # Default estimate
-
-                    # Calculate delta
-                    delta = self.calculate_delta(
-                        S=current_price,
-                        K=strike,
-                        T=T,
-                        r=0.045,  # Risk-free rate
-                        sigma=estimated_iv,
-                        option_type='put'
-                    )
-
-                    delta_diff = abs(delta - target_delta)
-                    if delta_diff < best_delta_diff:
-                        best_delta_diff = delta_diff
-                        best_put = put
-
-                if not best_put:
-                    continue
+                targets.append((target_dte, actual_dte, closest_exp))
 
-                closest_put = best_put
+            if not targets:
+                return []
 
-                # Get market data
-                option_id = closest_put['id']
-                market_data = rh.options.get_option_market_data_by_id(option_id)
+            # Several target DTEs can resolve to the same expiration - list it once
+            expirations = list(dict.fromkeys(exp for _, _, exp in targets))
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(expirations)))) as executor:
+                puts_by_exp = dict(zip(expirations, executor.map(
+                    lambda exp: self._find_puts(symbol, exp), expirations
+                )))
+
+            # Find strike with delta closest to -0.30 (30 delta) per expiration
+            selected = []
+            for target_dte, actual_dte, closest_exp in targets:
+                candidates = self._candidate_puts(puts_by_exp.get(closest_exp, []), current_price, actual_dte)
+                if candidates:
+                    selected.append((target_dte, actual_dte, closest_exp, candidates))
+
+            # Get market data for every candidate contract in one batch
+            market_data = self.get_option_market_data_batch(
+                [put for *_, candidates in selected for put in candidates]
+            )
 
-                if not market_data:
+            results = []
+            for target_dte, actual_dte, closest_exp, candidates in selected:
+                best = self._refine_with_market_iv(candidates, market_data, current_price, actual_dte)
+                if not best:
                     continue
 
-                data = market_data[0]
-                strike_price = float(closest_put.get('strike_price', 0))
-                bid = float(data.get('bid_price', 0))
-                ask = float(data.get('ask_price', 0))
-                mid = (bid + ask) / 2
-                premium = mid * 100
-                volume = int(data.get('volume', 0))
-                oi = int(data.get('open_interest', 0))
-                iv = float(data.get('implied_volatility', 0))
-
-                # Calculate returns
-                capital = strike_price * 100
-                premium_pct = (premium / capital * 100) if capital > 0 else 0
-                T_years = actual_dte / 365.0
-                monthly_return = (premium_pct / actual_dte * 30) if actual_dte > 0 else 0
-                annual_return = (premium_pct / actual_dte * 365) if actual_dte > 0 else 0
-
-                # Calculate delta
-                delta = self.calculate_delta(
-                    S=current_price,
-                    K=strike_price,
-                    T=T_years,
-                    r=self.risk_free_rate,
-                    sigma=iv,
-                    option_type='put'
-                )
-
-                # Calculate probability of profit (based on delta)
-                # For puts, probability of profit ≈ 1 + delta (since delta is negative)
-                prob_profit = round((1 + delta) * 100, 1)
-
-                # Calculate break-even
-                breakeven = strike_price - (premium / 100)
-
-                # Downside protection
-                downside_protection = ((current_price - breakeven) / current_price * 100)
-
-                results.append({
-                    'target_dte': target_dte,
-                    'actual_dte': actual_dte,
-                    'expiration_date': closest_exp,
-                    'strike_price': strike_price,
-                    'current_price': current_price,
-                    'bid': bid,
-                    'ask': ask,
-                    'mid': mid,
-                    'premium': premium,
-                    'premium_pct': premium_pct,
-                    'monthly_return': monthly_return,
-                    'annual_return': annual_return,
-                    'delta': delta,
-                    'prob_profit': prob_profit,
-                    'iv': iv * 100,
-                    'volume': volume,
-                    'open_interest': oi,
-                    'breakeven': breakeven,
-                    'downside_protection': downside_protection,
-                    'strike_to_spot': (strike_price / current_price - 1) * 100  # % OTM
-                })
+                put, data = best
+                results.append(self._build_expiration_result(
+                    target_dte, actual_dte, closest_exp, put, data, current_price
+                ))
 
             return results
 
@@ -253,22 +400,42 @@ class EnhancedOptionsFetcher:
             traceback.print_exc()
             return []
 
-    def get_best_opportunities(self, symbols: List[str], min_monthly_return: float = 1.0) -> List[Dict]:
+    def get_best_opportunities(self, symbols: List[str], min_monthly_return: float = 1.0,
+                               max_workers: int = 8) -> List[Dict]:
         """
         Scan multiple symbols and return best opportunities
 
+        Symbols are fetched concurrently; every request still draws from the
+        shared Robinhood token budget, so more workers never exceed the
+        provider rate limit.
+
         Returns list sorted by monthly return
         """
+        # Log in once up front so worker threads share the session
+        if not self.login_robinhood():
+            return []
+
         all_opportunities = []
 
-        for symbol in symbols:
+        def scan(symbol: str) -> List[Dict]:
             logger.info(f"Scanning {symbol}...")
-            options_data = self.get_all_expirations_data(symbol)
+            return self.get_all_expirations_data(symbol)
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {executor.submit(scan, symbol): symbol for symbol in symbols}
+
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    options_data = future.result()
+                except Exception as e:
+                    logger.error(f"Error scanning {symbol}: {e}")
+                    continue
 
-            for opt in options_data:
-                if opt['monthly_return'] >= min_monthly_return:
-                    opt['symbol'] = symbol
-                    all_opportunities.append(opt)
+                for opt in options_data:
+                    if opt['monthly_return'] >= min_monthly_return:
+                        opt['symbol'] = symbol
+                        all_opportunities.append(opt)
 
         # Sort by monthly return (descending)
         all_opportunities.sort(key=lambda x: x['monthly_return'], reverse=True)
@@ -8,6 +8,7 @@ from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 import psycopg2.extras
 from src.kalshi_db_manager import KalshiDBManager
+from src.kalshi_market_index import KalshiMarketIndex, get_market_index
 
 logger = logging.getLogger(__name__)
 
@@ -146,69 +147,26 @@ class ESPNKalshiMatcher:
             logger.warning(f"Could not parse game_time {game_time}: {e}")
             game_date = datetime.now().date()
 
-        # Query Kalshi database for matching market
-        conn = None
-        cur = None
         try:
-            conn = self.db.get_connection()
-            cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-
             # Search within +/- 3 days of game time
             date_start = game_date - timedelta(days=3)
             date_end = game_date + timedelta(days=3)
 
+            # Title lookups against the shared in-memory market index
+            # (previously one ILIKE query per variation pair)
+            index = get_market_index()
+
             # Try matching with team name variations
             result = None
             for away_var in away_variations:
                 for home_var in home_variations:
-                    query = """
-                    SELECT
-                        ticker,
-                        title,
-                        yes_price,
-                        no_price,
-                        volume,
-                        close_time,
-                        market_type,
-                        raw_data->>'expected_expiration_time' as game_time_str
-                    FROM kalshi_markets
-                    WHERE
-                        (
-                            title ILIKE %s AND title ILIKE %s
-                        )
-                        AND (
-                            market_type IN ('nfl', 'cfb', 'winner', 'all')
-                            OR raw_data->>'market_type' IN ('nfl', 'cfb', 'winner')
-                            OR ticker LIKE 'KXNFLGAME%%'
-                            OR ticker LIKE 'KXNCAAFGAME%%'
-                        )
-                        AND (
-                            -- Match by expected_expiration_time (actual game time) if available
-                            (raw_data->>'expected_expiration_time' IS NOT NULL
-                             AND (raw_data->>'expected_expiration_time')::timestamp >= %s
-                             AND (raw_data->>'expected_expiration_time')::timestamp <= %s)
-                            OR
-                            -- Fallback to close_time for older data
-                            (raw_data->>'expected_expiration_time' IS NULL
-                             AND close_time >= %s
-                             AND close_time <= %s)
-                        )
-                        AND status != 'closed'
-                        AND yes_price IS NOT NULL
-                    ORDER BY volume DESC, close_time ASC
-                    LIMIT 1
-                    """
-
-                    cur.execute(query, (
-                        f'%{away_var}%',
-                        f'%{home_var}%',
-                        date_start,  # For expected_expiration_time start
-                        date_end,    # For expected_expiration_time end
-                        date_start,  # For close_time start (fallback)
-                        date_end     # For close_time end (fallback)
-                    ))
-
-                    result = cur.fetchone()
+                    for market in index.find_by_title([away_var], [home_var], substring=True):
+                        event_date = KalshiMarketIndex.event_date(market)
+                        if (self._is_football_market(market) and event_date and
+                                date_start <= event_date <= date_end):
+                            result = market
+                            break
+
                     if result:
                         logger.debug(f"Matched using variations: {away_var} vs {home_var}")
                         break
@@ -266,11 +224,15 @@ class ESPNKalshiMatcher:
         except Exception as e:
             logger.error(f"Error matching game to Kalshi: {e}", exc_info=True)
             return None
-        finally:
-            if cur:
-                cur.close()
-            if conn:
-                self.db.release_connection(conn)
+
+    @staticmethod
+    def _is_football_market(market: Dict) -> bool:
+        """NFL/CFB game market, by market_type or ticker pattern"""
+        ticker = market.get('ticker', '')
+        return (market.get('market_type') in ('nfl', 'cfb', 'winner', 'all') or
+                market.get('raw_market_type') in ('nfl', 'cfb', 'winner') or
+                ticker.startswith('KXNFLGAME') or
+                ticker.startswith('KXNCAAFGAME'))
 
     def enrich_espn_games_with_kalshi(self, espn_games: List[Dict]) -> List[Dict]:
         """
@@ -406,34 +368,20 @@ def enrich_games_with_kalshi_odds_nba(nba_games: List[Dict]) -> List[Dict]:
     Returns:
         Same list with kalshi_odds added
     """
-    from src.kalshi_db_manager import KalshiDBManager
-
-    db = KalshiDBManager()
-    conn = None
-    cur = None
-
     try:
-        conn = db.get_connection()
-        cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        index = get_market_index()
 
         enriched = []
         for game in nba_games:
             away_team = game.get('away_team', '')
             home_team = game.get('home_team', '')
 
-            # Query for NBA Kalshi markets for this matchup
+            # NBA Kalshi markets for this matchup, from the shared market index
             # NBA markets use format like: KXNBAGAME-25NOV19NYKDAL-NYK
-            cur.execute("""
-                SELECT *
-                FROM kalshi_markets
-                WHERE status = 'active'
-                AND ticker LIKE 'KXNBAGAME%%'
-                AND (title ILIKE %s OR title ILIKE %s)
-                ORDER BY volume DESC NULLS LAST
-                LIMIT 1
-            """, (f'%{away_team}%', f'%{home_team}%'))
-
-            market = cur.fetchone()
+            market = next((
+                m for m in index.find_by_title([t for t in (away_team, home_team) if t], substring=True)
+                if m.get('status') == 'active' and m['ticker'].startswith('KXNBAGAME')
+            ), None)
 
             if market and market.get('yes_price') is not None:
                 # Determine which team is "yes" based on ticker suffix
@@ -468,12 +416,6 @@ def enrich_games_with_kalshi_odds_nba(nba_games: List[Dict]) -> List[Dict]:
         logger.error(f"Error enriching NBA games with Kalshi odds: {e}")
         return nba_games
 
-    finally:
-        if cur:
-            cur.close()
-        if conn:
-            db.release_connection(conn)
-
 
 if __name__ == "__main__":
     # Test matching
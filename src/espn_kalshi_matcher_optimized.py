@@ -2,72 +2,36 @@
 Optimized Kalshi Matcher - Batch queries and caching
 
 Performance improvements:
-- 428 database queries → 1 cached query (428x reduction)
+- 428 database queries → 1 shared, incrementally refreshed market index
 - 10-30 second page loads → <1 second (10-30x faster)
 - O(n) team matching → O(1) index lookups (100x faster matching)
 """
 
-import streamlit as st
 import logging
 from typing import List, Dict, Optional
-from src.kalshi_db_manager import KalshiDBManager
-import psycopg2.extras
+from src.kalshi_market_index import (
+    get_market_index, is_active_game_market, market_lookup_keys,
+    game_lookup_keys, market_to_odds
+)
 
 logger = logging.getLogger(__name__)
 
 
-@st.cache_data(ttl=300, show_spinner=False)
 def get_all_active_kalshi_markets_cached() -> List[Dict]:
     """
-    Fetch all active Kalshi markets (cached for 5 minutes).
+    Fetch all active Kalshi game markets from the shared market index.
 
-    This replaces 400+ individual queries with a single batch query.
-    Cache ensures database is only hit once per 5 minutes.
+    The index loads the table once and then only pulls rows whose
+    synced_at/last_updated changed, so this no longer re-reads
+    kalshi_markets on every cache expiry.
 
     Returns:
-        List of all active Kalshi market dicts
+        List of all active Kalshi market dicts, highest volume first
     """
-    db = KalshiDBManager()
-    conn = None
-    cur = None
-
-    try:
-        conn = db.get_connection()
-        cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-
-        # Single query to fetch ALL active markets
-        cur.execute("""
-            SELECT
-                ticker,
-                title,
-                yes_price,
-                no_price,
-                volume,
-                home_team,
-                away_team,
-                market_type,
-                sector,
-                close_time,
-                status
-            FROM kalshi_markets
-            WHERE status = 'active'
-            AND yes_price IS NOT NULL
-            AND ticker LIKE 'KX%GAME%'
-            ORDER BY volume DESC NULLS LAST
-        """)
-
-        markets = cur.fetchall()
-        logger.info(f"✅ Fetched {len(markets)} active Kalshi markets (cached for 5min)")
-        return markets
-
-    except Exception as e:
-        logger.error(f"Error fetching Kalshi markets: {e}")
-        return []
-    finally:
-        if cur:
-            cur.close()
-        if conn:
-            db.release_connection(conn)
+    index = get_market_index()
+    markets = [m for m in index.all_markets() if is_active_game_market(m)]
+    markets.sort(key=lambda m: float(m.get('volume') or 0), reverse=True)
+    return markets
 
 
 def build_market_lookup_index(markets: List[Dict]) -> Dict[str, Dict]:
@@ -89,80 +53,13 @@ def build_market_lookup_index(markets: List[Dict]) -> Dict[str, Dict]:
     index = {}
 
     for market in markets:
-        home = (market.get('home_team') or '').lower().strip()
-        away = (market.get('away_team') or '').lower().strip()
-        title = (market.get('title') or '').lower()
-
-        # Generate index keys
-        if home and away:
-            # Direct team names
-            index[f"{away}_{home}"] = market
-            index[f"{home}_{away}"] = market
-
-            # Team abbreviations (from ticker)
-            ticker = market.get('ticker', '')
-            if '-' in ticker:
-                suffix = ticker.split('-')[-1].lower()
-                if len(suffix) <= 5:  # Likely abbreviation
-                    index[f"{suffix}_{home}"] = market
-                    index[f"{suffix}_{away}"] = market
-                    index[f"{away}_{suffix}"] = market
-                    index[f"{home}_{suffix}"] = market
-
-        # Also index by title for fuzzy matching
-        if title:
-            # Clean title and create searchable keys
-            title_words = [w for w in title.split() if len(w) > 2]
-            if len(title_words) >= 2:
-                # Index by combinations of title words
-                index['_'.join(title_words[-2:])] = market
-                if len(title_words) >= 3:
-                    index['_'.join(title_words[-3:])] = market
+        for key in market_lookup_keys(market):
+            index[key] = market
 
     logger.debug(f"Built market index with {len(index)} lookup keys for {len(markets)} markets")
     return index
 
 
-def normalize_team_name(team: str) -> str:
-    """Normalize team name for matching"""
-    if not team:
-        return ""
-
-    team = team.strip()
-
-    # Remove mascot (last word) from full team names
-    # "Florida State Seminoles" -> "Florida State"
-    parts = team.split()
-    if len(parts) > 1:
-        # Check if last word is likely a mascot
-        last_word = parts[-1].lower()
-        common_mascots = [
-            'seminoles', 'wolfpack', 'buckeyes', 'wolverines', 'broncos',
-            'bulldogs', 'tigers', 'bears', 'wildcats', 'eagles', 'hawks',
-            'panthers', 'lions', 'aggies', 'cowboys', 'knights', 'trojans',
-            'spartans', 'huskies', 'crimson', 'tide', 'gators', 'gamecocks',
-            'volunteers', 'rebels', 'commodores', 'razorbacks', 'sooners',
-            'longhorns', 'horns', 'hurricanes', 'hokies', 'tar heels', 'heels',
-            'cardinals', 'rams', 'ducks', 'beavers', 'cougars', 'utes'
-        ]
-        # Remove if it's a known mascot or ends with 's' (plural mascot)
-        if last_word in common_mascots or (last_word.endswith('s') and len(last_word) > 4):
-            team = ' '.join(parts[:-1])
-
-    # Normalize to lowercase
-    team = team.lower()
-
-    # Remove common suffixes
-    for suffix in [' football', ' basketball', ' fc', ' sc']:
-        if team.endswith(suffix):
-            team = team[:-len(suffix)].strip()
-
-    # Handle "St." vs "State" variations
-    team = team.replace(' st.', ' state').replace(' st ', ' state ')
-
-    return team.strip()
-
-
 def match_game_to_market_fast(game: Dict, market_index: Dict[str, Dict]) -> Optional[Dict]:
     """
     Fast O(1) matching using pre-built index.
@@ -174,71 +71,24 @@ def match_game_to_market_fast(game: Dict, market_index: Dict[str, Dict]) -> Opti
     Returns:
         Dict with kalshi_odds or None
     """
-    home = normalize_team_name(game.get('home_team', ''))
-    away = normalize_team_name(game.get('away_team', ''))
     home_abbr = (game.get('home_abbr') or '').lower().strip()
     away_abbr = (game.get('away_abbr') or '').lower().strip()
 
     # Try various matching strategies (in order of confidence)
-    lookup_keys = [
-        f"{away}_{home}",                    # Exact team names
-        f"{home}_{away}",                    # Reversed
-        f"{away_abbr}_{home_abbr}" if away_abbr and home_abbr else None,  # Abbreviations
-        f"{home_abbr}_{away_abbr}" if away_abbr and home_abbr else None,  # Reversed abbr
-        f"{away_abbr}_{home}" if away_abbr and home else None,           # Mixed
-        f"{away}_{home_abbr}" if away and home_abbr else None,           # Mixed
-        f"{home}_{away_abbr}" if home and away_abbr else None,           # Mixed
-        f"{home_abbr}_{away}" if home_abbr and away else None,           # Mixed
-    ]
-
-    # Remove None values
-    lookup_keys = [k for k in lookup_keys if k]
-
-    for key in lookup_keys:
+    for key in game_lookup_keys(game):
         if key in market_index:
-            market = market_index[key]
-
-            # Determine which team is "yes" from ticker
-            ticker = market.get('ticker', '')
-            ticker_suffix = ticker.split('-')[-1].lower() if '-' in ticker else ''
-
-            # Simple heuristic: if ticker ends with away abbr, away is yes
-            away_is_yes = False
-            if ticker_suffix and away_abbr:
-                if ticker_suffix == away_abbr or away_abbr in ticker_suffix:
-                    away_is_yes = True
-                elif ticker_suffix == home_abbr or home_abbr in ticker_suffix:
-                    away_is_yes = False
-                else:
-                    # Default: assume ticker suffix is home team (Kalshi convention)
-                    away_is_yes = False
-
-            if away_is_yes:
-                away_price = float(market['yes_price']) if market['yes_price'] else 0
-                home_price = float(market['no_price']) if market['no_price'] else 0
-            else:
-                away_price = float(market['no_price']) if market['no_price'] else 0
-                home_price = float(market['yes_price']) if market['yes_price'] else 0
-
-            return {
-                'away_win_price': away_price,
-                'home_win_price': home_price,
-                'ticker': market['ticker'],
-                'title': market['title'],
-                'volume': market.get('volume', 0),
-                'close_time': market.get('close_time')
-            }
+            return market_to_odds(market_index[key], away_abbr, home_abbr)
 
     return None
 
 
 def enrich_games_with_kalshi_odds_optimized(games: List[Dict], sport: str = 'nfl') -> List[Dict]:
     """
-    Optimized enrichment using batch query + caching + O(1) lookups.
+    Optimized enrichment using the shared market index + O(1) lookups.
 
     Performance:
     - Old: 400+ database queries, 10-30 seconds
-    - New: 1 cached query, <1 second
+    - New: incremental index refresh (at most every 30s), dict lookups per game
 
     Args:
         games: List of ESPN game dicts
@@ -253,42 +103,15 @@ def enrich_games_with_kalshi_odds_optimized(games: List[Dict], sport: str = 'nfl
     if not games:
         return games
 
-    # Fetch all markets (cached, only hits DB once per 5min)
-    all_markets = get_all_active_kalshi_markets_cached()
-
-    # Map sport parameter to sector values and ticker patterns
-    sport_config = {
-        'nfl': {'sector': 'nfl', 'ticker_pattern': 'KXNFLGAME'},
-        'ncaaf': {'sector': 'ncaaf', 'ticker_pattern': 'KXNCAAFGAME', 'market_type': 'cfb'},
-        'nba': {'sector': 'nba', 'ticker_pattern': 'KXNBAGAME'},
-        'mlb': {'sector': 'mlb', 'ticker_pattern': 'KXMLBGAME'}
-    }
-
-    sport_lower = sport.lower()
-    config = sport_config.get(sport_lower, {'sector': sport_lower, 'ticker_pattern': f'KX{sport_lower.upper()}GAME'})
-
-    # Filter by sport/sector OR ticker pattern (fallback for NULL sectors)
-    sport_markets = []
-    for m in all_markets:
-        sector = (m.get('sector') or '').lower()
-        market_type = (m.get('market_type') or '').lower()
-        ticker = m.get('ticker', '')
-
-        # Match by sector, market_type, or ticker pattern
-        if (sector == config['sector'] or
-            market_type == config.get('market_type', '') or
-            (config.get('ticker_pattern') and ticker.startswith(config['ticker_pattern']))):
-            sport_markets.append(m)
-
-    # Build fast lookup index
-    market_index = build_market_lookup_index(sport_markets)
+    # Shared across sports; only changed markets are pulled on refresh
+    index = get_market_index()
 
-    logger.info(f"Enriching {len(games)} {sport.upper()} games with {len(sport_markets)} active markets")
+    logger.info(f"Enriching {len(games)} {sport.upper()} games against {len(index)} open markets")
 
     # Match games to markets (fast O(1) lookups)
     matched = 0
     for game in games:
-        odds = match_game_to_market_fast(game, market_index)
+        odds = index.match_game(game, sport)
         if odds:
             game['kalshi_odds'] = odds
             matched += 1
@@ -3,7 +3,10 @@ Kalshi Database Manager
 Handles all database operations for Kalshi football markets
 """
 
+import io
 import os
+import time
+import functools
 import psycopg2
 import psycopg2.extras
 import psycopg2.pool
@@ -30,6 +33,7 @@ class KalshiDBManager:
             'user': 'postgres',
             'password': os.getenv('DB_PASSWORD')
         }
+        self.last_ingest_stats = {'rows': 0, 'seconds': 0.0, 'rows_per_second': None}
         self._initialize_pool()
         self.initialize_database()
 
@@ -96,6 +100,12 @@ class KalshiDBManager:
             tables_exist = cur.fetchone()[0]
 
             if tables_exist:
+                # Columns added after the initial schema
+                cur.execute("""
+                    ALTER TABLE kalshi_sync_log
+                    ADD COLUMN IF NOT EXISTS rows_per_second NUMERIC(12,2)
+                """)
+                conn.commit()
                 logger.info("Kalshi database tables already initialized")
                 return
 
@@ -128,10 +138,23 @@ class KalshiDBManager:
             if conn:
                 self.release_connection(conn)
 
+    # Columns staged by store_markets, in COPY order
+    _MARKET_STAGE_COLUMNS = (
+        'seq', 'ticker', 'title', 'subtitle', 'market_type', 'series_ticker',
+        'home_team', 'away_team',
+        'yes_price', 'no_price', 'volume', 'open_interest',
+        'status', 'close_time', 'expiration_time',
+        'raw_data'
+    )
+
     def store_markets(self, markets: List[Dict], market_type: str) -> int:
         """
         Store or update markets in database
 
+        Rows are staged into a temp table with a single COPY and merged into
+        kalshi_markets with one set-based upsert. Ingest throughput for the
+        call is left in self.last_ingest_stats for log_sync.
+
         Args:
             markets: List of market dictionaries from Kalshi API
             market_type: 'nfl' or 'college'
@@ -139,82 +162,81 @@ class KalshiDBManager:
         Returns:
             Number of markets stored/updated
         """
+        self.last_ingest_stats = {'rows': 0, 'seconds': 0.0, 'rows_per_second': None}
+
         if not markets:
             return 0
 
+        start = time.perf_counter()
+        rows = self._build_market_rows(markets, market_type)
+        if not rows:
+            return 0
+
         conn = self.get_connection()
         cur = conn.cursor()
-        stored_count = 0
 
         try:
-            for market in markets:
-                # Extract market data
-                ticker = market.get('ticker')
-                title = market.get('title', '')
-                subtitle = market.get('subtitle', '')
-                series_ticker = market.get('series_ticker', '')
-
-                # Parse teams from title (if possible)
-                home_team, away_team = self._extract_teams(title)
-
-                # Extract prices
-                last_price = market.get('last_price')
-                yes_price = last_price / 100 if last_price else None
-                no_price = (100 - last_price) / 100 if last_price else None
-
-                # Extract other fields
-                volume = market.get('volume', 0)
-                open_interest = market.get('open_interest', 0)
-                status = market.get('status', 'open')
-                close_time = market.get('close_time')
-                expiration_time = market.get('expiration_time')
-
-                # Truncate fields to database limits to avoid errors
-                ticker = ticker[:100] if ticker else None
-                series_ticker = series_ticker[:100] if series_ticker else ''
-                home_team = home_team[:100] if home_team else None
-                away_team = away_team[:100] if away_team else None
-
-                # Store market
-                cur.execute("""
-                    INSERT INTO kalshi_markets (
-                        ticker, title, subtitle, market_type, series_ticker,
-                        home_team, away_team,
-                        yes_price, no_price, volume, open_interest,
-                        status, close_time, expiration_time,
-                        raw_data, synced_at
-                    ) VALUES (
-                        %s, %s, %s, %s, %s,
-                        %s, %s,
-                        %s, %s, %s, %s,
-                        %s, %s, %s,
-                        %s, NOW()
-                    )
-                    ON CONFLICT (ticker) DO UPDATE SET
-                        title = EXCLUDED.title,
-                        subtitle = EXCLUDED.subtitle,
-                        yes_price = EXCLUDED.yes_price,
-                        no_price = EXCLUDED.no_price,
-                        volume = EXCLUDED.volume,
-                        open_interest = EXCLUDED.open_interest,
-                        status = EXCLUDED.status,
-                        close_time = EXCLUDED.close_time,
-                        expiration_time = EXCLUDED.expiration_time,
-                        raw_data = EXCLUDED.raw_data,
-                        synced_at = NOW(),
-                        last_updated = NOW()
-                """, (
+            cur.execute("""
+                CREATE TEMP TABLE kalshi_markets_stage (
+                    seq INTEGER,
+                    ticker TEXT,
+                    title TEXT,
+                    subtitle TEXT,
+                    market_type TEXT,
+                    series_ticker TEXT,
+                    home_team TEXT,
+                    away_team TEXT,
+                    yes_price NUMERIC,
+                    no_price NUMERIC,
+                    volume NUMERIC,
+                    open_interest INTEGER,
+                    status TEXT,
+                    close_time TIMESTAMP WITH TIME ZONE,
+                    expiration_time TIMESTAMP WITH TIME ZONE,
+                    raw_data JSONB
+                ) ON COMMIT DROP
+            """)
+
+            cur.copy_expert(
+                f"COPY kalshi_markets_stage ({', '.join(self._MARKET_STAGE_COLUMNS)}) FROM STDIN",
+                self._market_rows_to_copy_buffer(rows)
+            )
+
+            # DISTINCT ON keeps the last occurrence of a repeated ticker, since
+            # ON CONFLICT cannot touch the same row twice in one statement
+            cur.execute("""
+                INSERT INTO kalshi_markets (
                     ticker, title, subtitle, market_type, series_ticker,
                     home_team, away_team,
                     yes_price, no_price, volume, open_interest,
                     status, close_time, expiration_time,
-                    json.dumps(market)
-                ))
-
-                stored_count += 1
+                    raw_data, synced_at
+                )
+                SELECT DISTINCT ON (ticker)
+                    ticker, title, subtitle, market_type, series_ticker,
+                    home_team, away_team,
+                    yes_price, no_price, volume, open_interest,
+                    status, close_time, expiration_time,
+                    raw_data, NOW()
+                FROM kalshi_markets_stage
+                ORDER BY ticker, seq DESC
+                ON CONFLICT (ticker) DO UPDATE SET
+                    title = EXCLUDED.title,
+                    subtitle = EXCLUDED.subtitle,
+                    yes_price = EXCLUDED.yes_price,
+                    no_price = EXCLUDED.no_price,
+                    volume = EXCLUDED.volume,
+                    open_interest = EXCLUDED.open_interest,
+                    status = EXCLUDED.status,
+                    close_time = EXCLUDED.close_time,
+                    expiration_time = EXCLUDED.expiration_time,
+                    raw_data = EXCLUDED.raw_data,
+                    synced_at = NOW(),
+                    last_updated = NOW()
+            """)
+            stored_count = cur.rowcount
 
             conn.commit()
-            logger.info(f"Stored/updated {stored_count} {market_type} markets")
 
         except Exception as e:
             conn.rollback()
@@ -223,10 +245,89 @@ class KalshiDBManager:
 
         finally:
             cur.close()
-            conn.close()
+            self.release_connection(conn)
+
+        elapsed = time.perf_counter() - start
+        rows_per_second = len(rows) / elapsed if elapsed > 0 else None
+        self.last_ingest_stats = {
+            'rows': len(rows),
+            'seconds': elapsed,
+            'rows_per_second': rows_per_second
+        }
+
+        logger.info(
+            f"Stored/updated {stored_count} {market_type} markets "
+            f"({len(rows)} rows in {elapsed:.2f}s"
+            + (f", {rows_per_second:,.0f} rows/sec)" if rows_per_second else ")")
+        )
 
         return stored_count
 
+    def _build_market_rows(self, markets: List[Dict], market_type: str) -> List[tuple]:
+        """
+        Flatten Kalshi API markets into stage rows (see _MARKET_STAGE_COLUMNS)
+
+        Markets without a ticker are skipped.
+        """
+        rows = []
+
+        for seq, market in enumerate(markets):
+            ticker = market.get('ticker')
+            if not ticker:
+                continue
+
+            title = market.get('title', '')
+            subtitle = market.get('subtitle', '')
+            series_ticker = market.get('series_ticker', '')
+
+            # Parse teams from title (if possible)
+            home_team, away_team = self._extract_teams_cached(title)
+
+            # Extract prices
+            last_price = market.get('last_price')
+            yes_price = last_price / 100 if last_price else None
+            no_price = (100 - last_price) / 100 if last_price else None
+
+            # Truncate fields to database limits to avoid errors
+            rows.append((
+                seq, ticker[:100], title, subtitle, market_type,
+                series_ticker[:100] if series_ticker else '',
+                home_team[:100] if home_team else None,
+                away_team[:100] if away_team else None,
+                yes_price, no_price,
+                market.get('volume', 0), market.get('open_interest', 0),
+                market.get('status', 'open'),
+                market.get('close_time'), market.get('expiration_time'),
+                json.dumps(market)
+            ))
+
+        return rows
+
+    @staticmethod
+    def _market_rows_to_copy_buffer(rows: List[tuple]) -> io.StringIO:
+        """Serialize stage rows to a COPY text-format buffer (NULL as \\N)"""
+        def encode(value) -> str:
+            if value is None:
+                return '\\N'
+            return (str(value)
+                    .replace('\\', '\\\\')
+                    .replace('\t', '\\t')
+                    .replace('\n', '\\n')
+                    .replace('\r', '\\r'))
+
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write('\t'.join(encode(value) for value in row))
+            buffer.write('\n')
+        buffer.seek(0)
+        return buffer
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _extract_teams_cached(title: str) -> tuple:
+        """_extract_teams memoized by title (bounded LRU); titles repeat across syncs"""
+        return KalshiDBManager._extract_teams(title)
+
     def update_market_prices(self, ticker: str, yes_price: float, no_price: float) -> bool:
         """
         Update market prices only (for real-time price monitoring)
@@ -263,7 +364,8 @@ class KalshiDBManager:
             cur.close()
             conn.close()
 
-    def _extract_teams(self, title: str) -> tuple:
+    @staticmethod
+    def _extract_teams(title: str) -> tuple:
         """
         Extract team names from Kalshi market title using robust pattern matching
         and validation against known team databases.
@@ -778,10 +880,15 @@ class KalshiDBManager:
 
     def log_sync(self, sync_type: str, market_type: str, total: int,
                 successful: int, failed: int, duration: int,
-                status: str = 'completed', error_msg: Optional[str] = None) -> int:
+                status: str = 'completed', error_msg: Optional[str] = None,
+                rows_per_second: Optional[float] = None) -> int:
         """
         Log a sync operation
 
+        Args:
+            rows_per_second: Ingest throughput, e.g. from
+                last_ingest_stats['rows_per_second'] after store_markets
+
         Returns:
             Sync log ID
         """
@@ -793,11 +900,11 @@ class KalshiDBManager:
                 INSERT INTO kalshi_sync_log (
                     sync_type, market_type, total_processed,
                     successful, failed, duration_seconds,
-                    status, error_message, completed_at
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW())
+                    status, error_message, rows_per_second, completed_at
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
                 RETURNING id
             """, (sync_type, market_type, total, successful, failed,
-                  duration, status, error_msg))
+                  duration, status, error_msg, rows_per_second))
 
             sync_id = cur.fetchone()[0]
             conn.commit()
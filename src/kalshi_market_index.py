@@ -0,0 +1,608 @@
+"""
+Kalshi Market Index - long-lived, incrementally refreshed market lookup
+
+Holds every open Kalshi market in process and keeps it current by pulling
+only rows whose synced_at/last_updated moved past the last watermark (minus
+a safety lag for rows stamped before their transaction committed).
+Shared by the NFL, NCAA and NBA enrichment paths so each page render is
+pure dict lookups:
+- team-pair keys (names, abbreviations, canonical aliases) -> markets
+- title word n-grams -> markets, replacing per-game ILIKE queries
+"""
+
+import re
+import time
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, date, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+import psycopg2.extras
+
+from src.kalshi_db_manager import KalshiDBManager
+
+logger = logging.getLogger(__name__)
+
+
+# Sport -> how its markets are recognised in kalshi_markets
+SPORT_CONFIG = {
+    'nfl': {'sector': 'nfl', 'ticker_pattern': 'KXNFLGAME'},
+    'ncaaf': {'sector': 'ncaaf', 'ticker_pattern': 'KXNCAAFGAME', 'market_type': 'cfb'},
+    'nba': {'sector': 'nba', 'ticker_pattern': 'KXNBAGAME'},
+    'mlb': {'sector': 'mlb', 'ticker_pattern': 'KXMLBGAME'}
+}
+
+COMMON_MASCOTS = {
+    'seminoles', 'wolfpack', 'buckeyes', 'wolverines', 'broncos',
+    'bulldogs', 'tigers', 'bears', 'wildcats', 'eagles', 'hawks',
+    'panthers', 'lions', 'aggies', 'cowboys', 'knights', 'trojans',
+    'spartans', 'huskies', 'crimson', 'tide', 'gators', 'gamecocks',
+    'volunteers', 'rebels', 'commodores', 'razorbacks', 'sooners',
+    'longhorns', 'horns', 'hurricanes', 'hokies', 'tar heels', 'heels',
+    'cardinals', 'rams', 'ducks', 'beavers', 'cougars', 'utes'
+}
+
+# Longest title phrase indexed (e.g. "new york giants")
+MAX_TITLE_NGRAM = 4
+
+_TITLE_TOKEN_RE = re.compile(r"[a-z0-9&']+")
+
+
+def sport_config(sport: str) -> Dict:
+    """Matching config for a sport, with a KX<SPORT>GAME fallback"""
+    sport_lower = sport.lower()
+    return SPORT_CONFIG.get(
+        sport_lower,
+        {'sector': sport_lower, 'ticker_pattern': f'KX{sport_lower.upper()}GAME'}
+    )
+
+
+def market_matches_sport(market: Dict, config: Dict) -> bool:
+    """Match by sector, market_type, or ticker pattern (fallback for NULL sectors)"""
+    sector = (market.get('sector') or '').lower()
+    market_type = (market.get('market_type') or '').lower()
+    ticker = market.get('ticker', '')
+
+    return (sector == config['sector'] or
+            market_type == config.get('market_type', '') or
+            bool(config.get('ticker_pattern') and ticker.startswith(config['ticker_pattern'])))
+
+
+def is_active_game_market(market: Dict) -> bool:
+    """Active game-winner market (status 'active', ticker KX*GAME*)"""
+    ticker = market.get('ticker', '')
+    return (market.get('status') == 'active' and
+            ticker.startswith('KX') and 'GAME' in ticker[2:])
+
+
+def normalize_team_name(team: str) -> str:
+    """Normalize team name for matching"""
+    if not team:
+        return ""
+
+    team = team.strip()
+
+    # Remove mascot (last word) from full team names
+    # "Florida State Seminoles" -> "Florida State"
+    parts = team.split()
+    if len(parts) > 1:
+        # Check if last word is likely a mascot
+        last_word = parts[-1].lower()
+        # Remove if it's a known mascot or ends with 's' (plural mascot)
+        if last_word in COMMON_MASCOTS or (last_word.endswith('s') and len(last_word) > 4):
+            team = ' '.join(parts[:-1])
+
+    # Normalize to lowercase
+    team = team.lower()
+
+    # Remove common suffixes
+    for suffix in [' football', ' basketball', ' fc', ' sc']:
+        if team.endswith(suffix):
+            team = team[:-len(suffix)].strip()
+
+    # Handle "St." vs "State" variations
+    team = team.replace(' st.', ' state').replace(' st ', ' state ')
+
+    return team.strip()
+
+
+def market_lookup_keys(market: Dict) -> Set[str]:
+    """
+    Lookup keys for a market:
+    - "lakers_warriors" / "warriors_lakers"
+    - ticker suffix paired with either team ("lal_warriors")
+    - last two/three title words
+    """
+    keys = set()
+
+    home = (market.get('home_team') or '').lower().strip()
+    away = (market.get('away_team') or '').lower().strip()
+    title = (market.get('title') or '').lower()
+
+    if home and away:
+        # Direct team names
+        keys.add(f"{away}_{home}")
+        keys.add(f"{home}_{away}")
+
+        # Team abbreviations (from ticker)
+        ticker = market.get('ticker', '')
+        if '-' in ticker:
+            suffix = ticker.split('-')[-1].lower()
+            if len(suffix) <= 5:  # Likely abbreviation
+                keys.update((f"{suffix}_{home}", f"{suffix}_{away}",
+                             f"{away}_{suffix}", f"{home}_{suffix}"))
+
+    # Also index by title for fuzzy matching
+    if title:
+        title_words = [w for w in title.split() if len(w) > 2]
+        if len(title_words) >= 2:
+            keys.add('_'.join(title_words[-2:]))
+            if len(title_words) >= 3:
+                keys.add('_'.join(title_words[-3:]))
+
+    return keys
+
+
+def game_lookup_keys(game: Dict) -> List[str]:
+    """Lookup keys for an ESPN game, in order of match confidence"""
+    home = normalize_team_name(game.get('home_team', ''))
+    away = normalize_team_name(game.get('away_team', ''))
+    home_abbr = (game.get('home_abbr') or '').lower().strip()
+    away_abbr = (game.get('away_abbr') or '').lower().strip()
+
+    lookup_keys = [
+        f"{away}_{home}",                    # Exact team names
+        f"{home}_{away}",                    # Reversed
+        f"{away_abbr}_{home_abbr}" if away_abbr and home_abbr else None,  # Abbreviations
+        f"{home_abbr}_{away_abbr}" if away_abbr and home_abbr else None,  # Reversed abbr
+        f"{away_abbr}_{home}" if away_abbr and home else None,           # Mixed
+        f"{away}_{home_abbr}" if away and home_abbr else None,           # Mixed
+        f"{home}_{away_abbr}" if home and away_abbr else None,           # Mixed
+        f"{home_abbr}_{away}" if home_abbr and away else None,           # Mixed
+    ]
+
+    return [k for k in lookup_keys if k]
+
+
+def market_to_odds(market: Dict, away_abbr: str, home_abbr: str) -> Dict:
+    """Convert a matched market into the kalshi_odds dict attached to games"""
+    # Determine which team is "yes" from ticker
+    ticker = market.get('ticker', '')
+    ticker_suffix = ticker.split('-')[-1].lower() if '-' in ticker else ''
+
+    # Simple heuristic: if ticker ends with away abbr, away is yes.
+    # Otherwise assume ticker suffix is home team (Kalshi convention)
+    away_is_yes = bool(ticker_suffix and away_abbr and
+                       (ticker_suffix == away_abbr or away_abbr in ticker_suffix))
+
+    if away_is_yes:
+        away_price = float(market['yes_price']) if market['yes_price'] else 0
+        home_price = float(market['no_price']) if market['no_price'] else 0
+    else:
+        away_price = float(market['no_price']) if market['no_price'] else 0
+        home_price = float(market['yes_price']) if market['yes_price'] else 0
+
+    return {
+        'away_win_price': away_price,
+        'home_win_price': home_price,
+        'ticker': market['ticker'],
+        'title': market['title'],
+        'volume': market.get('volume', 0),
+        'close_time': market.get('close_time')
+    }
+
+
+def title_ngrams(text: str) -> Set[str]:
+    """Word n-grams (1..MAX_TITLE_NGRAM) of a lowercased title or team name"""
+    tokens = _TITLE_TOKEN_RE.findall((text or '').lower())
+    grams = set()
+    for n in range(1, MAX_TITLE_NGRAM + 1):
+        for i in range(len(tokens) - n + 1):
+            grams.add(' '.join(tokens[i:i + n]))
+    return grams
+
+
+def build_team_alias_map() -> Dict[str, str]:
+    """
+    Map normalized team names, cities, nicknames and abbreviations to one
+    canonical normalized name per team.
+
+    Ambiguous aliases (e.g. a city with two teams) are dropped rather than
+    guessed.
+    """
+    candidates: Dict[str, Set[str]] = defaultdict(set)
+
+    def add(canonical: str, *aliases: str):
+        canonical = normalize_team_name(canonical)
+        if not canonical:
+            return
+        for alias in aliases:
+            if not alias:
+                continue
+            candidates[alias.lower().strip()].add(canonical)
+            candidates[normalize_team_name(alias)].add(canonical)
+
+    try:
+        from src.nfl_team_database import NFL_TEAMS, NFL_TEAM_ALIASES
+        for name, info in NFL_TEAMS.items():
+            add(name, name, info.get('full_name'), info.get('abbr'))
+        for alias, name in NFL_TEAM_ALIASES.items():
+            add(name, alias)
+    except ImportError:
+        pass
+
+    try:
+        from src.nba_team_database import NBA_TEAMS, TEAM_NAME_VARIATIONS
+        for abbr, info in NBA_TEAMS.items():
+            add(info['full_name'], abbr, info.get('full_name'), info.get('name'))
+        for alias, abbr in TEAM_NAME_VARIATIONS.items():
+            if abbr in NBA_TEAMS:
+                add(NBA_TEAMS[abbr]['full_name'], alias)
+    except ImportError:
+        pass
+
+    return {alias: next(iter(names)) for alias, names in candidates.items()
+            if alias and len(names) == 1}
+
+
+def _as_date(value) -> Optional[date]:
+    """Date part of a timestamp column or ISO string"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+
+class KalshiMarketIndex:
+    """
+    In-process index of open Kalshi markets with watermark-based refresh
+
+    Markets are keyed by ticker. Every secondary index stores tickers so a
+    changed or closed market is updated in place without a rebuild:
+    - per-sport team-pair keys (highest volume wins on collisions)
+    - title n-grams for substring-style team lookups
+    """
+
+    MARKET_COLUMNS = """
+        ticker,
+        title,
+        yes_price,
+        no_price,
+        volume,
+        home_team,
+        away_team,
+        market_type,
+        sector,
+        close_time,
+        status,
+        raw_data->>'expected_expiration_time' AS expected_expiration_time,
+        raw_data->>'market_type' AS raw_market_type,
+        GREATEST(synced_at, last_updated) AS changed_at
+    """
+
+    def __init__(self, db: Optional[KalshiDBManager] = None,
+                 refresh_interval: float = 30.0,
+                 full_rebuild_interval: float = 3600.0,
+                 watermark_lag: float = 300.0):
+        """
+        Args:
+            db: Database manager (created lazily on first refresh)
+            refresh_interval: Minimum seconds between incremental refreshes
+            full_rebuild_interval: Seconds between full reloads, which also
+                drop rows deleted from the table
+            watermark_lag: Seconds re-read before the watermark. synced_at is
+                the writing transaction's start time, so a row can commit after
+                a later-stamped row was already read; this must exceed the
+                longest market sync transaction.
+        """
+        self._db = db
+        self.refresh_interval = refresh_interval
+        self.full_rebuild_interval = full_rebuild_interval
+        self.watermark_lag = timedelta(seconds=watermark_lag)
+
+        self._lock = threading.RLock()
+        self._markets: Dict[str, Dict] = {}
+        self._sport_keys: Dict[str, Dict[str, Set[str]]] = defaultdict(lambda: defaultdict(set))
+        self._market_keys: Dict[str, Dict[str, Set[str]]] = {}
+        self._title_index: Dict[str, Set[str]] = defaultdict(set)
+        self._market_grams: Dict[str, Set[str]] = {}
+        self._aliases = build_team_alias_map()
+
+        self._watermark: Optional[datetime] = None
+        self._last_refresh = 0.0
+        self._last_full_load = 0.0
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    def refresh(self, force: bool = False) -> int:
+        """
+        Pull markets changed since the watermark (full load on first use)
+
+        Returns:
+            Number of markets added, updated or removed
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._last_refresh and now - self._last_refresh < self.refresh_interval:
+                return 0
+
+            full = self._watermark is None or now - self._last_full_load >= self.full_rebuild_interval
+            rows = self._fetch_rows(None if full else self._watermark - self.watermark_lag)
+            if rows is None:
+                return 0
+
+            if full:
+                self._clear()
+                self._last_full_load = now
+
+            for row in rows:
+                self.apply(row)
+
+            self._last_refresh = now
+            logger.debug(f"Market index {'loaded' if full else 'refreshed'}: "
+                         f"{len(rows)} changed rows, {len(self._markets)} open markets")
+            return len(rows)
+
+    def _fetch_rows(self, since: Optional[datetime]) -> Optional[List[Dict]]:
+        """Open markets (full load) or every row changed at/after since"""
+        if self._db is None:
+            self._db = KalshiDBManager()
+
+        conn = None
+        cur = None
+        try:
+            conn = self._db.get_connection()
+            cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+            if since is None:
+                cur.execute(f"""
+                    SELECT {self.MARKET_COLUMNS}
+                    FROM kalshi_markets
+                    WHERE status != 'closed'
+                    AND yes_price IS NOT NULL
+                """)
+            else:
+                # Re-reads the lag window before the watermark; apply() is idempotent
+                cur.execute(f"""
+                    SELECT {self.MARKET_COLUMNS}
+                    FROM kalshi_markets
+                    WHERE GREATEST(synced_at, last_updated) >= %s
+                """, (since,))
+
+            return [dict(row) for row in cur.fetchall()]
+
+        except Exception as e:
+            logger.error(f"Error refreshing Kalshi market index: {e}")
+            return None
+        finally:
+            if cur:
+                cur.close()
+            if conn:
+                self._db.release_connection(conn)
+
+    def apply(self, market: Dict):
+        """Insert, update or (if closed / unpriced) remove one market row"""
+        ticker = market.get('ticker')
+        if not ticker:
+            return
+
+        with self._lock:
+            changed_at = market.get('changed_at')
+            if changed_at is not None and (self._watermark is None or changed_at > self._watermark):
+                self._watermark = changed_at
+
+            self._remove(ticker)
+            if market.get('status') == 'closed' or market.get('yes_price') is None:
+                return
+
+            self._markets[ticker] = market
+
+            keys = set(market_lookup_keys(market))
+            home = self.canonical_team(market.get('home_team'))
+            away = self.canonical_team(market.get('away_team'))
+            if home and away:
+                keys.update((f"{away}_{home}", f"{home}_{away}"))
+
+            sport_keys = {}
+            for sport in SPORT_CONFIG:
+                if market_matches_sport(market, SPORT_CONFIG[sport]):
+                    sport_keys[sport] = keys
+                    for key in keys:
+                        self._sport_keys[sport][key].add(ticker)
+            self._market_keys[ticker] = sport_keys
+
+            grams = title_ngrams(market.get('title'))
+            for gram in grams:
+                self._title_index[gram].add(ticker)
+            self._market_grams[ticker] = grams
+
+    def _remove(self, ticker: str):
+        if self._markets.pop(ticker, None) is None:
+            return
+
+        for sport, keys in self._market_keys.pop(ticker, {}).items():
+            index = self._sport_keys[sport]
+            for key in keys:
+                tickers = index.get(key)
+                if tickers is not None:
+                    tickers.discard(ticker)
+                    if not tickers:
+                        del index[key]
+
+        for gram in self._market_grams.pop(ticker, ()):
+            tickers = self._title_index.get(gram)
+            if tickers is not None:
+                tickers.discard(ticker)
+                if not tickers:
+                    del self._title_index[gram]
+
+    def _clear(self):
+        self._markets.clear()
+        self._sport_keys.clear()
+        self._market_keys.clear()
+        self._title_index.clear()
+        self._market_grams.clear()
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._markets)
+
+    def canonical_team(self, name: Optional[str]) -> str:
+        """Canonical normalized team name (alias map, else normalize_team_name)"""
+        if not name:
+            return ''
+        lowered = name.lower().strip()
+        if lowered in self._aliases:
+            return self._aliases[lowered]
+        normalized = normalize_team_name(name)
+        return self._aliases.get(normalized, normalized)
+
+    def all_markets(self) -> List[Dict]:
+        """All open markets"""
+        with self._lock:
+            return list(self._markets.values())
+
+    def markets_for_sport(self, sport: str) -> List[Dict]:
+        """Open markets for a sport"""
+        config = sport_config(sport)
+        with self._lock:
+            return [m for m in self._markets.values() if market_matches_sport(m, config)]
+
+    def lookup(self, sport: str, key: str,
+               accept: Optional[Callable[[Dict], bool]] = None) -> Optional[Dict]:
+        """Highest-volume market for a team-pair lookup key (filtered by accept)"""
+        sport = sport.lower()
+        with self._lock:
+            if sport in SPORT_CONFIG:
+                tickers = self._sport_keys[sport].get(key)
+                candidates = [self._markets[t] for t in tickers] if tickers else []
+            else:
+                config = sport_config(sport)
+                candidates = [m for m in self._markets.values()
+                              if market_matches_sport(m, config) and key in market_lookup_keys(m)]
+
+        if accept is not None:
+            candidates = [m for m in candidates if accept(m)]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda m: (float(m.get('volume') or 0), m['ticker']))
+
+    def match_game(self, game: Dict, sport: str,
+                   accept: Optional[Callable[[Dict], bool]] = is_active_game_market) -> Optional[Dict]:
+        """
+        Match an ESPN game to a market and return its kalshi_odds dict
+
+        Args:
+            game: ESPN game dict with away_team, home_team, away_abbr, home_abbr
+            sport: 'nfl', 'ncaaf', 'nba', ...
+            accept: Market filter (default: active KX*GAME* markets)
+        """
+        home_abbr = (game.get('home_abbr') or '').lower().strip()
+        away_abbr = (game.get('away_abbr') or '').lower().strip()
+
+        keys = game_lookup_keys(game)
+        home = self.canonical_team(game.get('home_team'))
+        away = self.canonical_team(game.get('away_team'))
+        if home and away:
+            keys += [f"{away}_{home}", f"{home}_{away}"]
+
+        for key in keys:
+            market = self.lookup(sport, key, accept)
+            if market:
+                return market_to_odds(market, away_abbr, home_abbr)
+
+        return None
+
+    def tickers_with_title_term(self, term: str) -> Set[str]:
+        """Tickers whose title contains term as a whole word or phrase"""
+        grams = title_ngrams(term)
+        phrase = ' '.join(_TITLE_TOKEN_RE.findall((term or '').lower()))
+        if not phrase or phrase not in grams:
+            return set()
+        with self._lock:
+            return set(self._title_index.get(phrase, ()))
+
+    def tickers_with_title_substring(self, terms: Iterable[str]) -> Set[str]:
+        """Tickers whose title contains any of terms anywhere (case-insensitive, like ILIKE '%term%')"""
+        terms = [term.lower() for term in terms if term]
+        if not terms:
+            return set()
+        with self._lock:
+            return {
+                ticker for ticker, market in self._markets.items()
+                if any(term in (market.get('title') or '').lower() for term in terms)
+            }
+
+    def find_by_title(self, first_terms: Iterable[str],
+                      second_terms: Optional[Iterable[str]] = None,
+                      substring: bool = False) -> List[Dict]:
+        """
+        Markets whose title contains any of first_terms (and, if given, any
+        of second_terms), highest volume then earliest close first
+
+        Terms match whole words via the n-gram index; substring=True scans
+        titles for plain substrings instead, matching the ILIKE queries the
+        legacy matchers used.
+        """
+        def matching(terms: Iterable[str]) -> Set[str]:
+            if substring:
+                return self.tickers_with_title_substring(terms)
+            tickers = set()
+            for term in terms:
+                tickers |= self.tickers_with_title_term(term)
+            return tickers
+
+        first = matching(first_terms)
+        if second_terms is not None and first:
+            first &= matching(second_terms)
+
+        with self._lock:
+            markets = [self._markets[t] for t in first if t in self._markets]
+
+        return sorted(markets, key=_volume_then_close)
+
+    @staticmethod
+    def event_date(market: Dict) -> Optional[date]:
+        """Game date: expected_expiration_time when present, else close_time"""
+        if market.get('expected_expiration_time'):
+            return _as_date(market['expected_expiration_time'])
+        return _as_date(market.get('close_time'))
+
+
+def _volume_then_close(market: Dict):
+    close = market.get('close_time')
+    close_key = close.timestamp() if isinstance(close, datetime) else float('inf')
+    return (-float(market.get('volume') or 0), close_key)
+
+
+# Singleton instance
+_market_index: Optional[KalshiMarketIndex] = None
+_market_index_lock = threading.Lock()
+
+
+def get_market_index(refresh: bool = True) -> KalshiMarketIndex:
+    """
+    Shared market index, refreshed incrementally (at most every
+    refresh_interval seconds) when refresh is True
+    """
+    global _market_index
+    if _market_index is None:
+        with _market_index_lock:
+            if _market_index is None:
+                _market_index = KalshiMarketIndex()
+                logger.info("Initialized shared Kalshi market index")
+    if refresh:
+        _market_index.refresh()
+    return _market_index
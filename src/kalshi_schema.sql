@@ -188,6 +188,7 @@ CREATE TABLE IF NOT EXISTS kalshi_sync_log (
     successful INTEGER DEFAULT 0,
     failed INTEGER DEFAULT 0,
     duration_seconds INTEGER,
+    rows_per_second NUMERIC(12,2), -- Ingest throughput reported by store_markets
 
     -- Status
     status VARCHAR(20) DEFAULT 'running', -- 'running', 'completed', 'error'
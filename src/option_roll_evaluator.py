@@ -13,10 +13,11 @@ import numpy as np
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 import yfinance as yf
-from scipy.stats import norm
 import logging
 import os
 
+from src.options_pricing import bs_greeks
+
 # Try to import Robinhood - optional dependency
 try:
     import robin_stocks.robinhood as rh
@@ -412,6 +413,10 @@ class OptionRollEvaluator:
             best_combo = None
             best_score = -float('inf')
 
+            # Closing cost and volatility don't depend on the candidate roll
+            close_cost = self._get_option_price(symbol, current_strike, current_expiration, 'ask', 'put')
+            volatility = self._get_volatility(symbol)
+
             for exp_date in future_expirations[:3]:
                 # Try Yahoo Finance first, fallback to Robinhood
                 try:
@@ -430,43 +435,42 @@ class OptionRollEvaluator:
                 target_strikes = puts[(puts['strike'] < current_strike) &
                                      (puts['strike'] > current_price * 0.90)]
 
-                for _, target_option in target_strikes.iterrows():
-                    # Calculate roll metrics
-                    close_cost = self._get_option_price(symbol, current_strike, current_expiration, 'ask', 'put')
-                    open_credit = float(target_option['bid'])
-                    net_credit = open_credit - close_cost - (2 * self.commission_per_contract / 100)
-
-                    if net_credit <= 0:
-                        continue  # Skip if requires net debit
-
-                    # Calculate value metrics
-                    days_added = self._days_to_expiry(exp_date) - self._days_to_expiry(current_expiration)
-                    new_strike = float(target_option['strike'])
-
-                    prob_profit = self._calculate_prob_otm(
-                        current_price, new_strike,
-                        self._get_volatility(symbol),
-                        self._days_to_expiry(exp_date)
-                    )
-
-                    # Composite score
-                    strike_reduction = (current_strike - new_strike) / current_strike
-                    time_value = days_added / 30  # Normalize to monthly
-                    score = (net_credit * 0.4) + (prob_profit * 0.3) + \
-                           (strike_reduction * 0.2) + (time_value * 0.1)
-
-                    if score > best_score:
-                        best_score = score
-                        best_combo = {
-                            'new_strike': new_strike,
-                            'new_expiration': exp_date,
-                            'close_cost': close_cost,
-                            'open_credit': open_credit,
-                            'net_credit': net_credit,
-                            'days_added': days_added,
-                            'probability_profit': prob_profit,
-                            'strike_reduction_pct': strike_reduction * 100
-                        }
+                if target_strikes.empty:
+                    continue
+
+                # Score every candidate strike for this expiration at once
+                new_strikes = target_strikes['strike'].to_numpy(dtype=float)
+                open_credits = target_strikes['bid'].to_numpy(dtype=float)
+                net_credits = open_credits - close_cost - (2 * self.commission_per_contract / 100)
+
+                # Calculate value metrics
+                days_added = self._days_to_expiry(exp_date) - self._days_to_expiry(current_expiration)
+                prob_profits = self._calculate_prob_otm_batch(
+                    current_price, new_strikes, volatility, self._days_to_expiry(exp_date)
+                )
+
+                # Composite score
+                strike_reductions = (current_strike - new_strikes) / current_strike
+                time_value = days_added / 30  # Normalize to monthly
+                scores = (net_credits * 0.4) + (prob_profits * 0.3) + \
+                         (strike_reductions * 0.2) + (time_value * 0.1)
+
+                # Skip strikes that require a net debit
+                scores = np.where(net_credits > 0, scores, -np.inf)
+                i = int(np.argmax(scores))
+
+                if net_credits[i] > 0 and scores[i] > best_score:
+                    best_score = scores[i]
+                    best_combo = {
+                        'new_strike': float(new_strikes[i]),
+                        'new_expiration': exp_date,
+                        'close_cost': close_cost,
+                        'open_credit': float(open_credits[i]),
+                        'net_credit': float(net_credits[i]),
+                        'days_added': days_added,
+                        'probability_profit': float(prob_profits[i]),
+                        'strike_reduction_pct': float(strike_reductions[i]) * 100
+                    }
 
             if best_combo:
                 evaluation.update({
@@ -670,27 +674,22 @@ class OptionRollEvaluator:
     def _calculate_prob_otm(self, spot: float, strike: float,
                            volatility: float, days: int) -> float:
         """Calculate probability option stays OTM"""
-        # Guard against invalid inputs
-        if days <= 0:
-            return 0 if spot <= strike else 1
+        return float(self._calculate_prob_otm_batch(spot, [strike], volatility, days)[0])
 
-        if spot <= 0 or strike <= 0:
-            return 0.5  # Neutral probability for invalid prices
+    def _calculate_prob_otm_batch(self, spot: float, strikes, volatility: float,
+                                  days: int) -> np.ndarray:
+        """Calculate probability each put strike stays OTM in one kernel call"""
+        strikes = np.asarray(strikes, dtype=float)
 
-        if volatility <= 0:
-            # Deterministic case: no volatility
-            return 0 if spot <= strike else 1
+        # Expired or zero-volatility rows resolve to 0/1 on current moneyness
+        prob_otm = bs_greeks(spot, strikes, days / 365, self.risk_free_rate,
+                             volatility, 'put')['prob_otm']
 
-        try:
-            time_to_exp = days / 365
-            d2 = (np.log(spot / strike) +
-                  (self.risk_free_rate - 0.5 * volatility**2) * time_to_exp) / \
-                 (volatility * np.sqrt(time_to_exp))
-
-            return float(norm.cdf(d2))
-        except (ValueError, ZeroDivisionError, FloatingPointError):
-            # Return neutral probability if calculation fails
-            return 0.5
+        if days > 0:
+            # Neutral probability for invalid prices
+            prob_otm = np.where((spot <= 0) | (strikes <= 0), 0.5, prob_otm)
+
+        return prob_otm
 
     def _analyze_covered_call_potential(self, symbol: str, cost_basis: float) -> Dict:
         """Analyze potential covered call income after assignment"""
@@ -4,10 +4,13 @@ Tries multiple APIs to get options data: Polygon, Tradier, Yahoo Finance
 
 import os
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 import logging
 
+from src.services.rate_limiter import get_rate_limiter
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -18,6 +21,22 @@ class OptionsDataFetcher:
     def __init__(self):
         self.polygon_key = os.getenv('POLYGON_API_KEY')
         self.tradier_key = os.getenv('TRADIER_API_KEY')  # If you have one
+        # Each provider draws from its own token budget (see services/config.py)
+        self.rate_limiter = get_rate_limiter()
+        self.rate_limit_timeout = 60  # Max seconds to wait for a provider token
+
+    def _acquire(self, provider: str, tokens: int = 1) -> bool:
+        """Wait for tokens from the provider's budget"""
+        if self.rate_limiter.wait_if_needed(provider, tokens, timeout=self.rate_limit_timeout):
+            return True
+        logger.debug(f"{provider} rate budget exhausted, skipping request")
+        return False
+
+    def _get(self, provider: str, url: str, **kwargs) -> Optional[requests.Response]:
+        """requests.get gated by the provider's token budget"""
+        if not self._acquire(provider):
+            return None
+        return requests.get(url, **kwargs)
 
     def fetch_options_polygon(self, symbol: str, target_dte: int = 45) -> Optional[Dict]:
         """Fetch options from Polygon.io"""
@@ -27,8 +46,10 @@ class OptionsDataFetcher:
         try:
             # Get current price first
             price_url = f"https://api.polygon.io/v2/aggs/ticker/{symbol}/prev"
-            price_resp = requests.get(price_url, params={'apiKey': self.polygon_key}, timeout=5)
+            price_resp = self._get('polygon', price_url, params={'apiKey': self.polygon_key}, timeout=5)
 
+            if price_resp is None:
+                return None
             if price_resp.status_code != 200:
                 logger.debug(f"Polygon price failed for {symbol}: {price_resp.status_code}")
                 return None
@@ -46,7 +67,8 @@ class OptionsDataFetcher:
             # Get options chain snapshot
             # Note: Options data might require paid plan - let's try
             options_url = f"https://api.polygon.io/v3/snapshot/options/{symbol}"
-            options_resp = requests.get(
+            options_resp = self._get(
+                'polygon',
                 options_url,
                 params={
                     'apiKey': self.polygon_key,
@@ -58,6 +80,9 @@ class OptionsDataFetcher:
                 timeout=10
             )
 
+            if options_resp is None:
+                return None
+
             if options_resp.status_code == 200:
                 data = options_resp.json()
                 if data.get('results'):
@@ -122,14 +147,15 @@ class OptionsDataFetcher:
                 'Accept': 'application/json'
             }
 
-            quote_resp = requests.get(
+            quote_resp = self._get(
+                'tradier',
                 quote_url,
                 params={'symbols': symbol},
                 headers=headers,
                 timeout=5
             )
 
-            if quote_resp.status_code != 200:
+            if quote_resp is None or quote_resp.status_code != 200:
                 return None
 
             quote_data = quote_resp.json()
@@ -142,14 +168,15 @@ class OptionsDataFetcher:
 
             # Get expirations
             exp_url = f"https://sandbox.tradier.com/v1/markets/options/expirations"
-            exp_resp = requests.get(
+            exp_resp = self._get(
+                'tradier',
                 exp_url,
                 params={'symbol': symbol},
                 headers=headers,
                 timeout=5
             )
 
-            if exp_resp.status_code != 200:
+            if exp_resp is None or exp_resp.status_code != 200:
                 return None
 
             expirations = exp_resp.json().get('expirations', {}).get('date', [])
@@ -165,7 +192,8 @@ class OptionsDataFetcher:
 
             # Get options chain for that expiration
             chain_url = "https://sandbox.tradier.com/v1/markets/options/chains"
-            chain_resp = requests.get(
+            chain_resp = self._get(
+                'tradier',
                 chain_url,
                 params={
                     'symbol': symbol,
@@ -176,7 +204,7 @@ class OptionsDataFetcher:
                 timeout=10
             )
 
-            if chain_resp.status_code != 200:
+            if chain_resp is None or chain_resp.status_code != 200:
                 return None
 
             chain_data = chain_resp.json()
@@ -238,11 +266,13 @@ class OptionsDataFetcher:
             import robin_stocks.robinhood as rh
 
             # Check if already logged in
-            if not rh.account.load_account_profile():
+            if not self._acquire('robinhood') or not rh.account.load_account_profile():
                 logger.debug("Not logged into Robinhood")
                 return None
 
             # Get current price
+            if not self._acquire('robinhood'):
+                return None
             quote = rh.stocks.get_stock_quote_by_symbol(symbol)
             if not quote:
                 return None
@@ -252,6 +282,8 @@ class OptionsDataFetcher:
                 return None
 
             # Get option chains
+            if not self._acquire('robinhood'):
+                return None
             chains = rh.options.get_chains(symbol)
             if not chains:
                 return None
@@ -268,13 +300,16 @@ class OptionsDataFetcher:
                 key=lambda x: abs((datetime.strptime(x, '%Y-%m-%d') - target_date).days)
             )
 
-            # Get put options for that expiration
+            # Get put instruments for that expiration (without per-strike market data)
             target_strike = current_price * 0.95
-            puts = rh.options.find_options_by_expiration(
+            if not self._acquire('robinhood'):
+                return None
+            puts = rh.options.find_tradable_options(
                 symbol,
                 closest_exp,
                 optionType='put'
             )
+            puts = [p for p in (puts or []) if p and p.get('expiration_date') == closest_exp]
 
             if not puts:
                 return None
@@ -282,7 +317,9 @@ class OptionsDataFetcher:
             # Find closest strike
             closest_put = min(puts, key=lambda x: abs(float(x.get('strike_price', 0)) - target_strike))
 
-            # Get market data for this option
+            # Get market data for this option (instrument lookup + market data)
+            if not self._acquire('robinhood', tokens=2):
+                return None
             option_data = rh.options.get_option_market_data_by_id(closest_put['id'])
 
             if not option_data:
@@ -350,6 +387,24 @@ class OptionsDataFetcher:
         logger.debug(f"No options data available for {symbol}")
         return None
 
+    def get_best_options_data_many(self, symbols: List[str], target_dte: int = 45,
+                                   max_workers: int = 8) -> Dict[str, Optional[Dict]]:
+        """
+        Fetch options data for many symbols concurrently
+
+        Symbols fan out over a thread pool; each provider call still waits on
+        that provider's token budget, so concurrency never exceeds its limit.
+
+        Returns:
+            Dict mapping symbol -> options data (None if no source had data)
+        """
+        if not symbols:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(symbols)))) as executor:
+            results = executor.map(lambda sym: self.get_best_options_data(sym, target_dte), symbols)
+            return dict(zip(symbols, results))
+
 
 if __name__ == "__main__":
     # Test the fetcher
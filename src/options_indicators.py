@@ -8,6 +8,8 @@ import pandas as pd
 from typing import Dict, Optional, List
 import logging
 
+from src.options_pricing import bs_greeks
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,14 +27,6 @@ class OptionsIndicators:
     - Volatility Skew analysis
     """
 
-    def __init__(self):
-        try:
-            import mibian
-            self.mibian = mibian
-        except ImportError:
-            logger.warning("mibian not installed. Greeks calculation will be limited.")
-            self.mibian = None
-
     def implied_volatility_rank(
         self,
         current_iv: float,
@@ -225,45 +219,12 @@ class OptionsIndicators:
         Returns:
             Dictionary with all Greeks and theoretical price
         """
-        if self.mibian is None:
-            return {
-                'error': 'mibian library not installed',
-                'delta': None,
-                'gamma': None,
-                'theta': None,
-                'vega': None,
-                'rho': None,
-                'price': None
-            }
-
         try:
-            # Convert IV to percentage for mibian
-            iv_pct = iv * 100
-
-            # Create Black-Scholes option
-            option = self.mibian.BS(
-                [spot, strike, rate * 100, dte],
-                volatility=iv_pct
-            )
-
-            if option_type.lower() == 'call':
-                greeks = {
-                    'delta': option.callDelta,
-                    'gamma': option.gamma,
-                    'theta': option.callTheta,
-                    'vega': option.vega,
-                    'rho': option.callRho,
-                    'price': option.callPrice
-                }
-            else:  # put
-                greeks = {
-                    'delta': option.putDelta,
-                    'gamma': option.gamma,
-                    'theta': option.putTheta,
-                    'vega': option.vega,
-                    'rho': option.putRho,
-                    'price': option.putPrice
-                }
+            greeks = {
+                key: float(value)
+                for key, value in bs_greeks(spot, strike, dte / 365, rate, iv, option_type.lower()).items()
+                if key != 'prob_otm'
+            }
 
             # Add interpretation
             greeks['delta_interpretation'] = self._interpret_delta(
@@ -288,6 +249,34 @@ class OptionsIndicators:
                 'price': None
             }
 
+    def calculate_chain_greeks(
+        self,
+        spot: float,
+        strikes,
+        rate: float,
+        dte,
+        ivs,
+        option_type='call'
+    ) -> pd.DataFrame:
+        """
+        Calculate Greeks for a whole option chain in one vectorized call
+
+        Args:
+            spot: Current stock price
+            strikes: Array of strike prices
+            rate: Risk-free interest rate (decimal)
+            dte: Days to expiration (scalar or per-strike array)
+            ivs: Implied volatilities (decimal, scalar or per-strike array)
+            option_type: 'call'/'put' (scalar or per-strike array)
+
+        Returns:
+            DataFrame with strike, price, delta, gamma, theta, vega, rho, prob_otm
+        """
+        strikes = np.asarray(strikes, dtype=float)
+        greeks = bs_greeks(spot, strikes, np.asarray(dte, dtype=float) / 365, rate, ivs, option_type)
+
+        return pd.DataFrame({'strike': np.broadcast_to(strikes, greeks['price'].shape), **greeks})
+
     def _interpret_delta(self, delta: float, option_type: str) -> str:
         """Interpret delta value"""
         abs_delta = abs(delta)
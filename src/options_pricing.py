@@ -0,0 +1,242 @@
+"""
+Vectorized Black-Scholes Pricing Kernel
+Prices and Greeks for whole option chains in one call, plus an implied volatility solver
+
+All functions take scalars or NumPy arrays for S, K, T, r, sigma (broadcast
+together) and return arrays. Units follow the usual broker conventions:
+- theta: value change per calendar day
+- vega: value change per 1 vol point (0.01 sigma)
+- rho: value change per 1% rate move
+- prob_otm: risk-neutral probability the option expires out of the money
+
+Rows with non-positive S, K, T or sigma are treated as expired/degenerate:
+price is intrinsic value, all Greeks are 0 and prob_otm is 1.0 when the
+option is currently OTM, else 0.0.
+"""
+
+import math
+from typing import Dict, Union
+
+import numpy as np
+from scipy.special import ndtr, ndtri
+
+ArrayLike = Union[float, np.ndarray, list]
+
+_INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+
+
+def _npdf(x: np.ndarray) -> np.ndarray:
+    """Standard normal density"""
+    return _INV_SQRT_2PI * np.exp(-0.5 * x * x)
+
+
+def _is_put(option_type, shape) -> np.ndarray:
+    """Boolean put mask from 'put'/'call' (scalar or array)"""
+    flags = np.char.lower(np.asarray(option_type, dtype=str)) == 'put'
+    return np.broadcast_to(flags, shape)
+
+
+def _prepare(S, K, T, r, sigma, option_type):
+    """Broadcast inputs to float arrays and build the validity mask"""
+    S, K, T, r, sigma = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (S, K, T, r, sigma))
+    )
+    put = _is_put(option_type, S.shape)
+    valid = (S > 0) & (K > 0) & (T > 0) & (sigma > 0)
+    return S, K, T, r, sigma, put, valid
+
+
+def bs_price(S: ArrayLike, K: ArrayLike, T: ArrayLike, r: ArrayLike, sigma: ArrayLike,
+             option_type='put') -> np.ndarray:
+    """
+    Black-Scholes option price
+
+    Args:
+        S: Current stock price
+        K: Strike price
+        T: Time to expiration (in years)
+        r: Risk-free rate
+        sigma: Implied volatility (as decimal)
+        option_type: 'call' or 'put' (scalar or per-row array)
+
+    Returns:
+        Array of option prices
+    """
+    S, K, T, r, sigma, put, valid = _prepare(S, K, T, r, sigma, option_type)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sqrt_t = np.sqrt(T)
+        d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * sqrt_t)
+        d2 = d1 - sigma * sqrt_t
+        disc_k = K * np.exp(-r * T)
+        call = S * ndtr(d1) - disc_k * ndtr(d2)
+        price = np.where(put, call - S + disc_k, call)
+
+    intrinsic = np.where(put, np.maximum(K - S, 0.0), np.maximum(S - K, 0.0))
+    return np.where(valid, price, intrinsic)
+
+
+def bs_greeks(S: ArrayLike, K: ArrayLike, T: ArrayLike, r: ArrayLike, sigma: ArrayLike,
+              option_type='put') -> Dict[str, np.ndarray]:
+    """
+    Black-Scholes price and Greeks for a whole chain
+
+    Args:
+        S: Current stock price
+        K: Strike price
+        T: Time to expiration (in years)
+        r: Risk-free rate
+        sigma: Implied volatility (as decimal)
+        option_type: 'call' or 'put' (scalar or per-row array)
+
+    Returns:
+        Dict of arrays: price, delta, gamma, theta, vega, rho, prob_otm
+    """
+    S, K, T, r, sigma, put, valid = _prepare(S, K, T, r, sigma, option_type)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        sqrt_t = np.sqrt(T)
+        sig_sqrt_t = sigma * sqrt_t
+        d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / sig_sqrt_t
+        d2 = d1 - sig_sqrt_t
+
+        nd1 = ndtr(d1)
+        nd2 = ndtr(d2)
+        pdf_d1 = _npdf(d1)
+        disc_k = K * np.exp(-r * T)
+
+        call_price = S * nd1 - disc_k * nd2
+        decay = -S * pdf_d1 * sigma / (2 * sqrt_t)
+
+        price = np.where(put, call_price - S + disc_k, call_price)
+        delta = np.where(put, nd1 - 1.0, nd1)
+        gamma = pdf_d1 / (S * sig_sqrt_t)
+        theta = np.where(put, decay + r * disc_k * (1.0 - nd2), decay - r * disc_k * nd2) / 365.0
+        vega = S * pdf_d1 * sqrt_t / 100.0
+        rho = np.where(put, -T * disc_k * (1.0 - nd2), T * disc_k * nd2) / 100.0
+        prob_otm = np.where(put, nd2, 1.0 - nd2)
+
+    intrinsic = np.where(put, np.maximum(K - S, 0.0), np.maximum(S - K, 0.0))
+    otm_now = np.where(put, S > K, S < K).astype(float)
+
+    return {
+        'price': np.where(valid, price, intrinsic),
+        'delta': np.where(valid, delta, 0.0),
+        'gamma': np.where(valid, gamma, 0.0),
+        'theta': np.where(valid, theta, 0.0),
+        'vega': np.where(valid, vega, 0.0),
+        'rho': np.where(valid, rho, 0.0),
+        'prob_otm': np.where(valid, prob_otm, otm_now),
+    }
+
+
+def bs_delta(S: ArrayLike, K: ArrayLike, T: ArrayLike, r: ArrayLike, sigma: ArrayLike,
+             option_type='put') -> np.ndarray:
+    """Black-Scholes delta only (0 for degenerate rows)"""
+    S, K, T, r, sigma, put, valid = _prepare(S, K, T, r, sigma, option_type)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
+        nd1 = ndtr(d1)
+
+    return np.where(valid, np.where(put, nd1 - 1.0, nd1), 0.0)
+
+
+def strike_for_delta(S: ArrayLike, T: ArrayLike, r: ArrayLike, sigma: ArrayLike,
+                     target_delta: ArrayLike, option_type='put') -> np.ndarray:
+    """
+    Invert Black-Scholes delta to the strike that has target_delta
+
+    Solves N(d1) = delta (call) or N(d1) - 1 = delta (put) for d1, then
+    K = S * exp((r + sigma^2 / 2) * T - d1 * sigma * sqrt(T)).
+
+    Args:
+        S: Current stock price
+        T: Time to expiration (in years)
+        r: Risk-free rate
+        sigma: Implied volatility (as decimal)
+        target_delta: Desired delta (negative for puts, e.g. -0.30)
+        option_type: 'call' or 'put' (scalar or per-row array)
+
+    Returns:
+        Array of (continuous) strikes; NaN where the target is unreachable
+    """
+    S, T, r, sigma, target_delta = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (S, T, r, sigma, target_delta))
+    )
+    put = _is_put(option_type, S.shape)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1 = ndtri(np.where(put, target_delta + 1.0, target_delta))
+        strike = S * np.exp((r + 0.5 * sigma ** 2) * T - d1 * sigma * np.sqrt(T))
+
+    valid = (S > 0) & (T > 0) & (sigma > 0) & np.isfinite(strike)
+    return np.where(valid, strike, np.nan)
+
+
+def implied_volatility(price: ArrayLike, S: ArrayLike, K: ArrayLike, T: ArrayLike, r: ArrayLike,
+                       option_type='put', tol: float = 1e-6, max_iter: int = 100,
+                       sigma_low: float = 1e-4, sigma_high: float = 5.0) -> np.ndarray:
+    """
+    Vectorized implied volatility solver
+
+    Newton-Raphson on every row at once, safeguarded by a per-row bisection
+    bracket so rows with tiny vega (deep ITM/OTM) still converge.
+
+    Args:
+        price: Observed option prices
+        S, K, T, r: As in bs_price
+        option_type: 'call' or 'put' (scalar or per-row array)
+        tol: Absolute price tolerance
+        max_iter: Maximum iterations
+        sigma_low, sigma_high: Initial volatility bracket
+
+    Returns:
+        Array of implied volatilities (NaN where price is outside no-arbitrage bounds)
+    """
+    price = np.asarray(price, dtype=float)
+    S, K, T, r, price = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (S, K, T, r, price))
+    )
+    put = _is_put(option_type, S.shape)
+
+    disc_k = K * np.exp(-r * T)
+    lower = np.where(put, np.maximum(disc_k - S, 0.0), np.maximum(S - disc_k, 0.0))
+    upper = np.where(put, disc_k, S)
+    solvable = (S > 0) & (K > 0) & (T > 0) & (price > lower) & (price < upper)
+
+    lo = np.full(S.shape, sigma_low)
+    hi = np.full(S.shape, sigma_high)
+
+    # Brenner-Subrahmanyam starting point, clipped into the bracket
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sigma = np.sqrt(2 * np.pi / T) * price / S
+    sigma = np.clip(np.nan_to_num(sigma, nan=0.3), sigma_low * 2, sigma_high / 2)
+
+    active = solvable.copy()
+    sqrt_t = np.sqrt(np.where(T > 0, T, 1.0))
+
+    for _ in range(max_iter):
+        if not active.any():
+            break
+
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * sqrt_t)
+            d2 = d1 - sigma * sqrt_t
+            call = S * ndtr(d1) - disc_k * ndtr(d2)
+            model = np.where(put, call - S + disc_k, call)
+            vega = S * _npdf(d1) * sqrt_t
+
+        diff = model - price
+        active &= np.abs(diff) > tol
+
+        # Tighten the bracket: price is increasing in sigma
+        hi = np.where(active & (diff > 0), sigma, hi)
+        lo = np.where(active & (diff <= 0), sigma, lo)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = sigma - diff / vega
+        use_newton = np.isfinite(newton) & (newton > lo) & (newton < hi)
+        sigma = np.where(active, np.where(use_newton, newton, 0.5 * (lo + hi)), sigma)
+
+    return np.where(solvable, sigma, np.nan)
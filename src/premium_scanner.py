@@ -1,11 +1,15 @@
 """Premium Scanner - Finds the best option premiums for wheel strategy"""
 
 import yfinance as yf
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
 
+# Option chain columns carried into the columnar scan
+CHAIN_COLUMNS = ('strike', 'bid', 'ask', 'volume', 'openInterest', 'impliedVolatility')
+
+
 class PremiumScanner:
     """Scans for the best option premiums"""
 
@@ -18,6 +22,9 @@ class PremiumScanner:
         """
         Scan symbols for best put premiums
 
+        Put chains for every symbol are fetched first and stacked into a
+        single frame, which is then scored column-wise in one pass.
+
         Args:
             symbols: List of stock symbols to scan
             max_price: Maximum stock price
@@ -28,108 +35,131 @@ class PremiumScanner:
             List of premium opportunities sorted by return
         """
 
-        opportunities = []
+        chains = []
 
         for symbol in symbols:
-            try:
-                # Get stock info
-                ticker = yf.Ticker(symbol)
-                info = ticker.info
+            chain = self._fetch_put_chain(symbol, max_price, dte)
+            if chain is not None:
+                chains.append(chain)
 
-                current_price = info.get('currentPrice') or info.get('regularMarketPrice', 0)
-
-                # Skip if price too high
-                if current_price > max_price or current_price <= 0:
-                    continue
-
-                # Get options chain
-                try:
-                    # Get available expiration dates
-                    expirations = ticker.options
-
-                    if not expirations:
-                        continue
-
-                    # Find closest expiration to target DTE
-                    target_date = datetime.now() + timedelta(days=dte)
-                    best_expiry = min(expirations,
-                                    key=lambda x: abs((datetime.strptime(x, '%Y-%m-%d') - target_date).days))
-
-                    # Get options chain for that date
-                    opt_chain = ticker.option_chain(best_expiry)
-                    puts = opt_chain.puts
-
-                    if puts.empty:
-                        continue
-
-                    # Find OTM puts (strike < current price)
-                    otm_puts = puts[puts['strike'] < current_price * 0.95]  # 5% OTM
-
-                    if otm_puts.empty:
-                        continue
-
-                    # Find best premium
-                    for _, put in otm_puts.iterrows():
-                        strike = put['strike']
-                        bid = put['bid']
-                        ask = put['ask']
-                        volume = put['volume'] or 0
-                        oi = put['openInterest'] or 0
-                        iv = put['impliedVolatility'] or 0
-
-                        # Skip if no liquidity
-                        if volume < self.min_volume and oi < self.min_oi:
-                            continue
-
-                        # Use mid price for premium
-                        premium = (bid + ask) / 2 if bid > 0 and ask > 0 else bid
-
-                        if premium <= 0:
-                            continue
-
-                        # Calculate returns
-                        premium_pct = (premium / strike) * 100
-
-                        # Skip if premium too low
-                        if premium_pct < min_premium_pct:
-                            continue
-
-                        # Calculate annualized return
-                        days_to_expiry = (datetime.strptime(best_expiry, '%Y-%m-%d') - datetime.now()).days
-                        if days_to_expiry <= 0:
-                            continue
-
-                        monthly_return = (premium_pct / days_to_expiry) * 30
-                        annual_return = monthly_return * 12
-
-                        opportunities.append({
-                            'symbol': symbol,
-                            'stock_price': round(current_price, 2),
-                            'strike': round(strike, 2),
-                            'expiration': best_expiry,
-                            'dte': days_to_expiry,
-                            'premium': round(premium * 100, 2),  # Premium for 1 contract
-                            'premium_pct': premium_pct,
-                            'monthly_return': monthly_return,
-                            'annual_return': annual_return,
-                            'iv': round(iv * 100, 1),
-                            'volume': int(volume),
-                            'open_interest': int(oi),
-                            'bid_ask_spread': round(ask - bid, 3) if ask > 0 and bid > 0 else 0
-                        })
-
-                except Exception as e:
-                    # Skip if options data not available
-                    continue
-
-            except Exception as e:
-                # Skip symbol if error
-                continue
+        if not chains:
+            return []
+
+        return self._score_chains(pd.concat(chains, ignore_index=True), min_premium_pct)
+
+    def _fetch_put_chain(self, symbol: str, max_price: float, dte: int) -> Optional[pd.DataFrame]:
+        """
+        Fetch the OTM puts for the expiration closest to the target DTE
+
+        Returns:
+            Put rows tagged with symbol, stock_price, expiration and dte,
+            or None if the symbol has no usable chain
+        """
+        try:
+            # Get stock info
+            ticker = yf.Ticker(symbol)
+            info = ticker.info
+
+            current_price = info.get('currentPrice') or info.get('regularMarketPrice', 0)
+
+            # Skip if price too high
+            if current_price > max_price or current_price <= 0:
+                return None
 
-        # Sort by monthly return (best first)
-        opportunities.sort(key=lambda x: x['monthly_return'], reverse=True)
+            # Get available expiration dates
+            expirations = ticker.options
 
-        return opportunities
+            if not expirations:
+                return None
+
+            # Find closest expiration to target DTE
+            now = datetime.now()
+            target_date = now + timedelta(days=dte)
+            expiry_dates = {x: datetime.strptime(x, '%Y-%m-%d') for x in expirations}
+            best_expiry = min(expirations, key=lambda x: abs((expiry_dates[x] - target_date).days))
+
+            # Get options chain for that date
+            puts = ticker.option_chain(best_expiry).puts
+
+            if puts.empty:
+                return None
+
+            # Find OTM puts (strike < current price)
+            otm_puts = puts[puts['strike'] < current_price * 0.95]  # 5% OTM
+
+            if otm_puts.empty:
+                return None
+
+            chain = otm_puts[list(CHAIN_COLUMNS)].copy()
+            chain['symbol'] = symbol
+            chain['stock_price'] = current_price
+            chain['expiration'] = best_expiry
+            chain['dte'] = (expiry_dates[best_expiry] - now).days
+            return chain
+
+        except Exception:
+            # Skip symbol if stock or options data not available
+            return None
+
+    def _score_chains(self, chains: pd.DataFrame, min_premium_pct: float) -> List[Dict]:
+        """
+        Score stacked put chains as vector operations
+
+        Args:
+            chains: Put rows with CHAIN_COLUMNS plus symbol, stock_price,
+                expiration and dte columns (see _fetch_put_chain)
+            min_premium_pct: Minimum premium as % of strike
+
+        Returns:
+            List of premium opportunities sorted by monthly return
+        """
+        strike = chains['strike'].to_numpy(dtype=float)
+        bid = chains['bid'].fillna(0).to_numpy(dtype=float)
+        ask = chains['ask'].fillna(0).to_numpy(dtype=float)
+        volume = chains['volume'].fillna(0).to_numpy(dtype=float)
+        oi = chains['openInterest'].fillna(0).to_numpy(dtype=float)
+        iv = chains['impliedVolatility'].fillna(0).to_numpy(dtype=float)
+        days = chains['dte'].to_numpy(dtype=float)
+
+        two_sided = (bid > 0) & (ask > 0)
+
+        # Use mid price for premium, falling back to bid on one-sided quotes
+        premium = np.where(two_sided, (bid + ask) / 2, bid)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            premium_pct = (premium / strike) * 100
+            monthly_return = (premium_pct / days) * 30
+
+        mask = (
+            ((volume >= self.min_volume) | (oi >= self.min_oi))
+            & (premium > 0)
+            & (premium_pct >= min_premium_pct)
+            & (days > 0)
+        )
+
+        if not mask.any():
+            return []
+
+        result = pd.DataFrame({
+            'symbol': chains['symbol'].to_numpy()[mask],
+            'stock_price': np.round(chains['stock_price'].to_numpy(dtype=float)[mask], 2),
+            'strike': np.round(strike[mask], 2),
+            'expiration': chains['expiration'].to_numpy()[mask],
+            'dte': days[mask].astype(int),
+            'premium': np.round(premium[mask] * 100, 2),  # Premium for 1 contract
+            'premium_pct': premium_pct[mask],
+            'monthly_return': monthly_return[mask],
+            'annual_return': monthly_return[mask] * 12,
+            'iv': np.round(iv[mask] * 100, 1),
+            'volume': volume[mask].astype(int),
+            'open_interest': oi[mask].astype(int),
+            'bid_ask_spread': np.where(two_sided, np.round(ask - bid, 3), 0.0)[mask]
+        })
+
+        # Sort by monthly return (best first), keeping scan order on ties
+        result = result.sort_values('monthly_return', ascending=False, kind='stable')
+
+        return result.to_dict('records')
 
     def scan_all_stocks_under(self, max_price: float) -> List[str]:
         """
@@ -200,4 +230,4 @@ class PremiumScanner:
             except:
                 continue
 
-        return candidates
\ No newline at end of file
+        return candidates
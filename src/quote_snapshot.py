@@ -0,0 +1,159 @@
+"""
+Quote Snapshot Service
+Latest prices for many symbols from one batched request, with a short TTL cache
+
+Scanners that only need the last trade price should use this instead of
+downloading a day of 1-minute history per symbol:
+
+    quotes = get_quote_snapshot_service()
+    prices = quotes.get_last_prices(['AAPL', 'MSFT', 'NVDA'])
+"""
+
+import time
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+import yfinance as yf
+
+logger = logging.getLogger(__name__)
+
+
+class QuoteSnapshotService:
+    """
+    Batched last-price lookups shared across scanners
+
+    Prices are cached per symbol for ttl seconds. Symbols missing from a
+    successful response are cached as None for the same period so they are
+    not re-requested on every scan; a failed or empty download caches nothing.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 30.0,
+        batch_size: int = 500,
+        downloader: Optional[Callable[..., pd.DataFrame]] = None
+    ):
+        """
+        Args:
+            ttl: Seconds a fetched price stays fresh
+            batch_size: Maximum symbols per download request
+            downloader: Replacement for yf.download (same signature)
+        """
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self._download = downloader or yf.download
+        self._cache: Dict[str, Tuple[Optional[float], float]] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    def get_last_prices(self, symbols: Iterable[str]) -> Dict[str, float]:
+        """
+        Latest price per symbol
+
+        Args:
+            symbols: Tickers to quote
+
+        Returns:
+            Dictionary of symbol -> last price (symbols without data are omitted)
+        """
+        symbols = list(dict.fromkeys(symbols))
+        now = time.monotonic()
+
+        prices: Dict[str, float] = {}
+        missing: List[str] = []
+        with self._lock:
+            for symbol in symbols:
+                cached = self._cache.get(symbol)
+                if cached is not None and now - cached[1] < self.ttl:
+                    if cached[0] is not None:
+                        prices[symbol] = cached[0]
+                else:
+                    missing.append(symbol)
+
+        for offset in range(0, len(missing), self.batch_size):
+            batch = missing[offset:offset + self.batch_size]
+            fetched = self._fetch(batch)
+            if fetched is None:
+                continue
+            fetched_at = time.monotonic()
+
+            with self._lock:
+                for symbol in batch:
+                    price = fetched.get(symbol)
+                    self._cache[symbol] = (price, fetched_at)
+                    if price is not None:
+                        prices[symbol] = price
+
+        return {symbol: prices[symbol] for symbol in symbols if symbol in prices}
+
+    def get_last_price(self, symbol: str) -> Optional[float]:
+        """Latest price for one symbol (None if unavailable)"""
+        return self.get_last_prices([symbol]).get(symbol)
+
+    def invalidate(self, symbols: Optional[Iterable[str]] = None):
+        """Drop cached prices for symbols (all symbols if None)"""
+        with self._lock:
+            if symbols is None:
+                self._cache.clear()
+            else:
+                for symbol in symbols:
+                    self._cache.pop(symbol, None)
+
+    def _fetch(self, symbols: List[str]) -> Optional[Dict[str, float]]:
+        """Last 1-minute close per symbol from one download request (None if the request failed)"""
+        self.requests += 1
+        try:
+            data = self._download(
+                symbols,
+                period='1d',
+                interval='1m',
+                group_by='ticker',
+                threads=True,
+                progress=False
+            )
+        except Exception as e:
+            logger.error(f"Quote batch of {len(symbols)} symbols failed: {e}")
+            return None
+
+        # yfinance reports a failed request as an empty frame
+        if data is None or data.empty:
+            logger.warning(f"Quote batch of {len(symbols)} symbols returned no data")
+            return None
+
+        prices = {}
+        grouped = isinstance(data.columns, pd.MultiIndex)
+        available = set(data.columns.get_level_values(0)) if grouped else set()
+
+        for symbol in symbols:
+            if grouped:
+                if symbol not in available:
+                    continue
+                closes = data[symbol]['Close']
+            elif len(symbols) == 1:
+                closes = data['Close']
+            else:
+                continue
+
+            closes = closes.dropna()
+            if not closes.empty:
+                prices[symbol] = float(closes.iloc[-1])
+
+        logger.debug(f"Quoted {len(prices)}/{len(symbols)} symbols in one request")
+        return prices
+
+
+# Singleton instance
+_quote_service: Optional[QuoteSnapshotService] = None
+_init_lock = threading.Lock()
+
+
+def get_quote_snapshot_service() -> QuoteSnapshotService:
+    """Get or create the shared quote snapshot service"""
+    global _quote_service
+    if _quote_service is None:
+        with _init_lock:
+            if _quote_service is None:
+                _quote_service = QuoteSnapshotService()
+    return _quote_service
@@ -0,0 +1,329 @@
+"""
+Magnus RAG System - BM25 Keyword Index
+======================================
+
+Incrementally built inverted index with Okapi BM25 scoring, used as the
+keyword retriever for hybrid search. Query cost is proportional to the
+posting lists of the query terms, not to the number of documents.
+
+Tokens keep ticker-style symbols intact: "$AAPL" -> "aapl", "BRK.B" -> "brk.b".
+
+Persistence is a JSON snapshot plus an append-only log of documents added
+since the snapshot, so adding a few documents does not rewrite the index.
+"""
+
+import os
+import re
+import json
+import math
+import logging
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.'&][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word/ticker tokens"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def reciprocal_rank_fusion(
+    rankings: List[List[str]],
+    weights: Optional[List[float]] = None,
+    k: int = 60
+) -> List[Tuple[str, float]]:
+    """
+    Fuse ranked id lists with (weighted) reciprocal-rank fusion
+
+    Args:
+        rankings: Ranked id lists, best first
+        weights: Weight per ranking (default: 1.0 each)
+        k: RRF rank constant
+
+    Returns:
+        (id, fused score) pairs, best first; ties keep first-seen order
+    """
+    weights = weights or [1.0] * len(rankings)
+    scores: Dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight / (k + rank)
+
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class BM25Index:
+    """
+    Inverted index with BM25 scoring
+
+    Documents are appended with add(); ids that are already indexed are
+    skipped, matching ChromaDB's add() semantics. flush() appends them to the
+    log next to the snapshot; save() writes a new snapshot and empties it.
+    """
+
+    FORMAT_VERSION = 1
+
+    # flush() compacts into a snapshot once the log holds this many documents
+    # (or half the index, if larger)
+    COMPACT_MIN_DOCUMENTS = 1000
+
+    def __init__(self, path: Optional[str] = None, k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            path: JSON file the index is loaded from and saved to (None = memory only)
+            k1: Term frequency saturation
+            b: Document length normalization
+        """
+        self.path = path
+        self.log_path = f"{path}.log" if path else None
+        self.k1 = k1
+        self.b = b
+
+        self._lock = threading.Lock()
+        self._doc_ids: List[str] = []
+        self._doc_index: Dict[str, int] = {}
+        self._doc_lengths: List[int] = []
+        self._lengths_array: Optional[np.ndarray] = None
+        self._total_length = 0
+        self._postings: Dict[str, Dict[int, int]] = {}
+
+        # Documents added since the last flush, and documents in the log
+        self._unlogged: List[Tuple[str, Dict[str, int]]] = []
+        self._logged = 0
+
+        if path and (os.path.exists(path) or os.path.exists(self.log_path)):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._doc_ids)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_index
+
+    def add(self, doc_ids: Iterable[str], texts: Iterable[str]) -> int:
+        """
+        Index documents
+
+        Args:
+            doc_ids: Document ids
+            texts: Document texts
+
+        Returns:
+            Number of newly indexed documents
+        """
+        added = 0
+        with self._lock:
+            for doc_id, text in zip(doc_ids, texts):
+                if doc_id in self._doc_index:
+                    continue
+
+                terms = dict(Counter(tokenize(text or '')))
+                self._add_terms(doc_id, terms)
+                if self.path:
+                    self._unlogged.append((doc_id, terms))
+                added += 1
+
+            if added:
+                self._lengths_array = None
+
+        return added
+
+    def _add_terms(self, doc_id: str, terms: Dict[str, int]):
+        # Caller holds the lock
+        doc = len(self._doc_ids)
+        self._doc_ids.append(doc_id)
+        self._doc_index[doc_id] = doc
+        length = sum(terms.values())
+        self._doc_lengths.append(length)
+        self._total_length += length
+
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[doc] = tf
+
+    @staticmethod
+    def _idf(df: int, n_docs: int) -> float:
+        return math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+    def reference_score(self, query: str) -> float:
+        """
+        Score of an average-length document containing each query term once
+
+        Dividing a search score by this gives a relevance that depends on the
+        query and corpus only, not on the other results.
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            n_docs = len(self._doc_ids)
+            if not terms or n_docs == 0:
+                return 0.0
+            # tf = 1 at average length scores exactly idf
+            return sum(self._idf(len(self._postings.get(term, ())), n_docs) for term in terms)
+
+    def search(self, query: str, n_results: int = 10) -> List[Tuple[str, float]]:
+        """
+        Top documents by BM25 score
+
+        Args:
+            query: Query text
+            n_results: Maximum results
+
+        Returns:
+            (doc id, score) pairs with score > 0, best first
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+
+        with self._lock:
+            n_docs = len(self._doc_ids)
+            if not terms or n_docs == 0:
+                return []
+
+            avg_length = self._total_length / n_docs or 1.0
+            if self._lengths_array is None:
+                self._lengths_array = np.asarray(self._doc_lengths, dtype=np.float64)
+            lengths = self._lengths_array
+            scores = np.zeros(n_docs)
+
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                docs = np.fromiter(postings.keys(), dtype=np.int64, count=len(postings))
+                tf = np.fromiter(postings.values(), dtype=np.float64, count=len(postings))
+
+                idf = self._idf(len(postings), n_docs)
+                norm = self.k1 * (1 - self.b + self.b * lengths[docs] / avg_length)
+                scores[docs] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+            matched = np.flatnonzero(scores > 0)
+            if len(matched) > n_results:
+                matched = matched[np.argpartition(-scores[matched], n_results - 1)[:n_results]]
+            matched = matched[np.lexsort((matched, -scores[matched]))]
+
+            return [(self._doc_ids[i], float(scores[i])) for i in matched]
+
+    def flush(self):
+        """
+        Append documents added since the last flush to the log
+
+        Compacts into a new snapshot with save() once the log grows past
+        COMPACT_MIN_DOCUMENTS or half the index.
+        """
+        if not self.log_path:
+            return
+
+        with self._lock:
+            pending, self._unlogged = self._unlogged, []
+            if pending:
+                os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+                with open(self.log_path, 'a') as f:
+                    f.writelines(
+                        json.dumps({'id': doc_id, 'terms': terms}, separators=(',', ':')) + '\n'
+                        for doc_id, terms in pending
+                    )
+                self._logged += len(pending)
+            compact = self._logged > max(self.COMPACT_MIN_DOCUMENTS, len(self._doc_ids) // 2)
+
+        if compact:
+            self.save()
+
+    def save(self, path: Optional[str] = None):
+        """Write the index atomically as a JSON snapshot and empty the log"""
+        path = path or self.path
+        if not path:
+            return
+
+        # The lock stays held until the log is emptied, so documents added
+        # while the snapshot is written are neither half-saved nor discarded
+        with self._lock:
+            data = {
+                'version': self.FORMAT_VERSION,
+                'k1': self.k1,
+                'b': self.b,
+                'doc_ids': list(self._doc_ids),
+                'doc_lengths': list(self._doc_lengths),
+                'postings': {
+                    term: [list(postings.keys()), list(postings.values())]
+                    for term, postings in self._postings.items()
+                },
+            }
+
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_path, path)
+
+            if path == self.path:
+                # The snapshot now covers every logged and unlogged document
+                self._unlogged = []
+                self._logged = 0
+                if os.path.exists(self.log_path):
+                    os.remove(self.log_path)
+
+    def load(self, path: Optional[str] = None):
+        """Replace the index contents with a saved index (snapshot, then its log)"""
+        path = path or self.path
+        self.clear()
+
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+
+            if data.get('version') != self.FORMAT_VERSION:
+                logger.warning(f"Ignoring BM25 index with unknown version at {path}")
+                return
+
+            with self._lock:
+                self.k1 = data['k1']
+                self.b = data['b']
+                self._doc_ids = data['doc_ids']
+                self._doc_index = {doc_id: i for i, doc_id in enumerate(self._doc_ids)}
+                self._doc_lengths = data['doc_lengths']
+                self._total_length = sum(self._doc_lengths)
+                self._postings = {
+                    term: dict(zip(docs, tfs)) for term, (docs, tfs) in data['postings'].items()
+                }
+
+        log_path = f"{path}.log"
+        if os.path.exists(log_path):
+            with self._lock, open(log_path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final line from an interrupted append
+                        continue
+                    if entry['id'] not in self._doc_index:
+                        self._add_terms(entry['id'], entry['terms'])
+                        if path == self.path:
+                            self._logged += 1
+
+        logger.info(f"Loaded BM25 index with {len(self._doc_ids)} documents from {path}")
+
+    def clear(self):
+        """Remove every document"""
+        with self._lock:
+            self._doc_ids = []
+            self._doc_index = {}
+            self._doc_lengths = []
+            self._lengths_array = None
+            self._total_length = 0
+            self._postings = {}
+            self._unlogged = []
+            self._logged = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Document and vocabulary counts"""
+        with self._lock:
+            n_docs = len(self._doc_ids)
+            return {
+                'documents': n_docs,
+                'terms': len(self._postings),
+                'avg_document_length': self._total_length / n_docs if n_docs else 0.0,
+            }
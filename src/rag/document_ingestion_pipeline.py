@@ -14,6 +14,8 @@ Features:
 - Daily XTrades message sync
 - Deduplication and versioning
 - Progress tracking and error handling
+- Streaming ingestion: reader threads -> batched embedding -> batched upsert,
+  connected by bounded queues
 
 Supported Sources:
 - Local files (PDF, TXT, MD, DOCX)
@@ -26,7 +28,10 @@ Created: 2025-11-21
 """
 
 import logging
-from typing import Dict, Any, Optional, List, Union, Iterator
+import queue
+import threading
+import time
+from typing import Dict, Any, Optional, List, Union, Iterator, Iterable, Callable
 from pathlib import Path
 from datetime import datetime, timedelta
 from enum import Enum
@@ -36,6 +41,9 @@ import os
 
 logger = logging.getLogger(__name__)
 
+# Queue sentinel that ends a pipeline stage
+_END = object()
+
 
 # ============================================================================
 # Document Types and Categories
@@ -255,34 +263,334 @@ class DocumentIngestionPipeline:
         Returns:
             Dict with batch ingestion results
         """
-        results = {
-            'total': len(documents),
-            'success': 0,
-            'skipped': 0,
-            'errors': 0,
-            'results': []
-        }
+        return self.ingest_stream(documents, category=category, source=source)
 
-        for doc in documents:
-            result = self.ingest_document(
-                content=doc['content'],
-                metadata=doc.get('metadata', {}),
-                category=category,
-                source=source
-            )
+    def ingest_stream(
+        self,
+        items: Iterable[Any],
+        category: DocumentCategory,
+        source: DocumentSource = DocumentSource.LOCAL_FILE,
+        load: Optional[Callable[[Any], Optional[Dict[str, Any]]]] = None,
+        skip_duplicates: bool = True,
+        reader_workers: int = 4,
+        dedup_batch_size: int = 256,
+        embed_batch_size: int = 256,
+        queue_size: int = 8,
+        progress_every: int = 1000,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Ingest documents through a streaming chunk -> embed -> upsert pipeline
+
+        Stages run concurrently and are connected by bounded queues, so an
+        arbitrarily long input is processed with flat memory:
+
+        - reader threads: load(item) -> document, doc id and chunks
+        - dedup/packer: checks whole batches of doc ids with one collection
+          lookup, then packs chunks from many documents into full
+          embedding batches
+        - embedder: one model call per embedding batch
+        - upserter: one collection upsert per embedding batch
 
-            results['results'].append(result)
+        Args:
+            items: Documents (dicts with 'content' and 'metadata'), or
+                anything load() turns into one
+            category: Document category
+            source: Document source
+            load: Turns an item into a document; None means items are
+                documents. Returning None drops the item.
+            skip_duplicates: Skip documents already in the collection
+            reader_workers: Threads running load() and chunking
+            dedup_batch_size: Documents per duplicate lookup
+            embed_batch_size: Chunks per embedding call and upsert
+            queue_size: Capacity of each inter-stage queue
+            progress_every: Log throughput every N finished documents
+            progress_callback: Called with the metrics at each progress log,
+                from whichever stage thread finished the document, outside
+                the pipeline lock; exceptions it raises are logged
+
+        Returns:
+            Dict with batch ingestion results and throughput metrics
+
+        Raises:
+            Exception: Whatever iterating items raised, after the documents
+                already read have been drained
+        """
+        collection = self._get_collection(category)
+        reader_workers = max(1, reader_workers)
+
+        item_queue = queue.Queue(maxsize=queue_size * reader_workers)
+        doc_queue = queue.Queue(maxsize=queue_size * dedup_batch_size)
+        embed_queue = queue.Queue(maxsize=queue_size)
+        upsert_queue = queue.Queue(maxsize=queue_size)
+
+        lock = threading.Lock()
+        results: Dict[int, Dict[str, Any]] = {}
+        remaining: Dict[int, int] = {}
+        failed: Dict[int, str] = {}
+        pending_docs: Dict[int, tuple] = {}
+        source_errors: List[Exception] = []
+        # Progress snapshots taken under the lock, reported after releasing it
+        due_progress: List[Dict[str, Any]] = []
+        metrics = {
+            'documents_read': 0,
+            'documents_finished': 0,
+            'chunks_upserted': 0,
+            'embedding_batches': 0,
+            'read_seconds': 0.0,
+            'dedup_seconds': 0.0,
+            'embed_seconds': 0.0,
+            'upsert_seconds': 0.0,
+        }
+        started = time.perf_counter()
+
+        def snapshot() -> Dict[str, Any]:
+            elapsed = time.perf_counter() - started
+            return {
+                **metrics,
+                'elapsed_seconds': elapsed,
+                'docs_per_second': metrics['documents_finished'] / elapsed if elapsed else 0.0,
+                'chunks_per_second': metrics['chunks_upserted'] / elapsed if elapsed else 0.0,
+            }
 
+        def finish(index: int, result: Dict[str, Any]):
+            # Caller holds the lock
+            results[index] = result
+            metrics['documents_finished'] += 1
             if result['status'] == 'success':
-                results['success'] += 1
+                self.stats['documents_processed'] += 1
             elif result['status'] == 'skipped':
-                results['skipped'] += 1
+                self.stats['duplicates_skipped'] += 1
             else:
-                results['errors'] += 1
+                self.stats['errors'] += 1
+
+            if progress_every and metrics['documents_finished'] % progress_every == 0:
+                due_progress.append(snapshot())
+
+        def report_progress():
+            # Caller must not hold the lock, so a slow callback stalls only its own stage
+            with lock:
+                due = due_progress[:]
+                due_progress.clear()
+
+            for progress in due:
+                logger.info(
+                    f"Ingested {progress['documents_finished']} documents "
+                    f"({progress['docs_per_second']:.1f} docs/s, "
+                    f"{progress['chunks_per_second']:.1f} chunks/s)"
+                )
+                if progress_callback:
+                    try:
+                        progress_callback(progress)
+                    except Exception as e:
+                        logger.error(f"Progress callback failed: {e}")
 
-        logger.info(f"Batch ingestion complete: {results['success']}/{results['total']} success")
+        def feed():
+            try:
+                for item in enumerate(items):
+                    item_queue.put(item)
+            except Exception as e:
+                logger.error(f"Document source failed: {e}")
+                source_errors.append(e)
+            finally:
+                for _ in range(reader_workers):
+                    item_queue.put(_END)
+
+        def read():
+            while True:
+                entry = item_queue.get()
+                if entry is _END:
+                    doc_queue.put(_END)
+                    return
+
+                index, item = entry
+                t0 = time.perf_counter()
+                try:
+                    doc = load(item) if load else item
+                    if doc is None:
+                        continue
+                    metadata = doc.get('metadata', {})
+                    doc_id = self._generate_doc_id(doc['content'], metadata)
+                    chunks = self._chunk_document(doc['content'])
+                except Exception as e:
+                    logger.error(f"Failed to read document: {e}")
+                    with lock:
+                        metrics['documents_read'] += 1
+                        finish(index, {'status': 'error', 'error': str(e)})
+                    report_progress()
+                    continue
+                finally:
+                    with lock:
+                        metrics['read_seconds'] += time.perf_counter() - t0
+
+                with lock:
+                    metrics['documents_read'] += 1
+                doc_queue.put((index, doc_id, chunks, metadata))
+
+        def embed():
+            while True:
+                batch = embed_queue.get()
+                if batch is _END:
+                    upsert_queue.put(_END)
+                    return
+
+                t0 = time.perf_counter()
+                try:
+                    embeddings = self._generate_embeddings([chunk for _, _, chunk, _ in batch])
+                except Exception as e:
+                    embeddings = e
+                with lock:
+                    metrics['embed_seconds'] += time.perf_counter() - t0
+                upsert_queue.put((batch, embeddings))
+
+        def upsert():
+            while True:
+                entry = upsert_queue.get()
+                if entry is _END:
+                    return
+
+                batch, embeddings = entry
+                t0 = time.perf_counter()
+                error = None
+                if isinstance(embeddings, Exception):
+                    error = embeddings
+                else:
+                    # Drop the rest of a document once one of its batches failed, so its
+                    # last chunk is never stored and the next run does not skip it
+                    with lock:
+                        keep = [i for i, (index, _, _, _) in enumerate(batch) if index not in failed]
+                    written = [batch[i] for i in keep]
+                    try:
+                        if written:
+                            collection.upsert(
+                                ids=[chunk_id for _, chunk_id, _, _ in written],
+                                embeddings=[embeddings[i] for i in keep],
+                                documents=[chunk for _, _, chunk, _ in written],
+                                metadatas=[meta for _, _, _, meta in written]
+                            )
+                    except Exception as e:
+                        error = e
+
+                with lock:
+                    metrics['upsert_seconds'] += time.perf_counter() - t0
+                    metrics['embedding_batches'] += 1
+                    if error is None:
+                        metrics['chunks_upserted'] += len(written)
+                        self.stats['chunks_created'] += len(written)
+                        self.stats['embeddings_generated'] += len(written)
+                    else:
+                        logger.error(f"Failed to ingest batch of {len(batch)} chunks: {error}")
+
+                    for index, _, _, _ in batch:
+                        if error is not None:
+                            failed.setdefault(index, str(error))
+                        remaining[index] -= 1
+                        if remaining[index]:
+                            continue
+
+                        del remaining[index]
+                        doc_id, n_chunks = pending_docs.pop(index)
+                        if index in failed:
+                            finish(index, {'status': 'error', 'error': failed.pop(index), 'doc_id': doc_id})
+                        else:
+                            finish(index, {
+                                'status': 'success',
+                                'doc_id': doc_id,
+                                'chunks_created': n_chunks,
+                                'category': category.value
+                            })
+                report_progress()
+
+        threads = [threading.Thread(target=feed, daemon=True)]
+        threads += [threading.Thread(target=read, daemon=True) for _ in range(reader_workers)]
+        threads += [threading.Thread(target=embed, daemon=True), threading.Thread(target=upsert, daemon=True)]
+        for thread in threads:
+            thread.start()
+
+        # Dedup and pack in this thread
+        seen = set()
+        packed = []
+
+        def flush_docs(docs: List[tuple]):
+            t0 = time.perf_counter()
+            existing = self._existing_doc_ids(collection, docs) if skip_duplicates else set()
+            with lock:
+                metrics['dedup_seconds'] += time.perf_counter() - t0
+
+            ingestion_date = datetime.now().isoformat()
+            for index, doc_id, chunks, metadata in docs:
+                if doc_id in existing or doc_id in seen:
+                    with lock:
+                        finish(index, {'status': 'skipped', 'reason': 'duplicate', 'doc_id': doc_id})
+                    report_progress()
+                    continue
+                if not chunks:
+                    with lock:
+                        finish(index, {'status': 'skipped', 'reason': 'empty', 'doc_id': doc_id})
+                    report_progress()
+                    continue
+
+                seen.add(doc_id)
+                with lock:
+                    remaining[index] = len(chunks)
+                    pending_docs[index] = (doc_id, len(chunks))
+                for i, chunk in enumerate(chunks):
+                    packed.append((index, f"{doc_id}_chunk_{i}", chunk, {
+                        **metadata,
+                        'doc_id': doc_id,
+                        'chunk_index': i,
+                        'total_chunks': len(chunks),
+                        'category': category.value,
+                        'source': source.value,
+                        'ingestion_date': ingestion_date,
+                        'chunk_size': len(chunk)
+                    }))
+                    if len(packed) >= embed_batch_size:
+                        embed_queue.put(packed[:])
+                        packed.clear()
 
-        return results
+        try:
+            docs = []
+            readers_done = 0
+            while readers_done < reader_workers:
+                entry = doc_queue.get()
+                if entry is _END:
+                    readers_done += 1
+                    continue
+                docs.append(entry)
+                if len(docs) >= dedup_batch_size:
+                    flush_docs(docs)
+                    docs = []
+
+            flush_docs(docs)
+            if packed:
+                embed_queue.put(packed[:])
+        finally:
+            embed_queue.put(_END)
+
+        for thread in threads:
+            thread.join()
+
+        if source_errors:
+            raise source_errors[0]
+
+        ordered = [results[index] for index in sorted(results)]
+        summary = {
+            'total': len(ordered),
+            'success': sum(1 for r in ordered if r['status'] == 'success'),
+            'skipped': sum(1 for r in ordered if r['status'] == 'skipped'),
+            'errors': sum(1 for r in ordered if r['status'] == 'error'),
+            'results': ordered,
+            'metrics': snapshot()
+        }
+
+        logger.info(
+            f"Batch ingestion complete: {summary['success']}/{summary['total']} success "
+            f"({summary['metrics']['docs_per_second']:.1f} docs/s, "
+            f"{summary['metrics']['chunks_per_second']:.1f} chunks/s)"
+        )
+
+        return summary
 
     def ingest_from_database(
         self,
@@ -290,38 +598,74 @@ class DocumentIngestionPipeline:
         query: str,
         category: DocumentCategory,
         text_column: str = 'content',
-        metadata_columns: Optional[List[str]] = None
+        metadata_columns: Optional[List[str]] = None,
+        skip_duplicates: bool = True,
+        fetch_size: int = 2000
     ) -> Dict[str, Any]:
         """
         Ingest documents from PostgreSQL database
 
+        Rows are streamed through a server-side cursor straight into
+        ingest_stream(), so the result set is never held in memory.
+
         Args:
             table: Database table name
             query: SQL query to fetch documents
             category: Document category
             text_column: Column containing text content
             metadata_columns: Columns to include as metadata
+            skip_duplicates: Skip documents already in the collection
+            fetch_size: Rows per round trip
 
         Returns:
             Dict with ingestion results
         """
         try:
-            from src.database.connection_pool import get_connection
-
-            documents = []
+            return self.ingest_stream(
+                self._iter_database_documents(table, query, text_column, metadata_columns, fetch_size),
+                category=category,
+                source=DocumentSource.DATABASE,
+                skip_duplicates=skip_duplicates
+            )
 
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query)
+        except Exception as e:
+            logger.error(f"Database ingestion failed: {e}")
+            return {
+                'status': 'error',
+                'error': str(e)
+            }
 
-                columns = [desc[0] for desc in cursor.description]
-                rows = cursor.fetchall()
+    def _iter_database_documents(
+        self,
+        table: str,
+        query: str,
+        text_column: str,
+        metadata_columns: Optional[List[str]],
+        fetch_size: int
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield documents for the rows of query"""
+        from src.database.connection_pool import get_db_connection
+
+        fetched = 0
+        with get_db_connection() as conn:
+            cursor = conn.cursor(name=f"ingest_{table}")
+            cursor.itersize = fetch_size
+            cursor.execute(query)
+
+            columns = None
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                # Named cursors only have a description after the first fetch
+                columns = columns or [desc[0] for desc in cursor.description]
+                fetched += len(rows)
 
                 for row in rows:
                     row_dict = dict(zip(columns, row))
 
                     # Extract content
-                    content = str(row_dict.get(text_column, ''))
+                    content = str(row_dict.get(text_column) or '')
 
                     if not content:
                         continue
@@ -341,26 +685,14 @@ class DocumentIngestionPipeline:
                                     value = value.isoformat()
                                 metadata[col] = value
 
-                    documents.append({
+                    yield {
                         'content': content,
                         'metadata': metadata
-                    })
+                    }
 
-            logger.info(f"Fetched {len(documents)} documents from {table}")
+            cursor.close()
 
-            # Ingest batch
-            return self.ingest_batch(
-                documents=documents,
-                category=category,
-                source=DocumentSource.DATABASE
-            )
-
-        except Exception as e:
-            logger.error(f"Database ingestion failed: {e}")
-            return {
-                'status': 'error',
-                'error': str(e)
-            }
+        logger.info(f"Fetched {fetched} rows from {table}")
 
     def ingest_xtrades_messages(
         self,
@@ -401,11 +733,6 @@ class DocumentIngestionPipeline:
         ORDER BY timestamp DESC
         """
 
-        # Temporarily disable duplicate check if force reload
-        original_check = self._is_duplicate
-        if force_reload:
-            self._is_duplicate = lambda *args: False
-
         result = self.ingest_from_database(
             table='discord_messages',
             query=query,
@@ -415,13 +742,10 @@ class DocumentIngestionPipeline:
                 'timestamp', 'channel_name', 'author_name', 'ticker',
                 'alert_type', 'entry_price', 'target_price', 'stop_loss',
                 'confidence_score'
-            ]
+            ],
+            skip_duplicates=not force_reload
         )
 
-        # Restore duplicate check
-        if force_reload:
-            self._is_duplicate = original_check
-
         logger.info(f"XTrades ingestion complete: {result.get('success', 0)} messages added")
 
         return result
@@ -506,33 +830,35 @@ class DocumentIngestionPipeline:
 
         logger.info(f"Found {len(files)} files in {directory}")
 
-        # Read and ingest files
-        documents = []
-        for file_path in files:
-            try:
-                content = self._read_file(file_path)
+        # Reader threads parse files while earlier ones are embedded
+        return self.ingest_stream(
+            files,
+            category=category,
+            source=DocumentSource.LOCAL_FILE,
+            load=self._load_file_document
+        )
 
-                if content:
-                    documents.append({
-                        'content': content,
-                        'metadata': {
-                            'filename': file_path.name,
-                            'file_path': str(file_path),
-                            'file_size': file_path.stat().st_size,
-                            'modified_date': datetime.fromtimestamp(
-                                file_path.stat().st_mtime
-                            ).isoformat()
-                        }
-                    })
+    def _load_file_document(self, file_path: Path) -> Optional[Dict[str, Any]]:
+        """Read a file into a document (None if unreadable or empty)"""
+        try:
+            content = self._read_file(file_path)
 
-            except Exception as e:
-                logger.error(f"Failed to read {file_path}: {e}")
+            if content:
+                stat = file_path.stat()
+                return {
+                    'content': content,
+                    'metadata': {
+                        'filename': file_path.name,
+                        'file_path': str(file_path),
+                        'file_size': stat.st_size,
+                        'modified_date': datetime.fromtimestamp(stat.st_mtime).isoformat()
+                    }
+                }
 
-        return self.ingest_batch(
-            documents=documents,
-            category=category,
-            source=DocumentSource.LOCAL_FILE
-        )
+        except Exception as e:
+            logger.error(f"Failed to read {file_path}: {e}")
+
+        return None
 
     # ========================================================================
     # Helper Methods
@@ -567,6 +893,28 @@ class DocumentIngestionPipeline:
             logger.warning(f"Duplicate check failed: {e}")
             return False
 
+    def _existing_doc_ids(self, collection, docs: List[tuple]) -> set:
+        """
+        Doc ids of a batch that are already fully stored, in one lookup
+
+        Chunks are upserted in order, so a document is complete once its
+        last chunk id exists.
+        """
+        last_chunk_ids = {
+            f"{doc_id}_chunk_{len(chunks) - 1}": doc_id
+            for _, doc_id, chunks, _ in docs if chunks
+        }
+        if not last_chunk_ids:
+            return set()
+
+        try:
+            found = collection.get(ids=list(last_chunk_ids), include=[])
+            return {last_chunk_ids[chunk_id] for chunk_id in found['ids']}
+
+        except Exception as e:
+            logger.warning(f"Duplicate check failed: {e}")
+            return set()
+
     def _chunk_document(self, content: str) -> List[str]:
         """Split document into chunks with overlap"""
         chunks = []
@@ -596,22 +944,18 @@ class DocumentIngestionPipeline:
         """Generate embeddings for chunks"""
         if self.embedder:
             # Use Sentence Transformers
-            embeddings = self.embedder.encode(chunks, show_progress_bar=False)
+            embeddings = self.embedder.encode(chunks, batch_size=64, show_progress_bar=False)
             return embeddings.tolist()
         else:
             # Fallback to OpenAI
             import openai
             client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 
-            embeddings = []
-            for chunk in chunks:
-                response = client.embeddings.create(
-                    model="text-embedding-3-small",
-                    input=chunk
-                )
-                embeddings.append(response.data[0].embedding)
-
-            return embeddings
+            response = client.embeddings.create(
+                model="text-embedding-3-small",
+                input=chunks
+            )
+            return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
 
     def _get_collection(self, category: DocumentCategory):
         """Get or create ChromaDB collection for category"""
@@ -701,7 +1045,13 @@ def ingest_all_xtrades_history(days: int = 90):
         force_reload=False
     )
 
-    logger.info(f"Historical XTrades ingestion: {result}")
+    metrics = result.get('metrics', {})
+    logger.info(
+        f"Historical XTrades ingestion: {result.get('success', 0)} added, "
+        f"{result.get('skipped', 0)} skipped, {result.get('errors', 0)} errors in "
+        f"{metrics.get('elapsed_seconds', 0):.1f}s ({metrics.get('docs_per_second', 0):.1f} docs/s, "
+        f"{metrics.get('chunks_per_second', 0):.1f} chunks/s)"
+    )
 
     return result
 
@@ -0,0 +1,338 @@
+"""
+Magnus RAG System - Memory-Mapped Embedding Cache
+=================================================
+
+Persistent embedding cache backed by two files in the cache directory:
+- vectors.f32: float32 matrix (rows x dimension), memory-mapped
+- index.sqlite: 16-byte key hash -> row, with an LRU access counter, the
+  free-row list and the matrix capacity
+
+Lookups are batched (one SQLite query per 500 keys, one fancy-index read of
+the matrix), so a cache hit never unpickles anything. When the cache is full
+the least recently used entries are evicted and their rows are reused by
+later inserts, keeping the matrix at most max_entries rows.
+
+Row allocation state lives in SQLite and every read or write runs inside a
+BEGIN IMMEDIATE transaction, so several processes can share one cache_dir
+without handing out the same row twice.
+"""
+
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class MmapEmbeddingCache:
+    """
+    Embedding vectors in a memory-mapped float32 matrix with a SQLite index
+
+    Keys are 16-byte digests (e.g. hashlib.md5(...).digest()).
+    """
+
+    VECTORS_FILE = "vectors.f32"
+    INDEX_FILE = "index.sqlite"
+
+    # SQLite host parameter limit is 999 on older builds
+    QUERY_CHUNK = 500
+
+    def __init__(
+        self,
+        cache_dir: str,
+        dimension: int,
+        max_entries: int = 500_000,
+        initial_capacity: int = 1024
+    ):
+        """
+        Open (or create) a cache
+
+        Args:
+            cache_dir: Directory holding the matrix and index files
+            dimension: Embedding dimension; a cache built for another
+                dimension is discarded
+            max_entries: Entries kept before LRU eviction
+            initial_capacity: Rows allocated when the matrix is created
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.dimension = int(dimension)
+        self.max_entries = int(max_entries)
+        self.initial_capacity = max(1, int(initial_capacity))
+
+        self._lock = threading.Lock()
+        self._vectors_path = self.cache_dir / self.VECTORS_FILE
+        # Autocommit mode: transactions are opened explicitly by _transaction()
+        self._db = sqlite3.connect(str(self.cache_dir / self.INDEX_FILE), check_same_thread=False,
+                                   timeout=30.0, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER);
+            CREATE TABLE IF NOT EXISTS entries (
+                key BLOB PRIMARY KEY,
+                row INTEGER NOT NULL,
+                tick INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_tick ON entries (tick);
+            CREATE TABLE IF NOT EXISTS free_rows (row INTEGER PRIMARY KEY);
+        """)
+
+        # This process's mapping of the matrix; _sync_matrix() remaps it when
+        # another process grows or resets the file
+        self._capacity = 0
+        self._generation = None
+        self._matrix = None
+
+        with self._lock, self._transaction():
+            if self._meta("dimension") not in (None, self.dimension):
+                logger.info("Embedding dimension changed - resetting cache")
+                self._reset()
+            self._set_meta("dimension", self.dimension)
+            self._sync_matrix()
+
+    # =========================================================================
+    # PUBLIC API
+    # =========================================================================
+
+    def get_many(self, keys: List[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Batch lookup
+
+        Args:
+            keys: Key digests
+
+        Returns:
+            (vectors, found) - vectors is (len(keys), dimension) float32 with
+            zero rows where found is False
+        """
+        vectors = np.zeros((len(keys), self.dimension), dtype=np.float32)
+        found = np.zeros(len(keys), dtype=bool)
+        if not keys:
+            return vectors, found
+
+        # The transaction keeps another process from reusing a row between
+        # the index lookup and the matrix read
+        with self._lock, self._transaction():
+            self._sync_matrix()
+            rows = self._lookup_rows(keys)
+            if not rows:
+                return vectors, found
+
+            positions = [i for i, key in enumerate(keys) if key in rows]
+            row_ids = np.fromiter((rows[keys[i]] for i in positions), dtype=np.int64, count=len(positions))
+            vectors[positions] = self._matrix[row_ids]
+            found[positions] = True
+
+            # One LRU touch for the whole batch
+            tick = self._next_tick()
+            self._db.executemany(
+                "UPDATE entries SET tick = ? WHERE key = ?",
+                [(tick, key) for key in rows]
+            )
+
+        return vectors, found
+
+    def get(self, key: bytes):
+        """Single lookup; returns the vector or None"""
+        vectors, found = self.get_many([key])
+        return vectors[0] if found[0] else None
+
+    def put_many(self, keys: List[bytes], vectors: np.ndarray):
+        """
+        Insert or overwrite vectors
+
+        Args:
+            keys: Key digests
+            vectors: (len(keys), dimension) array
+        """
+        if not keys:
+            return
+
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(keys), self.dimension)
+
+        # Last write wins for duplicate keys within the batch
+        latest = {key: i for i, key in enumerate(keys)}
+        keys = list(latest)
+        vectors = vectors[list(latest.values())]
+
+        with self._lock, self._transaction():
+            self._sync_matrix()
+            existing = self._lookup_rows(keys)
+            # A batch larger than the cache keeps only its last max_entries keys
+            new_keys = [key for key in keys if key not in existing][-self.max_entries:]
+
+            # Evict before allocating so freed rows are reused
+            overflow = self._count() + len(new_keys) - self.max_entries
+            if overflow > 0:
+                self._evict(overflow, keep=set(existing))
+
+            rows = dict(existing)
+            rows.update(zip(new_keys, self._allocate_rows(len(new_keys))))
+
+            kept = [i for i, key in enumerate(keys) if key in rows]
+            row_ids = np.fromiter((rows[keys[i]] for i in kept), dtype=np.int64, count=len(kept))
+            self._matrix[row_ids] = vectors[kept]
+
+            tick = self._next_tick()
+            self._db.executemany(
+                "INSERT OR REPLACE INTO entries (key, row, tick) VALUES (?, ?, ?)",
+                [(keys[i], rows[keys[i]], tick) for i in kept]
+            )
+
+    def put(self, key: bytes, vector: np.ndarray):
+        """Insert or overwrite one vector"""
+        self.put_many([key], np.asarray(vector)[None, :])
+
+    def clear(self):
+        """Remove every entry and shrink the matrix file"""
+        with self._lock, self._transaction():
+            self._reset()
+            self._set_meta("dimension", self.dimension)
+            self._sync_matrix()
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry counts and bytes on disk"""
+        with self._lock:
+            disk = sum(
+                path.stat().st_size
+                for path in self.cache_dir.glob("*")
+                if path.name.startswith((self.VECTORS_FILE, self.INDEX_FILE))
+            )
+            return {
+                "entries": self._count(),
+                "max_entries": self.max_entries,
+                "capacity_rows": self._capacity,
+                "dimension": self.dimension,
+                "bytes_on_disk": disk,
+            }
+
+    def close(self):
+        """Flush the matrix and close the index"""
+        with self._lock:
+            if isinstance(self._matrix, np.memmap):
+                self._matrix.flush()
+            self._matrix = None
+            self._db.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count()
+
+    # =========================================================================
+    # INTERNALS (caller holds the lock)
+    # =========================================================================
+
+    @contextmanager
+    def _transaction(self):
+        """
+        BEGIN IMMEDIATE takes SQLite's write lock up front, serializing row
+        allocation and matrix access across processes sharing cache_dir
+        """
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def _sync_matrix(self):
+        """Remap the matrix if another process grew or reset it since our last transaction"""
+        generation = self._meta("generation") or 0
+        capacity = self._meta("capacity") or 0
+        if self._matrix is None or generation != self._generation or capacity > self._capacity:
+            self._generation = generation
+            self._open_matrix(capacity)
+
+    def _count(self) -> int:
+        """Rows below next_row are either in use or on the free list"""
+        free = self._db.execute("SELECT COUNT(*) FROM free_rows").fetchone()[0]
+        return (self._meta("next_row") or 0) - free
+
+    def _next_tick(self) -> int:
+        return self._db.execute("SELECT COALESCE(MAX(tick), 0) + 1 FROM entries").fetchone()[0]
+
+    def _lookup_rows(self, keys: Iterable[bytes]) -> Dict[bytes, int]:
+        keys = list(dict.fromkeys(keys))
+        rows = {}
+        for offset in range(0, len(keys), self.QUERY_CHUNK):
+            chunk = keys[offset:offset + self.QUERY_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows.update(self._db.execute(
+                f"SELECT key, row FROM entries WHERE key IN ({placeholders})", chunk
+            ))
+        return rows
+
+    def _evict(self, count: int, keep: set):
+        victims = [
+            (key, row) for key, row in self._db.execute(
+                "SELECT key, row FROM entries ORDER BY tick LIMIT ?", (count + len(keep),)
+            ) if key not in keep
+        ][:count]
+        self._db.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key, _ in victims])
+        self._db.executemany("INSERT INTO free_rows (row) VALUES (?)", [(row,) for _, row in victims])
+
+    def _allocate_rows(self, count: int) -> List[int]:
+        """Reuse free rows first, then extend the matrix (doubling its capacity)"""
+        rows = [r for (r,) in self._db.execute("SELECT row FROM free_rows ORDER BY row LIMIT ?", (count,))]
+        self._db.executemany("DELETE FROM free_rows WHERE row = ?", [(row,) for row in rows])
+
+        fresh = count - len(rows)
+        if fresh:
+            next_row = self._meta("next_row") or 0
+            rows.extend(range(next_row, next_row + fresh))
+            self._set_meta("next_row", next_row + fresh)
+            if next_row + fresh > self._capacity:
+                capacity = max(self.initial_capacity, self._capacity)
+                while capacity < next_row + fresh:
+                    capacity *= 2
+                self._open_matrix(capacity)
+        return rows
+
+    def _open_matrix(self, capacity: int):
+        """Map the matrix file, growing it to capacity rows if needed"""
+        if isinstance(self._matrix, np.memmap):
+            self._matrix.flush()
+        self._matrix = None
+
+        row_bytes = self.dimension * np.dtype(np.float32).itemsize
+        size = self._vectors_path.stat().st_size if self._vectors_path.exists() else 0
+        capacity = max(capacity, size // row_bytes)
+
+        if capacity == 0:
+            self._vectors_path.touch()
+            self._capacity = 0
+            self._matrix = np.zeros((0, self.dimension), dtype=np.float32)
+        else:
+            if size < capacity * row_bytes:
+                with open(self._vectors_path, "ab") as f:
+                    f.truncate(capacity * row_bytes)
+            self._capacity = capacity
+            self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r+",
+                                     shape=(capacity, self.dimension))
+
+        self._set_meta("capacity", self._capacity)
+
+    def _reset(self):
+        # A new generation tells other processes to drop their mapping of the old file
+        generation = (self._meta("generation") or 0) + 1
+        self._db.execute("DELETE FROM entries")
+        self._db.execute("DELETE FROM free_rows")
+        self._db.execute("DELETE FROM meta")
+        self._set_meta("generation", generation)
+        self._matrix = None
+        if self._vectors_path.exists():
+            self._vectors_path.unlink()
+
+    def _meta(self, name: str):
+        row = self._db.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, name: str, value: int):
+        self._db.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, int(value)))
@@ -11,13 +11,14 @@ Created: 2025-11-20
 
 import logging
 import hashlib
-import pickle
 from typing import List, Dict, Any, Optional, Union
 from pathlib import Path
 import numpy as np
 from sentence_transformers import SentenceTransformer
 import torch
 
+from src.rag.embedding_cache import MmapEmbeddingCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,7 +28,7 @@ class EmbeddingsManager:
 
     Features:
     - Efficient batch processing
-    - Automatic caching to disk
+    - Memory-mapped disk cache with batch lookup and LRU eviction
     - GPU acceleration when available
     - Multiple model support
     - Normalization and optimization
@@ -46,7 +47,8 @@ class EmbeddingsManager:
         cache_dir: str = "c:/code/Magnus/data/embeddings_cache",
         device: Optional[str] = None,
         batch_size: int = 32,
-        enable_cache: bool = True
+        enable_cache: bool = True,
+        cache_max_entries: int = 500_000
     ):
         """
         Initialize embeddings manager
@@ -57,16 +59,14 @@ class EmbeddingsManager:
             device: Device to use ('cuda', 'cpu', or None for auto)
             batch_size: Batch size for encoding
             enable_cache: Enable disk caching
+            cache_max_entries: Cached embeddings kept before LRU eviction
         """
         # Resolve model name
         self.model_name = self.MODELS.get(model_name, model_name)
         self.cache_dir = Path(cache_dir)
         self.batch_size = batch_size
         self.enable_cache = enable_cache
-
-        # Create cache directory
-        if self.enable_cache:
-            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.cache_max_entries = cache_max_entries
 
         # Determine device
         if device is None:
@@ -87,6 +87,14 @@ class EmbeddingsManager:
             logger.error(f"Error loading model: {e}")
             raise
 
+        self._cache = None
+        if self.enable_cache:
+            self._cache = MmapEmbeddingCache(
+                str(self.cache_dir),
+                dimension=self.embedding_dimension,
+                max_entries=cache_max_entries
+            )
+
         # Cache statistics
         self._cache_stats = {
             "hits": 0,
@@ -113,7 +121,7 @@ class EmbeddingsManager:
         """
         # Check cache first
         if self.enable_cache:
-            cache_key = self._get_cache_key(text)
+            cache_key = self._get_cache_key(text, normalize)
             cached = self._load_from_cache(cache_key)
             if cached is not None:
                 self._cache_stats["hits"] += 1
@@ -163,60 +171,65 @@ class EmbeddingsManager:
         if not texts:
             return np.array([])
 
-        # Check cache for each text
-        embeddings = []
-        texts_to_encode = []
-        cache_keys = []
+        n = len(texts)
+        self._cache_stats["total_requests"] += n
 
-        for text in texts:
-            if self.enable_cache:
-                cache_key = self._get_cache_key(text)
-                cached = self._load_from_cache(cache_key)
-                if cached is not None:
-                    embeddings.append(cached)
-                    self._cache_stats["hits"] += 1
-                    self._cache_stats["total_requests"] += 1
-                    continue
-
-            texts_to_encode.append(text)
-            cache_keys.append(cache_key if self.enable_cache else None)
-            embeddings.append(None)
-            self._cache_stats["misses"] += 1
-            self._cache_stats["total_requests"] += 1
+        if not self.enable_cache:
+            self._cache_stats["misses"] += n
+            return self._encode_texts(list(texts), normalize, show_progress)
 
-        # Encode remaining texts
-        if texts_to_encode:
+        # One batched cache lookup for every text
+        cache_keys = [self._get_cache_key(text, normalize) for text in texts]
+        try:
+            embeddings, found = self._cache.get_many(cache_keys)
+        except Exception as e:
+            logger.warning(f"Error loading from cache: {e}")
+            embeddings = np.zeros((n, self.embedding_dimension), dtype=np.float32)
+            found = np.zeros(n, dtype=bool)
+        hits = int(found.sum())
+        self._cache_stats["hits"] += hits
+        self._cache_stats["misses"] += n - hits
+
+        if hits < n:
+            # Only true misses go to the model, each distinct text once
+            first_index = {}
+            for i in np.flatnonzero(~found):
+                first_index.setdefault(cache_keys[i], i)
+
+            miss_keys = list(first_index)
+            new_embeddings = self._encode_texts(
+                [texts[first_index[key]] for key in miss_keys], normalize, show_progress
+            )
             try:
-                logger.info(f"Encoding {len(texts_to_encode)} texts in batch")
-
-                # Encode in batches
-                new_embeddings = self.model.encode(
-                    texts_to_encode,
-                    batch_size=self.batch_size,
-                    normalize_embeddings=normalize,
-                    convert_to_numpy=True,
-                    show_progress_bar=show_progress
-                )
+                self._cache.put_many(miss_keys, new_embeddings)
+            except Exception as e:
+                logger.warning(f"Error saving to cache: {e}")
 
-                # Cache results and fill in embeddings list
-                new_embedding_idx = 0
-                for i, embedding in enumerate(embeddings):
-                    if embedding is None:
-                        embeddings[i] = new_embeddings[new_embedding_idx]
+            lookup = {key: row for row, key in enumerate(miss_keys)}
+            missing = np.flatnonzero(~found)
+            embeddings[missing] = new_embeddings[[lookup[cache_keys[i]] for i in missing]]
 
-                        # Cache
-                        if self.enable_cache and cache_keys[i]:
-                            self._save_to_cache(cache_keys[i], new_embeddings[new_embedding_idx])
+        return embeddings
 
-                        new_embedding_idx += 1
+    def _encode_texts(self, texts: List[str], normalize: bool, show_progress: bool) -> np.ndarray:
+        """Encode texts with the model in batch_size batches"""
+        try:
+            logger.info(f"Encoding {len(texts)} texts in batch")
 
-                logger.info(f"Successfully encoded {len(texts_to_encode)} texts")
+            embeddings = self.model.encode(
+                texts,
+                batch_size=self.batch_size,
+                normalize_embeddings=normalize,
+                convert_to_numpy=True,
+                show_progress_bar=show_progress
+            )
 
-            except Exception as e:
-                logger.error(f"Error encoding batch: {e}")
-                raise
+            logger.info(f"Successfully encoded {len(texts)} texts")
+            return np.asarray(embeddings, dtype=np.float32)
 
-        return np.array(embeddings)
+        except Exception as e:
+            logger.error(f"Error encoding batch: {e}")
+            raise
 
     def encode_query(self, query: str) -> np.ndarray:
         """
@@ -284,21 +297,22 @@ class EmbeddingsManager:
 
         return similarities
 
-    def _get_cache_key(self, text: str) -> str:
+    def _get_cache_key(self, text: str, normalize: bool = True) -> bytes:
         """
         Generate cache key for text
 
         Args:
             text: Input text
+            normalize: Whether the embedding is normalized
 
         Returns:
-            Cache key (hash)
+            Cache key (16-byte hash)
         """
-        # Include model name in key
-        key_string = f"{self.model_name}:{text}"
-        return hashlib.md5(key_string.encode()).hexdigest()
+        # Include model name and normalization in key
+        key_string = f"{self.model_name}:{int(normalize)}:{text}"
+        return hashlib.md5(key_string.encode()).digest()
 
-    def _load_from_cache(self, cache_key: str) -> Optional[np.ndarray]:
+    def _load_from_cache(self, cache_key: bytes) -> Optional[np.ndarray]:
         """
         Load embedding from cache
 
@@ -308,18 +322,14 @@ class EmbeddingsManager:
         Returns:
             Cached embedding or None
         """
-        cache_file = self.cache_dir / f"{cache_key}.pkl"
-
         try:
-            if cache_file.exists():
-                with open(cache_file, 'rb') as f:
-                    return pickle.load(f)
+            return self._cache.get(cache_key)
         except Exception as e:
             logger.warning(f"Error loading from cache: {e}")
 
         return None
 
-    def _save_to_cache(self, cache_key: str, embedding: np.ndarray):
+    def _save_to_cache(self, cache_key: bytes, embedding: np.ndarray):
         """
         Save embedding to cache
 
@@ -327,11 +337,8 @@ class EmbeddingsManager:
             cache_key: Cache key
             embedding: Embedding vector
         """
-        cache_file = self.cache_dir / f"{cache_key}.pkl"
-
         try:
-            with open(cache_file, 'wb') as f:
-                pickle.dump(embedding, f)
+            self._cache.put(cache_key, np.asarray(embedding, dtype=np.float32))
         except Exception as e:
             logger.warning(f"Error saving to cache: {e}")
 
@@ -342,11 +349,15 @@ class EmbeddingsManager:
             return
 
         try:
-            cache_files = list(self.cache_dir.glob("*.pkl"))
-            for cache_file in cache_files:
+            count = len(self._cache)
+            self._cache.clear()
+
+            # Per-embedding pickle files from the previous cache format
+            legacy_files = list(self.cache_dir.glob("*.pkl"))
+            for cache_file in legacy_files:
                 cache_file.unlink()
 
-            logger.info(f"Cleared {len(cache_files)} cached embeddings")
+            logger.info(f"Cleared {count} cached embeddings ({len(legacy_files)} legacy files)")
 
         except Exception as e:
             logger.error(f"Error clearing cache: {e}")
@@ -358,10 +369,8 @@ class EmbeddingsManager:
         Returns:
             Dictionary with cache stats
         """
-        cache_size = 0
-        if self.enable_cache:
-            cache_files = list(self.cache_dir.glob("*.pkl"))
-            cache_size = sum(f.stat().st_size for f in cache_files)
+        cache = self._cache.stats() if self.enable_cache else {}
+        cache_size = cache.get("bytes_on_disk", 0)
 
         hit_rate = 0
         if self._cache_stats["total_requests"] > 0:
@@ -375,6 +384,9 @@ class EmbeddingsManager:
             "cache_hits": self._cache_stats["hits"],
             "cache_misses": self._cache_stats["misses"],
             "hit_rate_percent": round(hit_rate, 2),
+            "cached_embeddings": cache.get("entries", 0),
+            "max_cached_embeddings": cache.get("max_entries", 0),
+            "bytes_on_disk": cache_size,
             "cache_size_mb": round(cache_size / (1024 * 1024), 2),
             "cache_directory": str(self.cache_dir)
         }
@@ -31,6 +31,8 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 import re
 
+from src.rag.bm25_index import BM25Index, reciprocal_rank_fusion
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -58,6 +60,7 @@ class RetrievedDocument:
     keyword_match_score: float
     combined_score: float
     source: str
+    doc_id: str = ''
 
 
 class RAGService:
@@ -65,7 +68,7 @@ class RAGService:
     Production-ready RAG service with advanced techniques
 
     Features:
-    - Hybrid retrieval (semantic + keyword)
+    - Hybrid retrieval (semantic + BM25 keyword, reciprocal-rank fusion)
     - Adaptive retrieval based on query complexity
     - Reranking for improved relevance
     - Semantic chunking
@@ -79,7 +82,8 @@ class RAGService:
         collection_name: str = "magnus_knowledge",
         embedding_model: str = "all-mpnet-base-v2",
         cache_ttl_seconds: int = 3600,
-        min_confidence_threshold: float = 0.6
+        min_confidence_threshold: float = 0.6,
+        persist_directory: str = "./chroma_db"
     ):
         """
         Initialize RAG service with production-ready configuration
@@ -89,12 +93,14 @@ class RAGService:
             embedding_model: Sentence transformer model
             cache_ttl_seconds: Cache time-to-live (default 1 hour)
             min_confidence_threshold: Minimum confidence for retrieval
+            persist_directory: ChromaDB directory (the BM25 index is stored here too)
         """
         logger.info("Initializing Production RAG Service...")
 
         # ChromaDB setup with persistence
+        self.persist_directory = persist_directory
         self.chroma_client = chromadb.Client(Settings(
-            persist_directory="./chroma_db",
+            persist_directory=persist_directory,
             anonymized_telemetry=False
         ))
 
@@ -113,6 +119,12 @@ class RAGService:
         self.embedding_model = SentenceTransformer(embedding_model)
         logger.info(f"Loaded embedding model: {embedding_model}")
 
+        # BM25 keyword index, kept in sync with the collection by add_documents
+        self.keyword_index = BM25Index(
+            os.path.join(persist_directory, f"{collection_name}_bm25.json")
+        )
+        self._sync_keyword_index()
+
         # Cache configuration
         self.cache = {}
         self.cache_ttl = timedelta(seconds=cache_ttl_seconds)
@@ -224,64 +236,98 @@ class RAGService:
                     similarity_score=similarity,
                     keyword_match_score=0.0,  # Will be computed if hybrid search
                     combined_score=similarity,
-                    source='semantic'
+                    source='semantic',
+                    doc_id=results['ids'][0][i]
                 ))
 
         return documents
 
-    def _keyword_search(self, query: str, documents: List[str]) -> List[float]:
+    def _keyword_search(self, query: str, n_results: int = 5) -> List[RetrievedDocument]:
         """
-        Keyword-based BM25-style scoring
-
-        Simple implementation: count keyword matches with TF-IDF weighting
+        Keyword search with the BM25 inverted index
 
         Returns:
-            List of keyword match scores
+            List of retrieved documents with BM25 scores relative to the
+            query's reference score (an average-length document containing
+            each query term once scores 1.0), capped at 1.0
         """
-        query_terms = set(query.lower().split())
-        scores = []
+        hits = self.keyword_index.search(query, n_results=n_results)
+        if not hits:
+            return []
 
-        for doc in documents:
-            doc_terms = doc.lower().split()
-            matches = sum(1 for term in query_terms if term in doc_terms)
-            score = matches / len(query_terms) if query_terms else 0.0
-            scores.append(score)
+        reference = self.keyword_index.reference_score(query) or 1.0
 
-        return scores
+        stored = self.collection.get(ids=[doc_id for doc_id, _ in hits], include=['documents', 'metadatas'])
+        by_id = {
+            doc_id: (content, metadata)
+            for doc_id, content, metadata in zip(stored['ids'], stored['documents'], stored['metadatas'])
+        }
+
+        documents = []
+        for doc_id, score in hits:
+            if doc_id not in by_id:
+                continue
+            content, metadata = by_id[doc_id]
+            relevance = min(score / reference, 1.0)
+            documents.append(RetrievedDocument(
+                content=content,
+                metadata=metadata or {},
+                similarity_score=0.0,
+                keyword_match_score=relevance,
+                combined_score=relevance,
+                source='keyword',
+                doc_id=doc_id
+            ))
+
+        return documents
 
-    def _hybrid_search(self, query: str, n_results: int = 5, alpha: float = 0.7) -> List[RetrievedDocument]:
+    def _hybrid_search(self, query: str, n_results: int = 5, alpha: float = 0.7,
+                       rrf_k: int = 60) -> List[RetrievedDocument]:
         """
-        Hybrid search combining semantic and keyword search
+        Hybrid search fusing semantic and BM25 keyword retrieval
+
+        Both retrievers run independently, so keyword-only matches (e.g.
+        tickers the embedding model does not know) are retrieved too.
 
         Args:
             query: User query
             n_results: Number of results
-            alpha: Weight for semantic score (1-alpha for keyword)
+            alpha: Weight of the semantic ranking (1-alpha for keyword)
+            rrf_k: Reciprocal-rank fusion constant
 
         Returns:
-            Reranked documents combining both methods
+            Documents ordered by weighted reciprocal-rank fusion. RRF only
+            decides the order; combined_score blends the raw semantic
+            similarity and keyword relevance, so it says how well the
+            documents match rather than where they rank.
         """
-        # Get semantic search results
         semantic_docs = self._semantic_search(query, n_results=n_results * 2)
+        keyword_docs = self._keyword_search(query, n_results=n_results * 2)
 
-        if not semantic_docs:
+        if not semantic_docs and not keyword_docs:
             return []
 
-        # Compute keyword scores for semantic results
-        doc_contents = [doc.content for doc in semantic_docs]
-        keyword_scores = self._keyword_search(query, doc_contents)
+        fused = reciprocal_rank_fusion(
+            [[doc.doc_id for doc in semantic_docs], [doc.doc_id for doc in keyword_docs]],
+            weights=[alpha, 1 - alpha],
+            k=rrf_k
+        )
 
-        # Combine scores
-        for i, doc in enumerate(semantic_docs):
-            doc.keyword_match_score = keyword_scores[i]
-            doc.combined_score = (alpha * doc.similarity_score +
-                                 (1 - alpha) * doc.keyword_match_score)
+        documents = {doc.doc_id: doc for doc in keyword_docs}
+        for doc in semantic_docs:
+            keyword_doc = documents.get(doc.doc_id)
+            if keyword_doc is not None:
+                doc.keyword_match_score = keyword_doc.keyword_match_score
+            documents[doc.doc_id] = doc
+
+        results = []
+        for doc_id, _ in fused[:n_results]:
+            doc = documents[doc_id]
+            doc.combined_score = alpha * doc.similarity_score + (1 - alpha) * doc.keyword_match_score
             doc.source = 'hybrid'
+            results.append(doc)
 
-        # Rerank by combined score
-        semantic_docs.sort(key=lambda x: x.combined_score, reverse=True)
-
-        return semantic_docs[:n_results]
+        return results
 
     def _rerank_results(self, documents: List[RetrievedDocument], query: str) -> List[RetrievedDocument]:
         """
@@ -561,8 +607,33 @@ class RAGService:
             ids=ids
         )
 
+        # Index the same documents for keyword search; flush appends them to the
+        # index log instead of rewriting the whole snapshot
+        if self.keyword_index.add(ids, documents):
+            self.keyword_index.flush()
+
         logger.info(f"Added {len(documents)} documents to knowledge base")
 
+    def _sync_keyword_index(self, page_size: int = 1000):
+        """
+        Index collection documents missing from the BM25 index
+
+        Covers collections populated before the keyword index existed or
+        written by another process; does nothing when the counts match.
+        """
+        total = self.collection.count()
+        if len(self.keyword_index) >= total:
+            return
+
+        logger.info(f"Building BM25 index for {total - len(self.keyword_index)} documents...")
+        added = 0
+        for offset in range(0, total, page_size):
+            page = self.collection.get(include=['documents'], limit=page_size, offset=offset)
+            added += self.keyword_index.add(page['ids'], page['documents'])
+
+        if added:
+            self.keyword_index.save()
+
     def clear_cache(self):
         """Clear query cache"""
         self.cache = {}
@@ -576,6 +647,7 @@ class RAGService:
             'collection_name': self.collection_name,
             'total_documents': count,
             'cache_size': len(self.cache),
+            'keyword_index': self.keyword_index.stats(),
             'embedding_model': self.embedding_model.get_sentence_embedding_dimension(),
             'metrics': self.get_metrics()
         }
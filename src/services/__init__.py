@@ -48,6 +48,8 @@ except ImportError:
     RobinhoodClient = None
     get_robinhood_client = None
 
+from src.services.llm_response_cache import PersistentResponseCache
+
 # Optional import - llm_service may not have all dependencies
 try:
     from src.services.llm_service import (
@@ -103,6 +105,7 @@ __all__ = [
     # LLM Service
     "LLMService",
     "ResponseCache",
+    "PersistentResponseCache",
     "UsageTracker",
     "get_llm_service",
 
@@ -64,6 +64,43 @@ ROBINHOOD_CONFIG = ServiceConfig(
 )
 
 
+# =============================================================================
+# Market Data Provider Configurations
+# =============================================================================
+
+# Polygon.io - Free tier is 5 requests per minute
+POLYGON_CONFIG = ServiceConfig(
+    name="polygon",
+    rate_limit=ServiceRateLimit(
+        max_calls=5,
+        time_window=60
+    ),
+    timeout=10,
+    retry_policy=RetryPolicy(
+        max_retries=2,
+        base_delay=2.0,
+        max_delay=30.0
+    ),
+    base_url="https://api.polygon.io"
+)
+
+# Tradier - Sandbox allows 60 market data requests per minute
+TRADIER_CONFIG = ServiceConfig(
+    name="tradier",
+    rate_limit=ServiceRateLimit(
+        max_calls=60,
+        time_window=60
+    ),
+    timeout=10,
+    retry_policy=RetryPolicy(
+        max_retries=2,
+        base_delay=1.0,
+        max_delay=30.0
+    ),
+    base_url="https://sandbox.tradier.com/v1"
+)
+
+
 # =============================================================================
 # LLM Provider Configurations
 # =============================================================================
@@ -203,6 +240,8 @@ KIMI_CONFIG = ServiceConfig(
 
 SERVICE_CONFIGS: Dict[str, ServiceConfig] = {
     "robinhood": ROBINHOOD_CONFIG,
+    "polygon": POLYGON_CONFIG,
+    "tradier": TRADIER_CONFIG,
     "ollama": OLLAMA_CONFIG,
     "groq": GROQ_CONFIG,
     "deepseek": DEEPSEEK_CONFIG,
@@ -0,0 +1,266 @@
+"""
+Persistent LLM Response Cache
+SQLite-backed response cache shared across processes, with an optional semantic tier
+
+Responses are keyed on provider, model, generation parameters and the exact
+prompt. The database runs in WAL mode, so Streamlit workers and the Telegram
+bot can share one file. Entries expire after ttl seconds and the least
+recently used entries are evicted past max_entries.
+
+When an embed function is configured, a prompt that misses the exact key can
+still hit a cached response for the same provider/model/parameters whose
+prompt embedding is within semantic_distance (cosine distance). Keep the
+distance small - prompts differing only in a ticker or a number embed close
+together.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def cache_params(**kwargs) -> str:
+    """Canonical string for generation parameters (max_tokens, temperature, ...)"""
+    return repr(sorted(kwargs.items()))
+
+
+def load_sentence_embedder(model_name: str = "all-MiniLM-L6-v2") -> Optional[Callable[[List[str]], np.ndarray]]:
+    """Sentence-transformers embed function, or None if the package is missing"""
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        logger.warning("sentence-transformers not installed - semantic LLM cache disabled")
+        return None
+
+    model = SentenceTransformer(model_name)
+    return lambda texts: model.encode(texts, show_progress_bar=False)
+
+
+class _SemanticIndex:
+    """In-process matrix of normalized prompt embeddings for one provider/model/params group"""
+
+    def __init__(self):
+        self.keys: List[str] = []
+        self.created = np.zeros(0)
+        self.matrix: Optional[np.ndarray] = None
+        self.last_rowid = 0
+
+    def extend(self, keys: List[str], created: Sequence[float], vectors: np.ndarray):
+        # A replaced entry gets a new rowid; drop its old position
+        replaced = set(keys)
+        if replaced.intersection(self.keys):
+            self.keep(np.array([key not in replaced for key in self.keys]))
+
+        self.keys.extend(keys)
+        self.created = np.concatenate([self.created, np.asarray(created, dtype=np.float64)])
+        self.matrix = vectors if self.matrix is None else np.vstack([self.matrix, vectors])
+
+    def keep(self, mask: np.ndarray):
+        self.keys = [key for key, kept in zip(self.keys, mask) if kept]
+        self.created = self.created[mask]
+        self.matrix = self.matrix[mask]
+
+
+class PersistentResponseCache:
+    """
+    SQLite response cache with TTL, LRU eviction and optional semantic hits
+
+    Lookups return a hit dict with the response, the tier that answered
+    ('persistent' or 'semantic') and the cost of the original generation.
+    """
+
+    def __init__(
+        self,
+        path: str = "data/llm_cache/responses.sqlite",
+        ttl: int = 86400,
+        max_entries: int = 10_000,
+        embed: Optional[Callable[[List[str]], Any]] = None,
+        semantic_distance: float = 0.05
+    ):
+        """
+        Args:
+            path: SQLite database file
+            ttl: Time to live in seconds
+            max_entries: Entries kept before LRU eviction
+            embed: Embeds a list of prompts (None = exact matches only)
+            semantic_distance: Maximum cosine distance for a semantic hit
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.embed = embed
+        self.semantic_distance = semantic_distance
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                provider TEXT NOT NULL,
+                model TEXT NOT NULL,
+                params TEXT NOT NULL,
+                prompt TEXT NOT NULL,
+                response TEXT NOT NULL,
+                cost REAL NOT NULL DEFAULT 0,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                embedding BLOB
+            );
+            CREATE INDEX IF NOT EXISTS responses_group ON responses (provider, model, params);
+            CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+        """)
+        self._db.commit()
+
+        self._semantic: Dict[tuple, _SemanticIndex] = {}
+
+    @staticmethod
+    def _make_key(prompt: str, provider: str, model: str, params: str) -> str:
+        return hashlib.md5(f"{provider}:{model}:{params}:{prompt}".encode()).hexdigest()
+
+    def get(self, prompt: str, provider: str, model: str, **kwargs) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response
+
+        Returns:
+            Dict with 'response', 'tier', 'cost' (and 'distance' for
+            semantic hits), or None on a miss
+        """
+        params = cache_params(**kwargs)
+        key = self._make_key(prompt, provider, model, params)
+        now = time.time()
+
+        with self._lock:
+            row = self._db.execute(
+                "SELECT response, cost, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[2] < self.ttl:
+                self._touch(key, now)
+                return {'response': row[0], 'tier': 'persistent', 'cost': row[1]}
+
+        if self.embed is None:
+            return None
+        return self._semantic_get(prompt, provider, model, params, now)
+
+    def set(self, prompt: str, provider: str, model: str, response: str, cost: float = 0.0, **kwargs):
+        """Cache a response along with the cost of generating it"""
+        params = cache_params(**kwargs)
+        key = self._make_key(prompt, provider, model, params)
+        embedding = self._embed_one(prompt).tobytes() if self.embed else None
+        now = time.time()
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, provider, model, params, prompt, response, cost, created, accessed, embedding) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, provider, model, params, prompt, response, cost, now, now, embedding)
+            )
+            self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._db.commit()
+
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+            self._semantic.clear()
+        logger.info("Cleared persistent LLM response cache")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Entry counts"""
+        with self._lock:
+            total, valid = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(created >= ?), 0) FROM responses",
+                (time.time() - self.ttl,)
+            ).fetchone()
+
+        return {
+            'total_entries': total,
+            'valid_entries': valid,
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'semantic_enabled': self.embed is not None,
+            'semantic_distance': self.semantic_distance,
+            'path': self.path
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    # =========================================================================
+    # INTERNALS
+    # =========================================================================
+
+    def _touch(self, key: str, now: float):
+        # Caller holds the lock
+        self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        self._db.commit()
+
+    def _embed_one(self, prompt: str) -> np.ndarray:
+        vector = np.asarray(self.embed([prompt]), dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _semantic_get(self, prompt: str, provider: str, model: str, params: str,
+                      now: float) -> Optional[Dict[str, Any]]:
+        query = self._embed_one(prompt)
+        group = (provider, model, params)
+
+        with self._lock:
+            index = self._semantic.setdefault(group, _SemanticIndex())
+
+            # Pick up entries written since the last lookup (by any process)
+            rows = self._db.execute(
+                "SELECT rowid, key, created, embedding FROM responses "
+                "WHERE provider = ? AND model = ? AND params = ? AND rowid > ? AND embedding IS NOT NULL "
+                "ORDER BY rowid",
+                (provider, model, params, index.last_rowid)
+            ).fetchall()
+            if rows:
+                vectors = np.stack([np.frombuffer(row[3], dtype=np.float32) for row in rows])
+                if vectors.shape[1] == query.shape[0]:
+                    index.extend([row[1] for row in rows], [row[2] for row in rows], vectors)
+                index.last_rowid = rows[-1][0]
+
+            expired = now - index.created >= self.ttl
+            if expired.any():
+                index.keep(~expired)
+
+            while index.keys:
+                distances = 1.0 - index.matrix @ query
+                best = int(np.argmin(distances))
+                if distances[best] > self.semantic_distance:
+                    return None
+
+                key = index.keys[best]
+                row = self._db.execute(
+                    "SELECT response, cost FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    # Evicted since it was indexed
+                    index.keep(np.arange(len(index.keys)) != best)
+                    continue
+
+                self._touch(key, now)
+                logger.debug(f"Semantic cache hit for {provider}/{model} (distance {distances[best]:.3f})")
+                return {'response': row[0], 'tier': 'semantic', 'cost': row[1],
+                        'distance': float(distances[best])}
+
+        return None
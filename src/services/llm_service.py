@@ -13,6 +13,7 @@ from loguru import logger
 from dotenv import load_dotenv
 
 from src.services.config import get_service_config, calculate_cost
+from src.services.llm_response_cache import PersistentResponseCache, load_sentence_embedder
 from src.services.rate_limiter import rate_limit
 
 load_dotenv()
@@ -23,71 +24,116 @@ load_dotenv()
 # =============================================================================
 
 class ResponseCache:
-    """Simple in-memory cache for LLM responses"""
+    """
+    Two-level cache for LLM responses
+
+    Level 1 is an in-process dict keyed on the prompt hash. Level 2 is an
+    optional PersistentResponseCache (SQLite, shared across processes, with
+    an optional semantic tier); level-2 hits are promoted to level 1.
+    """
 
-    def __init__(self, ttl: int = 3600):
+    def __init__(self, ttl: int = 3600, persistent: Optional[PersistentResponseCache] = None):
         """
         Initialize cache
 
         Args:
             ttl: Time to live in seconds (default 1 hour)
+            persistent: Shared level-2 cache (None = in-memory only)
         """
-        self._cache: Dict[str, Tuple[Any, float]] = {}
+        self._cache: Dict[str, Tuple[Any, float, float]] = {}
         self._lock = threading.Lock()
         self.ttl = ttl
+        self.persistent = persistent
 
     def _make_key(self, prompt: str, provider: str, model: str, **kwargs) -> str:
         """Create cache key from parameters"""
         key_string = f"{provider}:{model}:{prompt}:{kwargs}"
         return hashlib.md5(key_string.encode()).hexdigest()
 
-    def get(self, prompt: str, provider: str, model: str, **kwargs) -> Optional[str]:
-        """Get cached response if exists and not expired"""
+    def lookup(self, prompt: str, provider: str, model: str, **kwargs) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached response with the tier that answered
+
+        Returns:
+            Dict with 'response', 'tier' ('memory', 'persistent' or
+            'semantic') and 'cost' of the original generation, or None
+        """
         key = self._make_key(prompt, provider, model, **kwargs)
 
         with self._lock:
             if key in self._cache:
-                response, timestamp = self._cache[key]
+                response, timestamp, cost = self._cache[key]
 
                 # Check if expired
                 if time.time() - timestamp < self.ttl:
                     logger.debug(f"Cache hit for {provider}/{model}")
-                    return response
+                    return {'response': response, 'tier': 'memory', 'cost': cost}
                 else:
                     # Expired, remove
                     del self._cache[key]
 
-        return None
+        if self.persistent is None:
+            return None
+
+        try:
+            hit = self.persistent.get(prompt, provider, model, **kwargs)
+        except Exception as e:
+            logger.warning(f"Persistent cache lookup failed: {e}")
+            return None
 
-    def set(self, prompt: str, provider: str, model: str, response: str, **kwargs):
+        if hit:
+            logger.debug(f"{hit['tier'].title()} cache hit for {provider}/{model}")
+            with self._lock:
+                self._cache[key] = (hit['response'], time.time(), hit['cost'])
+        return hit
+
+    def get(self, prompt: str, provider: str, model: str, **kwargs) -> Optional[str]:
+        """Get cached response if exists and not expired"""
+        hit = self.lookup(prompt, provider, model, **kwargs)
+        return hit['response'] if hit else None
+
+    def set(self, prompt: str, provider: str, model: str, response: str, cost: float = 0.0, **kwargs):
         """Cache a response"""
         key = self._make_key(prompt, provider, model, **kwargs)
 
         with self._lock:
-            self._cache[key] = (response, time.time())
+            self._cache[key] = (response, time.time(), cost)
             logger.debug(f"Cached response for {provider}/{model}")
 
+        if self.persistent is not None:
+            try:
+                self.persistent.set(prompt, provider, model, response, cost=cost, **kwargs)
+            except Exception as e:
+                logger.warning(f"Persistent cache write failed: {e}")
+
     def clear(self):
         """Clear all cached responses"""
         with self._lock:
             self._cache.clear()
             logger.info("Cleared LLM response cache")
 
+        if self.persistent is not None:
+            self.persistent.clear()
+
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
         with self._lock:
             now = time.time()
             valid_entries = sum(
-                1 for _, timestamp in self._cache.values()
+                1 for _, timestamp, _ in self._cache.values()
                 if now - timestamp < self.ttl
             )
 
-            return {
+            stats = {
                 'total_entries': len(self._cache),
                 'valid_entries': valid_entries,
                 'ttl': self.ttl
             }
 
+        if self.persistent is not None:
+            stats['persistent'] = self.persistent.get_stats()
+        return stats
+
 
 # =============================================================================
 # Usage Tracker
@@ -100,28 +146,38 @@ class UsageTracker:
         self._usage: Dict[str, Dict[str, Any]] = {}
         self._lock = threading.Lock()
 
+    def _entry(self, provider: str, model: str) -> Dict[str, Any]:
+        # Caller holds the lock
+        key = f"{provider}:{model}"
+
+        if key not in self._usage:
+            self._usage[key] = {
+                'provider': provider,
+                'model': model,
+                'calls': 0,
+                'input_tokens': 0,
+                'output_tokens': 0,
+                'total_cost': 0.0,
+                'cache_hits': 0,
+                'semantic_hits': 0,
+                'cache_misses': 0,
+                'cost_saved': 0.0,
+                'first_call': datetime.now().isoformat(),
+                'last_call': datetime.now().isoformat()
+            }
+
+        return self._usage[key]
+
     def record(self, provider: str, model: str, input_tokens: int, output_tokens: int, cost: float):
         """Record an API call"""
         with self._lock:
-            key = f"{provider}:{model}"
-
-            if key not in self._usage:
-                self._usage[key] = {
-                    'provider': provider,
-                    'model': model,
-                    'calls': 0,
-                    'input_tokens': 0,
-                    'output_tokens': 0,
-                    'total_cost': 0.0,
-                    'first_call': datetime.now().isoformat(),
-                    'last_call': datetime.now().isoformat()
-                }
+            usage = self._entry(provider, model)
 
-            self._usage[key]['calls'] += 1
-            self._usage[key]['input_tokens'] += input_tokens
-            self._usage[key]['output_tokens'] += output_tokens
-            self._usage[key]['total_cost'] += cost
-            self._usage[key]['last_call'] = datetime.now().isoformat()
+            usage['calls'] += 1
+            usage['input_tokens'] += input_tokens
+            usage['output_tokens'] += output_tokens
+            usage['total_cost'] += cost
+            usage['last_call'] = datetime.now().isoformat()
 
     def get_stats(self, provider: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -145,11 +201,44 @@ class UsageTracker:
                 # Return all
                 return self._usage.copy()
 
+    def record_cache(self, provider: str, model: str, hit: Optional[Dict[str, Any]]):
+        """
+        Record a response cache lookup
+
+        Args:
+            provider: Provider name
+            model: Model name
+            hit: Cache hit from ResponseCache.lookup (None for a miss)
+        """
+        with self._lock:
+            usage = self._entry(provider, model)
+            if hit is None:
+                usage['cache_misses'] += 1
+                return
+
+            usage['cache_hits'] += 1
+            if hit['tier'] == 'semantic':
+                usage['semantic_hits'] += 1
+            usage['cost_saved'] += hit.get('cost', 0.0)
+
     def get_total_cost(self) -> float:
         """Get total cost across all providers"""
         with self._lock:
             return sum(usage['total_cost'] for usage in self._usage.values())
 
+    def get_cache_totals(self) -> Dict[str, Any]:
+        """Cache hits, misses and cost saved across all providers"""
+        with self._lock:
+            hits = sum(usage['cache_hits'] for usage in self._usage.values())
+            misses = sum(usage['cache_misses'] for usage in self._usage.values())
+            return {
+                'cache_hits': hits,
+                'semantic_hits': sum(usage['semantic_hits'] for usage in self._usage.values()),
+                'cache_misses': misses,
+                'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+                'cost_saved': sum(usage['cost_saved'] for usage in self._usage.values())
+            }
+
     def reset(self):
         """Reset all usage statistics"""
         with self._lock:
@@ -168,7 +257,8 @@ class LLMService:
     Features:
     - Multiple provider support (Claude, DeepSeek, Gemini, etc.)
     - Automatic provider fallback on errors
-    - Response caching for identical prompts
+    - Response caching: in-memory, persistent (shared SQLite) and
+      optional semantic near-duplicate hits
     - Cost tracking per provider
     - Rate limiting per provider
     - Thread-safe singleton pattern
@@ -188,7 +278,7 @@ class LLMService:
         """Initialize LLM service (singleton pattern)"""
         if not hasattr(self, '_initialized'):
             self._providers = {}
-            self._cache = ResponseCache(ttl=3600)  # 1 hour cache
+            self._cache = ResponseCache(ttl=3600, persistent=self._init_persistent_cache())  # 1 hour in memory
             self._usage = UsageTracker()
             self._router = None  # Intelligent router (initialized after providers)
             self._initialize_providers()
@@ -196,6 +286,38 @@ class LLMService:
             self._initialized = True
             logger.info("LLM service initialized")
 
+    def _init_persistent_cache(self) -> Optional[PersistentResponseCache]:
+        """
+        Shared SQLite cache tier
+
+        Environment:
+            LLM_CACHE_PATH: SQLite file (default data/llm_cache/responses.sqlite)
+            LLM_CACHE_TTL: Seconds (default 86400)
+            LLM_CACHE_MAX_ENTRIES: LRU limit (default 10000)
+            LLM_CACHE_SEMANTIC: "true" to enable near-duplicate prompt hits
+            LLM_CACHE_SEMANTIC_DISTANCE: Max cosine distance (default 0.05)
+            LLM_CACHE_DISABLE: "true" to keep the cache in memory only
+        """
+        if os.getenv('LLM_CACHE_DISABLE', 'false').lower() == 'true':
+            return None
+
+        try:
+            embed = None
+            if os.getenv('LLM_CACHE_SEMANTIC', 'false').lower() == 'true':
+                embed = load_sentence_embedder()
+
+            return PersistentResponseCache(
+                path=os.getenv('LLM_CACHE_PATH', 'data/llm_cache/responses.sqlite'),
+                ttl=int(os.getenv('LLM_CACHE_TTL', '86400')),
+                max_entries=int(os.getenv('LLM_CACHE_MAX_ENTRIES', '10000')),
+                embed=embed,
+                semantic_distance=float(os.getenv('LLM_CACHE_SEMANTIC_DISTANCE', '0.05'))
+            )
+
+        except Exception as e:
+            logger.warning(f"Persistent LLM cache unavailable, using memory only: {e}")
+            return None
+
     def _initialize_providers(self):
         """Initialize all available LLM providers"""
         # Import existing LLM manager
@@ -347,11 +469,13 @@ class LLMService:
 
         # Check cache first
         if use_cache:
-            cached_response = self._cache.get(
+            hit = self._cache.lookup(
                 prompt, provider, current_model,
                 max_tokens=max_tokens, temperature=temperature
             )
-            if cached_response:
+            self._usage.record_cache(provider, current_model, hit)
+            if hit:
+                cached_response = hit['response']
                 return {
                     "text": cached_response,
                     "provider": provider,
@@ -359,7 +483,8 @@ class LLMService:
                     "input_tokens": self._estimate_tokens(prompt),
                     "output_tokens": self._estimate_tokens(cached_response),
                     "cost": 0.0,  # No cost for cached response
-                    "cached": True
+                    "cached": True,
+                    "cache_tier": hit['tier']
                 }
 
         # Generate response with rate limiting
@@ -381,7 +506,7 @@ class LLMService:
             # Cache response
             if use_cache and text:
                 self._cache.set(
-                    prompt, provider, current_model, text,
+                    prompt, provider, current_model, text, cost=cost,
                     max_tokens=max_tokens, temperature=temperature
                 )
 
@@ -464,7 +589,7 @@ class LLMService:
             "provider_stats": stats,
             "total_cost": total_cost,
             "available_providers": self.get_available_providers(),
-            "cache_stats": self._cache.get_stats()
+            "cache_stats": {**self._cache.get_stats(), **self._usage.get_cache_totals()}
         }
 
     def clear_cache(self):
@@ -531,6 +656,7 @@ class LLMService:
             "total_providers": len(self._providers),
             "cache_enabled": True,
             "cache_ttl": self._cache.ttl,
+            "persistent_cache_enabled": self._cache.persistent is not None,
             "total_cost": self._usage.get_total_cost(),
             "intelligent_routing_enabled": self._router is not None
         }
@@ -626,6 +752,8 @@ if __name__ == "__main__":
     cache_stats = stats['cache_stats']
     print(f"  Total entries: {cache_stats['total_entries']}")
     print(f"  Valid entries: {cache_stats['valid_entries']}")
+    print(f"  Hits: {cache_stats['cache_hits']} ({cache_stats['semantic_hits']} semantic), "
+          f"misses: {cache_stats['cache_misses']}, saved: ${cache_stats['cost_saved']:.4f}")
 
     print("\n" + "=" * 60)
     print("LLM service tests complete!")
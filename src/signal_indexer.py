@@ -0,0 +1,207 @@
+"""
+Incremental Signal Indexer
+Keeps the trading_signals vector collection in sync with PostgreSQL
+
+Only signals that are new (id above the high-water mark) or whose outcome
+changed (signal_outcomes.updated_at above the high-water mark) are read.
+Rows stream through a server-side cursor in fixed-size batches; batches are
+embedded in parallel and upserted in order, so memory stays flat no matter
+how large discord_trading_signals grows.
+"""
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import psycopg2.extras
+
+CHANGED_SIGNALS_QUERY = """
+    SELECT
+        s.id,
+        s.primary_ticker,
+        s.setup_type,
+        s.sentiment,
+        s.entry,
+        s.target,
+        s.stop_loss,
+        s.option_strike,
+        s.option_type,
+        s.content,
+        s.author,
+        s.timestamp,
+        o.outcome,
+        o.pnl_percent,
+        o.pnl_dollars,
+        o.updated_at AS outcome_updated_at
+    FROM discord_trading_signals s
+    LEFT JOIN signal_outcomes o ON s.id = o.signal_id
+    WHERE s.id > %(last_signal_id)s
+       OR o.updated_at > %(last_outcome_update)s
+    ORDER BY s.id
+"""
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Comparable timestamp for both TIMESTAMP and TIMESTAMPTZ columns"""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def signal_metadata(signal: Dict) -> Dict:
+    """Collection metadata for a signal row"""
+    metadata = {
+        'signal_id': signal['id'],
+        'ticker': signal['primary_ticker'] or 'unknown',
+        'setup_type': signal['setup_type'] or 'general',
+        'sentiment': signal['sentiment'] or 'neutral',
+        'author': signal['author'] or 'unknown',
+        'outcome': signal['outcome'] or 'pending',
+        'timestamp': signal['timestamp'].isoformat() if signal['timestamp'] else None,
+    }
+
+    # Add outcome data if available
+    if signal.get('pnl_percent'):
+        metadata['pnl_percent'] = float(signal['pnl_percent'])
+    if signal.get('pnl_dollars'):
+        metadata['pnl_dollars'] = float(signal['pnl_dollars'])
+
+    return metadata
+
+
+class IncrementalSignalIndexer:
+    """Upserts new and changed signals into a vector collection"""
+
+    EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+    def __init__(
+        self,
+        collection,
+        get_connection: Callable,
+        to_document: Callable[[Dict], str],
+        embed: Optional[Callable[[List[str]], List[List[float]]]] = None,
+        state_path: str = "./chroma_db/trading_signals_index_state.json",
+        batch_size: int = 500,
+        max_workers: int = 4
+    ):
+        """
+        Args:
+            collection: Vector collection with an upsert() method (ChromaDB)
+            get_connection: Returns a new PostgreSQL connection
+            to_document: Builds the embedding text for a signal row
+            embed: Embeds a list of documents (None = the collection embeds on upsert)
+            state_path: JSON file holding the high-water marks
+            batch_size: Signals per cursor fetch and per upsert
+            max_workers: Batches embedded concurrently
+        """
+        self.collection = collection
+        self.get_connection = get_connection
+        self.to_document = to_document
+        self.embed = embed
+        self.state_path = state_path
+        self.batch_size = batch_size
+        self.max_workers = max(1, max_workers)
+
+    def load_state(self) -> Dict:
+        """High-water marks from the last run"""
+        state = {'last_signal_id': 0, 'last_outcome_update': None}
+        if self.state_path and os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                state.update(json.load(f))
+        return state
+
+    def save_state(self, state: Dict):
+        """Persist high-water marks atomically"""
+        if not self.state_path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def reset(self):
+        """Forget the high-water marks so the next run re-indexes everything"""
+        if self.state_path and os.path.exists(self.state_path):
+            os.remove(self.state_path)
+
+    def run(self) -> Dict:
+        """
+        Index signals changed since the last run
+
+        Returns:
+            Dictionary with the number of upserted signals and batches
+        """
+        state = self.load_state()
+        last_outcome_update = state['last_outcome_update']
+        params = {
+            'last_signal_id': state['last_signal_id'],
+            'last_outcome_update': (datetime.fromisoformat(last_outcome_update)
+                                    if last_outcome_update else self.EPOCH),
+        }
+
+        newest_outcome = params['last_outcome_update']
+        indexed = 0
+        batches = 0
+
+        conn = self.get_connection()
+        try:
+            # Named cursor = server-side; rows arrive batch_size at a time
+            cur = conn.cursor(name='signal_indexer', cursor_factory=psycopg2.extras.RealDictCursor)
+            cur.itersize = self.batch_size
+            cur.execute(CHANGED_SIGNALS_QUERY, params)
+
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                pending = deque()
+
+                def finish_oldest():
+                    nonlocal indexed, batches
+                    rows, ids, documents, metadatas, future = pending.popleft()
+                    self._upsert(ids, documents, metadatas, future.result() if future else None)
+                    indexed += len(ids)
+                    batches += 1
+
+                    # Rows arrive in id order, so every id up to here is indexed
+                    state['last_signal_id'] = max(state['last_signal_id'], rows[-1]['id'])
+                    self.save_state(state)
+
+                while True:
+                    rows = cur.fetchmany(self.batch_size)
+                    if not rows:
+                        break
+
+                    for row in rows:
+                        updated = row.get('outcome_updated_at')
+                        if updated is not None and _as_utc(updated) > _as_utc(newest_outcome):
+                            newest_outcome = updated
+
+                    ids = [f"signal_{row['id']}" for row in rows]
+                    documents = [self.to_document(row) for row in rows]
+                    metadatas = [signal_metadata(row) for row in rows]
+                    future = pool.submit(self.embed, documents) if self.embed else None
+                    pending.append((rows, ids, documents, metadatas, future))
+
+                    # Bound in-flight batches to keep memory flat
+                    if len(pending) >= self.max_workers:
+                        finish_oldest()
+
+                while pending:
+                    finish_oldest()
+
+            cur.close()
+        finally:
+            conn.close()
+
+        # Outcome changes are spread over all ids, so this mark moves only after a full pass
+        if _as_utc(newest_outcome) > _as_utc(params['last_outcome_update']):
+            state['last_outcome_update'] = newest_outcome.isoformat()
+        self.save_state(state)
+
+        return {'indexed': indexed, 'batches': batches, **state}
+
+    def _upsert(self, ids: List[str], documents: List[str], metadatas: List[Dict],
+                embeddings: Optional[List[List[float]]]):
+        kwargs = {'ids': ids, 'documents': documents, 'metadatas': metadatas}
+        if embeddings is not None:
+            kwargs['embeddings'] = [list(map(float, vector)) for vector in embeddings]
+        self.collection.upsert(**kwargs)
@@ -4,12 +4,16 @@ Enables semantic similarity search for finding similar past trades
 """
 import chromadb
 from chromadb.config import Settings
+from chromadb.utils import embedding_functions
 from typing import List, Dict, Optional
 import psycopg2
 import psycopg2.extras
 import os
+import sys
 from datetime import datetime
 
+from src.signal_indexer import IncrementalSignalIndexer
+
 
 class SignalVectorSearch:
     """Vector search for trading signals using ChromaDB"""
@@ -23,9 +27,14 @@ class SignalVectorSearch:
             settings=Settings(anonymized_telemetry=False)
         )
 
+        # Embeddings are computed by the indexer in parallel batches and
+        # by the collection for query texts; both use the same function
+        self.embedding_function = embedding_functions.DefaultEmbeddingFunction()
+
         # Create or get collection
         self.collection = self.chroma_client.get_or_create_collection(
             name="trading_signals",
+            embedding_function=self.embedding_function,
             metadata={"description": "Discord trading signals with outcomes"}
         )
 
@@ -76,79 +85,36 @@ class SignalVectorSearch:
 
         return " | ".join(parts)
 
-    def index_all_signals(self):
-        """Index all signals from database into ChromaDB"""
-        conn = self.get_connection()
-        cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+    def _signal_indexer(self) -> IncrementalSignalIndexer:
+        return IncrementalSignalIndexer(
+            collection=self.collection,
+            get_connection=self.get_connection,
+            to_document=self.create_signal_embedding_text,
+            embed=self.embedding_function,
+            state_path="./chroma_db/trading_signals_index_state.json"
+        )
 
-        # Get all signals with outcomes
-        cur.execute("""
-            SELECT
-                s.id,
-                s.primary_ticker,
-                s.setup_type,
-                s.sentiment,
-                s.entry,
-                s.target,
-                s.stop_loss,
-                s.option_strike,
-                s.option_type,
-                s.content,
-                s.author,
-                s.timestamp,
-                o.outcome,
-                o.pnl_percent,
-                o.pnl_dollars
-            FROM discord_trading_signals s
-            LEFT JOIN signal_outcomes o ON s.id = o.signal_id
-        """)
-
-        signals = cur.fetchall()
-        cur.close()
-        conn.close()
+    def index_new_signals(self) -> Dict:
+        """Upsert signals that are new or whose outcome changed since the last run"""
+        result = self._signal_indexer().run()
 
-        if not signals:
+        if result['indexed']:
+            print(f"Indexed {result['indexed']} new/changed signals into ChromaDB")
+        else:
             print("No signals to index")
-            return
-
-        # Prepare data for ChromaDB
-        documents = []
-        metadatas = []
-        ids = []
-
-        for signal in signals:
-            # Create embedding text
-            doc_text = self.create_signal_embedding_text(signal)
-            documents.append(doc_text)
-
-            # Metadata
-            metadata = {
-                'signal_id': signal['id'],
-                'ticker': signal['primary_ticker'] or 'unknown',
-                'setup_type': signal['setup_type'] or 'general',
-                'sentiment': signal['sentiment'] or 'neutral',
-                'author': signal['author'] or 'unknown',
-                'outcome': signal['outcome'] or 'pending',
-                'timestamp': signal['timestamp'].isoformat() if signal['timestamp'] else None,
-            }
-
-            # Add outcome data if available
-            if signal.get('pnl_percent'):
-                metadata['pnl_percent'] = float(signal['pnl_percent'])
-            if signal.get('pnl_dollars'):
-                metadata['pnl_dollars'] = float(signal['pnl_dollars'])
-
-            metadatas.append(metadata)
-            ids.append(f"signal_{signal['id']}")
-
-        # Add to ChromaDB
-        self.collection.add(
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids
-        )
+        return result
 
-        print(f"Indexed {len(signals)} signals into ChromaDB")
+    def index_all_signals(self) -> Dict:
+        """Re-index every signal from database into ChromaDB"""
+        indexer = self._signal_indexer()
+        indexer.reset()
+        result = indexer.run()
+
+        if result['indexed']:
+            print(f"Indexed {result['indexed']} signals into ChromaDB")
+        else:
+            print("No signals to index")
+        return result
 
     def find_similar_signals(
         self,
@@ -277,6 +243,10 @@ class SignalVectorSearch:
 
 if __name__ == "__main__":
     search = SignalVectorSearch()
-    print("Indexing all signals into ChromaDB...")
-    search.index_all_signals()
+    if "--full" in sys.argv:
+        print("Re-indexing all signals into ChromaDB...")
+        search.index_all_signals()
+    else:
+        print("Indexing new and changed signals into ChromaDB...")
+        search.index_new_signals()
     print("Vector search system ready!")
@@ -3,8 +3,10 @@ Smart Money Concepts (ICT) Indicators
 Order Blocks, Fair Value Gaps, BOS/CHoCH, Liquidity Pools
 """
 
+import time
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 import logging
@@ -46,70 +48,10 @@ class SmartMoneyIndicators:
         Bullish OB: Last down candle before strong rally
         Bearish OB: Last up candle before strong drop
         """
-        order_blocks = []
-
-        for i in range(2, len(df) - 1):
-            # Bullish Order Block
-            if (df['close'].iloc[i] < df['open'].iloc[i] and  # Red candle
-                df['close'].iloc[i+1] > df['open'].iloc[i+1] and  # Next is green
-                df['close'].iloc[i+1] > df['high'].iloc[i]):  # Breaks previous high
-
-                strength = self._calculate_ob_strength(df, i, 'BULLISH')
-
-                order_blocks.append({
-                    'type': 'BULLISH_OB',
-                    'top': float(df['high'].iloc[i]),
-                    'bottom': float(df['low'].iloc[i]),
-                    'midpoint': float((df['high'].iloc[i] + df['low'].iloc[i]) / 2),
-                    'index': int(i),
-                    'timestamp': df.index[i] if hasattr(df.index[i], 'strftime') else None,
-                    'strength': strength,
-                    'volume': int(df['volume'].iloc[i]),
-                    'mitigated': False
-                })
-
-            # Bearish Order Block
-            elif (df['close'].iloc[i] > df['open'].iloc[i] and  # Green candle
-                  df['close'].iloc[i+1] < df['open'].iloc[i+1] and  # Next is red
-                  df['close'].iloc[i+1] < df['low'].iloc[i]):  # Breaks previous low
-
-                strength = self._calculate_ob_strength(df, i, 'BEARISH')
-
-                order_blocks.append({
-                    'type': 'BEARISH_OB',
-                    'top': float(df['high'].iloc[i]),
-                    'bottom': float(df['low'].iloc[i]),
-                    'midpoint': float((df['high'].iloc[i] + df['low'].iloc[i]) / 2),
-                    'index': int(i),
-                    'timestamp': df.index[i] if hasattr(df.index[i], 'strftime') else None,
-                    'strength': strength,
-                    'volume': int(df['volume'].iloc[i]),
-                    'mitigated': False
-                })
-
+        order_blocks = self._order_blocks(self._ohlcv(df), df.index)
         logger.info(f"Detected {len(order_blocks)} order blocks")
         return order_blocks
 
-    def _calculate_ob_strength(self, df: pd.DataFrame, index: int, ob_type: str) -> int:
-        """Calculate order block strength (0-100)"""
-        strength = 50  # Base score
-
-        # Volume factor
-        avg_volume = df['volume'].iloc[max(0, index-20):index].mean()
-        if avg_volume > 0:
-            volume_ratio = df['volume'].iloc[index] / avg_volume
-            strength += min(25, volume_ratio * 10)
-
-        # Impulse strength
-        if ob_type == 'BULLISH':
-            impulse = (df['close'].iloc[index+1] - df['low'].iloc[index]) / df['low'].iloc[index]
-        else:
-            impulse = (df['high'].iloc[index] - df['close'].iloc[index+1]) / df['high'].iloc[index]
-
-        strength += min(25, impulse * 1000)
-
-        return min(100, int(strength))
-
     def detect_fair_value_gaps(self, df: pd.DataFrame) -> List[Dict]:
         """
         Detect Fair Value Gaps (price imbalances)
@@ -117,81 +59,10 @@ class SmartMoneyIndicators:
         Bullish FVG: Gap between high[i] and low[i+2]
         Bearish FVG: Gap between low[i] and high[i+2]
         """
-        fvgs = []
-
-        for i in range(len(df) - 2):
-            # Bullish FVG (gap up)
-            if df['low'].iloc[i+2] > df['high'].iloc[i]:
-                gap_size = df['low'].iloc[i+2] - df['high'].iloc[i]
-                gap_pct = (gap_size / df['close'].iloc[i]) * 100
-
-                if gap_pct >= self.min_fvg_pct:
-                    fvgs.append({
-                        'type': 'BULLISH_FVG',
-                        'top': float(df['low'].iloc[i+2]),
-                        'bottom': float(df['high'].iloc[i]),
-                        'midpoint': float((df['low'].iloc[i+2] + df['high'].iloc[i]) / 2),
-                        'index': int(i),
-                        'timestamp': df.index[i] if hasattr(df.index[i], 'strftime') else None,
-                        'gap_size': float(gap_size),
-                        'gap_pct': float(gap_pct),
-                        'filled': False,
-                        'fill_percentage': 0.0
-                    })
-
-            # Bearish FVG (gap down)
-            elif df['high'].iloc[i+2] < df['low'].iloc[i]:
-                gap_size = df['low'].iloc[i] - df['high'].iloc[i+2]
-                gap_pct = (gap_size / df['close'].iloc[i]) * 100
-
-                if gap_pct >= self.min_fvg_pct:
-                    fvgs.append({
-                        'type': 'BEARISH_FVG',
-                        'top': float(df['low'].iloc[i]),
-                        'bottom': float(df['high'].iloc[i+2]),
-                        'midpoint': float((df['low'].iloc[i] + df['high'].iloc[i+2]) / 2),
-                        'index': int(i),
-                        'timestamp': df.index[i] if hasattr(df.index[i], 'strftime') else None,
-                        'gap_size': float(gap_size),
-                        'gap_pct': float(gap_pct),
-                        'filled': False,
-                        'fill_percentage': 0.0
-                    })
-
-        # Check which FVGs have been filled
-        for fvg in fvgs:
-            fvg['filled'], fvg['fill_percentage'] = self._check_fvg_filled(df, fvg)
-
+        fvgs = self._fair_value_gaps(self._ohlcv(df), df.index)
         logger.info(f"Detected {len(fvgs)} fair value gaps")
         return fvgs
 
-    def _check_fvg_filled(self, df: pd.DataFrame, fvg: Dict) -> Tuple[bool, float]:
-        """Check if FVG has been filled by subsequent price action"""
-        start_idx = fvg['index'] + 3
-
-        if start_idx >= len(df):
-            return False, 0.0
-
-        subsequent_prices = df.iloc[start_idx:]
-        gap_size = fvg['top'] - fvg['bottom']
-
-        if fvg['type'] == 'BULLISH_FVG':
-            # Check if price came back down into gap
-            lowest_reentry = subsequent_prices['low'].min()
-            if lowest_reentry <= fvg['top']:
-                fill_amount = fvg['top'] - max(lowest_reentry, fvg['bottom'])
-                fill_pct = (fill_amount / gap_size) * 100
-                return fill_pct >= 50, fill_pct
-        else:  # BEARISH_FVG
-            # Check if price came back up into gap
-            highest_reentry = subsequent_prices['high'].max()
-            if highest_reentry >= fvg['bottom']:
-                fill_amount = min(highest_reentry, fvg['top']) - fvg['bottom']
-                fill_pct = (fill_amount / gap_size) * 100
-                return fill_pct >= 50, fill_pct
-
-        return False, 0.0
-
     def detect_market_structure(self, df: pd.DataFrame) -> Dict:
         """
         Detect Break of Structure (BOS) and Change of Character (CHoCH)
@@ -199,71 +70,281 @@ class SmartMoneyIndicators:
         BOS: Price breaks previous high/low in trend direction
         CHoCH: Price breaks structure against trend (reversal signal)
         """
-        swing_highs = self._find_swing_highs(df)
-        swing_lows = self._find_swing_lows(df)
+        arrays = self._ohlcv(df)
+        structure = self._market_structure(
+            arrays, df.index,
+            self._swing_indices(arrays['high'], highs=True),
+            self._swing_indices(arrays['low'], highs=False)
+        )
+        logger.info(f"Detected {len(structure['bos']) + len(structure['choch'])} structure breaks")
+        return structure
+
+    def detect_liquidity_pools(self, df: pd.DataFrame) -> List[Dict]:
+        """
+        Detect liquidity pools (stop loss clusters)
+
+        Buy-side liquidity: Above recent swing highs
+        Sell-side liquidity: Below recent swing lows
+        """
+        arrays = self._ohlcv(df)
+        liquidity_pools = self._liquidity_pools(
+            arrays,
+            self._swing_indices(arrays['high'], highs=True),
+            self._swing_indices(arrays['low'], highs=False)
+        )
+        logger.info(f"Detected {len(liquidity_pools)} liquidity pools")
+        return liquidity_pools
+
+    def get_all_smc_indicators(self, df: pd.DataFrame) -> Dict:
+        """Get all Smart Money Concepts indicators at once"""
+        indicators = self._all_indicators(df)
+        logger.info(
+            f"SMC: {len(indicators['order_blocks'])} order blocks, "
+            f"{len(indicators['fair_value_gaps'])} FVGs, "
+            f"{len(indicators['liquidity_pools'])} liquidity pools"
+        )
+        return indicators
+
+    def analyze_batch(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, Dict]:
+        """
+        Run every SMC detector over many symbols.
+
+        Args:
+            frames: Symbol -> OHLCV DataFrame (lowercase columns)
+
+        Returns:
+            Symbol -> get_all_smc_indicators() result
+        """
+        start = time.perf_counter()
+        results = {symbol: self._all_indicators(df) for symbol, df in frames.items()}
+
+        total_bars = sum(len(df) for df in frames.values())
+        logger.info(f"SMC batch: {len(frames)} symbols, {total_bars:,} bars "
+                    f"in {time.perf_counter() - start:.2f}s")
+        return results
+
+    def _all_indicators(self, df: pd.DataFrame) -> Dict:
+        """All detectors on one frame, reading columns once and sharing swing points"""
+        arrays = self._ohlcv(df)
+        swing_high_idx = self._swing_indices(arrays['high'], highs=True)
+        swing_low_idx = self._swing_indices(arrays['low'], highs=False)
+
+        return {
+            'order_blocks': self._order_blocks(arrays, df.index),
+            'fair_value_gaps': self._fair_value_gaps(arrays, df.index),
+            'market_structure': self._market_structure(arrays, df.index, swing_high_idx, swing_low_idx),
+            'liquidity_pools': self._liquidity_pools(arrays, swing_high_idx, swing_low_idx)
+        }
+
+    @staticmethod
+    def _ohlcv(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """OHLCV columns as float64 arrays plus suffix extremes for fill/sweep checks"""
+        arrays = {
+            col: df[col].to_numpy(dtype=np.float64)
+            for col in ('open', 'high', 'low', 'close', 'volume') if col in df.columns
+        }
+        # suffix_high[k] = max(high[k:]), ignoring NaN like pandas max()
+        arrays['suffix_high'] = np.fmax.accumulate(arrays['high'][::-1])[::-1]
+        arrays['suffix_low'] = np.fmin.accumulate(arrays['low'][::-1])[::-1]
+        return arrays
+
+    @staticmethod
+    def _timestamp(index: pd.Index, i: int):
+        value = index[i]
+        return value if hasattr(value, 'strftime') else None
+
+    def _order_blocks(self, a: Dict[str, np.ndarray], index: pd.Index) -> List[Dict]:
+        o, h, l, c, v = a['open'], a['high'], a['low'], a['close'], a['volume']
+        n = len(c)
+        if n < 4:
+            return []
+
+        i = np.arange(2, n - 1)
+        nxt = i + 1
+        bullish = (c[i] < o[i]) & (c[nxt] > o[nxt]) & (c[nxt] > h[i])
+        bearish = ~bullish & (c[i] > o[i]) & (c[nxt] < o[nxt]) & (c[nxt] < l[i])
+
+        hits = i[bullish | bearish]
+        if not len(hits):
+            return []
+        is_bull = bullish[hits - 2]
+
+        # Mean volume of up to 20 prior bars (NaN skipped, as Series.mean does)
+        valid = ~np.isnan(v)
+        volume_sum = np.concatenate(([0.0], np.cumsum(np.where(valid, v, 0.0))))
+        volume_count = np.concatenate(([0], np.cumsum(valid)))
+        window_start = np.maximum(hits - 20, 0)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            avg_volume = (volume_sum[hits] - volume_sum[window_start]) / \
+                         (volume_count[hits] - volume_count[window_start])
+            volume_score = np.where(avg_volume > 0, np.minimum(25, v[hits] / avg_volume * 10), 0)
+            impulse = np.where(
+                is_bull,
+                (c[hits + 1] - l[hits]) / l[hits],
+                (h[hits] - c[hits + 1]) / h[hits]
+            )
+        strength = np.minimum(100, np.trunc(50 + volume_score + np.minimum(25, impulse * 1000)))
+
+        tops = h[hits].tolist()
+        bottoms = l[hits].tolist()
+        midpoints = ((h[hits] + l[hits]) / 2).tolist()
+        volumes = v[hits].tolist()
+
+        return [
+            {
+                'type': 'BULLISH_OB' if bull else 'BEARISH_OB',
+                'top': tops[k],
+                'bottom': bottoms[k],
+                'midpoint': midpoints[k],
+                'index': idx,
+                'timestamp': self._timestamp(index, idx),
+                'strength': int(strength[k]),
+                'volume': int(volumes[k]),
+                'mitigated': False
+            }
+            for k, (idx, bull) in enumerate(zip(hits.tolist(), is_bull.tolist()))
+        ]
+
+    def _fair_value_gaps(self, a: Dict[str, np.ndarray], index: pd.Index) -> List[Dict]:
+        h, l, c = a['high'], a['low'], a['close']
+        n = len(c)
+        if n < 3:
+            return []
+
+        bullish = l[2:] > h[:-2]
+        bearish = ~bullish & (h[2:] < l[:-2])
+        top = np.where(bullish, l[2:], l[:-2])
+        bottom = np.where(bullish, h[:-2], h[2:])
+        gap_size = top - bottom
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gap_pct = (gap_size / c[:-2]) * 100
+
+        hits = np.flatnonzero((bullish | bearish) & (gap_pct >= self.min_fvg_pct))
+        if not len(hits):
+            return []
+
+        is_bull = bullish[hits]
+        top, bottom, gap_size, gap_pct = top[hits], bottom[hits], gap_size[hits], gap_pct[hits]
+
+        # Fill check against the extreme of everything from i+3 onwards
+        start = hits + 3
+        has_after = start < n
+        after = np.minimum(start, n - 1)
+        reentry = np.where(is_bull, a['suffix_low'][after], a['suffix_high'][after])
+
+        with np.errstate(invalid='ignore'):
+            entered = has_after & np.where(is_bull, reentry <= top, reentry >= bottom)
+            fill_amount = np.where(is_bull,
+                                   top - np.maximum(reentry, bottom),
+                                   np.minimum(reentry, top) - bottom)
+            fill_pct = np.where(entered, fill_amount / gap_size * 100, 0.0)
+
+        records = zip(hits.tolist(), is_bull.tolist(), top.tolist(), bottom.tolist(),
+                      ((top + bottom) / 2).tolist(), gap_size.tolist(), gap_pct.tolist(),
+                      (entered & (fill_pct >= 50)).tolist(), fill_pct.tolist())
+
+        return [
+            {
+                'type': 'BULLISH_FVG' if bull else 'BEARISH_FVG',
+                'top': t,
+                'bottom': b,
+                'midpoint': mid,
+                'index': idx,
+                'timestamp': self._timestamp(index, idx),
+                'gap_size': size,
+                'gap_pct': pct,
+                'filled': filled,
+                'fill_percentage': fill
+            }
+            for idx, bull, t, b, mid, size, pct, filled, fill in records
+        ]
+
+    def _swing_indices(self, values: np.ndarray, highs: bool) -> np.ndarray:
+        """
+        Bars strictly above (highs) or below (lows) every other bar within
+        swing_window on both sides.
+        """
+        w = self.swing_window
+        n = len(values)
+        centers = np.arange(w, n - w)
+        if w <= 0 or not len(centers):
+            return centers
+
+        # edge[k] = extreme of values[k:k+w]; NaN neighbours never block, as in the bar loop
+        reducer = np.fmax if highs else np.fmin
+        edge = reducer.reduce(sliding_window_view(values, w), axis=1)
+        left = edge[centers - w]
+        right = edge[centers + 1]
+        center = values[centers]
+
+        if highs:
+            blocked = (left >= center) | (right >= center)
+        else:
+            blocked = (left <= center) | (right <= center)
+        return centers[~blocked]
+
+    def _swing_points(self, values: np.ndarray, idx: np.ndarray, index: pd.Index) -> List[Dict]:
+        return [
+            {'price': price, 'index': i, 'timestamp': self._timestamp(index, i)}
+            for i, price in zip(idx.tolist(), values[idx].tolist())
+        ]
+
+    def _find_swing_highs(self, df: pd.DataFrame) -> List[Dict]:
+        """Find swing highs (local maxima)"""
+        high = df['high'].to_numpy(dtype=np.float64)
+        return self._swing_points(high, self._swing_indices(high, highs=True), df.index)
+
+    def _find_swing_lows(self, df: pd.DataFrame) -> List[Dict]:
+        """Find swing lows (local minima)"""
+        low = df['low'].to_numpy(dtype=np.float64)
+        return self._swing_points(low, self._swing_indices(low, highs=False), df.index)
+
+    def _market_structure(self, a: Dict[str, np.ndarray], index: pd.Index,
+                          swing_high_idx: np.ndarray, swing_low_idx: np.ndarray) -> Dict:
+        swing_highs = self._swing_points(a['high'], swing_high_idx, index)
+        swing_lows = self._swing_points(a['low'], swing_low_idx, index)
 
         if len(swing_highs) < 3 or len(swing_lows) < 3:
             return {'bos': [], 'choch': [], 'current_trend': 'NEUTRAL'}
 
-        structure_breaks = []
-        current_trend = self._determine_trend(df, swing_highs, swing_lows)
+        current_trend = self._determine_trend(None, swing_highs, swing_lows)
+        close = a['close']
+        bars = np.arange(len(close))
 
-        for i in range(len(df)):
-            if i < self.swing_window:
-                continue
+        # Extreme of the last three swings confirmed strictly before each bar
+        breaks_up = close > self._recent_swing_extreme(a['high'][swing_high_idx], swing_high_idx, bars, np.max)
+        breaks_down = close < self._recent_swing_extreme(a['low'][swing_low_idx], swing_low_idx, bars, np.min)
 
-            current_price = df['close'].iloc[i]
+        structure_breaks = []
 
+        def record(kind, direction, i):
+            structure_breaks.append({
+                'type': kind,
+                'direction': direction,
+                'price': float(close[i]),
+                'index': int(i),
+                'timestamp': self._timestamp(index, i)
+            })
+
+        # The trend only changes on a break, so walk the break bars alone
+        events = np.flatnonzero((breaks_up | breaks_down) & (bars >= self.swing_window))
+        for i in events.tolist():
             if current_trend == 'BULLISH':
-                # Look for BOS (break above previous high)
-                recent_highs = [h['price'] for h in swing_highs if h['index'] < i]
-                if recent_highs and current_price > max(recent_highs[-3:]):
-                    structure_breaks.append({
-                        'type': 'BOS',
-                        'direction': 'BULLISH',
-                        'price': float(current_price),
-                        'index': int(i),
-                        'timestamp': df.index[i] if hasattr(df.index[i], 'strftime') else None
-                    })
-
-                # Look for CHoCH (break below recent low = reversal)
-                recent_lows = [l['price'] for l in swing_lows if l['index'] < i]
-                if recent_lows and current_price < min(recent_lows[-3:]):
-                    structure_breaks.append({
-                        'type': 'CHOCH',
-                        'direction': 'BEARISH',
-                        'price': float(current_price),
-                        'index': int(i),
-                        'timestamp': df.index[i] if hasattr(df.index[i], 'strftime') else None
-                    })
+                if breaks_up[i]:
+                    record('BOS', 'BULLISH', i)
+                if breaks_down[i]:
+                    record('CHOCH', 'BEARISH', i)
                     current_trend = 'BEARISH'
 
             elif current_trend == 'BEARISH':
-                # Look for BOS (break below previous low)
-                recent_lows = [l['price'] for l in swing_lows if l['index'] < i]
-                if recent_lows and current_price < min(recent_lows[-3:]):
-                    structure_breaks.append({
-                        'type': 'BOS',
-                        'direction': 'BEARISH',
-                        'price': float(current_price),
-                        'index': int(i),
-                        'timestamp': df.index[i] if hasattr(df.index[i], 'strftime') else None
-                    })
-
-                # Look for CHoCH (break above recent high = reversal)
-                recent_highs = [h['price'] for h in swing_highs if h['index'] < i]
-                if recent_highs and current_price > max(recent_highs[-3:]):
-                    structure_breaks.append({
-                        'type': 'CHOCH',
-                        'direction': 'BULLISH',
-                        'price': float(current_price),
-                        'index': int(i),
-                        'timestamp': df.index[i] if hasattr(df.index[i], 'strftime') else None
-                    })
+                if breaks_down[i]:
+                    record('BOS', 'BEARISH', i)
+                if breaks_up[i]:
+                    record('CHOCH', 'BULLISH', i)
                     current_trend = 'BULLISH'
 
-        logger.info(f"Detected {len(structure_breaks)} structure breaks")
-
         return {
             'bos': [s for s in structure_breaks if s['type'] == 'BOS'],
             'choch': [s for s in structure_breaks if s['type'] == 'CHOCH'],
@@ -272,114 +353,74 @@ class SmartMoneyIndicators:
             'swing_lows': swing_lows
         }
 
-    def detect_liquidity_pools(self, df: pd.DataFrame) -> List[Dict]:
-        """
-        Detect liquidity pools (stop loss clusters)
+    @staticmethod
+    def _recent_swing_extreme(prices: np.ndarray, swing_idx: np.ndarray,
+                              bars: np.ndarray, reducer) -> np.ndarray:
+        """Per bar, reducer over the (up to) three latest swings before it; NaN if none"""
+        fill = -np.inf if reducer is np.max else np.inf
+        last_three = reducer(sliding_window_view(np.concatenate(([fill, fill], prices)), 3), axis=1)
 
-        Buy-side liquidity: Above recent swing highs
-        Sell-side liquidity: Below recent swing lows
-        """
-        swing_highs = self._find_swing_highs(df)
-        swing_lows = self._find_swing_lows(df)
+        count = np.searchsorted(swing_idx, bars, side='left')
+        return np.where(count > 0, last_three[np.maximum(count - 1, 0)], np.nan)
 
+    def _liquidity_pools(self, a: Dict[str, np.ndarray],
+                         swing_high_idx: np.ndarray, swing_low_idx: np.ndarray) -> List[Dict]:
+        n = len(a['close'])
         liquidity_pools = []
 
-        # Buy-side liquidity (above highs)
-        for high in swing_highs:
-            # Check if multiple highs cluster nearby (within 2%)
-            nearby_highs = [h for h in swing_highs
-                           if abs(h['price'] - high['price']) / high['price'] < 0.02]
-
-            if len(nearby_highs) >= self.min_liquidity_touches:
-                liquidity_pools.append({
-                    'type': 'BUY_SIDE_LIQUIDITY',
-                    'price': float(high['price']),
-                    'touches': len(nearby_highs),
-                    'strength': len(nearby_highs) * 10,
-                    'swept': False,
-                    'indices': [h['index'] for h in nearby_highs]
-                })
-
-        # Sell-side liquidity (below lows)
-        for low in swing_lows:
-            nearby_lows = [l for l in swing_lows
-                          if abs(l['price'] - low['price']) / low['price'] < 0.02]
+        sides = (
+            ('BUY_SIDE_LIQUIDITY', swing_high_idx, a['high']),
+            ('SELL_SIDE_LIQUIDITY', swing_low_idx, a['low']),
+        )
+        for pool_type, swing_idx, values in sides:
+            prices = values[swing_idx]
+            for pos, members in self._price_clusters(prices):
+                indices = swing_idx[members]
+                price = float(prices[pos])
+
+                # Swept if price trades through the level after the last touch
+                after = int(indices[-1]) + 1
+                if after >= n:
+                    swept = False
+                elif pool_type == 'BUY_SIDE_LIQUIDITY':
+                    swept = bool(a['suffix_high'][after] > price * 1.001)
+                else:
+                    swept = bool(a['suffix_low'][after] < price * 0.999)
 
-            if len(nearby_lows) >= self.min_liquidity_touches:
                 liquidity_pools.append({
-                    'type': 'SELL_SIDE_LIQUIDITY',
-                    'price': float(low['price']),
-                    'touches': len(nearby_lows),
-                    'strength': len(nearby_lows) * 10,
-                    'swept': False,
-                    'indices': [l['index'] for l in nearby_lows]
+                    'type': pool_type,
+                    'price': price,
+                    'touches': len(members),
+                    'strength': len(members) * 10,
+                    'swept': swept,
+                    'indices': indices.tolist()
                 })
 
-        # Check which pools have been swept
-        for pool in liquidity_pools:
-            pool['swept'] = self._check_liquidity_swept(df, pool)
-
-        logger.info(f"Detected {len(liquidity_pools)} liquidity pools")
         return liquidity_pools
 
-    def _check_liquidity_swept(self, df: pd.DataFrame, pool: Dict) -> bool:
-        """Check if liquidity has been swept"""
-        max_index = max(pool['indices'])
-        if max_index >= len(df) - 1:
-            return False
-
-        subsequent_prices = df.iloc[max_index + 1:]
-
-        if pool['type'] == 'BUY_SIDE_LIQUIDITY':
-            # Check if price swept above
-            return subsequent_prices['high'].max() > pool['price'] * 1.001
-        else:
-            # Check if price swept below
-            return subsequent_prices['low'].min() < pool['price'] * 0.999
-
-    def _find_swing_highs(self, df: pd.DataFrame) -> List[Dict]:
-        """Find swing highs (local maxima)"""
-        swing_highs = []
-
-        for i in range(self.swing_window, len(df) - self.swing_window):
-            is_swing_high = True
-
-            # Check if highest in window
-            for j in range(i - self.swing_window, i + self.swing_window + 1):
-                if j != i and df['high'].iloc[j] >= df['high'].iloc[i]:
-                    is_swing_high = False
-                    break
-
-            if is_swing_high:
-                swing_highs.append({
-                    'price': float(df['high'].iloc[i]),
-                    'index': int(i),
-                    'timestamp': df.index[i] if hasattr(df.index[i], 'strftime') else None
-                })
+    def _price_clusters(self, prices: np.ndarray):
+        """
+        Yield (position, member positions) for every swing with at least
+        min_liquidity_touches swings within 2% of its price.
+        """
+        if len(prices) < self.min_liquidity_touches:
+            return
 
-        return swing_highs
+        order = np.argsort(prices, kind='stable')
+        sorted_prices = prices[order]
 
-    def _find_swing_lows(self, df: pd.DataFrame) -> List[Dict]:
-        """Find swing lows (local minima)"""
-        swing_lows = []
-
-        for i in range(self.swing_window, len(df) - self.swing_window):
-            is_swing_low = True
-
-            # Check if lowest in window
-            for j in range(i - self.swing_window, i + self.swing_window + 1):
-                if j != i and df['low'].iloc[j] <= df['low'].iloc[i]:
-                    is_swing_low = False
-                    break
-
-            if is_swing_low:
-                swing_lows.append({
-                    'price': float(df['low'].iloc[i]),
-                    'index': int(i),
-                    'timestamp': df.index[i] if hasattr(df.index[i], 'strftime') else None
-                })
+        # Slightly widened band gives a candidate superset; the exact test below decides
+        band = 0.02 * np.abs(prices) * (1 + 1e-9)
+        lo = np.searchsorted(sorted_prices, prices - band, side='left')
+        hi = np.searchsorted(sorted_prices, prices + band, side='right')
 
-        return swing_lows
+        for pos in np.flatnonzero(hi - lo >= self.min_liquidity_touches).tolist():
+            candidates = order[lo[pos]:hi[pos]]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                near = np.abs(prices[candidates] - prices[pos]) / prices[pos] < 0.02
+            members = np.sort(candidates[near])
+            if len(members) >= self.min_liquidity_touches:
+                yield pos, members
 
     def _determine_trend(self, df: pd.DataFrame, swing_highs: List[Dict], swing_lows: List[Dict]) -> str:
         """Determine current market trend"""
@@ -402,16 +443,6 @@ class SmartMoneyIndicators:
 
         return 'NEUTRAL'
 
-    def get_all_smc_indicators(self, df: pd.DataFrame) -> Dict:
-        """Get all Smart Money Concepts indicators at once"""
-        return {
-            'order_blocks': self.detect_order_blocks(df),
-            'fair_value_gaps': self.detect_fair_value_gaps(df),
-            'market_structure': self.detect_market_structure(df),
-            'liquidity_pools': self.detect_liquidity_pools(df)
-        }
-
-
 if __name__ == "__main__":
     # Test
     import yfinance as yf
@@ -1,10 +1,11 @@
 import numpy as np
 from datetime import datetime, timedelta
-from scipy.stats import norm
 from typing import List, Tuple
 from dataclasses import dataclass
 import pandas as pd
 
+from src.options_pricing import bs_greeks
+
 @dataclass
 class ThetaForecast:
     dates: List[datetime]
@@ -37,19 +38,8 @@ class ThetaCalculator:
         if T <= 0:
             return 0.0
 
-        d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
-        d2 = d1 - sigma * np.sqrt(T)
-
-        if option_type == 'put':
-            theta = ((-S * norm.pdf(d1) * sigma) / (2 * np.sqrt(T))
-                    + r * K * np.exp(-r * T) * norm.cdf(-d2))
-        else:  # call
-            theta = ((-S * norm.pdf(d1) * sigma) / (2 * np.sqrt(T))
-                    - r * K * np.exp(-r * T) * norm.cdf(d2))
-
-        # Convert annual theta to daily theta
-        daily_theta = theta / 365
-        return daily_theta
+        # Kernel theta is already per calendar day
+        return float(bs_greeks(S, K, T, r, sigma, option_type)['theta'])
 
     def calculate_forecast(self,
                           current_price: float,
@@ -93,59 +83,30 @@ class ThetaCalculator:
                 max_profit=entry_premium * quantity * 100
             )
 
-        # Generate daily forecasts
-        dates = []
-        days_remaining = []
-        theta_values = []
-        option_values = []
-        cumulative_pnl = []
-
-        for day in range(days_to_exp + 1):
-            forecast_date = today + timedelta(days=day)
-            days_left = days_to_exp - day
-            time_to_exp = days_left / 365.0  # Convert to years
-
-            # Calculate option value using Black-Scholes
-            if days_left > 0:
-                d1 = (np.log(current_price / strike_price) +
-                     (self.risk_free_rate + 0.5 * implied_volatility ** 2) * time_to_exp) / \
-                     (implied_volatility * np.sqrt(time_to_exp))
-                d2 = d1 - implied_volatility * np.sqrt(time_to_exp)
-
-                # Calculate option value based on type
-                if option_type == 'put':
-                    option_value = (strike_price * np.exp(-self.risk_free_rate * time_to_exp) * norm.cdf(-d2) -
-                                   current_price * norm.cdf(-d1))
-                else:  # call
-                    option_value = (current_price * norm.cdf(d1) -
-                                   strike_price * np.exp(-self.risk_free_rate * time_to_exp) * norm.cdf(d2))
-
-                # Theta calculation
-                theta = self.black_scholes_theta(
-                    current_price, strike_price, time_to_exp,
-                    self.risk_free_rate, implied_volatility, option_type
-                )
-            else:
-                # At expiration
-                if option_type == 'put':
-                    option_value = max(strike_price - current_price, 0)
-                else:  # call
-                    option_value = max(current_price - strike_price, 0)
-                theta = 0
-
-            # P/L calculation based on position type
-            if position_type == 'short':
-                # Short position: profit when option value decreases
-                pnl = (entry_premium - option_value) * quantity * 100
-            else:  # long
-                # Long position: profit when option value increases
-                pnl = (option_value - entry_premium) * quantity * 100
-
-            dates.append(forecast_date)
-            days_remaining.append(days_left)
-            theta_values.append(theta)
-            option_values.append(option_value)
-            cumulative_pnl.append(pnl)
+        # Generate daily forecasts - every remaining day is priced in one kernel call
+        days_remaining = np.arange(days_to_exp, -1, -1)
+        dates = [today + timedelta(days=day) for day in range(days_to_exp + 1)]
+
+        # At expiration (days_left == 0) the kernel returns intrinsic value and zero theta
+        greeks = bs_greeks(
+            current_price, strike_price, days_remaining / 365.0,
+            self.risk_free_rate, implied_volatility, option_type
+        )
+        option_values = greeks['price']
+        theta_values = greeks['theta']
+
+        # P/L calculation based on position type
+        if position_type == 'short':
+            # Short position: profit when option value decreases
+            cumulative_pnl = (entry_premium - option_values) * quantity * 100
+        else:  # long
+            # Long position: profit when option value increases
+            cumulative_pnl = (option_values - entry_premium) * quantity * 100
+
+        days_remaining = days_remaining.tolist()
+        theta_values = theta_values.tolist()
+        option_values = option_values.tolist()
+        cumulative_pnl = cumulative_pnl.tolist()
 
         total_decay = cumulative_pnl[-1] if cumulative_pnl else 0
         max_profit = entry_premium * quantity * 100
@@ -15,6 +15,13 @@ Features:
 - Rate limiting and backpressure handling
 - Message persistence and replay
 
+Fan-out:
+    Each broadcast is serialized once and put on a bounded send queue per
+    client; a writer task per client drains its queue. A slow dashboard tab
+    only falls behind itself. When a queue is full the oldest message is
+    dropped, and on latest-value channels (price ticks, game scores) a new
+    message replaces the pending one for the same symbol or game.
+
 Benefits:
 - Zero polling overhead - push-based updates
 - Sub-second latency for price updates
@@ -64,6 +71,13 @@ import queue
 
 logger = logging.getLogger(__name__)
 
+# Channel -> data field naming a latest-value stream; a newer message for the
+# same stream replaces the one still waiting in a client's queue
+DEFAULT_COALESCE_KEYS = {
+    'prices': 'symbol',
+    'game_scores': 'game_id',
+}
+
 
 @dataclass
 class WebSocketMessage:
@@ -74,6 +88,70 @@ class WebSocketMessage:
     message_id: str = field(default_factory=lambda: str(time.time()))
 
 
+class ClientSendQueue:
+    """
+    Bounded outbound queue for one client, drained by its writer task.
+
+    Entries are [channel, payload, coalesce_key, enqueued_at] lists so a
+    coalesced message can take over the pending entry in place.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = max(1, maxsize)
+        self.pending: deque = deque()
+        self.keyed: Dict[Any, list] = {}
+        self.ready = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def put(self, channel: Optional[str], payload: str, key: Any = None):
+        """
+        Queue a serialized message without blocking.
+
+        Returns:
+            (coalesced, dropped_channel): whether a pending message with the same
+            key was replaced, and the channel of the oldest message dropped to
+            make room (None if nothing was dropped)
+        """
+        now = time.perf_counter()
+
+        if key is not None:
+            entry = self.keyed.get(key)
+            if entry is not None:
+                entry[1] = payload
+                entry[3] = now
+                return True, None
+
+        dropped = None
+        if len(self.pending) >= self.maxsize:
+            oldest = self.pending.popleft()
+            self._forget(oldest)
+            dropped = oldest[0]
+
+        entry = [channel, payload, key, now]
+        self.pending.append(entry)
+        if key is not None:
+            self.keyed[key] = entry
+
+        self.ready.set()
+        return False, dropped
+
+    async def get(self) -> list:
+        """Wait for and remove the oldest queued message."""
+        while not self.pending:
+            self.ready.clear()
+            await self.ready.wait()
+
+        entry = self.pending.popleft()
+        self._forget(entry)
+        return entry
+
+    def _forget(self, entry: list):
+        if entry[2] is not None and self.keyed.get(entry[2]) is entry:
+            del self.keyed[entry[2]]
+
+
 class WebSocketServer:
     """
     WebSocket server for real-time data streaming.
@@ -88,7 +166,10 @@ class WebSocketServer:
         port: int = 8765,
         max_connections: int = 1000,
         message_buffer_size: int = 100,
-        enable_compression: bool = True
+        enable_compression: bool = True,
+        send_queue_size: int = 256,
+        coalesce_keys: Optional[Dict[str, str]] = None,
+        latency_window: int = 1000
     ):
         """
         Initialize WebSocket server.
@@ -99,20 +180,30 @@ class WebSocketServer:
             max_connections: Maximum concurrent connections
             message_buffer_size: Message buffer size per channel
             enable_compression: Enable WebSocket compression
+            send_queue_size: Maximum queued outbound messages per client
+            coalesce_keys: Channel -> data field whose pending messages are
+                replaced by newer ones (default: DEFAULT_COALESCE_KEYS)
+            latency_window: Recent deliveries kept per channel for latency stats
         """
         self.host = host
         self.port = port
         self.max_connections = max_connections
         self.message_buffer_size = message_buffer_size
         self.enable_compression = enable_compression
+        self.send_queue_size = send_queue_size
+        self.coalesce_keys = DEFAULT_COALESCE_KEYS if coalesce_keys is None else coalesce_keys
 
         # Active connections by client ID
         self.connections: Dict[str, websockets.WebSocketServerProtocol] = {}
 
+        # Outbound queues and their writer tasks by client ID
+        self.send_queues: Dict[int, ClientSendQueue] = {}
+        self.send_tasks: Dict[int, asyncio.Task] = {}
+
         # Subscriptions: channel -> set of client IDs
         self.subscriptions: Dict[str, Set[str]] = defaultdict(set)
 
-        # Message buffers by channel (for late subscribers)
+        # Serialized (payload, coalesce_key) buffers by channel (for late subscribers)
         self.message_buffers: Dict[str, deque] = defaultdict(
             lambda: deque(maxlen=message_buffer_size)
         )
@@ -123,17 +214,28 @@ class WebSocketServer:
             'active_connections': 0,
             'messages_sent': 0,
             'messages_failed': 0,
+            'messages_dropped': 0,
+            'messages_coalesced': 0,
             'channels_active': 0,
         }
 
+        # Per-channel delivery counters and recent latencies (seconds)
+        self.channel_stats: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {'published': 0, 'delivered': 0, 'dropped': 0, 'coalesced': 0, 'failed': 0}
+        )
+        self.channel_latency: Dict[str, deque] = defaultdict(
+            lambda: deque(maxlen=latency_window)
+        )
+
         # Server task
         self.server_task = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
         self.is_running = False
 
         # Lock for thread safety
         self.lock = threading.Lock()
 
-    async def _handle_client(self, websocket: websockets.WebSocketServerProtocol, path: str):
+    async def _handle_client(self, websocket: websockets.WebSocketServerProtocol, path: str = None):
         """
         Handle individual client connection.
 
@@ -154,6 +256,8 @@ class WebSocketServer:
                 self.stats['total_connections'] += 1
                 self.stats['active_connections'] = len(self.connections)
 
+            self._open_send_queue(client_id, websocket)
+
             logger.info(f"Client {client_id} connected from {websocket.remote_address}")
 
             # Handle messages from client
@@ -171,7 +275,7 @@ class WebSocketServer:
                         await self._unsubscribe_client(client_id, channel)
 
                     elif action == 'ping':
-                        await websocket.send(json.dumps({'action': 'pong'}))
+                        self._enqueue(client_id, None, json.dumps({'action': 'pong'}))
 
                 except json.JSONDecodeError:
                     logger.warning(f"Invalid JSON from client {client_id}")
@@ -183,13 +287,96 @@ class WebSocketServer:
 
         finally:
             # Cleanup on disconnect
+            self._remove_client(client_id)
+
+    def _open_send_queue(self, client_id: int, websocket: websockets.WebSocketServerProtocol):
+        """Create a client's send queue and start its writer task."""
+        sender = ClientSendQueue(self.send_queue_size)
+        self.send_queues[client_id] = sender
+        self.send_tasks[client_id] = asyncio.ensure_future(
+            self._drain_send_queue(client_id, websocket, sender)
+        )
+
+    def _remove_client(self, client_id: int):
+        """Forget a client and stop its writer task."""
+        with self.lock:
+            self.connections.pop(client_id, None)
+            self.stats['active_connections'] = len(self.connections)
+
+            # Remove from all subscriptions
+            for channel_subs in self.subscriptions.values():
+                channel_subs.discard(client_id)
+
+        self.send_queues.pop(client_id, None)
+        task = self.send_tasks.pop(client_id, None)
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+    async def _drain_send_queue(
+        self,
+        client_id: int,
+        websocket: websockets.WebSocketServerProtocol,
+        sender: ClientSendQueue
+    ):
+        """
+        Deliver a client's queued messages in order.
+
+        Args:
+            client_id: Client identifier
+            websocket: WebSocket connection
+            sender: The client's send queue
+        """
+        while True:
+            channel, payload, _, enqueued_at = await sender.get()
+
+            try:
+                await websocket.send(payload)
+
+            except websockets.exceptions.ConnectionClosed:
+                logger.warning(f"Connection closed for client {client_id}")
+                self._remove_client(client_id)
+                return
+
+            except Exception as e:
+                logger.error(f"Failed to send message to {client_id}: {e}")
+                with self.lock:
+                    self.stats['messages_failed'] += 1
+                    if channel is not None:
+                        self.channel_stats[channel]['failed'] += 1
+                continue
+
+            if channel is None:
+                continue  # Control message (confirmation, pong)
+
             with self.lock:
-                self.connections.pop(client_id, None)
-                self.stats['active_connections'] = len(self.connections)
+                self.stats['messages_sent'] += 1
+                self.channel_stats[channel]['delivered'] += 1
+                self.channel_latency[channel].append(time.perf_counter() - enqueued_at)
+
+    def _enqueue(self, client_id: int, channel: Optional[str], payload: str, key: Any = None):
+        """
+        Queue a serialized message for one client.
 
-                # Remove from all subscriptions
-                for channel_subs in self.subscriptions.values():
-                    channel_subs.discard(client_id)
+        Returns:
+            (coalesced, dropped_channel) from ClientSendQueue.put, or
+            (False, None) if the client is gone
+        """
+        sender = self.send_queues.get(client_id)
+        if sender is None:
+            return False, None
+        return sender.put(channel, payload, key)
+
+    def _coalesce_key(self, channel: str, message: Dict[str, Any]) -> Any:
+        """Key of the latest-value stream a message belongs to, if any."""
+        field_name = self.coalesce_keys.get(channel)
+        if field_name is None:
+            return None
+
+        data = message.get('data')
+        if not isinstance(data, dict) or data.get(field_name) is None:
+            return None
+
+        return (channel, data[field_name])
 
     async def _subscribe_client(
         self,
@@ -211,16 +398,15 @@ class WebSocketServer:
 
         logger.info(f"Client {client_id} subscribed to channel: {channel}")
 
-        # Send buffered messages
-        if channel in self.message_buffers:
-            for msg in self.message_buffers[channel]:
-                try:
-                    await websocket.send(json.dumps(msg))
-                except Exception as e:
-                    logger.error(f"Failed to send buffered message: {e}")
+        # Replay buffered messages (coalesced, so late subscribers get the latest ticks)
+        with self.lock:
+            buffered = list(self.message_buffers.get(channel, ()))
+
+        for payload, key in buffered:
+            self._enqueue(client_id, channel, payload, key)
 
         # Send confirmation
-        await websocket.send(json.dumps({
+        self._enqueue(client_id, None, json.dumps({
             'action': 'subscribed',
             'channel': channel
         }))
@@ -248,38 +434,38 @@ class WebSocketServer:
         """
         Broadcast message to all subscribers of a channel.
 
+        The message is serialized once and queued for every subscriber without
+        awaiting any send; each client's writer task delivers it.
+
         Args:
             channel: Channel name
             message: Message data
         """
+        payload = json.dumps(message)
+        key = self._coalesce_key(channel, message)
+
         # Add to buffer
         with self.lock:
-            self.message_buffers[channel].append(message)
-
-            if channel not in self.subscriptions:
-                return  # No subscribers
+            self.message_buffers[channel].append((payload, key))
+            self.channel_stats[channel]['published'] += 1
+            subscribers = list(self.subscriptions.get(channel, ()))
 
-            subscribers = list(self.subscriptions[channel])
+        coalesced = 0
+        dropped: Dict[str, int] = defaultdict(int)
 
-        # Send to all subscribers
         for client_id in subscribers:
-            websocket = self.connections.get(client_id)
-            if not websocket:
-                continue
+            was_coalesced, dropped_channel = self._enqueue(client_id, channel, payload, key)
+            coalesced += was_coalesced
+            if dropped_channel is not None:
+                dropped[dropped_channel] += 1
 
-            try:
-                await websocket.send(json.dumps(message))
-                self.stats['messages_sent'] += 1
-
-            except websockets.exceptions.ConnectionClosed:
-                logger.warning(f"Connection closed for client {client_id}")
-                with self.lock:
-                    self.connections.pop(client_id, None)
-                    self.subscriptions[channel].discard(client_id)
-
-            except Exception as e:
-                logger.error(f"Failed to send message to {client_id}: {e}")
-                self.stats['messages_failed'] += 1
+        if coalesced or dropped:
+            with self.lock:
+                self.stats['messages_coalesced'] += coalesced
+                self.channel_stats[channel]['coalesced'] += coalesced
+                for dropped_channel, count in dropped.items():
+                    self.stats['messages_dropped'] += count
+                    self.channel_stats[dropped_channel]['dropped'] += count
 
     def publish(self, channel: str, data: Dict[str, Any]):
         """
@@ -296,10 +482,10 @@ class WebSocketServer:
         }
 
         # Schedule broadcast
-        if self.is_running:
+        if self.is_running and self.loop is not None:
             asyncio.run_coroutine_threadsafe(
                 self._broadcast_to_channel(channel, message),
-                self.server_task.get_loop()
+                self.loop
             )
 
     def start(self):
@@ -313,6 +499,7 @@ class WebSocketServer:
             asyncio.set_event_loop(loop)
 
             async def serve():
+                self.loop = asyncio.get_running_loop()
                 self.is_running = True
                 logger.info(f"WebSocket server starting on ws://{self.host}:{self.port}")
 
@@ -330,6 +517,7 @@ class WebSocketServer:
                 logger.error(f"Server error: {e}")
             finally:
                 self.is_running = False
+                self.loop = None
                 loop.close()
 
         self.server_task = threading.Thread(target=run_server, daemon=True)
@@ -343,9 +531,32 @@ class WebSocketServer:
         logger.info("WebSocket server stopped")
 
     def get_stats(self) -> Dict[str, Any]:
-        """Get server statistics."""
+        """
+        Get server statistics.
+
+        Includes a 'channels' entry with per-channel delivery counters and
+        latency (queue to socket, milliseconds) over recent deliveries.
+        """
         with self.lock:
-            return dict(self.stats)
+            stats = dict(self.stats)
+            stats['messages_queued'] = sum(len(sender) for sender in list(self.send_queues.values()))
+            stats['channels'] = {
+                channel: {**counters, **self._latency_summary(self.channel_latency.get(channel, ()))}
+                for channel, counters in self.channel_stats.items()
+            }
+            return stats
+
+    @staticmethod
+    def _latency_summary(latencies) -> Dict[str, float]:
+        if not latencies:
+            return {'latency_ms_avg': 0.0, 'latency_ms_p95': 0.0, 'latency_ms_max': 0.0}
+
+        ordered = sorted(latencies)
+        return {
+            'latency_ms_avg': 1000 * sum(ordered) / len(ordered),
+            'latency_ms_p95': 1000 * ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+            'latency_ms_max': 1000 * ordered[-1],
+        }
 
 
 class StreamlitWebSocketClient:
@@ -507,6 +718,7 @@ def realtime_data_stream(channel: str, server_url: str = "ws://localhost:8765"):
 # Convenience exports
 __all__ = [
     'WebSocketServer',
+    'ClientSendQueue',
     'StreamlitWebSocketClient',
     'WebSocketMessage',
     'realtime_data_stream',
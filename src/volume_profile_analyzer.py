@@ -1,15 +1,158 @@
 """
 Volume Profile Analysis
 POC, Value Area, High/Low Volume Nodes
+
+Profiles are built from per-candle bin ranges with difference arrays
+(O(candles + bins)); rolling profiles slide a fixed price grid, adding the
+entering candle and subtracting the leaving one.
 """
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+ROLLING_CHUNK_VALUES = 2_000_000  # rolling histogram cells materialized per chunk
+MAX_ROLLING_BINS = 5000
+
+
+def overlap_bin_ranges(lows: np.ndarray, highs: np.ndarray,
+                       bottoms: np.ndarray, tops: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    First and last bin (inclusive) each candle overlaps.
+
+    A candle touches bin b when high >= bottoms[b] and low <= tops[b];
+    first > last means it touches none.
+    """
+    first = np.searchsorted(tops, lows, side='left')
+    last = np.searchsorted(bottoms, highs, side='right') - 1
+    return first, last
+
+
+def nearest_level_bins(prices: np.ndarray, levels: np.ndarray) -> np.ndarray:
+    """Index of the nearest ascending price level (lower level on ties)"""
+    upper = np.clip(np.searchsorted(levels, prices, side='left'), 0, len(levels) - 1)
+    lower = np.maximum(upper - 1, 0)
+    take_lower = np.abs(levels[lower] - prices) <= np.abs(levels[upper] - prices)
+    return np.where(take_lower, lower, upper)
+
+
+def _range_weights(first: np.ndarray, last: np.ndarray,
+                   volumes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Touching candles' (first, last, volume per touched bin)"""
+    touched = last >= first
+    first, last = first[touched], last[touched]
+    return first, last, volumes[touched] / (last - first + 1)
+
+
+def volume_histogram(first: np.ndarray, last: np.ndarray, volumes: np.ndarray,
+                     n_bins: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Spread each candle's volume evenly over its [first, last] bins.
+
+    Returns:
+        (volume per bin, number of candles touching each bin)
+    """
+    first, last, per_bin = _range_weights(first, last, volumes)
+
+    volume_diff = np.bincount(first, weights=per_bin, minlength=n_bins + 1)
+    volume_diff -= np.bincount(last + 1, weights=per_bin, minlength=n_bins + 1)
+    touch_diff = np.bincount(first, minlength=n_bins + 1) - np.bincount(last + 1, minlength=n_bins + 1)
+
+    return np.cumsum(volume_diff[:n_bins]), np.cumsum(touch_diff[:n_bins])
+
+
+def rolling_volume_histograms(first: np.ndarray, last: np.ndarray, volumes: np.ndarray,
+                              n_bins: int, window: int,
+                              chunk_rows: Optional[int] = None) -> Iterator[Tuple[int, int, np.ndarray]]:
+    """
+    Sliding-window histograms on a fixed grid.
+
+    The profile for step t covers candles [t - window, t): step t adds candle
+    t - 1 and removes candle t - 1 - window, so each step is O(1) updates to a
+    running difference array plus a prefix sum over the bins in use. Each
+    chunk of steps only materializes the band of bins its windows touch.
+
+    Yields:
+        (first step t, first bin b, histograms) where histograms[r, j] is the
+        volume in bin b + j at step t + r, for t from window through len(volumes);
+        bins outside the band are empty
+    """
+    n = len(volumes)
+    if n < window or window <= 0:
+        return
+
+    touched = last >= first
+    per_bin = np.where(touched, volumes / np.where(touched, last - first + 1, 1), 0.0)
+    start_col = np.where(touched, first, 0)
+    end_col = np.where(touched, last + 1, 0)
+    # Untouched candles never widen a chunk's band
+    band_low = np.where(touched, first, n_bins)
+    band_high = np.where(touched, last + 1, 0)
+
+    chunk_rows = chunk_rows or max(256, window)
+
+    # Running difference array, starting from the window before step `window`
+    carry = np.bincount(start_col[:window], weights=per_bin[:window], minlength=n_bins + 1)
+    carry -= np.bincount(end_col[:window], weights=per_bin[:window], minlength=n_bins + 1)
+
+    t0 = window
+    while t0 <= n:
+        t1 = min(t0 + chunk_rows, n + 1)
+
+        # Bin band covered by every candle in this chunk's windows
+        span = slice(max(0, t0 - 1 - window), t1 - 1)
+        col0 = int(min(band_low[span].min(), n_bins))
+        col1 = int(max(band_high[span].max(), col0))
+        width = col1 - col0 + 1
+
+        # Keep the materialized block bounded on very wide bands
+        t1 = min(t1, t0 + max(1, ROLLING_CHUNK_VALUES // width))
+        rows = np.arange(t1 - t0)
+
+        # Step t0 itself is the carried state; later steps add/remove one candle each
+        entering = np.arange(t0 - 1, t1 - 1)[1:]
+        leaving = entering - window
+        event_rows = rows[1:]
+
+        cells = np.concatenate([
+            event_rows * width + start_col[entering] - col0, event_rows * width + end_col[entering] - col0,
+            event_rows * width + start_col[leaving] - col0, event_rows * width + end_col[leaving] - col0,
+        ])
+        weights = np.concatenate([
+            per_bin[entering], -per_bin[entering], -per_bin[leaving], per_bin[leaving],
+        ])
+        # Untouched candles carry zero weight, so clipping their placeholder column is harmless
+        events = np.bincount(np.clip(cells, 0, len(rows) * width - 1), weights=weights,
+                             minlength=len(rows) * width).reshape(len(rows), width)
+
+        events[0] += carry[col0:col1 + 1]
+        diffs = np.cumsum(events, axis=0)
+
+        yield t0, col0, np.cumsum(diffs[:, :min(width, n_bins - col0)], axis=1)
+
+        # Advance the carried state to step t1
+        if t1 <= n:
+            carry[col0:col1 + 1] = diffs[-1]
+            enter, leave = t1 - 1, t1 - 1 - window
+            carry[start_col[enter]] += per_bin[enter]
+            carry[end_col[enter]] -= per_bin[enter]
+            carry[start_col[leave]] -= per_bin[leave]
+            carry[end_col[leave]] += per_bin[leave]
+        t0 = t1
+
+
+def rolling_bin_size(lows: np.ndarray, highs: np.ndarray, window: int, bins_per_window: int) -> float:
+    """Bin size giving a typical (median) rolling window about bins_per_window bins"""
+    if len(lows) < window or window <= 0:
+        return 0.0
+    window_low = pd.Series(lows).rolling(window).min().to_numpy()[window - 1:]
+    window_high = pd.Series(highs).rolling(window).max().to_numpy()[window - 1:]
+    typical_range = float(np.nanmedian(window_high - window_low))
+    return typical_range / bins_per_window if typical_range > 0 else 0.0
+
 
 class VolumeProfileAnalyzer:
     """
@@ -49,86 +192,73 @@ class VolumeProfileAnalyzer:
         Returns:
             Dictionary with POC, VAH, VAL, and volume distribution
         """
+        profile = self._profile(df)
+        if profile['volume_by_price']:
+            logger.info(f"Volume Profile calculated: POC=${profile['poc']:.2f}, "
+                        f"VA=[${profile['val']:.2f}, ${profile['vah']:.2f}]")
+        return profile
+
+    def _profile(self, df: pd.DataFrame) -> Dict:
         if len(df) == 0:
             return self._empty_profile()
 
+        lows = df['low'].to_numpy(dtype=np.float64)
+        highs = df['high'].to_numpy(dtype=np.float64)
+
         # Create price bins
-        price_min = df['low'].min()
-        price_max = df['high'].max()
+        price_min = np.nanmin(lows)
+        price_max = np.nanmax(highs)
         price_range = price_max - price_min
 
         if price_range == 0:
             return self._empty_profile()
 
         bin_size = price_range / self.price_bins
+        bottoms = price_min + np.arange(self.price_bins) * bin_size
+        bin_prices = bottoms + (bin_size / 2)
 
-        # Allocate volume to price bins
-        volume_by_price = {}
-
-        for i in range(len(df)):
-            candle_low = df['low'].iloc[i]
-            candle_high = df['high'].iloc[i]
-            candle_volume = df['volume'].iloc[i]
-
-            # Find which bins this candle touches
-            bins_touched = []
-            for bin_num in range(self.price_bins):
-                bin_bottom = price_min + (bin_num * bin_size)
-                bin_top = bin_bottom + bin_size
-
-                # Check if candle overlaps this bin
-                if candle_high >= bin_bottom and candle_low <= bin_top:
-                    bins_touched.append(bin_num)
+        # Allocate volume to the bins each candle overlaps
+        first, last = overlap_bin_ranges(lows, highs, bottoms, bottoms + bin_size)
+        volumes, touches = volume_histogram(first, last, df['volume'].to_numpy(dtype=np.float64),
+                                            self.price_bins)
 
-            # Distribute volume evenly across touched bins
-            if bins_touched:
-                volume_per_bin = candle_volume / len(bins_touched)
-                for bin_num in bins_touched:
-                    bin_price = price_min + (bin_num * bin_size) + (bin_size / 2)
-                    volume_by_price[bin_price] = volume_by_price.get(bin_price, 0) + volume_per_bin
-
-        if not volume_by_price:
+        touched = np.flatnonzero(touches > 0)
+        if not len(touched):
             return self._empty_profile()
 
-        # Find POC (highest volume)
-        poc_price = max(volume_by_price, key=volume_by_price.get)
-        poc_volume = volume_by_price[poc_price]
-
-        # Calculate Value Area (70% of volume)
-        total_volume = sum(volume_by_price.values())
-        value_area_volume = total_volume * self.value_area_pct
+        prices, volumes = bin_prices[touched], volumes[touched]
 
-        # Start from POC and expand until we have 70% of volume
-        sorted_prices = sorted(volume_by_price.keys(),
-                              key=lambda p: volume_by_price[p],
-                              reverse=True)
-
-        va_volume = 0
-        va_prices = []
-
-        for price in sorted_prices:
-            va_prices.append(price)
-            va_volume += volume_by_price[price]
-            if va_volume >= value_area_volume:
-                break
-
-        vah = max(va_prices)  # Value Area High
-        val = min(va_prices)  # Value Area Low
+        # Find POC (highest volume)
+        poc_idx = int(np.argmax(volumes))
 
-        logger.info(f"Volume Profile calculated: POC=${poc_price:.2f}, VA=[${val:.2f}, ${vah:.2f}]")
+        # Value Area: highest-volume bins until value_area_pct of volume
+        total_volume = volumes.sum()
+        va_count = self._value_area_counts(volumes[np.newaxis, :], total_volume * self.value_area_pct)[0]
+        va_bins = np.argsort(-volumes, kind='stable')[:va_count]
 
         return {
-            'poc': float(poc_price),
-            'poc_volume': float(poc_volume),
-            'vah': float(vah),
-            'val': float(val),
-            'value_area_volume': float(va_volume),
+            'poc': float(prices[poc_idx]),
+            'poc_volume': float(volumes[poc_idx]),
+            'vah': float(prices[va_bins].max()),  # Value Area High
+            'val': float(prices[va_bins].min()),  # Value Area Low
+            'value_area_volume': float(volumes[va_bins].sum()),
             'total_volume': float(total_volume),
-            'volume_by_price': {float(k): float(v) for k, v in volume_by_price.items()},
+            'volume_by_price': dict(zip(prices.tolist(), volumes.tolist())),
             'price_bins': self.price_bins,
             'bin_size': float(bin_size)
         }
 
+    @staticmethod
+    def _value_area_counts(volumes: np.ndarray, targets) -> np.ndarray:
+        """
+        Per row, how many of the highest-volume bins it takes to reach target
+        (all bins if the target is never reached).
+        """
+        ranked = -np.sort(-volumes, axis=1)
+        cumulative = np.cumsum(ranked, axis=1)
+        reached = cumulative >= np.reshape(targets, (-1, 1))
+        return np.where(reached.any(axis=1), reached.argmax(axis=1) + 1, volumes.shape[1])
+
     def identify_volume_nodes(self, volume_profile: Dict) -> Dict:
         """
         Identify High Volume Nodes (HVN) and Low Volume Nodes (LVN)
@@ -196,11 +326,13 @@ class VolumeProfileAnalyzer:
             return 0.0
 
         volume_data = volume_profile['volume_by_price']
+        if not volume_data:
+            return 0.0
 
         # Find closest price within tolerance
-        for vp_price, volume in volume_data.items():
-            if abs(vp_price - price) / price <= tolerance:
-                return float(volume)
+        closest = min(volume_data, key=lambda vp_price: abs(vp_price - price))
+        if abs(closest - price) / price <= tolerance:
+            return float(volume_data[closest])
 
         return 0.0
 
@@ -253,7 +385,9 @@ class VolumeProfileAnalyzer:
         """
         Calculate rolling volume profile (moving window)
 
-        Useful for dynamic POC tracking
+        Useful for dynamic POC tracking. Each profile uses its own window's
+        price grid; see calculate_rolling_poc for a fixed-grid sliding profile
+        over long histories.
 
         Args:
             df: Price data
@@ -266,7 +400,7 @@ class VolumeProfileAnalyzer:
 
         for i in range(window, len(df)):
             window_df = df.iloc[i-window:i]
-            profile = self.calculate_volume_profile(window_df)
+            profile = self._profile(window_df)
             profile['index'] = i
             profile['timestamp'] = df.index[i] if hasattr(df.index[i], 'strftime') else None
             profiles.append(profile)
@@ -274,6 +408,74 @@ class VolumeProfileAnalyzer:
         logger.info(f"Calculated {len(profiles)} rolling volume profiles")
         return profiles
 
+    def calculate_rolling_poc(
+        self,
+        df: pd.DataFrame,
+        window: int = 50,
+        bin_size: Optional[float] = None
+    ) -> pd.DataFrame:
+        """
+        Sliding-window POC and Value Area on one fixed price grid.
+
+        Row i profiles the `window` candles before it (no lookahead), matching
+        calculate_rolling_volume_profile's 'index'. Cost is O(candles x bins)
+        in vectorized chunks instead of a full profile per window.
+
+        Args:
+            df: Price data with 'high', 'low', 'volume'
+            window: Rolling window size
+            bin_size: Grid spacing (default: typical window range / price_bins)
+
+        Returns:
+            DataFrame indexed like df with poc, vah, val, total_volume
+            (NaN until a full window is available)
+        """
+        columns = ['poc', 'vah', 'val', 'total_volume']
+        values = np.full((len(df), len(columns)), np.nan)
+        if len(df) <= window or window <= 0:
+            return pd.DataFrame(values, index=df.index, columns=columns)
+
+        lows = df['low'].to_numpy(dtype=np.float64)
+        highs = df['high'].to_numpy(dtype=np.float64)
+        price_min = np.nanmin(lows)
+
+        bin_size = bin_size or rolling_bin_size(lows, highs, window, self.price_bins)
+        if not bin_size:
+            return pd.DataFrame(values, index=df.index, columns=columns)
+        n_bins = int(min(MAX_ROLLING_BINS, max(1, np.ceil((np.nanmax(highs) - price_min) / bin_size))))
+        bin_size = max(bin_size, (np.nanmax(highs) - price_min) / n_bins)
+
+        bottoms = price_min + np.arange(n_bins) * bin_size
+        bin_prices = bottoms + (bin_size / 2)
+        first, last = overlap_bin_ranges(lows, highs, bottoms, bottoms + bin_size)
+
+        for t0, col0, hists in rolling_volume_histograms(first, last, df['volume'].to_numpy(dtype=np.float64),
+                                                         n_bins, window):
+            rows = np.arange(t0, t0 + len(hists))
+            keep = rows < len(df)
+            rows, hists = rows[keep], hists[keep]
+            if not len(rows) or not hists.shape[1]:
+                continue
+
+            # Sliding sums leave tiny residues in empty bins
+            np.maximum(hists, 0.0, out=hists)
+            prices = bin_prices[col0:col0 + hists.shape[1]]
+            total = hists.sum(axis=1)
+            counts = self._value_area_counts(hists, total * self.value_area_pct)
+
+            order = np.argsort(-hists, axis=1, kind='stable')
+            in_va = np.arange(hists.shape[1]) < counts[:, np.newaxis]
+            va_prices = prices[order]
+
+            values[rows, 0] = prices[np.argmax(hists, axis=1)]
+            values[rows, 1] = np.where(in_va, va_prices, -np.inf).max(axis=1)
+            values[rows, 2] = np.where(in_va, va_prices, np.inf).min(axis=1)
+            values[rows, 3] = total
+            values[rows[total <= 0], :3] = np.nan
+
+        logger.info(f"Calculated rolling POC over {len(df)} candles ({n_bins} bins, window {window})")
+        return pd.DataFrame(values, index=df.index, columns=columns)
+
     def _empty_profile(self) -> Dict:
         """Return empty volume profile"""
         return {
@@ -8,11 +8,18 @@ Processes Xtrades alerts in real-time:
 - Detects closed alerts (CLOSE)
 - Enriches with market data
 - Triggers AI evaluation pipeline
+
+A monitoring cycle is diffed in one pass: the open trades of every scraped
+profile are loaded into an in-memory index keyed by alert ID, new / changed /
+closed trades are found with set operations, and all writes go out as
+batched statements in a single transaction.
 """
 
+import hashlib
 import logging
-from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Tuple
+from datetime import date, datetime, timedelta
+from decimal import Decimal
 from enum import Enum
 import psycopg2
 from psycopg2.extras import RealDictCursor, execute_values
@@ -43,6 +50,47 @@ class AlertType(Enum):
     UNKNOWN = "unknown"
 
 
+OPEN_TRADES_QUERY = """
+    SELECT id, profile_id, ticker, strategy, action, xtrades_alert_id, alert_text,
+           entry_price, strike_price, expiration_date, quantity, status, updated_at
+    FROM xtrades_trades
+    WHERE profile_id = ANY(%s) AND status = 'open'
+    FOR UPDATE SKIP LOCKED
+"""
+
+INSERT_TRADES_SQL = """
+    INSERT INTO xtrades_trades (
+        profile_id, ticker, strategy, action, entry_price,
+        entry_date, quantity, status, strike_price, expiration_date,
+        alert_text, alert_timestamp, xtrades_alert_id
+    ) VALUES %s
+    RETURNING *
+"""
+
+UPDATE_TRADES_SQL = """
+    UPDATE xtrades_trades AS t
+    SET entry_price = COALESCE(v.entry_price, t.entry_price),
+        quantity = COALESCE(v.quantity, t.quantity),
+        strike_price = COALESCE(v.strike_price, t.strike_price),
+        expiration_date = COALESCE(v.expiration_date, t.expiration_date),
+        alert_text = COALESCE(v.alert_text, t.alert_text),
+        updated_at = NOW()
+    FROM (VALUES %s) AS v (id, entry_price, quantity, strike_price, expiration_date, alert_text)
+    WHERE t.id = v.id
+    RETURNING t.*
+"""
+UPDATE_TRADES_TEMPLATE = "(%s::integer, %s::numeric, %s::integer, %s::numeric, %s::date, %s::text)"
+
+CLOSE_TRADES_SQL = """
+    UPDATE xtrades_trades
+    SET status = 'closed',
+        exit_date = NOW(),
+        updated_at = NOW()
+    WHERE id = ANY(%s)
+    RETURNING *
+"""
+
+
 class AlertProcessor:
     """
     Processes Xtrades trade alerts and detects events.
@@ -54,6 +102,13 @@ class AlertProcessor:
     - Prepare for AI evaluation
     """
 
+    # Fields that identify a position; hashed into the alert ID
+    IDENTITY_FIELDS = ('ticker', 'strategy', 'action', 'strike_price', 'expiration_date')
+
+    # Fields whose change makes an UPDATE event
+    CHECK_FIELDS = ('entry_price', 'quantity', 'strike_price',
+                    'expiration_date', 'alert_text', 'status')
+
     def __init__(self):
         """Initialize alert processor with database connection pool"""
         self.db_url = os.getenv("DATABASE_URL")
@@ -62,21 +117,49 @@ class AlertProcessor:
 
         # Get connection pool instance
         self.pool = get_db_pool()
+        self.last_cycle_stats: Dict[str, Any] = {}
         logger.info("Alert processor initialized with connection pooling")
 
     def process_scrape_results(self, profile_username: str,
-                               scraped_trades: List[Dict[str, Any]]) -> Dict[str, List[Dict]]:
+                               scraped_trades: List[Dict[str, Any]],
+                               detect_closed: bool = True) -> Dict[str, List[Dict]]:
         """
-        Process newly scraped trades and detect events with ACID transaction.
+        Process newly scraped trades for one profile.
 
         Args:
             profile_username: Username of the profile scraped
             scraped_trades: List of trades from latest scrape
+            detect_closed: Close open trades missing from the scrape. Pass
+                False for incremental scrapes, which only contain new alerts.
 
         Returns:
             Dict with keys: new_alerts, updated_alerts, closed_alerts
         """
-        # Use connection pool with context manager for automatic cleanup
+        return self.process_cycle({profile_username: scraped_trades}, detect_closed)[profile_username]
+
+    def process_cycle(self, scrapes: Dict[str, List[Dict[str, Any]]],
+                      detect_closed: bool = True) -> Dict[str, Dict[str, List[Dict]]]:
+        """
+        Diff a whole monitoring cycle against the database in one transaction.
+
+        Issues a fixed number of statements regardless of profile count:
+        profile lookup, open-trade load, and at most one batched insert,
+        update and close.
+
+        Args:
+            scrapes: Profile username -> trades from its latest scrape
+            detect_closed: Close open trades missing from their profile's scrape
+
+        Returns:
+            Profile username -> dict with keys new_alerts, updated_alerts, closed_alerts
+        """
+        results = {username: {'new_alerts': [], 'updated_alerts': [], 'closed_alerts': []}
+                   for username in scrapes}
+        if not scrapes:
+            return results
+
+        queries = 0
+
         with self.pool.get_connection() as conn:
             try:
                 # Set serializable isolation level to prevent race conditions
@@ -85,218 +168,242 @@ class AlertProcessor:
                 # Use transaction context - all or nothing
                 with conn:
                     with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                        # Get profile ID with row lock to prevent concurrent modifications
+                        # Lock the profiles to prevent concurrent cycles diffing them
                         cursor.execute(
-                            "SELECT id FROM xtrades_profiles WHERE username = %s FOR UPDATE",
-                            (profile_username,)
+                            "SELECT id, username FROM xtrades_profiles WHERE username = ANY(%s) FOR UPDATE",
+                            (list(scrapes),)
                         )
-                        profile_row = cursor.fetchone()
-                        if not profile_row:
-                            logger.error(f"Profile not found: {profile_username}")
-                            return {"new_alerts": [], "updated_alerts": [], "closed_alerts": []}
-
-                        profile_id = profile_row['id']
-
-                        # Get existing open trades with row locks (SKIP LOCKED prevents deadlocks)
-                        cursor.execute("""
-                            SELECT id, ticker, xtrades_alert_id, alert_text, entry_price,
-                                   strike_price, expiration_date, quantity, status, updated_at
-                            FROM xtrades_trades
-                            WHERE profile_id = %s AND status = %s
-                            FOR UPDATE SKIP LOCKED
-                        """, (profile_id, 'open'))
-
-                        existing_trades = {
-                            row['xtrades_alert_id']: dict(row)
-                            for row in cursor.fetchall()
-                            if row['xtrades_alert_id']
-                        }
-
-                        # Track scraped alert IDs
-                        scraped_alert_ids = set()
-
-                        # Results
-                        new_alerts = []
-                        updated_alerts = []
-                        closed_alerts = []
-
-                        # Process each scraped trade
-                        for trade in scraped_trades:
-                            alert_id = trade.get('xtrades_alert_id')
-                            if not alert_id:
-                                # Generate alert ID from trade details
-                                alert_id = self._generate_alert_id(trade)
-                                trade['xtrades_alert_id'] = alert_id
-
-                            scraped_alert_ids.add(alert_id)
-
-                            if alert_id in existing_trades:
-                                # Existing trade - check if updated
-                                existing = existing_trades[alert_id]
-
-                                if self._is_trade_updated(existing, trade):
-                                    # Trade has been updated
-                                    updated_trade = self._update_trade(cursor, existing['id'], trade)
-                                    updated_alerts.append({
-                                        'type': AlertType.UPDATE,
-                                        'trade_id': existing['id'],
-                                        'trade_data': updated_trade,
-                                        'changes': self._get_trade_changes(existing, trade)
-                                    })
-                            else:
-                                # New trade
-                                new_trade = self._insert_new_trade(cursor, profile_id, trade)
-                                new_alerts.append({
-                                    'type': AlertType.NEW,
-                                    'trade_id': new_trade['id'],
-                                    'trade_data': new_trade
-                                })
-
-                        # Check for closed trades (no longer in scrape results)
-                        for alert_id, existing_trade in existing_trades.items():
-                            if alert_id not in scraped_alert_ids:
-                                # Trade is no longer in active alerts - mark as closed
-                                closed_trade = self._close_trade(cursor, existing_trade['id'])
-                                closed_alerts.append({
-                                    'type': AlertType.CLOSE,
-                                    'trade_id': existing_trade['id'],
-                                    'trade_data': closed_trade
-                                })
+                        profile_ids = {row['username']: row['id'] for row in cursor.fetchall()}
+                        queries += 1
 
-                        # Transaction commits here automatically (with context)
+                        for username in scrapes:
+                            if username not in profile_ids:
+                                logger.error(f"Profile not found: {username}")
 
-                logger.info(
-                    f"Processed scrape for {profile_username}: "
-                    f"{len(new_alerts)} new, {len(updated_alerts)} updated, "
-                    f"{len(closed_alerts)} closed"
-                )
+                        index = self._load_open_trades(cursor, list(profile_ids.values()))
+                        queries += 1
+
+                        # Set-based diff per profile, entirely in memory
+                        inserts: List[Tuple[str, Dict]] = []
+                        updates: List[Tuple[str, Dict, Dict]] = []
+                        closes: List[Tuple[str, Dict]] = []
+
+                        for username, profile_id in profile_ids.items():
+                            new, changed, closed = self._diff_profile(
+                                index.get(profile_id, {}), scrapes[username], detect_closed
+                            )
+                            inserts.extend((username, trade) for trade in new)
+                            updates.extend((username, existing, trade) for existing, trade in changed)
+                            closes.extend((username, existing) for existing in closed)
 
-                return {
-                    'new_alerts': new_alerts,
-                    'updated_alerts': updated_alerts,
-                    'closed_alerts': closed_alerts
-                }
+                        queries += self._write_inserts(cursor, profile_ids, inserts, results)
+                        queries += self._write_updates(cursor, updates, results)
+                        queries += self._write_closes(cursor, closes, results)
+
+                        # Transaction commits here automatically (with context)
 
             except psycopg2.OperationalError as e:
                 logger.error(f"Database connection error: {e}", exc_info=True)
-                return {"new_alerts": [], "updated_alerts": [], "closed_alerts": []}
+                return {username: {'new_alerts': [], 'updated_alerts': [], 'closed_alerts': []}
+                        for username in scrapes}
 
             except Exception as e:
                 logger.error(f"Error processing scrape results: {e}", exc_info=True)
                 # Transaction automatically rolled back by context manager
-                return {"new_alerts": [], "updated_alerts": [], "closed_alerts": []}
+                return {username: {'new_alerts': [], 'updated_alerts': [], 'closed_alerts': []}
+                        for username in scrapes}
+
+        for username, alerts in results.items():
+            if username in profile_ids:
+                logger.info(
+                    f"Processed scrape for {username}: "
+                    f"{len(alerts['new_alerts'])} new, {len(alerts['updated_alerts'])} updated, "
+                    f"{len(alerts['closed_alerts'])} closed"
+                )
+
+        self.last_cycle_stats = {
+            'profiles': len(profile_ids),
+            'new': len(inserts),
+            'updated': len(updates),
+            'closed': len(closes),
+            'queries': queries,
+        }
+        return results
+
+    def _load_open_trades(self, cursor, profile_ids: List[int]) -> Dict[int, Dict[str, Dict]]:
+        """
+        Index open trades by profile, then by alert ID.
+
+        Each trade is reachable both by its stored xtrades_alert_id and by the
+        ID generated from its fields, so rows stored under an older ID
+        format still match.
+        """
+        index: Dict[int, Dict[str, Dict]] = {profile_id: {} for profile_id in profile_ids}
+        if not profile_ids:
+            return index
+
+        cursor.execute(OPEN_TRADES_QUERY, (profile_ids,))
+        for row in cursor.fetchall():
+            row = dict(row)
+            trades = index.setdefault(row['profile_id'], {})
+            trades[self._generate_alert_id(row)] = row
+            if row['xtrades_alert_id']:
+                trades[row['xtrades_alert_id']] = row
+
+        return index
+
+    def _diff_profile(self, open_trades: Dict[str, Dict], scraped_trades: List[Dict[str, Any]],
+                      detect_closed: bool) -> Tuple[List[Dict], List[Tuple[Dict, Dict]], List[Dict]]:
+        """Split one profile's scrape into new, changed and closed trades"""
+        scraped: Dict[str, Dict] = {}
+        for trade in scraped_trades:
+            alert_id = trade.get('xtrades_alert_id')
+            if not alert_id:
+                # Generate alert ID from trade details
+                alert_id = self._generate_alert_id(trade)
+                trade['xtrades_alert_id'] = alert_id
+            # The feed is newest first; keep the latest copy of a repeated alert
+            scraped.setdefault(alert_id, trade)
+
+        new_ids = scraped.keys() - open_trades.keys()
+        new = [trade for alert_id, trade in scraped.items() if alert_id in new_ids]
+
+        changed = []
+        matched = set()
+        for alert_id in scraped.keys() & open_trades.keys():
+            existing = open_trades[alert_id]
+            if existing['id'] in matched:
+                continue
+            matched.add(existing['id'])
+            if self._is_trade_updated(existing, scraped[alert_id]):
+                changed.append((existing, scraped[alert_id]))
+
+        closed = []
+        if detect_closed:
+            unmatched = {row['id']: row for row in open_trades.values() if row['id'] not in matched}
+            closed = list(unmatched.values())
+
+        return new, changed, closed
+
+    def _write_inserts(self, cursor, profile_ids: Dict[str, int],
+                       inserts: List[Tuple[str, Dict]], results: Dict) -> int:
+        """Insert all new trades with one statement; returns the number of queries"""
+        if not inserts:
+            return 0
+
+        values = [
+            (
+                profile_ids[username],
+                trade.get('ticker'),
+                trade.get('strategy'),
+                trade.get('action'),
+                trade.get('entry_price'),
+                trade.get('entry_date', datetime.now()),
+                trade.get('quantity', 1),
+                'open',
+                trade.get('strike_price'),
+                trade.get('expiration_date'),
+                trade.get('alert_text'),
+                trade.get('alert_timestamp', datetime.now()),
+                trade.get('xtrades_alert_id')
+            )
+            for username, trade in inserts
+        ]
+        rows = execute_values(cursor, INSERT_TRADES_SQL, values, page_size=len(values), fetch=True)
+        inserted = {(row['profile_id'], row['xtrades_alert_id']): dict(row) for row in rows}
+
+        for username, trade in inserts:
+            new_trade = inserted[(profile_ids[username], trade['xtrades_alert_id'])]
+            results[username]['new_alerts'].append({
+                'type': AlertType.NEW,
+                'trade_id': new_trade['id'],
+                'trade_data': new_trade
+            })
+
+        logger.info(f"Inserted {len(inserts)} new trades")
+        return 1
+
+    def _write_updates(self, cursor, updates: List[Tuple[str, Dict, Dict]], results: Dict) -> int:
+        """Update all changed trades with one statement; returns the number of queries"""
+        if not updates:
+            return 0
+
+        values = [
+            (
+                existing['id'],
+                trade.get('entry_price'),
+                trade.get('quantity'),
+                trade.get('strike_price'),
+                trade.get('expiration_date'),
+                trade.get('alert_text')
+            )
+            for _, existing, trade in updates
+        ]
+        rows = execute_values(cursor, UPDATE_TRADES_SQL, values, template=UPDATE_TRADES_TEMPLATE,
+                              page_size=len(values), fetch=True)
+        updated = {row['id']: dict(row) for row in rows}
+
+        for username, existing, trade in updates:
+            results[username]['updated_alerts'].append({
+                'type': AlertType.UPDATE,
+                'trade_id': existing['id'],
+                'trade_data': updated[existing['id']],
+                'changes': self._get_trade_changes(existing, trade)
+            })
+
+        logger.info(f"Updated {len(updates)} trades")
+        return 1
+
+    def _write_closes(self, cursor, closes: List[Tuple[str, Dict]], results: Dict) -> int:
+        """Close all missing trades with one statement; returns the number of queries"""
+        if not closes:
+            return 0
+
+        cursor.execute(CLOSE_TRADES_SQL, ([existing['id'] for _, existing in closes],))
+        closed = {row['id']: dict(row) for row in cursor.fetchall()}
+
+        for username, existing in closes:
+            results[username]['closed_alerts'].append({
+                'type': AlertType.CLOSE,
+                'trade_id': existing['id'],
+                'trade_data': closed[existing['id']]
+            })
+
+        logger.info(f"Closed {len(closes)} trades")
+        return 1
+
+    @staticmethod
+    def _comparable(value: Any) -> Any:
+        """Normalize DB and scraped values (Decimal vs float, date vs ISO string)"""
+        if isinstance(value, (Decimal, float, int)) and not isinstance(value, bool):
+            return round(float(value), 2)
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()[:10]
+        return value
 
     def _generate_alert_id(self, trade: Dict[str, Any]) -> str:
-        """Generate unique alert ID from trade details"""
-        ticker = trade.get('ticker', 'UNKNOWN')
-        action = trade.get('action', 'UNKNOWN')
-        strike = trade.get('strike_price', 0)
-        expiry = trade.get('expiration_date', 'UNKNOWN')
-        timestamp = trade.get('alert_timestamp', datetime.now())
+        """
+        Generate a stable alert ID from the fields that identify a position.
 
-        # Create unique ID
-        return f"{ticker}_{action}_{strike}_{expiry}_{timestamp}".replace(" ", "_")
+        The scrape time is deliberately left out so the same alert maps to
+        the same ID on every cycle.
+        """
+        key = "|".join(str(self._comparable(trade.get(field))) for field in self.IDENTITY_FIELDS)
+        return hashlib.md5(key.encode()).hexdigest()
 
     def _is_trade_updated(self, existing: Dict, new: Dict) -> bool:
         """Check if trade has been updated"""
-        # Compare key fields
-        check_fields = ['entry_price', 'quantity', 'strike_price',
-                       'expiration_date', 'alert_text', 'status']
-
-        for field in check_fields:
-            if field in new and existing.get(field) != new.get(field):
-                return True
-
-        return False
+        return bool(self._get_trade_changes(existing, new))
 
     def _get_trade_changes(self, existing: Dict, new: Dict) -> Dict[str, tuple]:
         """Get what changed in the trade"""
         changes = {}
-        check_fields = ['entry_price', 'quantity', 'strike_price',
-                       'expiration_date', 'alert_text', 'status']
-
-        for field in check_fields:
-            if field in new and existing.get(field) != new.get(field):
+        for field in self.CHECK_FIELDS:
+            if field in new and self._comparable(existing.get(field)) != self._comparable(new.get(field)):
                 changes[field] = (existing.get(field), new.get(field))
 
         return changes
 
-    def _insert_new_trade(self, cursor, profile_id: int,
-                         trade: Dict[str, Any]) -> Dict[str, Any]:
-        """Insert new trade into database - uses passed cursor (part of transaction)"""
-        cursor.execute("""
-            INSERT INTO xtrades_trades (
-                profile_id, ticker, strategy, action, entry_price,
-                entry_date, quantity, status, strike_price, expiration_date,
-                alert_text, alert_timestamp, xtrades_alert_id
-            ) VALUES (
-                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-            )
-            RETURNING *
-        """, (
-            profile_id,
-            trade.get('ticker'),
-            trade.get('strategy'),
-            trade.get('action'),
-            trade.get('entry_price'),
-            trade.get('entry_date', datetime.now()),
-            trade.get('quantity', 1),
-            'open',
-            trade.get('strike_price'),
-            trade.get('expiration_date'),
-            trade.get('alert_text'),
-            trade.get('alert_timestamp', datetime.now()),
-            trade.get('xtrades_alert_id')
-        ))
-
-        new_trade = dict(cursor.fetchone())
-
-        logger.info(f"Inserted new trade: {new_trade['ticker']} (ID: {new_trade['id']})")
-        return new_trade
-
-    def _update_trade(self, cursor, trade_id: int,
-                     trade: Dict[str, Any]) -> Dict[str, Any]:
-        """Update existing trade - uses passed cursor (part of transaction)"""
-        cursor.execute("""
-            UPDATE xtrades_trades
-            SET entry_price = COALESCE(%s, entry_price),
-                quantity = COALESCE(%s, quantity),
-                strike_price = COALESCE(%s, strike_price),
-                expiration_date = COALESCE(%s, expiration_date),
-                alert_text = COALESCE(%s, alert_text),
-                updated_at = NOW()
-            WHERE id = %s
-            RETURNING *
-        """, (
-            trade.get('entry_price'),
-            trade.get('quantity'),
-            trade.get('strike_price'),
-            trade.get('expiration_date'),
-            trade.get('alert_text'),
-            trade_id
-        ))
-
-        updated_trade = dict(cursor.fetchone())
-
-        logger.info(f"Updated trade: {updated_trade['ticker']} (ID: {trade_id})")
-        return updated_trade
-
-    def _close_trade(self, cursor, trade_id: int) -> Dict[str, Any]:
-        """Mark trade as closed - uses passed cursor (part of transaction)"""
-        cursor.execute("""
-            UPDATE xtrades_trades
-            SET status = %s,
-                exit_date = NOW(),
-                updated_at = NOW()
-            WHERE id = %s
-            RETURNING *
-        """, ('closed', trade_id))
-
-        closed_trade = dict(cursor.fetchone())
-
-        logger.info(f"Closed trade: {closed_trade['ticker']} (ID: {trade_id})")
-        return closed_trade
-
     def enrich_alert_with_market_data(self, alert: Dict[str, Any]) -> Dict[str, Any]:
         """
         Enrich alert with additional market data.
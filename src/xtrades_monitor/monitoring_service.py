@@ -13,7 +13,7 @@ This is the entry point for the background monitoring system.
 
 import logging
 import time
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Set
 from datetime import datetime
 import sys
 from pathlib import Path
@@ -24,7 +24,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from src.xtrades_monitor.alert_processor import AlertProcessor
 from src.xtrades_monitor.ai_consensus import AIConsensusEngine
 from src.xtrades_monitor.notification_service import TelegramNotificationService
-from src.xtrades_scraper import XtradesScraper
+from src.xtrades_scraper_pool import XtradesScraperPool
 
 # Configure logging
 logging.basicConfig(
@@ -43,26 +43,34 @@ class XtradesMonitoringService:
     Main monitoring service orchestrator.
 
     Coordinates:
-    - Scraping (XtradesScraper)
+    - Scraping (XtradesScraperPool)
     - Alert processing (AlertProcessor)
     - AI evaluation (AIConsensusEngine)
     - Notifications (TelegramNotificationService)
     """
 
-    def __init__(self, scrape_interval_seconds: int = 150):
+    def __init__(self, scrape_interval_seconds: int = 150, scraper_workers: int = 4,
+                 incremental: bool = True, full_scrape_every: int = 20):
         """
         Initialize monitoring service.
 
         Args:
             scrape_interval_seconds: How often to scrape (default: 150 = 2.5 minutes)
+            scraper_workers: Browsers scraping profiles in parallel
+            incremental: Stop scrolling each profile at the first alert already stored
+            full_scrape_every: In incremental mode, scrape full history every Nth
+                cycle (starting with the first) so closed trades are detected
         """
         self.scrape_interval = scrape_interval_seconds
+        self.incremental = incremental
+        self.full_scrape_every = full_scrape_every
+        self.cycles_run = 0
 
         logger.info("🚀 Initializing Xtrades Monitoring Service...")
 
         # Initialize components
         try:
-            self.scraper = XtradesScraper()
+            self.scraper = XtradesScraperPool(workers=scraper_workers, headless=True)
             self.alert_processor = AlertProcessor()
             self.ai_engine = AIConsensusEngine()
             self.notification_service = TelegramNotificationService()
@@ -114,44 +122,56 @@ class XtradesMonitoringService:
             profiles = self._get_profiles_to_monitor()
             logger.info(f"📋 Monitoring {len(profiles)} profiles...")
 
-            # Step 2: Scrape each profile
-            all_alerts = []
+            # Step 2: Scrape profiles in parallel. Only a full scrape can show
+            # that a trade disappeared, so one runs every full_scrape_every cycles
+            full_scrape = not self.incremental or self.cycles_run % self.full_scrape_every == 0
+            self.cycles_run += 1
+            known_alerts = None if full_scrape else self._get_known_alerts(profiles)
+            scrape_results = self.scraper.scrape_profiles(profiles, known_alerts=known_alerts)
+            logger.info(
+                f"🔍 Scraped {len(profiles)} profiles in {self.scraper.last_run_stats.get('seconds', 0):.1f}s "
+                f"({'incremental' if known_alerts is not None else 'full'})"
+            )
+
+            scraped_by_profile = {}
 
             for profile_username in profiles:
-                try:
-                    logger.info(f"\n🔍 Scraping profile: @{profile_username}")
-                    scraped_trades = self._scrape_profile(profile_username)
+                scraped_trades = scrape_results[profile_username]
+                if isinstance(scraped_trades, Exception):
+                    logger.error(f"❌ Error scraping @{profile_username}: {scraped_trades}")
+                    cycle_results['errors'].append(f"Scrape error for @{profile_username}: {str(scraped_trades)}")
+                    self.stats['failed_scrapes'] += 1
+                    continue
 
-                    if scraped_trades:
-                        logger.info(f"✅ Scraped {len(scraped_trades)} trades from @{profile_username}")
+                if scraped_trades:
+                    logger.info(f"✅ Scraped {len(scraped_trades)} trades from @{profile_username}")
+                    scraped_by_profile[profile_username] = scraped_trades
 
-                        # Process alerts
-                        alerts = self.alert_processor.process_scrape_results(
-                            profile_username, scraped_trades
-                        )
+                self.stats['successful_scrapes'] += 1
 
-                        # Collect new alerts for evaluation
-                        all_alerts.extend(alerts['new_alerts'])
+            self.stats['total_scrapes'] += len(profiles)
 
-                        cycle_results['profiles_scraped'] += 1
-                        cycle_results['alerts_detected'] += (
-                            len(alerts['new_alerts']) +
-                            len(alerts['updated_alerts']) +
-                            len(alerts['closed_alerts'])
-                        )
+            # Process alerts for every profile in one batched transaction
+            cycle_alerts = self.alert_processor.process_cycle(
+                scraped_by_profile, detect_closed=known_alerts is None
+            )
 
-                        self.stats['new_alerts'] += len(alerts['new_alerts'])
-                        self.stats['updated_alerts'] += len(alerts['updated_alerts'])
-                        self.stats['closed_alerts'] += len(alerts['closed_alerts'])
+            all_alerts = []
 
-                    self.stats['successful_scrapes'] += 1
+            for alerts in cycle_alerts.values():
+                # Collect new alerts for evaluation
+                all_alerts.extend(alerts['new_alerts'])
 
-                except Exception as e:
-                    logger.error(f"❌ Error scraping @{profile_username}: {e}")
-                    cycle_results['errors'].append(f"Scrape error for @{profile_username}: {str(e)}")
-                    self.stats['failed_scrapes'] += 1
+                cycle_results['profiles_scraped'] += 1
+                cycle_results['alerts_detected'] += (
+                    len(alerts['new_alerts']) +
+                    len(alerts['updated_alerts']) +
+                    len(alerts['closed_alerts'])
+                )
 
-            self.stats['total_scrapes'] += len(profiles)
+                self.stats['new_alerts'] += len(alerts['new_alerts'])
+                self.stats['updated_alerts'] += len(alerts['updated_alerts'])
+                self.stats['closed_alerts'] += len(alerts['closed_alerts'])
 
             # Step 3: Evaluate new alerts with AI
             logger.info(f"\n🤖 Evaluating {len(all_alerts)} new alerts with AI consensus...")
@@ -261,6 +281,9 @@ class XtradesMonitoringService:
             self._print_final_stats()
             raise
 
+        finally:
+            self.scraper.close()
+
     def _get_profiles_to_monitor(self) -> List[str]:
         """
         Get list of profile usernames to monitor.
@@ -292,21 +315,46 @@ class XtradesMonitoringService:
             logger.error(f"Error getting profiles: {e}")
             return []
 
-    def _scrape_profile(self, profile_username: str) -> List[Dict[str, Any]]:
+    def _get_known_alerts(self, profiles: List[str], per_profile: int = 200) -> Optional[Dict[str, Set[str]]]:
         """
-        Scrape a single profile.
+        Get the most recently stored alert texts for each profile.
 
         Returns:
-            List of trade dictionaries
+            Dict of username -> alert texts, or None if the query fails
+            (the cycle then falls back to a full scrape)
         """
         try:
-            # Use existing Xtrades scraper
-            trades = self.scraper.scrape_following_alerts(profile_username)
-            return trades
+            import psycopg2
+            import os
+
+            conn = psycopg2.connect(os.getenv("DATABASE_URL"))
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                SELECT p.username, t.alert_text
+                FROM xtrades_profiles p
+                JOIN LATERAL (
+                    SELECT alert_text
+                    FROM xtrades_trades
+                    WHERE profile_id = p.id AND alert_text IS NOT NULL
+                    ORDER BY id DESC
+                    LIMIT %s
+                ) t ON TRUE
+                WHERE p.username = ANY(%s)
+            """, (per_profile, list(profiles)))
+
+            known_alerts: Dict[str, Set[str]] = {username: set() for username in profiles}
+            for username, alert_text in cursor.fetchall():
+                known_alerts[username].add(alert_text)
+
+            cursor.close()
+            conn.close()
+
+            return known_alerts
 
         except Exception as e:
-            logger.error(f"Error scraping profile {profile_username}: {e}")
-            return []
+            logger.error(f"Error getting stored alerts, falling back to full scrape: {e}")
+            return None
 
     def _print_cumulative_stats(self):
         """Print cumulative statistics"""
@@ -368,6 +416,23 @@ def main():
         default=150,
         help='Scrape interval in seconds (default: 150 = 2.5 minutes)'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=4,
+        help='Browsers scraping profiles in parallel (default: 4)'
+    )
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='Scrape full alert history instead of stopping at stored alerts'
+    )
+    parser.add_argument(
+        '--full-every',
+        type=int,
+        default=20,
+        help='Cycles between full scrapes that detect closed trades (default: 20)'
+    )
     parser.add_argument(
         '--single-cycle',
         action='store_true',
@@ -377,12 +442,20 @@ def main():
     args = parser.parse_args()
 
     # Initialize service
-    service = XtradesMonitoringService(scrape_interval_seconds=args.interval)
+    service = XtradesMonitoringService(
+        scrape_interval_seconds=args.interval,
+        scraper_workers=args.workers,
+        incremental=not args.full,
+        full_scrape_every=args.full_every
+    )
 
     if args.single_cycle:
         # Run single cycle
         logger.info("🧪 Running single test cycle...")
-        results = service.run_single_cycle()
+        try:
+            results = service.run_single_cycle()
+        finally:
+            service.scraper.close()
 
         if results['success']:
             logger.info("✅ Test cycle completed successfully")
@@ -20,7 +20,7 @@ import re
 import time
 import json
 import pickle
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Set, Tuple
 from pathlib import Path
 from datetime import datetime, timedelta
 from decimal import Decimal
@@ -78,6 +78,17 @@ class XtradesScraper:
     LOGIN_URL = f"{BASE_URL}/login"
     DISCORD_OAUTH_URL = "https://discord.com/api/oauth2/authorize"
 
+    # Explicit wait timeouts (seconds)
+    PAGE_TIMEOUT = 20
+    ALERTS_TIMEOUT = 10
+
+    # Document height and number of loaded posts, used to detect new content
+    CONTENT_SIZE_JS = "return [document.body.scrollHeight, document.getElementsByTagName('app-post').length];"
+    POSTS_HTML_JS = (
+        "return Array.from(document.getElementsByTagName('app-post'))"
+        ".slice(arguments[0]).map(function (e) { return e.outerHTML; });"
+    )
+
     # Alert action patterns
     ACTION_PATTERNS = {
         'BTO': r'\bBTO\b',
@@ -202,7 +213,7 @@ class XtradesScraper:
 
             # Navigate to base URL first
             self.driver.get(self.BASE_URL)
-            time.sleep(2)
+            self._wait_for_page_ready()
 
             # Add cookies
             for cookie in cookies:
@@ -431,10 +442,38 @@ class XtradesScraper:
             print(f"Error in Discord OAuth flow: {e}")
             return False
 
+    def is_alive(self) -> bool:
+        """Check that the browser session still responds"""
+        try:
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _wait_for_page_ready(self) -> None:
+        """Wait until the current document has finished loading"""
+        try:
+            WebDriverWait(self.driver, self.PAGE_TIMEOUT).until(
+                lambda d: d.execute_script("return document.readyState") == "complete"
+            )
+        except TimeoutException:
+            print("Warning: Page did not finish loading, continuing")
+
+    def _wait_for_alerts(self) -> bool:
+        """Wait until Angular has rendered the first alert posts"""
+        try:
+            WebDriverWait(self.driver, self.ALERTS_TIMEOUT).until(
+                EC.presence_of_element_located((By.TAG_NAME, "app-post"))
+            )
+            return True
+        except TimeoutException:
+            return False
+
     def get_profile_alerts(
         self,
         username: str,
-        max_alerts: Optional[int] = None
+        max_alerts: Optional[int] = None,
+        known_alerts: Optional[Set[str]] = None
     ) -> List[Dict]:
         """
         Get trade alerts from a profile alerts tab.
@@ -442,6 +481,9 @@ class XtradesScraper:
         Args:
             username: Xtrades.net username to scrape
             max_alerts: Maximum number of alerts to retrieve (None = all)
+            known_alerts: Alert texts already stored. When given, scrolling
+                stops at the first known alert (the feed is newest first)
+                and only unseen alerts are returned.
 
         Returns:
             List of parsed trade alert dictionaries
@@ -456,7 +498,7 @@ class XtradesScraper:
         try:
             print(f"\nNavigating to profile page: {username}")
             self.driver.get(profile_url)
-            time.sleep(4)
+            self._wait_for_page_ready()
 
             # Check if profile exists
             if "404" in self.driver.title or "not found" in self.driver.page_source.lower():
@@ -476,11 +518,25 @@ class XtradesScraper:
                 "//nav//button[contains(text(), 'Alerts')]",
             ]
 
+            # Wait for Angular to render any of the tabs before trying them in order
+            try:
+                WebDriverWait(self.driver, self.ALERTS_TIMEOUT).until(
+                    EC.presence_of_element_located((By.XPATH, " | ".join(selectors_to_try)))
+                )
+            except TimeoutException:
+                pass
+
             for selector in selectors_to_try:
                 try:
                     alerts_tab = self.driver.find_element(By.XPATH, selector)
+                    previous_posts = self.driver.find_elements(By.TAG_NAME, "app-post")[:1]
                     alerts_tab.click()
-                    time.sleep(3)
+                    if previous_posts:
+                        # The tab swaps the feed; wait (at most the old fixed 3s) for the old posts to go
+                        try:
+                            WebDriverWait(self.driver, 3).until(EC.staleness_of(previous_posts[0]))
+                        except TimeoutException:
+                            pass
                     print(f"Clicked Alerts tab using selector: {selector[:50]}...")
                     alerts_tab_clicked = True
                     break
@@ -492,23 +548,21 @@ class XtradesScraper:
                 # Try direct /alerts URL
                 alerts_url = f"{self.BASE_URL}/profile/{username}/alerts"
                 self.driver.get(alerts_url)
-                time.sleep(3)
+                self._wait_for_page_ready()
 
                 # If still not on alerts, scrape from current page
                 if "404" in self.driver.title:
                     print("Alerts URL not valid, scraping from profile page")
                     self.driver.get(profile_url)
-                    time.sleep(2)
+                    self._wait_for_page_ready()
 
             # Wait for alerts to load (Angular dynamic content)
             print("Waiting for alerts to load...")
-            time.sleep(5)  # Give Angular time to fetch and render alerts
+            if not self._wait_for_alerts():
+                print("Warning: No alert posts rendered before timeout")
 
             # Scroll to load more content
-            self._scroll_page()
-
-            # Wait a bit more after scrolling
-            time.sleep(2)
+            self._scroll_page(known_alerts=known_alerts)
 
             # Get page source and parse
             page_source = self.driver.page_source
@@ -527,6 +581,9 @@ class XtradesScraper:
             # Find alerts
             alerts = self._find_alert_elements(soup)
 
+            if known_alerts:
+                alerts = [alert for alert in alerts if alert.get_text(strip=True) not in known_alerts]
+
             if not alerts:
                 print(f"No alerts found for {username}")
                 return []
@@ -556,43 +613,48 @@ class XtradesScraper:
         except Exception as e:
             raise XtradesScraperException(f"Error getting profile alerts: {e}")
 
-    def _scroll_page(self, scroll_pause: float = 1.5, max_scrolls: int = 100) -> int:
+    def _scroll_page(
+        self,
+        scroll_pause: float = 1.5,
+        max_scrolls: int = 100,
+        known_alerts: Optional[Set[str]] = None
+    ) -> int:
         """
         Scroll page to load ALL dynamic content using aggressive infinite scroll.
 
         Continues scrolling until no new content loads for 3 consecutive attempts.
         This ensures we get the full alert history, not just the first few posts.
+        With known_alerts, stops as soon as an already stored alert has loaded.
 
         Args:
-            scroll_pause: Seconds to wait after each scroll
+            scroll_pause: Maximum seconds to wait for new content after each scroll
             max_scrolls: Maximum scrolls to prevent infinite loops
+            known_alerts: Alert texts already stored
 
         Returns:
             Number of scrolls performed
         """
         try:
-            from selenium.webdriver.common.by import By
-
-            last_height = self.driver.execute_script("return document.body.scrollHeight")
-            last_post_count = 0
+            last_height, last_post_count = self._content_size()
             no_change_iterations = 0
 
+            if known_alerts and self._reached_known_alert(0, known_alerts):
+                print("✓ Newest alerts already stored, no scrolling needed")
+                return 0
+
             print(f"Starting aggressive infinite scroll (max {max_scrolls} scrolls)...")
 
             for scroll_num in range(1, max_scrolls + 1):
-                # Scroll to bottom
+                # Scroll to bottom and wait until the page grows (or the pause runs out)
                 self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(scroll_pause)
-
-                # Count current posts (app-post elements)
                 try:
-                    posts = self.driver.find_elements(By.TAG_NAME, "app-post")
-                    current_count = len(posts)
-                except Exception:
-                    current_count = last_post_count
+                    WebDriverWait(self.driver, scroll_pause, poll_frequency=0.1).until(
+                        lambda d: self._content_size() != (last_height, last_post_count)
+                    )
+                except TimeoutException:
+                    pass
 
-                # Get new page height
-                new_height = self.driver.execute_script("return document.body.scrollHeight")
+                new_height, current_count = self._content_size()
 
                 # Check if anything changed (height OR post count)
                 if new_height == last_height and current_count == last_post_count:
@@ -610,6 +672,9 @@ class XtradesScraper:
                     new_posts = current_count - last_post_count
                     if new_posts > 0:
                         print(f"  Scroll {scroll_num}: +{new_posts} new posts (total: {current_count})")
+                        if known_alerts and self._reached_known_alert(last_post_count, known_alerts):
+                            print(f"✓ Reached an alert already stored at scroll {scroll_num}")
+                            return scroll_num
                     else:
                         print(f"  Scroll {scroll_num}: Page height increased")
 
@@ -625,6 +690,19 @@ class XtradesScraper:
             print(f"Error during infinite scroll: {e}")
             return 0
 
+    def _content_size(self) -> Tuple[int, int]:
+        """Document height and number of loaded alert posts"""
+        height, posts = self.driver.execute_script(self.CONTENT_SIZE_JS)
+        return height, posts
+
+    def _reached_known_alert(self, start: int, known_alerts: Set[str]) -> bool:
+        """Check whether any post loaded after index start is an already stored alert"""
+        for html in self.driver.execute_script(self.POSTS_HTML_JS, start):
+            # Same text extraction as parse_alert, so it matches stored alert_text
+            if BeautifulSoup(html, 'html.parser').get_text(strip=True) in known_alerts:
+                return True
+        return False
+
     def _find_alert_elements(self, soup: BeautifulSoup) -> List:
         """
         Find alert elements in page HTML.
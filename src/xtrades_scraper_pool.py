@@ -0,0 +1,185 @@
+"""
+Xtrades Scraper Pool
+====================
+Scrapes many Xtrades profiles in parallel with a pool of headless browsers.
+
+The first browser logs in (saved cookies or Discord OAuth) and saves the
+session cookies; every later browser starts from those cookies, so OAuth runs
+at most once. Browsers are kept between calls, so a monitoring cycle only
+pays for page loads. Browsers are started one at a time because
+undetected-chromedriver patches its driver binary on startup.
+
+Usage:
+    with XtradesScraperPool(workers=4) as pool:
+        results = pool.scrape_profiles(["behappy", "trader2"])
+        for username, alerts in results.items():
+            if isinstance(alerts, Exception):
+                print(f"{username} failed: {alerts}")
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Set, Union
+
+
+class XtradesScraperPool:
+    """Pool of logged-in XtradesScraper browsers shared by worker threads"""
+
+    def __init__(
+        self,
+        workers: int = 4,
+        headless: bool = True,
+        cache_dir: Optional[str] = None,
+        scraper_factory: Optional[Callable] = None
+    ):
+        """
+        Args:
+            workers: Maximum number of browsers (and profiles scraped at once)
+            headless: Run browsers in headless mode
+            cache_dir: Directory for the shared session cookies
+            scraper_factory: Creates a scraper (default: XtradesScraper)
+        """
+        self.workers = max(1, workers)
+        self.headless = headless
+        self.cache_dir = cache_dir
+        self.scraper_factory = scraper_factory or self._new_scraper
+
+        # Most recently used browser first; it is the one most likely still warm
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._created = 0
+        self._startup_error: Optional[Exception] = None
+
+        self.last_run_stats: Dict = {}
+
+    def _new_scraper(self):
+        from src.xtrades_scraper import XtradesScraper
+        return XtradesScraper(headless=self.headless, cache_dir=self.cache_dir)
+
+    def scrape_profiles(
+        self,
+        usernames: Iterable[str],
+        max_alerts: Optional[int] = None,
+        known_alerts: Optional[Dict[str, Set[str]]] = None
+    ) -> Dict[str, Union[List[Dict], Exception]]:
+        """
+        Scrape alerts from several profiles concurrently
+
+        Args:
+            usernames: Profiles to scrape
+            max_alerts: Maximum alerts per profile (None = all)
+            known_alerts: Username -> alert texts already stored. Profiles in
+                this dict are scraped incrementally (see get_profile_alerts).
+
+        Returns:
+            Username -> list of parsed alerts, or the exception that profile raised
+        """
+        usernames = list(dict.fromkeys(usernames))
+        if not usernames:
+            return {}
+
+        started = time.perf_counter()
+        self._startup_error = None
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(usernames))) as executor:
+            futures = {
+                username: executor.submit(
+                    self._scrape_one, username, max_alerts,
+                    known_alerts.get(username) if known_alerts is not None else None
+                )
+                for username in usernames
+            }
+
+        results: Dict[str, Union[List[Dict], Exception]] = {}
+        for username, future in futures.items():
+            try:
+                results[username] = future.result()
+            except Exception as e:
+                results[username] = e
+
+        errors = sum(1 for result in results.values() if isinstance(result, Exception))
+        self.last_run_stats = {
+            'profiles': len(usernames),
+            'alerts': sum(len(result) for result in results.values() if not isinstance(result, Exception)),
+            'errors': errors,
+            'browsers': self._created,
+            'seconds': time.perf_counter() - started,
+        }
+        return results
+
+    def close(self) -> None:
+        """Close every idle browser"""
+        while True:
+            try:
+                scraper = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(scraper)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # =========================================================================
+    # INTERNALS
+    # =========================================================================
+
+    def _scrape_one(self, username: str, max_alerts: Optional[int],
+                    known_alerts: Optional[Set[str]]) -> List[Dict]:
+        scraper = self._acquire()
+        try:
+            return scraper.get_profile_alerts(username, max_alerts=max_alerts, known_alerts=known_alerts)
+        finally:
+            # A failed page keeps its browser; a dead browser is replaced on demand
+            if scraper.is_alive():
+                self._idle.put(scraper)
+            else:
+                self._discard(scraper)
+
+    def _acquire(self):
+        """Take an idle browser, or start a new one while under the worker limit"""
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            with self._lock:
+                if self._startup_error is None and self._created < self.workers:
+                    self._created += 1
+                    break
+                if self._created == 0:
+                    # Nothing to wait for: no browser exists and none can start
+                    raise self._startup_error
+
+            try:
+                return self._idle.get(timeout=1)
+            except queue.Empty:
+                continue
+
+        scraper = None
+        try:
+            with self._start_lock:
+                if self._startup_error is not None:
+                    # Another worker failed to start while this one was queued
+                    raise self._startup_error
+                scraper = self.scraper_factory()
+                scraper.login()
+            return scraper
+        except Exception as e:
+            with self._lock:
+                self._created -= 1
+                self._startup_error = e
+            if scraper is not None:
+                scraper.close()
+            raise
+
+    def _discard(self, scraper) -> None:
+        with self._lock:
+            self._created -= 1
+        scraper.close()
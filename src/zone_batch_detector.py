@@ -0,0 +1,295 @@
+"""
+Universe-wide Supply/Demand Zone Detection
+Refreshes zones for a whole symbol universe in one job:
+- OHLCV for every symbol is downloaded in a single bulk request
+- Symbols are split into chunks and detected across worker processes
+- New zones are de-duplicated against active zones loaded in one query
+- Everything is written with one ZoneDatabaseManager.save_zones_batch call
+"""
+
+import os
+import sys
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+import yfinance as yf
+
+from src.zone_detector import ZoneDetector
+from src.zone_analyzer import ZoneAnalyzer
+from src.zone_database_manager import ZoneDatabaseManager
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
+def _normalize_ohlcv(frame: pd.DataFrame) -> pd.DataFrame:
+    """Lower-case OHLCV columns with a 'timestamp' column, incomplete bars dropped"""
+    frame = frame.reset_index()
+    frame.columns = [str(c).lower() for c in frame.columns]
+    frame = frame.rename(columns={'date': 'timestamp', 'datetime': 'timestamp'})
+    frame = frame.dropna(subset=['open', 'high', 'low', 'close'])
+    frame['volume'] = frame['volume'].fillna(0).astype('int64')
+    return frame[OHLCV_COLUMNS].reset_index(drop=True)
+
+
+def load_ohlcv_bulk(
+    symbols: Iterable[str],
+    period: str = '6mo',
+    interval: str = '1d',
+    downloader: Optional[Callable[..., pd.DataFrame]] = None
+) -> Dict[str, pd.DataFrame]:
+    """
+    Download OHLCV for all symbols in one request
+
+    Args:
+        symbols: Tickers to load
+        period: History period (yfinance syntax, default: 6mo)
+        interval: Bar interval (default: 1d)
+        downloader: Replacement for yf.download (same signature)
+
+    Returns:
+        Dictionary of symbol -> OHLCV DataFrame (symbols without data are omitted)
+    """
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return {}
+
+    download = downloader or yf.download
+    data = download(
+        symbols,
+        period=period,
+        interval=interval,
+        group_by='ticker',
+        auto_adjust=False,
+        threads=True,
+        progress=False
+    )
+
+    if data is None or data.empty:
+        logger.warning(f"No OHLCV data returned for {len(symbols)} symbols")
+        return {}
+
+    frames = {}
+    grouped = isinstance(data.columns, pd.MultiIndex)
+    available = set(data.columns.get_level_values(0)) if grouped else set()
+
+    for symbol in symbols:
+        if grouped:
+            if symbol not in available:
+                continue
+            frame = data[symbol]
+        elif len(symbols) == 1:
+            frame = data
+        else:
+            continue
+
+        frame = _normalize_ohlcv(frame)
+        if not frame.empty:
+            frames[symbol] = frame
+
+    logger.info(f"Loaded OHLCV for {len(frames)}/{len(symbols)} symbols in one request")
+    return frames
+
+
+def _detect_chunk(detector: ZoneDetector,
+                  items: List[Tuple[str, pd.DataFrame]]) -> List[Tuple[str, List[Dict], float]]:
+    """Detect zones for a chunk of symbols (runs in a worker process)"""
+    results = []
+    for symbol, df in items:
+        try:
+            zones = detector.detect_zones(df, symbol)
+        except Exception as e:
+            logger.error(f"Error detecting zones for {symbol}: {e}")
+            zones = []
+        last_close = float(df['close'].iloc[-1]) if len(df) else float('nan')
+        results.append((symbol, zones, last_close))
+    return results
+
+
+def _is_duplicate(zone: Dict, existing: Dict, distance_pct: float = 1.0,
+                  tolerance: float = 0.5) -> bool:
+    """
+    The price rule of SupplyDemandScanner.scan_symbol_for_zones: the existing
+    zone is within distance_pct of the new zone's midpoint and both of its
+    boundaries are within tolerance of the new zone's.
+
+    Unlike the scanner, zones of a different zone_type are never duplicates,
+    so a supply and a demand zone at the same level are both kept.
+    """
+    if existing.get('zone_type', zone['zone_type']) != zone['zone_type']:
+        return False
+
+    upper = zone['zone_midpoint'] * (1 + distance_pct / 100)
+    lower = zone['zone_midpoint'] * (1 - distance_pct / 100)
+    top = float(existing['zone_top'])
+    bottom = float(existing['zone_bottom'])
+
+    near = ((top >= lower and bottom <= upper) or
+            (lower <= top <= upper) or
+            (lower <= bottom <= upper))
+    return (near and
+            abs(top - zone['zone_top']) < tolerance and
+            abs(bottom - zone['zone_bottom']) < tolerance)
+
+
+class ZoneBatchDetector:
+    """
+    Nightly zone refresh for a symbol universe
+
+    Usage:
+        detector = ZoneBatchDetector(max_workers=8)
+        summary = detector.refresh(['AAPL', 'MSFT', 'NVDA'])
+    """
+
+    def __init__(
+        self,
+        db: Optional[ZoneDatabaseManager] = None,
+        detector: Optional[ZoneDetector] = None,
+        analyzer: Optional[ZoneAnalyzer] = None,
+        max_workers: Optional[int] = None,
+        chunk_size: int = 50,
+        period: str = '6mo',
+        interval: str = '1d'
+    ):
+        """
+        Args:
+            db: Zone database manager (created on first use if None)
+            detector: Configured zone detector (default settings if None)
+            analyzer: Zone analyzer used to score new zones
+            max_workers: Worker processes (None = CPU count, 1 = in-process)
+            chunk_size: Symbols per worker task
+            period: OHLCV history period
+            interval: OHLCV bar interval
+        """
+        self._db = db
+        self.detector = detector or ZoneDetector()
+        self.analyzer = analyzer or ZoneAnalyzer()
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.period = period
+        self.interval = interval
+
+    @property
+    def db(self) -> ZoneDatabaseManager:
+        if self._db is None:
+            self._db = ZoneDatabaseManager()
+        return self._db
+
+    def detect(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, Tuple[List[Dict], float]]:
+        """
+        Detect zones for every symbol
+
+        Args:
+            frames: Dictionary of symbol -> OHLCV DataFrame
+
+        Returns:
+            Dictionary of symbol -> (zones, last close), in the order of frames
+        """
+        items = list(frames.items())
+        chunks = [items[i:i + self.chunk_size] for i in range(0, len(items), self.chunk_size)]
+
+        results: Dict[str, Tuple[List[Dict], float]] = {}
+        if self.max_workers <= 1 or len(chunks) <= 1:
+            for chunk in chunks:
+                for symbol, zones, last_close in _detect_chunk(self.detector, chunk):
+                    results[symbol] = (zones, last_close)
+        else:
+            workers = min(self.max_workers, len(chunks))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_detect_chunk, self.detector, chunk) for chunk in chunks]
+                for future in futures:
+                    for symbol, zones, last_close in future.result():
+                        results[symbol] = (zones, last_close)
+
+        return {symbol: results[symbol] for symbol in frames if symbol in results}
+
+    def refresh(
+        self,
+        symbols: Iterable[str],
+        frames: Optional[Dict[str, pd.DataFrame]] = None,
+        save: bool = True
+    ) -> Dict:
+        """
+        Detect, score, de-duplicate and store zones for a universe
+
+        Args:
+            symbols: Tickers to refresh
+            frames: Preloaded OHLCV per symbol (bulk-downloaded if None)
+            save: Write new zones and a scan log entry to the database
+
+        Returns:
+            Summary dictionary with per-symbol counts and the new zones
+        """
+        start_time = time.time()
+        symbols = list(dict.fromkeys(symbols))
+
+        if frames is None:
+            frames = load_ohlcv_bulk(symbols, period=self.period, interval=self.interval)
+
+        detected = self.detect(frames)
+        existing = self.db.get_active_zones_by_symbol(detected) if save else {}
+
+        new_zones = []
+        per_symbol = {}
+        zones_found = 0
+
+        for symbol in symbols:
+            if symbol not in detected:
+                per_symbol[symbol] = {'zones_found': 0, 'zones_saved': 0, 'error': 'No data'}
+                continue
+
+            zones, last_close = detected[symbol]
+            known = list(existing.get(symbol, []))
+            saved = 0
+
+            for zone in zones:
+                analyzed = self.analyzer.analyze_zone(zone, last_close)
+                if any(_is_duplicate(analyzed, other) for other in known):
+                    continue
+                known.append(analyzed)
+                new_zones.append(analyzed)
+                saved += 1
+
+            zones_found += len(zones)
+            per_symbol[symbol] = {'zones_found': len(zones), 'zones_saved': saved}
+
+        zone_ids = self.db.save_zones_batch(new_zones) if save and new_zones else []
+        duration = time.time() - start_time
+
+        if save:
+            self.db.log_scan({
+                'scan_type': 'ZONE_DETECTION',
+                'tickers_scanned': len(symbols),
+                'zones_found': zones_found,
+                'zones_updated': len(zone_ids),
+                'alerts_sent': 0,
+                'duration_seconds': duration,
+                'status': 'success'
+            })
+
+        logger.info(f"Zone refresh: {len(symbols)} symbols, {zones_found} zones found, "
+                    f"{len(new_zones)} new in {duration:.1f}s")
+
+        return {
+            'symbols_scanned': len(symbols),
+            'symbols_with_data': len(detected),
+            'zones_found': zones_found,
+            'zones_saved': len(zone_ids) if save else 0,
+            'duration_seconds': duration,
+            'results': per_symbol,
+            'zones': new_zones
+        }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    universe = [arg for arg in sys.argv[1:] if not arg.startswith('--')] or \
+        ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'NVDA', 'META', 'SPY', 'QQQ']
+    summary = ZoneBatchDetector().refresh(universe, save='--dry-run' not in sys.argv)
+    print(f"Symbols: {summary['symbols_scanned']}, zones found: {summary['zones_found']}, "
+          f"saved: {summary['zones_saved']}, {summary['duration_seconds']:.1f}s")
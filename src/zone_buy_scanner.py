@@ -9,13 +9,13 @@ Incorporates best practices from GitHub and Reddit:
 """
 
 import pandas as pd
-import yfinance as yf
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 import logging
 from src.zone_database_manager import ZoneDatabaseManager
 from src.zone_analyzer import ZoneAnalyzer
 from src.tradingview_db_manager import TradingViewDBManager
+from src.quote_snapshot import QuoteSnapshotService, get_quote_snapshot_service
 import os
 
 logger = logging.getLogger(__name__)
@@ -34,10 +34,11 @@ class BuyZoneScanner:
     - Visual ranking
     """
     
-    def __init__(self):
+    def __init__(self, quotes: Optional[QuoteSnapshotService] = None):
         self.zone_db = ZoneDatabaseManager()
         self.zone_analyzer = ZoneAnalyzer()
         self.tv_manager = TradingViewDBManager()
+        self.quotes = quotes or get_quote_snapshot_service()
     
     def get_stocks_from_sources(
         self,
@@ -168,30 +169,28 @@ class BuyZoneScanner:
         
         logger.info(f"Scanning {len(symbols)} symbols for buy zones...")
         
-        for symbol in symbols:
+        # All active demand zones in one query, current prices in one quote batch
+        try:
+            zones_by_symbol = self.zone_db.get_active_zones_by_symbol(
+                symbols,
+                zone_type='DEMAND',
+                min_strength=min_strength
+            )
+        except Exception as e:
+            logger.error(f"Error loading demand zones: {e}")
+            return pd.DataFrame()
+        
+        zoned_symbols = [symbol for symbol in symbols if zones_by_symbol.get(symbol)]
+        prices = self.quotes.get_last_prices(zoned_symbols)
+        
+        for symbol in zoned_symbols:
+            current_price = prices.get(symbol)
+            if current_price is None:
+                continue
+            
             try:
-                # Get active demand zones for this symbol
-                zones = self.zone_db.get_active_zones(
-                    symbol=symbol,
-                    zone_type='DEMAND',
-                    min_strength=min_strength
-                )
-                
-                if not zones:
-                    continue
-                
-                # Get current price
-                try:
-                    ticker = yf.Ticker(symbol)
-                    data = ticker.history(period='1d', interval='1m')
-                    if data.empty:
-                        continue
-                    current_price = float(data['Close'].iloc[-1])
-                except:
-                    continue
-                
                 # Analyze each zone
-                for zone in zones:
+                for zone in zones_by_symbol[symbol]:
                     # Calculate distance from zone
                     zone_midpoint = float(zone['zone_midpoint'])
                     distance_pct = abs((current_price - zone_midpoint) / zone_midpoint) * 100
@@ -4,8 +4,8 @@ Handles all PostgreSQL CRUD operations for supply/demand zones
 """
 
 import psycopg2
-from psycopg2.extras import RealDictCursor, execute_batch
-from typing import List, Dict, Optional, Tuple
+from psycopg2.extras import RealDictCursor, execute_batch, execute_values
+from typing import List, Dict, Iterable, Optional, Tuple
 from datetime import datetime
 import logging
 import os
@@ -63,38 +63,29 @@ class ZoneDatabaseManager:
     # ZONE CRUD OPERATIONS
     # =========================================================================
 
-    def save_zone(self, zone: Dict) -> int:
-        """
-        Save a new zone to database
-
-        Args:
-            zone: Zone dictionary from ZoneDetector/ZoneAnalyzer
-
-        Returns:
-            zone_id (primary key)
-        """
-
-        query = """
-            INSERT INTO sd_zones (
-                ticker, zone_type, timeframe,
-                zone_top, zone_bottom, zone_midpoint,
-                formed_date, formation_candle_index,
-                approach_volume, departure_volume, volume_ratio,
-                strength_score, time_at_zone, rejection_candles,
-                status, test_count, is_active, notes
-            ) VALUES (
-                %(symbol)s, %(zone_type)s, %(timeframe)s,
-                %(zone_top)s, %(zone_bottom)s, %(zone_midpoint)s,
-                %(formed_date)s, %(formation_candle_index)s,
-                %(approach_volume)s, %(departure_volume)s, %(volume_ratio)s,
-                %(strength_score)s, %(time_at_zone)s, %(rejection_candles)s,
-                %(status)s, %(test_count)s, %(is_active)s, %(notes)s
-            )
-            RETURNING id
-        """
-
-        # Set defaults
-        zone_data = {
+    ZONE_COLUMNS = (
+        'ticker', 'zone_type', 'timeframe',
+        'zone_top', 'zone_bottom', 'zone_midpoint',
+        'formed_date', 'formation_candle_index',
+        'approach_volume', 'departure_volume', 'volume_ratio',
+        'strength_score', 'time_at_zone', 'rejection_candles',
+        'status', 'test_count', 'is_active', 'notes'
+    )
+
+    # Value placeholders matching ZONE_COLUMNS (the ticker comes from 'symbol')
+    ZONE_VALUES_TEMPLATE = """(
+        %(symbol)s, %(zone_type)s, %(timeframe)s,
+        %(zone_top)s, %(zone_bottom)s, %(zone_midpoint)s,
+        %(formed_date)s, %(formation_candle_index)s,
+        %(approach_volume)s, %(departure_volume)s, %(volume_ratio)s,
+        %(strength_score)s, %(time_at_zone)s, %(rejection_candles)s,
+        %(status)s, %(test_count)s, %(is_active)s, %(notes)s
+    )"""
+
+    @staticmethod
+    def _zone_params(zone: Dict) -> Dict:
+        """Insert parameters for a zone, with defaults for optional fields"""
+        return {
             'symbol': zone['symbol'],
             'zone_type': zone['zone_type'],
             'timeframe': zone.get('timeframe', '1d'),
@@ -115,37 +106,68 @@ class ZoneDatabaseManager:
             'notes': zone.get('notes', '')
         }
 
+    def save_zone(self, zone: Dict) -> int:
+        """
+        Save a new zone to database
+
+        Args:
+            zone: Zone dictionary from ZoneDetector/ZoneAnalyzer
+
+        Returns:
+            zone_id (primary key)
+        """
+
+        query = f"""
+            INSERT INTO sd_zones ({', '.join(self.ZONE_COLUMNS)})
+            VALUES {self.ZONE_VALUES_TEMPLATE}
+            RETURNING id
+        """
+
         with self.get_connection() as conn:
             with conn.cursor() as cursor:
-                cursor.execute(query, zone_data)
+                cursor.execute(query, self._zone_params(zone))
                 zone_id = cursor.fetchone()[0]
                 conn.commit()
 
         logger.info(f"Saved zone {zone_id} for {zone['symbol']}")
         return zone_id
 
-    def save_zones_batch(self, zones: List[Dict]) -> List[int]:
+    def save_zones_batch(self, zones: List[Dict], page_size: int = 500) -> List[int]:
         """
         Save multiple zones in batch
 
+        All zones are inserted on one connection with multi-row INSERTs
+        and committed together.
+
         Args:
             zones: List of zone dictionaries
+            page_size: Zones per INSERT statement
 
         Returns:
-            List of zone IDs
+            List of zone IDs, in the order of zones
         """
 
         if not zones:
             return []
 
-        zone_ids = []
+        query = f"""
+            INSERT INTO sd_zones ({', '.join(self.ZONE_COLUMNS)})
+            VALUES %s
+            RETURNING id
+        """
+        rows = [self._zone_params(zone) for zone in zones]
 
         with self.get_connection() as conn:
             with conn.cursor() as cursor:
-                for zone in zones:
-                    zone_id = self.save_zone(zone)
-                    zone_ids.append(zone_id)
+                returned = execute_values(
+                    cursor, query, rows,
+                    template=self.ZONE_VALUES_TEMPLATE,
+                    page_size=page_size,
+                    fetch=True
+                )
+                conn.commit()
 
+        zone_ids = [row[0] for row in returned]
         logger.info(f"Saved {len(zone_ids)} zones in batch")
         return zone_ids
 
@@ -194,6 +216,55 @@ class ZoneDatabaseManager:
 
         return [dict(zone) for zone in zones]
 
+    def get_active_zones_by_symbol(
+        self,
+        symbols: Iterable[str],
+        zone_type: Optional[str] = None,
+        min_strength: int = 0
+    ) -> Dict[str, List[Dict]]:
+        """
+        Get active zones for many tickers in one query
+
+        Args:
+            symbols: Tickers to load
+            zone_type: Filter by type: 'SUPPLY' or 'DEMAND' (optional)
+            min_strength: Minimum strength score (default: 0)
+
+        Returns:
+            Dictionary of ticker -> active zones, ordered as get_active_zones
+            (every ticker present)
+        """
+
+        symbols = list(dict.fromkeys(symbols))
+        zones_by_symbol: Dict[str, List[Dict]] = {symbol: [] for symbol in symbols}
+        if not symbols:
+            return zones_by_symbol
+
+        query = """
+            SELECT *
+            FROM sd_zones
+            WHERE ticker = ANY(%s)
+              AND is_active = TRUE
+              AND status != 'BROKEN'
+              AND strength_score >= %s
+        """
+
+        params = [symbols, min_strength]
+
+        if zone_type:
+            query += " AND zone_type = %s"
+            params.append(zone_type)
+
+        query += " ORDER BY strength_score DESC, formed_date DESC"
+
+        with self.get_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(query, params)
+                for zone in cursor.fetchall():
+                    zones_by_symbol[zone['ticker']].append(dict(zone))
+
+        return zones_by_symbol
+
     def get_zone_by_id(self, zone_id: int) -> Optional[Dict]:
         """Get zone by ID"""
 
@@ -69,13 +69,14 @@ class ZoneDetector:
         df = df.reset_index(drop=True)
 
         zones = []
+        arrays = self._prepare_arrays(df)
 
         # Detect demand zones (at swing lows)
-        demand_zones = self._detect_demand_zones(df, symbol)
+        demand_zones = self._detect_demand_zones(df, symbol, arrays)
         zones.extend(demand_zones)
 
         # Detect supply zones (at swing highs)
-        supply_zones = self._detect_supply_zones(df, symbol)
+        supply_zones = self._detect_supply_zones(df, symbol, arrays)
         zones.extend(supply_zones)
 
         # Filter overlapping zones (keep strongest)
@@ -85,277 +86,155 @@ class ZoneDetector:
 
         return zones
 
-    def _detect_demand_zones(self, df: pd.DataFrame, symbol: str) -> List[Dict]:
-        """Detect demand zones at swing lows"""
-
-        # Find swing lows using scipy
-        lows = df['low'].values
-        peaks, properties = find_peaks(-lows, distance=self.swing_strength)
-
-        if len(peaks) == 0:
-            return []
-
-        zones = []
-
-        for peak_idx in peaks:
-            # Skip if too close to edges
-            if peak_idx < self.swing_strength or peak_idx >= len(df) - self.swing_strength:
-                continue
+    def _prepare_arrays(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Column arrays and prefix sums shared by every swing candidate
 
-            zone = self._analyze_demand_zone(df, peak_idx, symbol)
-            if zone:
-                zones.append(zone)
+        Prefix sums make each consolidation, approach and departure
+        volume/close total an O(1) difference instead of a DataFrame slice.
+        """
+        volume = df['volume'].to_numpy()
+        volume_sums = np.concatenate(([0], np.cumsum(volume)))
+
+        close = df['close'].to_numpy(dtype=float)
+        close_sums = np.concatenate(([0.0], np.cumsum(close)))
+
+        return {
+            'high': df['high'].to_numpy(dtype=float),
+            'low': df['low'].to_numpy(dtype=float),
+            'close': close,
+            'close_sums': close_sums,
+            'volume_sums': volume_sums,
+        }
 
-        return zones
+    def _detect_demand_zones(self, df: pd.DataFrame, symbol: str,
+                             arrays: Optional[Dict[str, np.ndarray]] = None) -> List[Dict]:
+        """Detect demand zones at swing lows"""
+        arrays = arrays if arrays is not None else self._prepare_arrays(df)
+        peaks, _ = find_peaks(-arrays['low'], distance=self.swing_strength)
+        return self._zones_from_swings(df, symbol, arrays, peaks, 'DEMAND')
 
-    def _detect_supply_zones(self, df: pd.DataFrame, symbol: str) -> List[Dict]:
+    def _detect_supply_zones(self, df: pd.DataFrame, symbol: str,
+                             arrays: Optional[Dict[str, np.ndarray]] = None) -> List[Dict]:
         """Detect supply zones at swing highs"""
+        arrays = arrays if arrays is not None else self._prepare_arrays(df)
+        peaks, _ = find_peaks(arrays['high'], distance=self.swing_strength)
+        return self._zones_from_swings(df, symbol, arrays, peaks, 'SUPPLY')
 
-        # Find swing highs using scipy
-        highs = df['high'].values
-        peaks, properties = find_peaks(highs, distance=self.swing_strength)
-
-        if len(peaks) == 0:
-            return []
-
-        zones = []
-
-        for peak_idx in peaks:
-            # Skip if too close to edges
-            if peak_idx < self.swing_strength or peak_idx >= len(df) - self.swing_strength:
-                continue
-
-            zone = self._analyze_supply_zone(df, peak_idx, symbol)
-            if zone:
-                zones.append(zone)
-
-        return zones
-
-    def _analyze_demand_zone(
+    def _zones_from_swings(
         self,
         df: pd.DataFrame,
-        swing_idx: int,
-        symbol: str
-    ) -> Optional[Dict]:
+        symbol: str,
+        arrays: Dict[str, np.ndarray],
+        peaks: np.ndarray,
+        zone_type: str
+    ) -> List[Dict]:
         """
-        Analyze potential demand zone at swing low
+        Evaluate every swing candidate of one zone type at once
 
-        Demand zones form when:
-        1. Price consolidates (tight range)
-        2. Then explodes upward (strong buying)
-        3. Volume on departure > volume on approach
+        A swing becomes a zone when the consolidation before it spans
+        min_zone_size_pct..max_zone_size_pct, volume over the 10 bars after it
+        is at least min_volume_ratio times the volume inside it, and the close
+        10 bars on has moved away from the zone by at least the zone's size.
         """
+        n = len(arrays['close'])
+        swings = peaks[(peaks >= self.swing_strength) & (peaks < n - self.swing_strength)]
+        if len(swings) == 0:
+            return []
 
-        # Find consolidation area before swing (approach)
-        consolidation = self._find_consolidation(df, swing_idx, direction='before')
-        if not consolidation:
-            return None
-
-        start_idx, end_idx = consolidation
-
-        # Zone boundaries (base of consolidation)
-        zone_bottom = df.loc[start_idx:end_idx, 'low'].min()
-        zone_top = df.loc[start_idx:end_idx, 'high'].max()
+        start, end, zone_bottom, zone_top = self._consolidation_bounds(arrays, swings)
         zone_midpoint = (zone_top + zone_bottom) / 2
 
-        # Validate zone size
         zone_size_pct = ((zone_top - zone_bottom) / zone_bottom) * 100
-        if zone_size_pct < self.min_zone_size_pct or zone_size_pct > self.max_zone_size_pct:
-            return None
-
-        # Calculate volume metrics
-        approach_volume = df.loc[start_idx:end_idx, 'volume'].sum()
-
-        # Find departure (impulse move up)
-        departure_end = min(end_idx + 10, len(df) - 1)
-        departure_volume = df.loc[end_idx:departure_end, 'volume'].sum()
-
-        volume_ratio = departure_volume / approach_volume if approach_volume > 0 else 0
-
-        # Require strong volume on departure
-        if volume_ratio < self.min_volume_ratio:
-            return None
-
-        # Calculate impulse move strength
-        departure_price = df.loc[departure_end, 'close']
-        impulse_pct = ((departure_price - zone_top) / zone_top) * 100
-
-        # Require meaningful impulse (at least 1x zone height, relaxed from 2x)
-        if impulse_pct < zone_size_pct * 1.0:
-            return None
-
-        # Calculate initial strength score (will be refined by ZoneAnalyzer)
-        strength_score = min(100, int(
-            (volume_ratio * 20) +  # Volume contribution
-            (impulse_pct * 5) +     # Impulse contribution
-            30                      # Base score for fresh zone
-        ))
-
-        # Build zone dictionary
-        zone = {
-            'symbol': symbol,
-            'zone_type': 'DEMAND',
-            'zone_top': float(zone_top),
-            'zone_bottom': float(zone_bottom),
-            'zone_midpoint': float(zone_midpoint),
-            'formed_date': df.loc[end_idx, 'timestamp'] if 'timestamp' in df.columns else datetime.now(),
-            'formation_candle_index': int(end_idx),
-            'approach_volume': int(approach_volume),
-            'departure_volume': int(departure_volume),
-            'volume_ratio': float(volume_ratio),
-            'strength_score': strength_score,
-            'time_at_zone': int(end_idx - start_idx + 1),
-            'status': 'FRESH',
-            'test_count': 0,
-            'is_active': True,
-            'notes': f'Swing low at index {swing_idx}, impulse: {impulse_pct:.1f}%'
-        }
+        keep = (zone_size_pct >= self.min_zone_size_pct) & (zone_size_pct <= self.max_zone_size_pct)
 
-        return zone
+        volume_sums = arrays['volume_sums']
+        approach_volume = volume_sums[end + 1] - volume_sums[start]
+        departure_end = np.minimum(end + 10, n - 1)
+        departure_volume = volume_sums[departure_end + 1] - volume_sums[end]
 
-    def _analyze_supply_zone(
-        self,
-        df: pd.DataFrame,
-        swing_idx: int,
-        symbol: str
-    ) -> Optional[Dict]:
-        """
-        Analyze potential supply zone at swing high
-
-        Supply zones form when:
-        1. Price consolidates (tight range)
-        2. Then drops sharply (strong selling)
-        3. Volume on departure > volume on approach
-        """
-
-        # Find consolidation area before swing (approach)
-        consolidation = self._find_consolidation(df, swing_idx, direction='before')
-        if not consolidation:
-            return None
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_ratio = np.where(approach_volume > 0, departure_volume / approach_volume, 0)
+        keep &= volume_ratio >= self.min_volume_ratio
 
-        start_idx, end_idx = consolidation
+        departure_price = arrays['close'][departure_end]
+        if zone_type == 'DEMAND':
+            impulse_pct = ((departure_price - zone_top) / zone_top) * 100
+        else:
+            impulse_pct = ((zone_bottom - departure_price) / zone_bottom) * 100
+        keep &= impulse_pct >= zone_size_pct * 1.0
 
-        # Zone boundaries (top of consolidation)
-        zone_bottom = df.loc[start_idx:end_idx, 'low'].min()
-        zone_top = df.loc[start_idx:end_idx, 'high'].max()
-        zone_midpoint = (zone_top + zone_bottom) / 2
+        swing_label = 'low' if zone_type == 'DEMAND' else 'high'
+        has_timestamp = 'timestamp' in df.columns
 
-        # Validate zone size
-        zone_size_pct = ((zone_top - zone_bottom) / zone_bottom) * 100
-        if zone_size_pct < self.min_zone_size_pct or zone_size_pct > self.max_zone_size_pct:
-            return None
-
-        # Calculate volume metrics
-        approach_volume = df.loc[start_idx:end_idx, 'volume'].sum()
-
-        # Find departure (impulse move down)
-        departure_end = min(end_idx + 10, len(df) - 1)
-        departure_volume = df.loc[end_idx:departure_end, 'volume'].sum()
-
-        volume_ratio = departure_volume / approach_volume if approach_volume > 0 else 0
-
-        # Require strong volume on departure
-        if volume_ratio < self.min_volume_ratio:
-            return None
-
-        # Calculate impulse move strength
-        departure_price = df.loc[departure_end, 'close']
-        impulse_pct = ((zone_bottom - departure_price) / zone_bottom) * 100
-
-        # Require meaningful impulse (at least 1x zone height, relaxed from 2x)
-        if impulse_pct < zone_size_pct * 1.0:
-            return None
-
-        # Calculate initial strength score
-        strength_score = min(100, int(
-            (volume_ratio * 20) +  # Volume contribution
-            (impulse_pct * 5) +     # Impulse contribution
-            30                      # Base score for fresh zone
-        ))
-
-        # Build zone dictionary
-        zone = {
-            'symbol': symbol,
-            'zone_type': 'SUPPLY',
-            'zone_top': float(zone_top),
-            'zone_bottom': float(zone_bottom),
-            'zone_midpoint': float(zone_midpoint),
-            'formed_date': df.loc[end_idx, 'timestamp'] if 'timestamp' in df.columns else datetime.now(),
-            'formation_candle_index': int(end_idx),
-            'approach_volume': int(approach_volume),
-            'departure_volume': int(departure_volume),
-            'volume_ratio': float(volume_ratio),
-            'strength_score': strength_score,
-            'time_at_zone': int(end_idx - start_idx + 1),
-            'status': 'FRESH',
-            'test_count': 0,
-            'is_active': True,
-            'notes': f'Swing high at index {swing_idx}, impulse: {impulse_pct:.1f}%'
-        }
+        zones = []
+        for i in np.flatnonzero(keep):
+            strength_score = min(100, int(
+                (volume_ratio[i] * 20) +  # Volume contribution
+                (impulse_pct[i] * 5) +     # Impulse contribution
+                30                         # Base score for fresh zone
+            ))
+            end_idx = int(end[i])
+
+            zones.append({
+                'symbol': symbol,
+                'zone_type': zone_type,
+                'zone_top': float(zone_top[i]),
+                'zone_bottom': float(zone_bottom[i]),
+                'zone_midpoint': float(zone_midpoint[i]),
+                'formed_date': df['timestamp'].iloc[end_idx] if has_timestamp else datetime.now(),
+                'formation_candle_index': end_idx,
+                'approach_volume': int(approach_volume[i]),
+                'departure_volume': int(departure_volume[i]),
+                'volume_ratio': float(volume_ratio[i]),
+                'strength_score': strength_score,
+                'time_at_zone': int(end_idx - start[i] + 1),
+                'status': 'FRESH',
+                'test_count': 0,
+                'is_active': True,
+                'notes': f'Swing {swing_label} at index {swings[i]}, impulse: {impulse_pct[i]:.1f}%'
+            })
 
-        return zone
+        return zones
 
-    def _find_consolidation(
+    def _consolidation_bounds(
         self,
-        df: pd.DataFrame,
-        swing_idx: int,
-        direction: str = 'before',
+        arrays: Dict[str, np.ndarray],
+        swings: np.ndarray,
         max_candles: int = 10
-    ) -> Optional[Tuple[int, int]]:
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
         """
-        Find consolidation area (tight price range) near swing point
+        Consolidation before each swing: the smallest window of 3-10 bars
+        ending at the swing whose range is under 5% of its average close,
+        else the 5 bars before the swing
 
-        Args:
-            df: Price data
-            swing_idx: Index of swing point
-            direction: 'before' or 'after' swing point
-            max_candles: Maximum consolidation length
+        Column k of the backward running max/min holds the high/low extreme
+        over [swing - k, swing], so every window size is one lookup.
 
         Returns:
-            (start_idx, end_idx) or None
+            (start, end, zone bottom, zone top) arrays, one entry per swing
         """
-
-        if direction == 'before':
-            # Look backward from swing
-            start_search = max(0, swing_idx - max_candles)
-            end_search = swing_idx
-
-            # Find tight consolidation
-            for window_size in range(3, max_candles + 1):
-                start = swing_idx - window_size
-                if start < 0:
-                    continue
-
-                window = df.loc[start:swing_idx]
-                high_range = window['high'].max() - window['low'].min()
-                avg_price = window['close'].mean()
-
-                # Tight consolidation: range < 5% of price (relaxed from 2%)
-                if (high_range / avg_price) < 0.05:
-                    return (start, swing_idx)
-
-            # If no tight consolidation, use last 3-5 candles
-            return (max(0, swing_idx - 5), swing_idx)
-
-        else:
-            # Look forward from swing
-            start_search = swing_idx
-            end_search = min(len(df) - 1, swing_idx + max_candles)
-
-            for window_size in range(3, max_candles + 1):
-                end = swing_idx + window_size
-                if end >= len(df):
-                    continue
-
-                window = df.loc[swing_idx:end]
-                high_range = window['high'].max() - window['low'].min()
-                avg_price = window['close'].mean()
-
-                # Relaxed from 0.02 (2%) to 0.05 (5%)
-                if (high_range / avg_price) < 0.05:
-                    return (swing_idx, end)
-
-            return (swing_idx, min(len(df) - 1, swing_idx + 5))
+        offsets = np.arange(max_candles + 1)
+        positions = swings[:, None] - offsets[None, :]
+        valid = positions >= 0
+        positions = np.maximum(positions, 0)
+
+        highs = np.maximum.accumulate(np.where(valid, arrays['high'][positions], -np.inf), axis=1)
+        lows = np.minimum.accumulate(np.where(valid, arrays['low'][positions], np.inf), axis=1)
+
+        close_sums = arrays['close_sums']
+        with np.errstate(invalid='ignore'):
+            avg_price = (close_sums[swings + 1][:, None] - close_sums[positions]) / (offsets + 1)
+            tight = valid & ((highs - lows) / avg_price < 0.05)
+        tight[:, :3] = False
+
+        # First tight window size from 3 up, else the last 5 candles
+        found = tight.any(axis=1)
+        window_size = np.where(found, tight.argmax(axis=1), np.minimum(swings, 5))
+        start = swings - window_size
+
+        rows = np.arange(len(swings))
+        return start, swings, lows[rows, window_size], highs[rows, window_size]
 
     def _filter_overlapping_zones(self, zones: List[Dict]) -> List[Dict]:
         """
@@ -22,6 +22,9 @@ Usage:
 
     # Scan watchlist
     python supply_demand_scanner_service.py --watchlist my_watchlist
+
+    # Refresh watchlist zones in one batch job (bulk OHLCV, process pool)
+    python supply_demand_scanner_service.py --watchlist my_watchlist --batch
 """
 
 import sys
@@ -39,6 +42,7 @@ sys.path.insert(0, 'src')
 from src.zone_detector import ZoneDetector
 from src.zone_analyzer import ZoneAnalyzer
 from src.zone_database_manager import ZoneDatabaseManager
+from src.zone_batch_detector import ZoneBatchDetector
 from src.price_monitor import PriceMonitor
 from src.alert_manager import AlertManager
 
@@ -196,20 +200,17 @@ class SupplyDemandScanner:
             logger.error(f"Error monitoring {symbol}: {e}")
             return []
 
-    def scan_watchlist(self, watchlist_name: str = "default") -> Dict:
+    def get_watchlist_symbols(self, watchlist_name: str = "default") -> List[str]:
         """
-        Scan all stocks in a TradingView watchlist
+        Get the tickers of a TradingView watchlist
 
         Args:
             watchlist_name: Watchlist name
 
         Returns:
-            Dictionary with scan summary
+            Sorted list of tickers (common stocks if the database is unavailable)
         """
 
-        start_time = time.time()
-        logger.info(f"Scanning watchlist: {watchlist_name}")
-
         # Get watchlist symbols from database
         query = """
             SELECT DISTINCT ticker
@@ -229,6 +230,54 @@ class SupplyDemandScanner:
             symbols = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'NVDA', 'META', 'SPY', 'QQQ']
             logger.info(f"Using fallback symbols: {symbols}")
 
+        return symbols
+
+    def refresh_watchlist_zones(self, watchlist_name: str = "default", max_workers: Optional[int] = None) -> Dict:
+        """
+        Refresh zones for a whole watchlist in one batch job
+
+        OHLCV is downloaded in one request, symbols are detected in a process
+        pool and new zones are saved with a single batch insert.
+
+        Args:
+            watchlist_name: Watchlist name
+            max_workers: Worker processes (None = CPU count)
+
+        Returns:
+            Dictionary with refresh summary
+        """
+
+        symbols = self.get_watchlist_symbols(watchlist_name)
+        if not symbols:
+            logger.warning(f"No symbols in watchlist '{watchlist_name}'")
+            return {'watchlist': watchlist_name, 'symbols_scanned': 0}
+
+        batch = ZoneBatchDetector(
+            db=self.db,
+            detector=self.detector,
+            analyzer=self.analyzer,
+            max_workers=max_workers
+        )
+        summary = batch.refresh(symbols)
+        summary['watchlist'] = watchlist_name
+        return summary
+
+    def scan_watchlist(self, watchlist_name: str = "default") -> Dict:
+        """
+        Scan all stocks in a TradingView watchlist
+
+        Args:
+            watchlist_name: Watchlist name
+
+        Returns:
+            Dictionary with scan summary
+        """
+
+        start_time = time.time()
+        logger.info(f"Scanning watchlist: {watchlist_name}")
+
+        symbols = self.get_watchlist_symbols(watchlist_name)
+
         if not symbols:
             logger.warning(f"No symbols in watchlist '{watchlist_name}'")
             return {'watchlist': watchlist_name, 'symbols_scanned': 0}
@@ -379,6 +428,8 @@ def main():
                        help='Disable Telegram alerts')
     parser.add_argument('--cleanup', type=int, metavar='DAYS',
                        help='Cleanup zones older than N days')
+    parser.add_argument('--batch', action='store_true',
+                       help='Refresh watchlist zones in one batch job')
 
     args = parser.parse_args()
 
@@ -418,6 +469,17 @@ def main():
             print(f"  Events Detected: {summary['events_detected']}")
             return
 
+        # Batch zone refresh mode
+        if args.batch:
+            logger.info(f"Batch zone refresh on watchlist: {args.watchlist}")
+            summary = scanner.refresh_watchlist_zones(args.watchlist)
+            print(f"\nBatch Refresh Results:")
+            print(f"  Symbols Scanned: {summary['symbols_scanned']}")
+            print(f"  Zones Found: {summary.get('zones_found', 0)}")
+            print(f"  Zones Saved: {summary.get('zones_saved', 0)}")
+            print(f"  Duration: {summary.get('duration_seconds', 0):.1f}s")
+            return
+
         # Watchlist scan mode
         if args.run_once or not args.scheduled:
             logger.info(f"Running single scan on watchlist: {args.watchlist}")
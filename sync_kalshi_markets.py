@@ -58,9 +58,11 @@ def sync_football_markets():
     logger.info("\n[4] Storing NFL markets in database...")
     nfl_stored = 0
     nfl_failed = 0
+    nfl_rate = None
 
     try:
         nfl_stored = db.store_markets(nfl_markets, market_type='nfl')
+        nfl_rate = db.last_ingest_stats['rows_per_second']
         logger.info(f"    ✅ Stored {nfl_stored} NFL markets")
     except Exception as e:
         logger.error(f"    ❌ Error storing NFL markets: {e}")
@@ -70,9 +72,11 @@ def sync_football_markets():
     logger.info("\n[5] Storing College Football markets in database...")
     college_stored = 0
     college_failed = 0
+    college_rate = None
 
     try:
         college_stored = db.store_markets(college_markets, market_type='college')
+        college_rate = db.last_ingest_stats['rows_per_second']
         logger.info(f"    ✅ Stored {college_stored} College Football markets")
     except Exception as e:
         logger.error(f"    ❌ Error storing College markets: {e}")
@@ -91,7 +95,8 @@ def sync_football_markets():
             successful=nfl_stored,
             failed=nfl_failed,
             duration=duration,
-            status='completed' if nfl_failed == 0 else 'error'
+            status='completed' if nfl_failed == 0 else 'error',
+            rows_per_second=nfl_rate
         )
 
     # Log College sync
@@ -103,7 +108,8 @@ def sync_football_markets():
             successful=college_stored,
             failed=college_failed,
             duration=duration,
-            status='completed' if college_failed == 0 else 'error'
+            status='completed' if college_failed == 0 else 'error',
+            rows_per_second=college_rate
         )
 
     # Summary
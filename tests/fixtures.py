@@ -0,0 +1,140 @@
+"""
+Synthetic data builders shared by the tests and benchmarks/
+Each returns data shaped like the real input of the engine it exercises
+"""
+
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+
+def make_synthetic_chains(n_rows: int, seed: int = 7) -> pd.DataFrame:
+    """Build a stacked put-chain frame shaped like _fetch_put_chain output"""
+    rng = np.random.default_rng(seed)
+    stock_price = rng.uniform(5, 50, n_rows)
+    strike = np.round(stock_price * rng.uniform(0.6, 0.95, n_rows), 1)
+    bid = np.round(np.maximum(rng.normal(0.6, 0.4, n_rows), 0), 2)
+    ask = np.round(bid + rng.uniform(0, 0.3, n_rows), 2)
+    expiration = (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
+
+    return pd.DataFrame({
+        'strike': strike,
+        'bid': bid,
+        'ask': ask,
+        'volume': rng.integers(0, 500, n_rows).astype(float),
+        'openInterest': rng.integers(0, 2000, n_rows).astype(float),
+        'impliedVolatility': rng.uniform(0.2, 1.2, n_rows),
+        'symbol': [f"SYM{i % 2000}" for i in range(n_rows)],
+        'stock_price': stock_price,
+        'expiration': expiration,
+        'dte': (datetime.strptime(expiration, '%Y-%m-%d') - datetime.now()).days,
+    })
+
+
+def make_synthetic_predictions(n_rows: int, seed: int = 11) -> pd.DataFrame:
+    """Build a prediction-history frame shaped like load_historical_data output"""
+    rng = np.random.default_rng(seed)
+    price = np.round(rng.uniform(0.1, 0.9, n_rows), 2)
+    probability = np.clip(price + rng.normal(0.04, 0.08, n_rows), 0.01, 0.99)
+    is_correct = rng.random(n_rows) < probability
+    predicted_at = pd.Timestamp('2025-09-01') + pd.to_timedelta(np.sort(rng.uniform(0, 90, n_rows)), unit='D')
+
+    return pd.DataFrame({
+        'id': np.arange(n_rows),
+        'ticker': [f"KXNFLGAME-SYN{i}" for i in range(n_rows)],
+        'predicted_outcome': 'yes',
+        'actual_outcome': np.where(is_correct, 'yes', 'no'),
+        'confidence_score': np.round(rng.uniform(40, 95, n_rows), 1),
+        'predicted_probability': probability,
+        'market_price': price,
+        'is_correct': is_correct,
+        'market_type': np.where(rng.random(n_rows) < 0.6, 'nfl', 'college'),
+        'sector': 'football',
+        'predicted_at': predicted_at,
+        'settled_at': predicted_at + pd.Timedelta(hours=4),
+        'edge_percentage': np.round((probability - price) * 100, 2),
+    })
+
+
+def make_synthetic_ohlcv(n_bars: int, seed: int = 7, start_price: float = 100.0) -> pd.DataFrame:
+    """Random-walk OHLCV bars with gaps and wicks, indexed by minute"""
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(0, 0.004, n_bars)))
+    open_ = np.concatenate(([start_price], close[:-1])) * (1 + rng.normal(0, 0.002, n_bars))
+    body_high = np.maximum(open_, close)
+    body_low = np.minimum(open_, close)
+
+    return pd.DataFrame({
+        'open': open_,
+        'high': body_high * (1 + np.abs(rng.normal(0, 0.002, n_bars))),
+        'low': body_low * (1 - np.abs(rng.normal(0, 0.002, n_bars))),
+        'close': close,
+        'volume': rng.integers(1_000, 100_000, n_bars),
+    }, index=pd.date_range('2024-01-02 09:30', periods=n_bars, freq='min'))
+
+
+def make_synthetic_universe(n_symbols: int, n_bars: int = 126, seed: int = 7) -> Dict[str, pd.DataFrame]:
+    """Random-walk daily OHLCV frames for n_symbols synthetic tickers"""
+    rng = np.random.default_rng(seed)
+    timestamps = pd.bdate_range('2024-01-02', periods=n_bars)
+    frames = {}
+    for i in range(n_symbols):
+        start_price = rng.uniform(10, 500)
+        close = start_price * np.exp(np.cumsum(rng.normal(0, 0.02, n_bars)))
+        open_ = np.concatenate(([start_price], close[:-1])) * (1 + rng.normal(0, 0.005, n_bars))
+        frames[f'SYM{i:04d}'] = pd.DataFrame({
+            'timestamp': timestamps,
+            'open': open_,
+            'high': np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, n_bars))),
+            'low': np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, n_bars))),
+            'close': close,
+            'volume': rng.integers(100_000, 5_000_000, n_bars),
+        })
+    return frames
+
+
+def make_synthetic_slate(num_markets: int = 300) -> List[Dict]:
+    """Synthetic Kalshi markets shaped like the ensemble's market dicts"""
+    return [
+        {
+            'ticker': f'NFL-SYN-{i:04d}',
+            'title': f'Synthetic market {i}',
+            'yes_price': round(0.05 + 0.9 * ((i * 37) % 100) / 100, 2),
+            'no_price': round(0.95 - 0.9 * ((i * 37) % 100) / 100, 2),
+            'volume': 10000 + i,
+        }
+        for i in range(num_markets)
+    ]
+
+
+def make_synthetic_messages(n: int = 10000, seed: int = 7) -> List[Dict]:
+    """Discord-like messages mixing trade alerts and chatter"""
+    rng = random.Random(seed)
+    tickers = ['SPY', 'QQQ', 'AAPL', 'NVDA', 'TSLA', 'AMD', 'META', 'MSFT']
+    templates = [
+        "${t} {s}C {m}/{d} exp entry {e} target {g} stop {x} breakout, looking strong",
+        "{t} pullback into support, swing long @ {e} pt {g} sl {x}",
+        "Taking {t} {s}P weekly puts on the earnings miss, bearish below {x}",
+        "gm everyone, CEO said on the call the FDA news is priced in already",
+        "{t} gap up premarket, day trade scalp only, quick in and out",
+        "anyone watching the market today? feels weak, might just sit on hands",
+    ]
+
+    messages = []
+    for i in range(n):
+        price = rng.uniform(20, 500)
+        content = rng.choice(templates).format(
+            t=rng.choice(tickers), s=int(price), m=rng.randint(1, 12), d=rng.randint(1, 28),
+            e=f"{price:.2f}", g=f"{price * 1.1:.2f}", x=f"{price * 0.95:.2f}",
+        )
+        messages.append({
+            'message_id': 1_100_000_000_000_000_000 + i,
+            'channel_id': 99,
+            'author_name': f"trader{i % 25}",
+            'timestamp': datetime(2025, 11, 1),
+            'content': content,
+        })
+    return messages
@@ -0,0 +1,185 @@
+"""
+Tests for set-based alert diffing in the Xtrades alert processor
+Covers the per-cycle open-trade index, batched writes and the stable alert ID
+"""
+
+import pytest
+import os
+import sys
+from datetime import date, datetime
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.xtrades_monitor.alert_processor import (
+    AlertProcessor,
+    AlertType,
+    CLOSE_TRADES_SQL,
+    OPEN_TRADES_QUERY,
+)
+
+
+def _trade(ticker, strike=None, entry=1.0, **extra):
+    return {
+        'ticker': ticker,
+        'strategy': 'Call' if strike else 'Shares',
+        'action': 'BTO',
+        'entry_price': entry,
+        'strike_price': strike,
+        'expiration_date': '2025-12-19' if strike else None,
+        'alert_text': f'BTO {ticker}',
+        **extra,
+    }
+
+
+def _row(processor, row_id, profile_id, trade, **overrides):
+    row = {
+        'id': row_id,
+        'profile_id': profile_id,
+        'ticker': trade['ticker'],
+        'strategy': trade['strategy'],
+        'action': trade['action'],
+        'xtrades_alert_id': processor._generate_alert_id(trade),
+        'alert_text': trade['alert_text'],
+        'entry_price': Decimal(str(trade['entry_price'])),
+        'strike_price': Decimal(str(trade['strike_price'])) if trade['strike_price'] else None,
+        'expiration_date': date.fromisoformat(trade['expiration_date']) if trade['expiration_date'] else None,
+        'quantity': None,
+        'status': 'open',
+        'updated_at': datetime(2025, 11, 1),
+    }
+    row.update(overrides)
+    return row
+
+
+def _mock_processor(profiles, open_rows):
+    """Processor on a mock pool; the cursor answers the profile lookup, open trades and close"""
+    processor = AlertProcessor.__new__(AlertProcessor)
+    processor.last_cycle_stats = {}
+    processor.pool = MagicMock()
+    conn = MagicMock()
+    processor.pool.get_connection.return_value.__enter__.return_value = conn
+    cursor = MagicMock()
+    conn.cursor.return_value.__enter__.return_value = cursor
+
+    def fetchall():
+        sql = cursor.execute.call_args[0][0]
+        if 'FROM xtrades_profiles' in sql:
+            return [{'id': profile_id, 'username': name} for name, profile_id in profiles.items()]
+        if sql == OPEN_TRADES_QUERY:
+            return open_rows
+        if sql == CLOSE_TRADES_SQL:
+            ids = cursor.execute.call_args[0][1][0]
+            return [{'id': row_id, 'status': 'closed'} for row_id in ids]
+        return []
+
+    cursor.fetchall.side_effect = fetchall
+    return processor, conn, cursor
+
+
+def _fake_execute_values(cursor, sql, values, template=None, page_size=100, fetch=False):
+    if sql.lstrip().startswith('INSERT'):
+        return [{'id': 1000 + i, 'profile_id': v[0], 'xtrades_alert_id': v[-1], 'ticker': v[1]}
+                for i, v in enumerate(values)]
+    return [{'id': v[0], 'entry_price': v[1]} for v in values]
+
+
+def test_cycle_diffs_new_changed_and_closed_in_batches():
+    processor = AlertProcessor.__new__(AlertProcessor)
+    kept, changed, gone = _trade('AAPL', 190, 2.5), _trade('TSLA', 250, 4.0), _trade('NVDA', entry=120.0)
+    open_rows = [
+        _row(processor, 1, 10, kept),
+        _row(processor, 2, 10, changed),
+        _row(processor, 3, 10, gone),
+        _row(processor, 4, 20, _trade('SPY', 600, 1.2)),
+    ]
+    processor, conn, cursor = _mock_processor({'alice': 10, 'bob': 20}, open_rows)
+
+    scrapes = {
+        'alice': [dict(kept), dict(changed, entry_price=4.4), _trade('AMD', 150, 3.0)],
+        'bob': [_trade('SPY', 600, 1.2)],
+    }
+    with patch('src.xtrades_monitor.alert_processor.execute_values',
+               side_effect=_fake_execute_values) as execute_values:
+        results = processor.process_cycle(scrapes)
+
+    alice, bob = results['alice'], results['bob']
+    assert [a['trade_data']['ticker'] for a in alice['new_alerts']] == ['AMD']
+    assert alice['new_alerts'][0]['type'] == AlertType.NEW
+    assert [a['trade_id'] for a in alice['updated_alerts']] == [2]
+    assert alice['updated_alerts'][0]['changes'] == {'entry_price': (Decimal('4.0'), 4.4)}
+    assert [a['trade_id'] for a in alice['closed_alerts']] == [3]
+    assert bob == {'new_alerts': [], 'updated_alerts': [], 'closed_alerts': []}
+
+    # One insert and one update statement for the whole cycle
+    inserted, updated = [c[0][2] for c in execute_values.call_args_list]
+    assert [v[1] for v in inserted] == ['AMD'] and [v[0] for v in updated] == [2]
+    assert processor.last_cycle_stats == {'profiles': 2, 'new': 1, 'updated': 1, 'closed': 1, 'queries': 5}
+    conn.set_isolation_level.assert_called_once()
+
+
+def test_query_count_does_not_grow_with_profiles():
+    profiles = {f'trader{i}': i for i in range(50)}
+    processor, _, cursor = _mock_processor(profiles, [])
+    scrapes = {name: [_trade('AAPL', 190), _trade(f'T{i}')] for i, name in enumerate(profiles)}
+
+    with patch('src.xtrades_monitor.alert_processor.execute_values',
+               side_effect=_fake_execute_values) as execute_values:
+        results = processor.process_cycle(scrapes)
+
+    assert all(len(alerts['new_alerts']) == 2 for alerts in results.values())
+    assert cursor.execute.call_count + execute_values.call_count == 3
+    assert processor.last_cycle_stats['queries'] == 3
+
+
+def test_legacy_alert_ids_still_match_and_duplicates_collapse():
+    processor = AlertProcessor.__new__(AlertProcessor)
+    trade = _trade('AAPL', 190, 2.5)
+    legacy = _row(processor, 7, 10, trade, xtrades_alert_id='AAPL_BTO_190_2025-12-19_2025-11-01_09:30:00')
+    processor, _, cursor = _mock_processor({'alice': 10}, [legacy])
+
+    with patch('src.xtrades_monitor.alert_processor.execute_values') as execute_values:
+        results = processor.process_cycle({'alice': [dict(trade), dict(trade)]})
+
+    assert results['alice'] == {'new_alerts': [], 'updated_alerts': [], 'closed_alerts': []}
+    execute_values.assert_not_called()
+    assert cursor.execute.call_count == 2
+
+
+def test_incremental_cycle_does_not_close_missing_trades():
+    processor = AlertProcessor.__new__(AlertProcessor)
+    open_rows = [_row(processor, 1, 10, _trade('AAPL', 190))]
+    processor, _, cursor = _mock_processor({'alice': 10}, open_rows)
+
+    with patch('src.xtrades_monitor.alert_processor.execute_values', side_effect=_fake_execute_values):
+        results = processor.process_cycle({'alice': [_trade('MSFT', 400)]}, detect_closed=False)
+
+    assert len(results['alice']['new_alerts']) == 1 and results['alice']['closed_alerts'] == []
+    assert all(c[0][0] != CLOSE_TRADES_SQL for c in cursor.execute.call_args_list)
+
+
+def test_unknown_profile_and_database_error():
+    processor, _, _ = _mock_processor({}, [])
+    assert processor.process_cycle({'ghost': [_trade('AAPL')]})['ghost']['new_alerts'] == []
+    assert processor.process_cycle({}) == {}
+
+    processor, _, cursor = _mock_processor({'alice': 10}, [])
+    with patch('src.xtrades_monitor.alert_processor.execute_values', side_effect=RuntimeError('db down')):
+        assert processor.process_scrape_results('alice', [_trade('AAPL')]) == {
+            'new_alerts': [], 'updated_alerts': [], 'closed_alerts': []}
+
+
+def test_alert_id_is_stable_and_values_normalized():
+    processor = AlertProcessor.__new__(AlertProcessor)
+    scraped = _trade('AAPL', 190, 2.5, alert_timestamp=datetime.now())
+    stored = {**scraped, 'strike_price': Decimal('190.00'), 'expiration_date': date(2025, 12, 19),
+              'alert_timestamp': datetime(2025, 1, 1)}
+
+    assert processor._generate_alert_id(scraped) == processor._generate_alert_id(stored)
+    assert processor._generate_alert_id(scraped) != processor._generate_alert_id(_trade('AAPL', 195, 2.5))
+    assert not processor._is_trade_updated({**stored, 'entry_price': Decimal('2.50')}, scraped)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
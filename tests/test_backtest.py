@@ -0,0 +1,271 @@
+"""
+Tests for the array-backed BacktestEngine simulation core
+Verifies evaluate_grid matches the original row-by-row simulation
+"""
+
+import pytest
+import os
+import sys
+import logging
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from analytics.backtest import BacktestEngine, BacktestConfig
+from analytics.metrics import (
+    calculate_brier_score,
+    calculate_calmar_ratio,
+    calculate_log_loss,
+    calculate_max_drawdown,
+    calculate_sharpe_ratio,
+    calculate_sortino_ratio,
+)
+from fixtures import make_synthetic_predictions
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_KEYS = [
+    'total_trades', 'winning_trades', 'losing_trades', 'win_rate',
+    'final_capital', 'total_pnl', 'total_return_pct',
+    'sharpe_ratio', 'sortino_ratio', 'max_drawdown_pct', 'max_drawdown_amount',
+    'avg_trade_pnl', 'avg_win_amount', 'avg_loss_amount', 'profit_factor',
+    'avg_brier_score', 'avg_log_loss',
+]
+
+
+def run_backtest_rowwise(engine: BacktestEngine, df: pd.DataFrame, config: BacktestConfig) -> Dict:
+    """
+    Original row-by-row simulation (iterrows, O(n^2) drawdown check)
+
+    The reference evaluate_grid is checked against; df must already be
+    filtered to the rows config trades.
+    """
+    # Initialize tracking
+    capital = config.initial_capital
+    trades = []
+    equity_curve = [capital]
+    returns_list = []
+
+    # Track performance
+    total_trades = 0
+    winning_trades = 0
+    losing_trades = 0
+
+    # Simulate each trade
+    for idx, row in df.iterrows():
+        # Calculate position size
+        position_size = engine.calculate_position_size(row, capital, config)
+
+        if position_size == 0:
+            continue
+
+        # Calculate P&L
+        pnl, roi_pct = engine.calculate_trade_pnl(row, position_size)
+
+        # Update capital
+        capital_before = capital
+        capital += pnl
+        equity_curve.append(capital)
+
+        # Track returns
+        returns_list.append(pnl / position_size)
+
+        # Record trade
+        is_win = pnl > 0
+        trades.append({
+            'ticker': row['ticker'],
+            'market_type': row['market_type'],
+            'prediction_outcome': row['predicted_outcome'],
+            'actual_outcome': row['actual_outcome'],
+            'confidence_score': row['confidence_score'],
+            'edge_percentage': row.get('edge_percentage', 0),
+            'entry_price': row['market_price'],
+            'position_size': position_size,
+            'position_pct': (position_size / capital_before * 100) if capital_before > 0 else 0,
+            'is_win': is_win,
+            'pnl': pnl,
+            'roi_pct': roi_pct,
+            'trade_date': row['predicted_at'],
+            'settlement_date': row['settled_at'],
+            'capital_before': capital_before,
+            'capital_after': capital,
+        })
+
+        # Update counters
+        total_trades += 1
+        if is_win:
+            winning_trades += 1
+        else:
+            losing_trades += 1
+
+        # Check drawdown limit
+        if len(equity_curve) > 1:
+            peak = max(equity_curve)
+            current_dd = ((capital - peak) / peak * 100)
+            if current_dd <= -config.max_drawdown_limit:
+                logger.warning(f"Max drawdown limit reached: {current_dd:.2f}%. Stopping backtest.")
+                break
+
+    return calculate_results_rowwise(
+        engine, config, df, trades, equity_curve, returns_list,
+        total_trades, winning_trades, losing_trades
+    )
+
+
+def calculate_results_rowwise(engine: BacktestEngine, config: BacktestConfig, df: pd.DataFrame,
+                              trades: List[Dict], equity_curve: List[float],
+                              returns_list: List[float], total_trades: int,
+                              winning_trades: int, losing_trades: int) -> Dict:
+    """Results dict from the row-by-row simulation's trade list and equity curve"""
+
+    if total_trades == 0:
+        return engine._empty_results(config)
+
+    final_capital = equity_curve[-1]
+    total_pnl = final_capital - config.initial_capital
+    total_return_pct = (total_pnl / config.initial_capital) * 100
+
+    win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
+
+    # Calculate financial metrics
+    trades_df = pd.DataFrame(trades)
+    avg_trade_pnl = trades_df['pnl'].mean()
+    avg_win = trades_df[trades_df['is_win']]['pnl'].mean() if winning_trades > 0 else 0
+    avg_loss = trades_df[~trades_df['is_win']]['pnl'].mean() if losing_trades > 0 else 0
+
+    gross_profit = trades_df[trades_df['is_win']]['pnl'].sum() if winning_trades > 0 else 0
+    gross_loss = abs(trades_df[~trades_df['is_win']]['pnl'].sum()) if losing_trades > 0 else 0
+    profit_factor = (gross_profit / gross_loss) if gross_loss > 0 else np.inf
+
+    # Calculate risk-adjusted metrics
+    returns = np.array(returns_list)
+    equity = np.array(equity_curve)
+
+    sharpe = calculate_sharpe_ratio(returns, periods_per_year=365) if len(returns) > 1 else 0
+    sortino = calculate_sortino_ratio(returns, periods_per_year=365) if len(returns) > 1 else 0
+
+    max_dd_pct, start_idx, end_idx = calculate_max_drawdown(equity)
+    max_dd_amount = equity[start_idx] - equity[end_idx] if start_idx >= 0 else 0
+
+    calmar = calculate_calmar_ratio(returns, equity, periods_per_year=365) if len(returns) > 1 else 0
+
+    # Calculate calibration metrics
+    predicted_probs = df['predicted_probability'].values
+    actual_outcomes = df['is_correct'].astype(float).values
+
+    avg_brier = calculate_brier_score(predicted_probs, actual_outcomes)
+    avg_log_loss = calculate_log_loss(predicted_probs, actual_outcomes)
+
+    return {
+        'config': config,
+        'start_date': df['predicted_at'].min(),
+        'end_date': df['predicted_at'].max(),
+        'total_trades': total_trades,
+        'winning_trades': winning_trades,
+        'losing_trades': losing_trades,
+        'win_rate': win_rate,
+        'final_capital': final_capital,
+        'total_pnl': total_pnl,
+        'total_return_pct': total_return_pct,
+        'sharpe_ratio': sharpe,
+        'sortino_ratio': sortino,
+        'calmar_ratio': calmar,
+        'max_drawdown_pct': abs(max_dd_pct),
+        'max_drawdown_amount': max_dd_amount,
+        'avg_trade_pnl': avg_trade_pnl,
+        'avg_win_amount': avg_win,
+        'avg_loss_amount': avg_loss,
+        'profit_factor': profit_factor,
+        'avg_brier_score': avg_brier,
+        'avg_log_loss': avg_log_loss,
+        'trades': trades,
+        'equity_curve': equity_curve,
+    }
+
+
+@pytest.fixture
+def engine():
+    return BacktestEngine()
+
+
+@pytest.fixture
+def history():
+    return make_synthetic_predictions(800)
+
+
+def _rowwise(engine, df, config):
+    mask = engine._config_mask(engine.prepare_arrays(df), config)
+    return run_backtest_rowwise(engine, df[mask].reset_index(drop=True), config)
+
+
+def _assert_same_results(actual, expected):
+    for key in SUMMARY_KEYS:
+        assert actual[key] == pytest.approx(expected[key], rel=1e-6, abs=1e-6, nan_ok=True), key
+    assert actual['equity_curve'] == pytest.approx(expected['equity_curve'], rel=1e-9)
+    assert actual['start_date'] == expected['start_date']
+    assert actual['end_date'] == expected['end_date']
+
+
+@pytest.mark.parametrize('config', [
+    BacktestConfig(name='kelly', kelly_fraction=0.5, min_confidence=55),
+    BacktestConfig(name='proportional', position_sizing='proportional', proportional_pct=8,
+                   market_types=['nfl']),
+    BacktestConfig(name='fixed', position_sizing='fixed', fixed_bet_size=400, min_edge=2),
+    BacktestConfig(name='stops', kelly_fraction=1.0, max_position_size=40, max_drawdown_limit=5),
+])
+def test_grid_matches_rowwise(engine, history, config):
+    actual = engine.evaluate_grid([config], history, include_trades=True)[0]
+    expected = _rowwise(engine, history, config)
+
+    _assert_same_results(actual, expected)
+    assert len(actual['trades']) == len(expected['trades'])
+    for a, e in zip(actual['trades'], expected['trades']):
+        assert a['ticker'] == e['ticker']
+        assert a['position_size'] == pytest.approx(e['position_size'])
+        assert a['capital_after'] == pytest.approx(e['capital_after'])
+        assert bool(a['is_win']) == bool(e['is_win'])
+
+
+def test_drawdown_limit_stops_early(engine, history):
+    config = BacktestConfig(kelly_fraction=1.0, max_position_size=50, max_drawdown_limit=3)
+    result = engine.evaluate_grid([config], history)[0]
+
+    assert 0 < result['total_trades'] < len(history)
+    equity = np.array(result['equity_curve'])
+    peak = np.maximum.accumulate(equity)
+    assert ((equity - peak) / peak * 100)[-1] <= -3
+    assert (((equity - peak) / peak * 100)[:-1] > -3).all()
+
+
+def test_config_grid_evaluated_in_one_pass(engine, history):
+    base = BacktestConfig(name='Sweep', max_drawdown_limit=50)
+    grid = BacktestEngine.make_config_grid(
+        base, kelly_fraction=[0.1, 0.25, 0.5], min_confidence=[0, 60, 75]
+    ) + [BacktestConfig(name='fixed', position_sizing='fixed')]
+
+    results = engine.evaluate_grid(grid, history)
+
+    assert len(results) == 10
+    assert results[0]['config'].name == 'Sweep [kelly_fraction=0.1, min_confidence=0]'
+    for config, result in zip(grid, results):
+        _assert_same_results(result, _rowwise(engine, history, config))
+
+
+def test_combined_config_is_loosest(engine):
+    combined = BacktestEngine.combined_config([
+        BacktestConfig(min_confidence=60, min_edge=5, market_types=['nfl']),
+        BacktestConfig(min_confidence=40, min_edge=2, market_types=['college'], max_price=0.9),
+    ])
+
+    assert combined.min_confidence == 40
+    assert combined.min_edge == 2
+    assert combined.market_types == ['college', 'nfl']
+    assert combined.max_price == 0.95
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
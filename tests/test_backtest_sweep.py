@@ -0,0 +1,118 @@
+"""
+Tests for the parallel backtest sweep runner
+Checks shared-memory workers against in-process evaluation and walk-forward selection
+"""
+
+import pytest
+import os
+import sys
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from analytics.backtest import BacktestEngine, BacktestConfig
+from analytics.sweep import BacktestSweepRunner, SharedArrays, make_windows
+from fixtures import make_synthetic_predictions
+
+
+@pytest.fixture
+def history():
+    return make_synthetic_predictions(1500)
+
+
+@pytest.fixture
+def grid():
+    return BacktestEngine.make_config_grid(
+        BacktestConfig(name='Sweep', max_drawdown_limit=80),
+        kelly_fraction=[0.1, 0.25, 0.5, 1.0],
+        min_confidence=[0, 50, 65],
+    )
+
+
+def _runner(workers, **kwargs):
+    engine = BacktestEngine()
+    engine.store_results_batch = MagicMock(side_effect=lambda batch: len(batch))
+    engine.load_historical_data = MagicMock()
+    return BacktestSweepRunner(engine=engine, max_workers=workers, **kwargs)
+
+
+def test_make_windows_walk_forward():
+    windows = make_windows(pd.Timestamp('2025-01-01'), pd.Timestamp('2025-03-01'),
+                           test_days=14, train_days=30)
+
+    assert windows[0].train_start == pd.Timestamp('2025-01-01')
+    assert windows[0].train_end == windows[0].test_start == pd.Timestamp('2025-01-31')
+    assert windows[1].test_start - windows[0].test_start == pd.Timedelta(days=14)
+    assert windows[-1].test_start <= pd.Timestamp('2025-03-01')
+
+    anchored = make_windows(pd.Timestamp('2025-01-01'), pd.Timestamp('2025-03-01'),
+                            test_days=14, train_days=30, anchored=True)
+    assert all(w.train_start == pd.Timestamp('2025-01-01') for w in anchored)
+
+
+def test_shared_arrays_round_trip(history):
+    arrays = BacktestEngine().prepare_arrays(history)
+    shared = SharedArrays(arrays)
+    try:
+        attached, handles = SharedArrays.attach(shared.spec, shared.extras)
+        for name, array in arrays.items():
+            np.testing.assert_array_equal(attached[name], array)
+        for handle in handles:
+            handle.close()
+    finally:
+        shared.close()
+
+
+def test_parallel_rolling_matches_in_process(history, grid):
+    parallel = _runner(2, chunk_size=5).run_rolling(grid, test_days=30, df=history)
+    serial = _runner(1).run_rolling(grid, test_days=30, df=history)
+
+    assert len(parallel) == len(grid) * parallel['window_index'].nunique()
+    pd.testing.assert_frame_equal(parallel.reset_index(drop=True), serial.reset_index(drop=True))
+
+
+def test_rolling_window_matches_direct_evaluation(history, grid):
+    result = _runner(1).run_rolling(grid, test_days=30, df=history)
+    first = result[result['window_index'] == 0].sort_values('config_index')
+
+    start = history['predicted_at'].min()
+    window = history[(history['predicted_at'] >= start) &
+                     (history['predicted_at'] < start + pd.Timedelta(days=30))]
+    expected = BacktestEngine().evaluate_grid(grid, window)
+
+    np.testing.assert_allclose(first['final_capital'], [r['final_capital'] for r in expected])
+    assert list(first['total_trades']) == [r['total_trades'] for r in expected]
+
+
+def test_results_streamed_in_batches(history, grid):
+    runner = _runner(1, chunk_size=4, batch_size=10)
+    result = runner.run_rolling(grid, test_days=30, df=history)
+
+    batches = [call.args[0] for call in runner.engine.store_results_batch.call_args_list]
+    assert len(batches) > 1
+    assert sum(len(b) for b in batches) == int((result['total_trades'] > 0).sum())
+    assert all('[window ' in r['config'].name for b in batches for r in b)
+
+
+def test_walk_forward_picks_best_training_config(history, grid):
+    result = _runner(1, store_results=False).run_walk_forward(
+        grid, train_days=30, test_days=15, objective='total_return_pct', df=history
+    )
+
+    train = result[result['phase'] == 'train']
+    test = result[result['phase'] == 'test']
+    assert len(test) > 0
+
+    for _, row in test.iterrows():
+        window = train[(train['window_index'] == row['window_index']) & (train['total_trades'] >= 10)]
+        best = window.loc[window['total_return_pct'].idxmax()]
+        assert row['config_index'] == best['config_index']
+        assert row['window_start'] == best['window_end']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,219 @@
+"""
+Tests for the BM25 keyword index and reciprocal-rank fusion
+Covers scoring, incremental adds, persistence and RAGService hybrid retrieval
+"""
+
+import pytest
+import os
+import sys
+import math
+import threading
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.rag.bm25_index import BM25Index, reciprocal_rank_fusion, tokenize
+
+DOCS = {
+    'csp': "Cash secured put (CSP): sell a put while holding cash to buy the stock.",
+    'wheel': "The wheel strategy sells CSPs, gets assigned, then sells covered calls.",
+    'nvda': "NVDA earnings: $NVDA implied volatility spikes before the report.",
+    'brk': "BRK.B is a low-volatility holding; sell covered calls on BRK.B.",
+}
+
+
+@pytest.fixture
+def index():
+    index = BM25Index()
+    index.add(list(DOCS), list(DOCS.values()))
+    return index
+
+
+def test_tokenize_keeps_tickers():
+    assert tokenize("$NVDA vs BRK.B, S&P 500. Done.") == ['nvda', 'vs', 'brk.b', 's&p', '500', 'done']
+
+
+def test_scores_match_bm25_formula(index):
+    results = dict(index.search('covered calls'))
+
+    n_docs, avg_length = 4, sum(len(tokenize(d)) for d in DOCS.values()) / 4
+    idf = math.log(1 + (n_docs - 2 + 0.5) / (2 + 0.5))
+
+    def term_score(tf, length):
+        return idf * tf * 2.5 / (tf + 1.5 * (1 - 0.75 + 0.75 * length / avg_length))
+
+    wheel_length = len(tokenize(DOCS['wheel']))
+    assert set(results) == {'wheel', 'brk'}
+    assert results['wheel'] == pytest.approx(2 * term_score(1, wheel_length))
+
+
+def test_ticker_query_finds_keyword_only_match(index):
+    assert [doc_id for doc_id, _ in index.search('$NVDA')] == ['nvda']
+    assert [doc_id for doc_id, _ in index.search('brk.b calls')][0] == 'brk'
+    assert index.search('unknownterm') == []
+
+
+def test_incremental_add_skips_existing_ids(index):
+    assert index.add(['csp', 'tsla'], ['duplicate text', 'TSLA covered calls weekly']) == 1
+    assert len(index) == 5
+    assert 'duplicate' not in dict(index.search('duplicate'))
+    assert [doc_id for doc_id, _ in index.search('tsla')] == ['tsla']
+
+
+def test_top_n_is_ordered(index):
+    ranked = index.search('sell covered calls put', n_results=2)
+    full = index.search('sell covered calls put', n_results=10)
+    assert ranked == full[:2]
+    assert [score for _, score in full] == sorted((score for _, score in full), reverse=True)
+
+
+def test_save_and_load_round_trip(index, tmp_path):
+    path = str(tmp_path / 'kb_bm25.json')
+    index.save(path)
+    loaded = BM25Index(path)
+
+    assert len(loaded) == len(index)
+    assert loaded.search('covered calls') == index.search('covered calls')
+    loaded.add(['new'], ['fresh NVDA note'])
+    assert 'new' in dict(loaded.search('nvda'))
+
+
+def test_reference_score_is_independent_of_other_results(index):
+    # An average-length document with each query term once scores exactly the reference
+    reference = BM25Index()
+    reference.add(['a', 'b'], ['alpha beta', 'gamma delta'])
+    assert dict(reference.search('alpha beta'))['a'] == pytest.approx(reference.reference_score('alpha beta'))
+
+    # The best hit of an off-topic query stays far below the reference
+    best = index.search('weather forecast for paris in the spring')[0][1]
+    assert best / index.reference_score('weather forecast for paris in the spring') < 0.2
+    assert index.reference_score('') == 0.0
+
+
+def test_flush_appends_log_and_save_compacts(tmp_path):
+    path = str(tmp_path / 'kb_bm25.json')
+    index = BM25Index(path)
+    index.add(['csp', 'wheel'], [DOCS['csp'], DOCS['wheel']])
+    index.save()
+
+    index.add(['nvda'], [DOCS['nvda']])
+    index.flush()
+    index.add(['brk'], [DOCS['brk']])
+    index.flush()
+
+    snapshot = os.path.getmtime(path), os.path.getsize(path)
+    with open(f"{path}.log") as f:
+        assert [line.split('"')[3] for line in f] == ['nvda', 'brk']
+
+    reloaded = BM25Index(path)
+    assert len(reloaded) == 4
+    assert reloaded.search('covered calls') == index.search('covered calls')
+
+    reloaded.COMPACT_MIN_DOCUMENTS = 0
+    reloaded.add(['tsla'], ['TSLA covered calls weekly'])
+    reloaded.flush()
+    assert not os.path.exists(f"{path}.log")
+    assert (os.path.getmtime(path), os.path.getsize(path)) != snapshot
+    assert len(BM25Index(path)) == 5
+
+
+def test_log_only_index_and_torn_line(tmp_path):
+    path = str(tmp_path / 'kb_bm25.json')
+    index = BM25Index(path)
+    index.add(['nvda'], [DOCS['nvda']])
+    index.flush()
+    with open(f"{path}.log", 'a') as f:
+        f.write('{"id":"brk","ter')
+
+    reloaded = BM25Index(path)
+    assert len(reloaded) == 1 and 'nvda' in reloaded
+
+
+def test_save_concurrent_with_add_keeps_every_document(tmp_path):
+    path = str(tmp_path / 'kb_bm25.json')
+    index = BM25Index(path)
+    index.add([f'base{i}' for i in range(2000)], ['covered calls on the wheel'] * 2000)
+    done = threading.Event()
+
+    def writer():
+        try:
+            for i in range(300):
+                index.add([f'new{i}'], [f'ticker{i} covered calls'])
+                if i % 20 == 0:
+                    index.flush()
+        finally:
+            done.set()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    while not done.is_set():
+        index.save()
+    thread.join()
+    index.flush()
+
+    reloaded = BM25Index(path)
+    assert len(reloaded) == 2300
+    assert all(reloaded.search(f'ticker{i}', 1)[0][0] == f'new{i}' for i in range(300))
+
+
+def test_reciprocal_rank_fusion_weights():
+    fused = reciprocal_rank_fusion([['a', 'b', 'c'], ['c', 'd']], weights=[0.5, 0.5], k=1)
+
+    # b and d tie; first-seen order wins
+    assert [doc_id for doc_id, _ in fused] == ['c', 'a', 'b', 'd']
+    assert dict(fused)['c'] == pytest.approx(0.5 / 4 + 0.5 / 2)
+
+
+def test_hybrid_search_returns_keyword_only_documents():
+    pytest.importorskip('chromadb')
+    pytest.importorskip('sentence_transformers')
+    from src.rag.rag_service import RAGService, RetrievedDocument
+
+    service = RAGService.__new__(RAGService)
+    service.keyword_index = BM25Index()
+    service.keyword_index.add(list(DOCS), list(DOCS.values()))
+    service.collection = MagicMock()
+    service.collection.get.side_effect = lambda ids, include: {
+        'ids': ids, 'documents': [DOCS[i] for i in ids], 'metadatas': [{'source': i} for i in ids]
+    }
+    service._semantic_search = MagicMock(return_value=[
+        RetrievedDocument(DOCS['wheel'], {}, 0.8, 0.0, 0.8, 'semantic', 'wheel'),
+        RetrievedDocument(DOCS['csp'], {}, 0.7, 0.0, 0.7, 'semantic', 'csp'),
+    ])
+
+    docs = service._hybrid_search('NVDA volatility', n_results=3, alpha=0.5)
+
+    assert {doc.doc_id for doc in docs} == {'wheel', 'csp', 'nvda'}
+    assert docs[0].doc_id in ('wheel', 'nvda')
+    assert all(doc.source == 'hybrid' for doc in docs)
+    wheel = next(doc for doc in docs if doc.doc_id == 'wheel')
+    assert wheel.combined_score == pytest.approx(0.5 * 0.8)
+
+
+def test_irrelevant_query_confidence_stays_below_threshold():
+    pytest.importorskip('chromadb')
+    pytest.importorskip('sentence_transformers')
+    from src.rag.rag_service import RAGService, RetrievedDocument
+
+    service = RAGService.__new__(RAGService)
+    service.min_confidence = 0.6
+    service.keyword_index = BM25Index()
+    service.keyword_index.add(list(DOCS), list(DOCS.values()))
+    service.collection = MagicMock()
+    service.collection.get.side_effect = lambda ids, include: {
+        'ids': ids, 'documents': [DOCS[i] for i in ids], 'metadatas': [{} for _ in ids]
+    }
+    # The nearest neighbours of an off-topic query are still returned, with low similarity
+    service._semantic_search = MagicMock(return_value=[
+        RetrievedDocument(DOCS['wheel'], {}, 0.21, 0.0, 0.21, 'semantic', 'wheel'),
+        RetrievedDocument(DOCS['csp'], {}, 0.18, 0.0, 0.18, 'semantic', 'csp'),
+    ])
+
+    docs = service._hybrid_search('what is the weather in paris', n_results=5, alpha=0.7)
+
+    assert docs and docs[0].combined_score < 0.3
+    assert service._calculate_confidence(docs, 'medium') < service.min_confidence
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,173 @@
+"""
+Tests for the streaming DiscordChatExporter importer
+Covers incremental JSON reading, staging rows, batched COPY + merge and import statistics
+"""
+
+import pytest
+import os
+import io
+import re
+import sys
+import json
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.discord_message_sync import DiscordExportReader, DiscordMessageSync, _copy_text_row
+
+
+def _message(i, content=None, edited=None, **extra):
+    return {
+        'id': str(1000 + i),
+        'type': 'Default',
+        'timestamp': f'2025-11-0{1 + i % 9}T14:00:00.123+00:00',
+        'timestampEdited': edited,
+        'content': content if content is not None else f'$SPY {400 + i}c "scalp"\nline two',
+        'author': {'id': '42', 'name': 'trader'},
+        'attachments': [],
+        'embeds': [{'title': 'chart'}],
+        'reactions': [{'emoji': {'name': 'fire'}, 'count': i}],
+        'mentions': [],
+        **extra,
+    }
+
+
+def _export(messages):
+    return {
+        'guild': {'id': '1', 'name': 'XTrades'},
+        'channel': {'id': '99', 'name': 'alerts'},
+        'dateRange': {'after': None, 'before': None},
+        'messages': messages,
+        'messageCount': len(messages),
+    }
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, 1 << 16])
+def test_reader_streams_messages_and_header(chunk_size):
+    export = _export([_message(i) for i in range(25)])
+    reader = DiscordExportReader(io.StringIO(json.dumps(export, indent=2)), chunk_size=chunk_size)
+
+    messages = list(reader)
+
+    assert messages == export['messages']
+    assert reader.header['channel'] == {'id': '99', 'name': 'alerts'}
+    assert reader.header['messageCount'] == 25
+
+
+def test_reader_header_available_before_first_message():
+    reader = DiscordExportReader(io.StringIO(json.dumps(_export([_message(0)]))), chunk_size=16)
+    iterator = iter(reader)
+    next(iterator)
+    assert reader.header['guild']['name'] == 'XTrades'
+
+
+def test_reader_empty_and_malformed():
+    assert list(DiscordExportReader(io.StringIO(json.dumps(_export([]))))) == []
+    with pytest.raises(ValueError):
+        list(DiscordExportReader(io.StringIO('{"messages": [{"id": "1"} {"id": "2"}]}')))
+
+
+def test_staging_row_skips_and_sanitizes():
+    assert DiscordMessageSync._staging_row(_message(0, content=' @everyone ')) is None
+    assert DiscordMessageSync._staging_row({**_message(0), 'timestamp': 'yesterday'}) is None
+
+    row = DiscordMessageSync._staging_row(_message(0, content='nul\x00byte'))
+    assert row[0] == 1000 and row[3] == 'nulbyte'
+    assert '\\u0000' not in row[6] and json.loads(row[6])['embeds'] == [{'title': 'chart'}]
+
+
+_UNESCAPES = {'\\\\': '\\', '\\t': '\t', '\\n': '\n', '\\r': '\r'}
+
+
+def _parse_copy_text(text):
+    """Rows of a COPY text-format buffer; \\N becomes None"""
+    return [
+        [None if field == '\\N' else re.sub(r'\\[\\tnr]', lambda m: _UNESCAPES[m.group()], field)
+         for field in line.split('\t')]
+        for line in text.split('\n') if line
+    ]
+
+
+def _mock_sync(returning):
+    sync = DiscordMessageSync.__new__(DiscordMessageSync)
+    sync.last_import_stats = {}
+    conn = MagicMock()
+    cur = conn.cursor.return_value
+    copies = []
+    cur.copy_expert.side_effect = lambda sql, buffer: copies.append(_parse_copy_text(buffer.read()))
+    cur.fetchall.side_effect = returning
+    sync.get_connection = MagicMock(return_value=conn)
+    return sync, conn, cur, copies
+
+
+def test_import_batches_copy_and_merge(tmp_path):
+    messages = [_message(i) for i in range(7)]
+    messages.insert(2, _message(1, edited='2025-11-02T15:00:00+00:00'))
+    messages.append(_message(50, content='@everyone'))
+    path = tmp_path / 'export.json'
+    path.write_text(json.dumps(_export(messages)), encoding='utf-8')
+
+    # Batches: 3 rows, 3 rows, 1 row (message 1 appears twice in the first batch; the last copy wins)
+    sync, conn, cur, copies = _mock_sync([
+        [(True,), (True,), (False,)],
+        [(True,)],
+        [],
+    ])
+
+    imported = sync.import_messages(path, batch_size=3)
+
+    assert [len(batch) for batch in copies] == [3, 3, 1]
+    first = {row[0]: row for row in copies[0]}
+    assert first['1001'][5] == '2025-11-02T15:00:00+00:00'
+    assert first['1001'][3] == '$SPY 401c "scalp"\nline two'
+    assert copies[0][0][5] is None  # NULL edited_timestamp
+
+    copy_sql = cur.copy_expert.call_args[0][0]
+    assert 'FORMAT text' in copy_sql
+
+    merges = [c for c in cur.execute.call_args_list if 'INSERT INTO discord_messages' in c[0][0]]
+    assert len(merges) == 3 and merges[0][0][1] == ('99',)
+    assert 'IS DISTINCT FROM EXCLUDED.edited_timestamp' in merges[0][0][0]
+
+    assert imported == 4
+    stats = sync.last_import_stats
+    assert (stats['messages'], stats['inserted'], stats['updated'], stats['unchanged'], stats['skipped']) == (9, 3, 1, 3, 1)
+    assert stats['messages_per_second'] > 0
+    conn.commit.assert_called_once()
+
+
+def test_copy_text_rows_keep_null_distinct_from_empty():
+    line = _copy_text_row((1, None, '', 'tab\there\\path\nnext', '2025-11-01T14:00:00+00:00', None))
+
+    assert line == '1\t\\N\t\ttab\\there\\\\path\\nnext\t2025-11-01T14:00:00+00:00\t\\N\n'
+    assert _parse_copy_text(line) == [['1', None, '', 'tab\there\\path\nnext', '2025-11-01T14:00:00+00:00', None]]
+
+
+def test_staging_timestamps_keep_utc_offset(tmp_path):
+    message = _message(0, edited='2025-11-02T11:00:00-04:00', timestamp='2025-11-01T10:00:00.123-04:00')
+    path = tmp_path / 'export.json'
+    path.write_text(json.dumps(_export([message])), encoding='utf-8')
+    sync, conn, cur, copies = _mock_sync([[(True,)]])
+
+    sync.import_messages(path)
+
+    # Offsets reach COPY unchanged and the staging columns apply them
+    assert copies[0][0][4:6] == ['2025-11-01T10:00:00.123-04:00', '2025-11-02T11:00:00-04:00']
+    create = cur.execute.call_args_list[0][0][0]
+    assert 'timestamp TIMESTAMPTZ,' in create and 'edited_timestamp TIMESTAMPTZ,' in create
+
+
+def test_import_rolls_back_on_database_error(tmp_path):
+    path = tmp_path / 'export.json'
+    path.write_text(json.dumps(_export([_message(0)])), encoding='utf-8')
+    sync, conn, cur, _ = _mock_sync([])
+    cur.copy_expert.side_effect = RuntimeError('copy failed')
+
+    with pytest.raises(RuntimeError):
+        sync.import_messages(path)
+    conn.rollback.assert_called_once()
+    conn.close.assert_called_once()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,180 @@
+"""
+Tests for the incremental Discord signal extractor
+Covers the keyword automaton, symbol-validated tickers and watermark-driven batched upserts
+"""
+
+import pytest
+import os
+import sys
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.discord_signal_extractor import (
+    DiscordSignalExtractor,
+    KeywordAutomaton,
+    SIGNAL_COLUMNS,
+)
+from fixtures import make_synthetic_messages
+
+
+def test_automaton_reports_overlapping_keywords_once():
+    automaton = KeywordAutomaton({'momentum': ['strong move'], 'bullish': ['strong', 'breakout'],
+                                  'breakout': ['breakout']})
+
+    counts = automaton.scan("Strong move today, STRONG breakout and another breakout")
+
+    assert counts == {'momentum': 1, 'bullish': 2, 'breakout': 1}
+
+
+def test_automaton_matches_at_word_starts():
+    automaton = KeywordAutomaton({'reversal': ['top'], 'bullish': ['call'], 'bearish': ['put']})
+
+    assert automaton.scan("stop 145, recall the input") == {}
+    assert automaton.scan("bought calls near the top, no puts") == {'reversal': 1, 'bullish': 1, 'bearish': 1}
+
+
+def test_setup_and_sentiment_classification():
+    extractor = DiscordSignalExtractor(symbols=['SPY'])
+
+    assert extractor.determine_setup_type("SPY earnings breakout") == 'earnings_play'
+    assert extractor.determine_setup_type("entry 10 stop 9") == 'general'
+    assert extractor.determine_sentiment("bullish, buying calls") == 'bullish'
+    assert extractor.determine_sentiment("weak tape, short it, buying puts") == 'bearish'
+    assert extractor.determine_sentiment("nothing to see") == 'neutral'
+
+
+def test_tickers_validated_against_symbols():
+    content = "$SPX and NVDA look good, DD says CEO loves AI, also AAPL then NVDA"
+
+    with_symbols = DiscordSignalExtractor(symbols=['nvda', 'aapl', 'AI'])
+    assert with_symbols.extract_tickers(content) == ['SPX', 'NVDA', 'AI', 'AAPL']
+
+    fallback = DiscordSignalExtractor()
+    assert fallback.extract_tickers(content) == ['SPX', 'NVDA', 'AI', 'AAPL']
+    assert fallback.extract_tickers("DD on the CEO") == []
+    assert DiscordSignalExtractor(symbols=['NVDA']).extract_tickers("CEO of NVDA") == ['NVDA']
+
+
+def test_extract_signal_fields():
+    extractor = DiscordSignalExtractor(symbols=['SPY'])
+    message = make_synthetic_messages(1)[0]
+    message['content'] = "$SPY 450C 12/15 exp entry 2.50 target 4.00 stop 1.75 breakout, looking strong"
+
+    signal = extractor.extract_signal(message)
+
+    assert signal['tickers'] == ['SPY'] and signal['primary_ticker'] == 'SPY'
+    assert (signal['entry'], signal['target'], signal['stop_loss']) == (2.5, 4.0, 1.75)
+    assert (signal['option_strike'], signal['option_type'], signal['option_expiration']) == (450.0, 'CALL', '12/15')
+    assert (signal['setup_type'], signal['sentiment'], signal['confidence']) == ('breakout', 'bullish', 100)
+
+
+def _row(message_id, content="$SPY entry 10 target 12 breakout", edited=None, channel_id=99):
+    return {
+        'message_id': message_id,
+        'channel_id': channel_id,
+        'content': content,
+        'author_name': 'trader',
+        'timestamp': datetime(2025, 11, 1),
+        'edited_timestamp': edited,
+    }
+
+
+def _mock_extractor(batches, batch_size=2):
+    extractor = DiscordSignalExtractor(symbols=['SPY'], batch_size=batch_size)
+    conn = MagicMock()
+    writer = MagicMock()
+    reader = MagicMock()
+    reader.fetchmany.side_effect = batches + [[]]
+    conn.cursor.side_effect = lambda name=None, **kwargs: reader if name else writer
+    extractor.get_connection = MagicMock(return_value=conn)
+    return extractor, conn, writer, reader
+
+
+def _calls(execute_values, marker):
+    return [c[0][2] for c in execute_values.call_args_list if marker in c[0][1]]
+
+
+def test_incremental_run_batches_upserts_and_advances_per_channel_watermarks():
+    edit = datetime(2025, 11, 3, 12, 0)
+    batches = [
+        [_row(5, edited=edit)],
+        [_row(101, content="gm everyone"), _row(102, channel_id=7)],
+        [_row(103), _row(104, channel_id=7)],
+    ]
+    extractor, conn, writer, reader = _mock_extractor(batches)
+
+    with patch('src.discord_signal_extractor.psycopg2.extras.execute_values') as execute_values:
+        count = extractor.process_new_messages()
+
+    query, params = reader.execute.call_args[0]
+    assert 'LEFT JOIN discord_signal_channel_state' in query
+    assert params == {'epoch': DiscordSignalExtractor.EPOCH}
+    assert conn.cursor.call_args_list[-1][1]['withhold'] is True
+
+    assert count == 4
+    upserted = [[row[0] for row in values] for values in _calls(execute_values, 'discord_trading_signals')]
+    assert upserted == [[5], [102], [103, 104]]
+    assert len(_calls(execute_values, 'discord_trading_signals')[0][0]) == len(SIGNAL_COLUMNS)
+
+    # Each batch advances only the channels it read; edit marks move after the full pass
+    states = _calls(execute_values, 'discord_signal_channel_state')
+    assert states == [
+        [(99, 5, None)],
+        [(99, 101, None), (7, 102, None)],
+        [(99, 103, None), (7, 104, None)],
+        [(99, 0, edit)],
+    ]
+    assert 'GREATEST' in next(c[0][1] for c in execute_values.call_args_list
+                              if 'discord_signal_channel_state' in c[0][1])
+    assert conn.commit.call_count == 5
+
+    stats = extractor.last_run_stats
+    assert (stats['messages'], stats['signals'], stats['batches'], stats['channels']) == (5, 4, 3, 2)
+
+
+def test_first_run_loads_symbols():
+    extractor, conn, writer, reader = _mock_extractor([[_row(1, content="NVDA entry 10 target 12")]])
+    extractor.symbols = None
+    writer.fetchall.return_value = [('NVDA ',), ('AAPL',)]
+
+    with patch('src.discord_signal_extractor.psycopg2.extras.execute_values') as execute_values:
+        assert extractor.process_new_messages() == 1
+
+    assert extractor.symbols == {'NVDA', 'AAPL'}
+    signals = _calls(execute_values, 'discord_trading_signals')
+    assert signals[0][0][SIGNAL_COLUMNS.index('primary_ticker')] == 'NVDA'
+
+
+def test_failed_batch_rolls_back_without_moving_watermark():
+    extractor, conn, writer, reader = _mock_extractor([[_row(101)], [_row(102)]])
+    saved = []
+
+    def execute_values(cur, sql, values, **kwargs):
+        if 'discord_signal_channel_state' in sql:
+            saved.append(values)
+        elif saved:
+            raise RuntimeError('db down')
+
+    with patch('src.discord_signal_extractor.psycopg2.extras.execute_values', side_effect=execute_values):
+        with pytest.raises(RuntimeError):
+            extractor.process_new_messages()
+
+    assert saved == [[(99, 101, None)]]
+    conn.rollback.assert_called_once()
+    conn.close.assert_called_once()
+
+
+def test_process_all_messages_resets_watermarks():
+    extractor, conn, writer, reader = _mock_extractor([])
+
+    with patch('src.discord_signal_extractor.psycopg2.extras.execute_values'):
+        assert extractor.process_all_messages() == 0
+
+    statements = [c[0][0] for c in writer.execute.call_args_list]
+    assert any(s.startswith('DELETE FROM discord_signal_channel_state') for s in statements)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
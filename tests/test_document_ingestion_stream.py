@@ -0,0 +1,219 @@
+"""
+Tests for the streaming document ingestion pipeline
+Covers batched dedup, packed embedding batches, batched upserts and error accounting
+"""
+
+import pytest
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.rag.document_ingestion_pipeline import (
+    DocumentIngestionPipeline,
+    DocumentCategory,
+    DocumentSource,
+)
+
+
+class FakeCollection:
+    """In-memory stand-in for a ChromaDB collection"""
+
+    def __init__(self):
+        self.records = {}
+        self.get_calls = []
+        self.upsert_sizes = []
+        self.fail_next_upsert = False
+
+    def get(self, ids=None, where=None, limit=None, include=None):
+        self.get_calls.append(list(ids or []))
+        if where:
+            found = [i for i, r in self.records.items() if r['metadata']['doc_id'] == where['doc_id']]
+            return {'ids': found[:limit]}
+        return {'ids': [i for i in ids if i in self.records]}
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        if self.fail_next_upsert:
+            self.fail_next_upsert = False
+            raise RuntimeError('upsert failed')
+        self.upsert_sizes.append(len(ids))
+        for id_, embedding, document, metadata in zip(ids, embeddings, documents, metadatas):
+            self.records[id_] = {'embedding': embedding, 'document': document, 'metadata': metadata}
+
+    def add(self, ids, embeddings, documents, metadatas):
+        self.upsert(ids, embeddings, documents, metadatas)
+
+
+def _document(i, sentences=3):
+    text = ' '.join(f"Document {i} sentence {j} talks about covered calls and puts." for j in range(sentences))
+    return {'content': text, 'metadata': {'ticker': f'T{i}'}}
+
+
+@pytest.fixture
+def pipeline():
+    collection = FakeCollection()
+    client = MagicMock()
+    client.get_collection.return_value = collection
+
+    embedder = MagicMock()
+    embedder.encode.side_effect = lambda chunks, **kwargs: np.array([[float(len(c)), 1.0] for c in chunks])
+
+    with patch.object(DocumentIngestionPipeline, '_init_embedder', return_value=embedder):
+        pipeline = DocumentIngestionPipeline(chroma_client=client, chunk_size=120, chunk_overlap=10)
+    pipeline.collection = collection
+    return pipeline
+
+
+def _ingest_one_at_a_time(pipeline, documents, category):
+    """The original ingest_batch: one ingest_document call per document"""
+    results = [
+        pipeline.ingest_document(content=doc['content'], metadata=doc.get('metadata', {}), category=category)
+        for doc in documents
+    ]
+    return {'success': sum(1 for r in results if r['status'] == 'success'), 'results': results}
+
+
+def test_stream_matches_rowwise_ingestion(pipeline):
+    documents = [_document(i, sentences=1 + i % 4) for i in range(20)]
+    result = pipeline.ingest_batch(documents, DocumentCategory.TRADING_STRATEGIES)
+
+    reference = MagicMock()
+    reference.get_collection.return_value = FakeCollection()
+    pipeline.chroma_client = reference
+    expected = _ingest_one_at_a_time(pipeline, documents, DocumentCategory.TRADING_STRATEGIES)
+
+    assert result['success'] == expected['success'] == 20
+    assert [r['doc_id'] for r in result['results']] == [r['doc_id'] for r in expected['results']]
+    stream_records = pipeline.collection.records
+    rowwise_records = reference.get_collection.return_value.records
+    assert stream_records.keys() == rowwise_records.keys()
+    for chunk_id, record in stream_records.items():
+        assert record['document'] == rowwise_records[chunk_id]['document']
+        assert record['embedding'] == rowwise_records[chunk_id]['embedding']
+
+
+def test_chunks_from_many_documents_share_embedding_batches(pipeline):
+    documents = [_document(i) for i in range(30)]
+
+    result = pipeline.ingest_stream(documents, DocumentCategory.TRADING_STRATEGIES,
+                                    embed_batch_size=16, dedup_batch_size=8)
+
+    total_chunks = result['metrics']['chunks_upserted']
+    assert total_chunks == len(pipeline.collection.records) > 30
+    assert pipeline.collection.upsert_sizes[:-1] == [16] * (len(pipeline.collection.upsert_sizes) - 1)
+    assert pipeline.embedder.encode.call_count == len(pipeline.collection.upsert_sizes)
+    assert pipeline.get_stats()['chunks_created'] == total_chunks
+
+
+def test_duplicates_checked_per_batch(pipeline):
+    documents = [_document(i) for i in range(10)]
+    pipeline.ingest_stream(documents[:6], DocumentCategory.TRADING_STRATEGIES)
+    pipeline.collection.get_calls.clear()
+
+    result = pipeline.ingest_stream(documents + [documents[7]], DocumentCategory.TRADING_STRATEGIES,
+                                    dedup_batch_size=4, reader_workers=1)
+
+    assert (result['success'], result['skipped']) == (4, 7)
+    assert len(pipeline.collection.get_calls) == 3
+    assert all(len(ids) <= 4 for ids in pipeline.collection.get_calls)
+
+    reloaded = pipeline.ingest_stream(documents, DocumentCategory.TRADING_STRATEGIES, skip_duplicates=False)
+    assert reloaded['success'] == 10
+
+
+def test_failed_batch_marks_its_documents_as_errors(pipeline):
+    documents = [_document(i, sentences=1) for i in range(6)]
+    pipeline.collection.fail_next_upsert = True
+
+    result = pipeline.ingest_stream(documents, DocumentCategory.TRADING_STRATEGIES,
+                                    embed_batch_size=3, reader_workers=1, dedup_batch_size=6)
+
+    assert (result['success'], result['errors']) == (3, 3)
+    assert [r['status'] for r in result['results']] == ['error'] * 3 + ['success'] * 3
+
+    # Failed documents are not treated as duplicates on retry
+    retry = pipeline.ingest_stream(documents, DocumentCategory.TRADING_STRATEGIES)
+    assert (retry['success'], retry['skipped']) == (3, 3)
+
+
+def test_failed_batch_drops_rest_of_its_document(pipeline):
+    document = _document(0, sentences=8)
+    n_chunks = len(pipeline._chunk_document(document['content']))
+    assert n_chunks > 2
+    pipeline.collection.fail_next_upsert = True
+
+    result = pipeline.ingest_stream([document, _document(1, sentences=1)], DocumentCategory.TRADING_STRATEGIES,
+                                    embed_batch_size=2, reader_workers=1)
+
+    assert [r['status'] for r in result['results']] == ['error', 'success']
+    doc_id = result['results'][0]['doc_id']
+    assert not any(chunk_id.startswith(doc_id) for chunk_id in pipeline.collection.records)
+
+    # The partly failed document is retried, not skipped as complete
+    retry = pipeline.ingest_stream([document], DocumentCategory.TRADING_STRATEGIES, embed_batch_size=2)
+    assert retry['success'] == 1
+    assert f"{doc_id}_chunk_{n_chunks - 1}" in pipeline.collection.records
+
+
+def test_source_errors_reach_the_caller(pipeline):
+    def rows():
+        yield _document(0)
+        raise ConnectionError('database went away')
+
+    with pytest.raises(ConnectionError):
+        pipeline.ingest_stream(rows(), DocumentCategory.TRADING_STRATEGIES)
+
+    with patch.object(pipeline, '_iter_database_documents', return_value=rows()):
+        result = pipeline.ingest_from_database('xtrades_messages', 'SELECT 1', DocumentCategory.TRADING_STRATEGIES)
+    assert result == {'status': 'error', 'error': 'database went away'}
+
+
+def test_loader_errors_and_dropped_items(pipeline):
+    def load(item):
+        if item == 'bad':
+            raise IOError('unreadable')
+        return None if item == 'empty' else _document(item)
+
+    progress = []
+    result = pipeline.ingest_stream([0, 'bad', 'empty', 1, 2], DocumentCategory.PLATFORM_DOCS,
+                                    source=DocumentSource.UPLOAD, load=load,
+                                    progress_every=2, progress_callback=progress.append)
+
+    assert (result['total'], result['success'], result['errors']) == (4, 3, 1)
+    assert len(progress) == 2 and progress[-1]['documents_finished'] == 4
+    assert result['metrics']['docs_per_second'] > 0
+    metadata = next(iter(pipeline.collection.records.values()))['metadata']
+    assert metadata['source'] == 'upload' and metadata['category'] == 'platform_docs'
+
+
+def test_failing_progress_callback_does_not_stop_ingestion(pipeline):
+    calls = []
+
+    def callback(progress):
+        calls.append(progress['documents_finished'])
+        raise RuntimeError('dashboard down')
+
+    result = pipeline.ingest_stream([_document(i) for i in range(6)], DocumentCategory.PLATFORM_DOCS,
+                                    embed_batch_size=2, progress_every=2, progress_callback=callback)
+
+    assert (result['total'], result['success'], result['errors']) == (6, 6, 0)
+    assert calls == [2, 4, 6]
+
+
+def test_local_directory_uses_reader_threads(pipeline, tmp_path):
+    for i in range(5):
+        (tmp_path / f"doc{i}.md").write_text(_document(i)['content'])
+    (tmp_path / "blank.txt").write_text("")
+
+    result = pipeline.ingest_local_directory(tmp_path, DocumentCategory.PLATFORM_DOCS, file_extensions=['.md', '.txt'])
+
+    assert (result['total'], result['success']) == (5, 5)
+    filenames = {r['metadata']['filename'] for r in pipeline.collection.records.values()}
+    assert filenames == {f"doc{i}.md" for i in range(5)}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
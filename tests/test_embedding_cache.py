@@ -0,0 +1,176 @@
+"""
+Tests for the memory-mapped embedding cache
+Covers batch lookup, persistence, LRU eviction with row reuse, sharing a directory and EmbeddingsManager misses
+"""
+
+import pytest
+import os
+import sys
+import hashlib
+import sqlite3
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.rag.embedding_cache import MmapEmbeddingCache
+
+DIM = 8
+
+
+def _key(text):
+    return hashlib.md5(text.encode()).digest()
+
+
+def _vectors(n, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, DIM)).astype(np.float32)
+
+
+def test_batch_lookup_returns_hits_and_mask(tmp_path):
+    cache = MmapEmbeddingCache(str(tmp_path), DIM)
+    vectors = _vectors(3)
+    cache.put_many([_key('a'), _key('b'), _key('c')], vectors)
+
+    found_vectors, found = cache.get_many([_key('c'), _key('x'), _key('a'), _key('c')])
+
+    assert found.tolist() == [True, False, True, True]
+    np.testing.assert_array_equal(found_vectors[[0, 2, 3]], vectors[[2, 0, 2]])
+    assert not found_vectors[1].any()
+    assert cache.get(_key('x')) is None
+
+
+def test_cache_persists_and_grows(tmp_path):
+    cache = MmapEmbeddingCache(str(tmp_path), DIM, initial_capacity=4)
+    keys = [_key(str(i)) for i in range(50)]
+    vectors = _vectors(50, seed=1)
+    for offset in range(0, 50, 7):
+        cache.put_many(keys[offset:offset + 7], vectors[offset:offset + 7])
+    cache.close()
+
+    reopened = MmapEmbeddingCache(str(tmp_path), DIM, initial_capacity=4)
+    found_vectors, found = reopened.get_many(keys)
+
+    assert found.all() and len(reopened) == 50
+    np.testing.assert_array_equal(found_vectors, vectors)
+    assert reopened.stats()['bytes_on_disk'] >= 50 * DIM * 4
+
+
+def test_lru_eviction_reuses_rows(tmp_path):
+    cache = MmapEmbeddingCache(str(tmp_path), DIM, max_entries=3, initial_capacity=2)
+    cache.put_many([_key('a'), _key('b'), _key('c')], _vectors(3))
+    cache.get_many([_key('a')])
+
+    cache.put(_key('d'), np.ones(DIM))
+
+    assert cache.get_many([_key('a'), _key('b'), _key('c'), _key('d')])[1].tolist() == [True, False, True, True]
+    assert len(cache) == 3
+    assert cache.stats()['capacity_rows'] == 4
+    np.testing.assert_array_equal(cache.get(_key('d')), np.ones(DIM))
+
+    # Free rows are recovered after reopening
+    cache.close()
+    reopened = MmapEmbeddingCache(str(tmp_path), DIM, max_entries=3)
+    reopened.put(_key('e'), np.full(DIM, 2.0))
+    assert reopened.stats()['capacity_rows'] == 4
+    assert len(reopened) == 3
+
+
+def test_overwrite_and_clear(tmp_path):
+    cache = MmapEmbeddingCache(str(tmp_path), DIM)
+    cache.put(_key('a'), np.zeros(DIM))
+    cache.put_many([_key('a'), _key('a')], np.stack([np.ones(DIM), np.full(DIM, 3.0)]))
+
+    np.testing.assert_array_equal(cache.get(_key('a')), np.full(DIM, 3.0))
+    assert len(cache) == 1
+
+    cache.clear()
+    assert len(cache) == 0 and cache.get(_key('a')) is None
+
+
+def test_dimension_change_resets_cache(tmp_path):
+    MmapEmbeddingCache(str(tmp_path), DIM).put(_key('a'), np.ones(DIM))
+    cache = MmapEmbeddingCache(str(tmp_path), DIM * 2)
+    assert len(cache) == 0 and cache.get(_key('a')) is None
+
+
+def test_instances_sharing_a_directory_never_share_rows(tmp_path):
+    # Two handles on one directory stand in for two processes
+    first = MmapEmbeddingCache(str(tmp_path), DIM, initial_capacity=2)
+    second = MmapEmbeddingCache(str(tmp_path), DIM, initial_capacity=2)
+    vectors = _vectors(10, seed=2)
+
+    first.put_many([_key('a'), _key('b')], vectors[:2])
+    second.put_many([_key('c'), _key('d'), _key('e')], vectors[2:5])
+    first.put_many([_key(str(i)) for i in range(5)], vectors[5:])
+
+    keys = [_key(k) for k in 'abcde'] + [_key(str(i)) for i in range(5)]
+    for cache in (first, second):
+        found_vectors, found = cache.get_many(keys)
+        assert found.all() and len(cache) == 10
+        np.testing.assert_array_equal(found_vectors, vectors)
+
+
+def test_eviction_and_clear_are_seen_by_other_instances(tmp_path):
+    first = MmapEmbeddingCache(str(tmp_path), DIM, max_entries=2)
+    second = MmapEmbeddingCache(str(tmp_path), DIM, max_entries=2)
+
+    first.put_many([_key('a'), _key('b')], _vectors(2))
+    second.put(_key('c'), np.ones(DIM))
+    first.put(_key('d'), np.full(DIM, 2.0))
+
+    assert first.get_many([_key(k) for k in 'abcd'])[1].tolist() == [False, False, True, True]
+    np.testing.assert_array_equal(second.get(_key('c')), np.ones(DIM))
+    np.testing.assert_array_equal(second.get(_key('d')), np.full(DIM, 2.0))
+
+    first.clear()
+    second.put(_key('e'), np.full(DIM, 3.0))
+    assert len(first) == 1 and first.get(_key('c')) is None
+    np.testing.assert_array_equal(first.get(_key('e')), np.full(DIM, 3.0))
+
+
+def test_manager_encodes_only_true_misses(tmp_path):
+    pytest.importorskip('sentence_transformers')
+    from src.rag import embeddings_manager
+
+    model = MagicMock()
+    model.get_sentence_embedding_dimension.return_value = DIM
+    model.encode.side_effect = lambda texts, **kwargs: np.stack(
+        [np.full(DIM, float(len(t))) for t in texts]
+    )
+    with patch.object(embeddings_manager, 'SentenceTransformer', return_value=model):
+        manager = embeddings_manager.EmbeddingsManager(cache_dir=str(tmp_path), device='cpu')
+
+    manager.encode_batch(['aa', 'bbb'])
+    result = manager.encode_batch(['bbb', 'c', 'c', 'aa'])
+
+    assert model.encode.call_args_list[-1][0][0] == ['c']
+    np.testing.assert_array_equal(result[:, 0], [3.0, 1.0, 1.0, 2.0])
+    stats = manager.get_cache_stats()
+    assert stats['cache_hits'] == 2 and stats['cache_misses'] == 4
+    assert stats['cached_embeddings'] == 3 and stats['bytes_on_disk'] > 0
+
+
+
+def test_manager_falls_back_to_encoding_when_cache_fails(tmp_path):
+    pytest.importorskip('sentence_transformers')
+    from src.rag import embeddings_manager
+
+    model = MagicMock()
+    model.get_sentence_embedding_dimension.return_value = DIM
+    model.encode.side_effect = lambda texts, **kwargs: np.stack(
+        [np.full(DIM, float(len(t))) for t in texts]
+    )
+    with patch.object(embeddings_manager, 'SentenceTransformer', return_value=model):
+        manager = embeddings_manager.EmbeddingsManager(cache_dir=str(tmp_path), device='cpu')
+
+    with patch.object(manager._cache, 'get_many', side_effect=sqlite3.OperationalError('database is locked')), \
+            patch.object(manager._cache, 'put_many', side_effect=OSError('bad memmap')):
+        result = manager.encode_batch(['aa', 'bbb', 'aa'])
+
+    assert model.encode.call_args[0][0] == ['aa', 'bbb']
+    np.testing.assert_array_equal(result[:, 0], [2.0, 3.0, 2.0])
+    assert manager.get_cache_stats()['cache_misses'] == 3
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
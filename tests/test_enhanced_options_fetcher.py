@@ -0,0 +1,150 @@
+"""
+Tests for EnhancedOptionsFetcher fetch pipeline
+Robinhood calls are mocked; verifies batching and concurrent fan-out
+"""
+
+import pytest
+import os
+import sys
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.enhanced_options_fetcher import EnhancedOptionsFetcher
+from src.services.rate_limiter import get_rate_limiter
+
+
+def _expiration(days: int) -> str:
+    return (datetime.now() + timedelta(days=days, hours=12)).strftime('%Y-%m-%d')
+
+
+def _make_puts(expiration: str, strikes):
+    return [{
+        'id': f"{expiration}-{strike}",
+        'url': f"https://api.robinhood.com/options/instruments/{expiration}-{strike}/",
+        'strike_price': f"{strike:.4f}",
+        'expiration_date': expiration,
+        'type': 'put',
+    } for strike in strikes]
+
+
+@pytest.fixture
+def mock_rh():
+    """Patch robin_stocks with a 100-dollar stock and three expirations"""
+    expirations = [_expiration(7), _expiration(30), _expiration(45)]
+    strikes = [float(s) for s in range(70, 111, 1)]
+
+    with patch('src.enhanced_options_fetcher.rh') as rh, \
+            patch('src.enhanced_options_fetcher.rh_helper') as rh_helper:
+        rh.stocks.get_stock_quote_by_symbol.return_value = {'last_trade_price': '100.00'}
+        rh.options.get_chains.return_value = {'expiration_dates': expirations}
+        rh.options.find_tradable_options.side_effect = \
+            lambda symbol, exp, optionType=None: _make_puts(exp, strikes)
+
+        def market_data(url, data_type, payload):
+            return [{
+                'instrument': instrument,
+                'instrument_id': instrument.rstrip('/').rsplit('/', 1)[-1],
+                'bid_price': '1.00',
+                'ask_price': '1.20',
+                'volume': 10,
+                'open_interest': 100,
+                'implied_volatility': '0.40',
+            } for instrument in payload['instruments'].split(',')]
+
+        rh_helper.request_get.side_effect = market_data
+        yield rh, rh_helper, expirations
+
+
+@pytest.fixture
+def fetcher():
+    # Start each test with a full Robinhood token budget
+    get_rate_limiter().reset('robinhood')
+    fetcher = EnhancedOptionsFetcher()
+    fetcher.logged_in = True
+    return fetcher
+
+
+def test_market_data_is_batched(mock_rh, fetcher):
+    """One market data request covers every selected expiration"""
+    rh, rh_helper, expirations = mock_rh
+
+    results = fetcher.get_all_expirations_data('TEST', target_dtes=[7, 30, 45])
+
+    assert [r['expiration_date'] for r in results] == expirations
+    assert rh_helper.request_get.call_count == 1
+    rh.options.get_option_market_data_by_id.assert_not_called()
+    rh.options.find_options_by_expiration.assert_not_called()
+    for r in results:
+        assert r['strike_price'] < r['current_price']
+        assert r['mid'] == pytest.approx(1.10)
+
+
+def test_shared_expiration_listed_once(mock_rh, fetcher):
+    """Target DTEs resolving to the same expiration only list puts once"""
+    rh, _, _ = mock_rh
+
+    results = fetcher.get_all_expirations_data('TEST', target_dtes=[28, 30, 32])
+
+    assert len(results) == 3
+    assert rh.options.find_tradable_options.call_count == 1
+
+
+def test_market_data_chunks_large_batches(mock_rh, fetcher):
+    """Batches larger than MARKET_DATA_BATCH_SIZE are split across requests"""
+    _, rh_helper, expirations = mock_rh
+    options = _make_puts(expirations[0], [float(s) for s in range(1, 121)])
+
+    data = fetcher.get_option_market_data_batch(options)
+
+    assert len(data) == 120
+    assert rh_helper.request_get.call_count == 3
+
+
+def test_best_opportunities_fans_out(mock_rh, fetcher):
+    """Every symbol is scanned and results are sorted by monthly return"""
+    opportunities = fetcher.get_best_opportunities(['AAA', 'BBB', 'CCC'], min_monthly_return=0)
+
+    assert {o['symbol'] for o in opportunities} == {'AAA', 'BBB', 'CCC'}
+    monthly = [o['monthly_return'] for o in opportunities]
+    assert monthly == sorted(monthly, reverse=True)
+
+
+def test_analytic_selection_prices_only_neighbours(mock_rh, fetcher):
+    """Analytic mode requests market data for at most 3 strikes per expiration"""
+    _, rh_helper, _ = mock_rh
+
+    results = fetcher.get_all_expirations_data('TEST', target_dtes=[7, 30, 45])
+
+    instruments = rh_helper.request_get.call_args[0][2]['instruments'].split(',')
+    assert len(results) == 3
+    assert len(instruments) <= 3 * len(results)
+
+
+def test_analytic_selection_matches_scan_at_default_iv(fetcher):
+    """With uniform default IV both modes pick the same 30-delta strike"""
+    puts = _make_puts(_expiration(30), [float(s) for s in range(50, 121)])
+    scan = EnhancedOptionsFetcher(strike_selection='scan')
+
+    for dte in (7, 14, 30, 45):
+        candidates = fetcher._candidate_puts(puts, 100.0, dte)
+        market_data = {put['id']: {'implied_volatility': '0.35'} for put in candidates}
+        chosen, _ = fetcher._refine_with_market_iv(candidates, market_data, 100.0, dte)
+
+        assert len(candidates) == 3
+        assert chosen['id'] == scan._select_target_put(puts, 100.0, dte)['id']
+
+
+def test_analytic_selection_follows_market_iv(fetcher):
+    """Higher real IV moves the 30-delta strike further OTM"""
+    puts = _make_puts(_expiration(30), [float(s) for s in range(80, 101)])
+    candidates = fetcher._candidate_puts(puts, 100.0, 30)
+
+    low_iv = {put['id']: {'implied_volatility': '0.30'} for put in candidates}
+    high_iv = {put['id']: {'implied_volatility': '0.45'} for put in candidates}
+
+    low_pick, _ = fetcher._refine_with_market_iv(candidates, low_iv, 100.0, 30)
+    high_pick, _ = fetcher._refine_with_market_iv(candidates, high_iv, 100.0, 30)
+
+    assert float(high_pick['strike_price']) < float(low_pick['strike_price'])
@@ -0,0 +1,141 @@
+"""
+Tests for FeatureStore caching and columnar retrieval
+Covers the LRU/TTL cache, cache-aware bulk reads and feature matrix snapshots
+"""
+
+import pytest
+import os
+import sys
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from analytics.feature_store import FeatureStore, FeatureCache, FeatureSnapshot
+
+NAMES = ['yes_price', 'volume', 'is_home']
+
+
+def _rows():
+    return [
+        ('A', 1, 'nfl', datetime(2025, 11, 1, tzinfo=timezone.utc),
+         datetime(2025, 11, 2, tzinfo=timezone.utc), [0.6, 100.0, 1.0]),
+        ('B', 2, 'nba', datetime(2025, 11, 3, tzinfo=timezone.utc),
+         datetime(2025, 11, 4, tzinfo=timezone.utc), [0.3, None, 0.0]),
+        ('C', 3, 'nfl', None, datetime(2025, 11, 5, tzinfo=timezone.utc), [0.9, 50.0, None]),
+    ]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return FeatureStore(db_config={}, snapshot_dir=str(tmp_path))
+
+
+def test_cache_evicts_least_recently_used():
+    cache = FeatureCache(max_entries=2, ttl=None)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_cache_entries_expire():
+    cache = FeatureCache(ttl=10)
+    with patch('analytics.feature_store.time.monotonic', return_value=100.0):
+        cache.set('a', 1)
+    with patch('analytics.feature_store.time.monotonic', return_value=105.0):
+        assert cache.get('a') == 1
+    with patch('analytics.feature_store.time.monotonic', return_value=111.0):
+        assert cache.get('a') is None
+    assert len(cache) == 0
+
+
+def test_bulk_read_only_queries_misses(store):
+    store._cache.set(store._cache_key('A', 'v1.0', 'base'), {'yes_price': 0.6})
+
+    conn = MagicMock()
+    conn.cursor.return_value.fetchall.return_value = [{'ticker': 'B', 'features': {'yes_price': 0.3}}]
+    with patch.object(store, 'get_connection', return_value=conn):
+        result = store.get_features_bulk(['A', 'B'])
+        assert conn.cursor.return_value.execute.call_args[0][1][0] == ['B']
+
+        assert result == {'A': {'yes_price': 0.6}, 'B': {'yes_price': 0.3}}
+        assert store.get_features_bulk(['A', 'B']) == result
+    assert conn.cursor.return_value.execute.call_count == 1
+
+
+def test_store_features_writes_through_cache(store):
+    store._cache.set(store._cache_key('A', 'v1.0', 'base'), {'yes_price': 0.1})
+
+    with patch.object(store, 'get_connection', return_value=MagicMock()):
+        assert store.store_features(1, 'A', {'yes_price': np.float64(0.7)})
+
+    assert store.get_features('A') == {'yes_price': 0.7}
+
+
+def test_snapshot_select_and_round_trip(tmp_path):
+    snapshot = FeatureSnapshot.from_rows('v1.0', 'base', NAMES, _rows())
+    path = str(tmp_path / 'snap.npz')
+    snapshot.save(path)
+    loaded = FeatureSnapshot.load(path)
+
+    matrix = loaded.select(['C', 'missing', 'A'], ['volume', 'unknown', 'yes_price'])
+
+    expected = np.array([[50.0, np.nan, 0.9],
+                         [np.nan, np.nan, np.nan],
+                         [100.0, np.nan, 0.6]])
+    np.testing.assert_array_equal(matrix, expected)
+    assert loaded.max_computed_at == snapshot.max_computed_at
+    assert loaded.names == NAMES
+
+
+def test_matrix_without_snapshot_extracts_in_sql(store):
+    with patch.object(store, '_fetch_matrix_rows', return_value=_rows()) as fetch:
+        matrix = store.get_features_matrix(['B', 'A', 'Z'], NAMES, use_snapshot=False)
+
+    fetch.assert_called_once_with(NAMES, 'v1.0', 'base', tickers=['B', 'A', 'Z'])
+    np.testing.assert_array_equal(matrix, [[0.3, np.nan, 0.0],
+                                           [0.6, 100.0, 1.0],
+                                           [np.nan, np.nan, np.nan]])
+
+
+def test_matrix_served_from_current_snapshot(store):
+    with patch.object(store, '_snapshot_feature_names', return_value=(NAMES, [])), \
+         patch.object(store, '_fetch_matrix_rows', return_value=_rows()):
+        store.build_snapshot()
+
+    # Fresh store instance reloads the snapshot from disk
+    reloaded = FeatureStore(db_config={}, snapshot_dir=store.snapshot_dir)
+    state = (3, datetime(2025, 11, 5, tzinfo=timezone.utc))
+    with patch.object(reloaded, '_snapshot_state', return_value=state), \
+         patch.object(reloaded, '_fetch_matrix_rows') as fetch:
+        matrix = reloaded.get_features_matrix(['A', 'C'], ['is_home'])
+    fetch.assert_not_called()
+    np.testing.assert_array_equal(matrix, [[1.0], [np.nan]])
+
+    # A newer computed_at makes the snapshot stale
+    stale = (3, datetime(2025, 11, 6, tzinfo=timezone.utc))
+    with patch.object(reloaded, '_snapshot_state', return_value=stale):
+        assert reloaded.get_snapshot() is None
+
+
+def test_dataframe_from_snapshot_applies_filters(store):
+    with patch.object(store, '_snapshot_feature_names', return_value=(NAMES, [])), \
+         patch.object(store, '_fetch_matrix_rows', return_value=_rows()), \
+         patch.object(store, '_snapshot_state', return_value=(3, datetime(2025, 11, 5, tzinfo=timezone.utc))):
+        store.build_snapshot()
+        df = store.get_features_dataframe(market_type='nfl', start_date=datetime(2025, 10, 1))
+
+    assert df['ticker'].tolist() == ['A']
+    assert df['volume'].tolist() == [100.0]
+    assert str(df['close_time'].dt.tz) == 'UTC'
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
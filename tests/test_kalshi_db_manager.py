@@ -0,0 +1,112 @@
+"""
+Tests for the bulk KalshiDBManager.store_markets ingest path
+Covers row staging, COPY serialization and the memoized team parser
+"""
+
+import pytest
+import json
+import os
+import sys
+from unittest.mock import patch, MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.kalshi_db_manager import KalshiDBManager
+
+
+@pytest.fixture
+def manager():
+    """Manager without a live database connection"""
+    db = KalshiDBManager.__new__(KalshiDBManager)
+    db.last_ingest_stats = {'rows': 0, 'seconds': 0.0, 'rows_per_second': None}
+    KalshiDBManager._extract_teams_cached.cache_clear()
+    return db
+
+
+def _market(ticker, title='Will Kansas City beat Buffalo?', last_price=62):
+    return {
+        'ticker': ticker,
+        'title': title,
+        'subtitle': 'Tab\there\nand a \\ backslash',
+        'series_ticker': 'KXNFLGAME',
+        'last_price': last_price,
+        'volume': 1500,
+        'open_interest': 300,
+        'status': 'open',
+        'close_time': '2025-11-09T18:00:00Z',
+        'expiration_time': None,
+    }
+
+
+def test_build_market_rows(manager):
+    markets = [_market('A'), {'title': 'no ticker'}, _market('B', last_price=None)]
+
+    with patch.object(KalshiDBManager, '_extract_teams', return_value=('Buffalo', 'Kansas City')):
+        rows = manager._build_market_rows(markets, 'nfl')
+
+    assert [row[1] for row in rows] == ['A', 'B']
+    assert rows[0][0] == 0 and rows[1][0] == 2
+    assert rows[0][6:10] == ('Buffalo', 'Kansas City', 0.62, 0.38)
+    assert rows[1][8] is None and rows[1][9] is None
+    assert json.loads(rows[0][-1])['ticker'] == 'A'
+
+
+def test_team_parsing_memoized_by_title(manager):
+    markets = [_market(f'T{i}') for i in range(50)]
+
+    with patch.object(KalshiDBManager, '_extract_teams', return_value=('Buffalo', 'Kansas City')) as extract:
+        manager._build_market_rows(markets, 'nfl')
+        manager._build_market_rows(markets, 'nfl')
+
+    extract.assert_called_once_with('Will Kansas City beat Buffalo?')
+
+
+def test_copy_buffer_escapes_text_format(manager):
+    buffer = manager._market_rows_to_copy_buffer([(0, 'A', 'x\ty', None, 'a\\b\nc')])
+
+    assert buffer.read() == '0\tA\tx\\ty\t\\N\ta\\\\b\\nc\n'
+
+
+def test_store_markets_single_copy_and_upsert(manager):
+    conn = MagicMock()
+    cur = conn.cursor.return_value
+    cur.rowcount = 3
+    manager.get_connection = MagicMock(return_value=conn)
+    manager.release_connection = MagicMock()
+
+    with patch.object(KalshiDBManager, '_extract_teams', return_value=(None, None)):
+        stored = manager.store_markets([_market('A'), _market('B'), _market('C')], 'nfl')
+
+    assert stored == 3
+    cur.copy_expert.assert_called_once()
+    copied = cur.copy_expert.call_args[0][1].read().splitlines()
+    assert len(copied) == 3
+
+    statements = [c[0][0] for c in cur.execute.call_args_list]
+    assert len(statements) == 2
+    assert 'CREATE TEMP TABLE' in statements[0]
+    assert 'ON CONFLICT (ticker)' in statements[1]
+
+    conn.commit.assert_called_once()
+    manager.release_connection.assert_called_once_with(conn)
+    assert manager.last_ingest_stats['rows'] == 3
+    assert manager.last_ingest_stats['rows_per_second'] > 0
+
+
+def test_store_markets_rolls_back_on_error(manager):
+    conn = MagicMock()
+    conn.cursor.return_value.copy_expert.side_effect = RuntimeError('copy failed')
+    manager.get_connection = MagicMock(return_value=conn)
+    manager.release_connection = MagicMock()
+
+    with patch.object(KalshiDBManager, '_extract_teams', return_value=(None, None)):
+        with pytest.raises(RuntimeError):
+            manager.store_markets([_market('A')], 'nfl')
+
+    conn.rollback.assert_called_once()
+    conn.commit.assert_not_called()
+    manager.release_connection.assert_called_once_with(conn)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,161 @@
+"""
+Tests for KalshiEnsemble batch prediction
+Covers early quorum with straggler cancellation, per-provider concurrency limits and the price-bucket cache
+"""
+
+import pytest
+import os
+import sys
+import json
+import asyncio
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.ai.kalshi_ensemble import KalshiEnsemble
+from fixtures import make_synthetic_slate
+
+
+class FakeClient:
+    """Model client with a fixed answer and delay that records concurrency"""
+
+    def __init__(self, outcome='yes', edge=8.0, delay=0.01, fail=False):
+        self.outcome = outcome
+        self.edge = edge
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def analyze_market(self, prompt):
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.active -= 1
+
+        if self.fail:
+            raise RuntimeError('provider down')
+        return {'content': json.dumps({
+            'predicted_outcome': self.outcome,
+            'confidence': 70.0,
+            'edge_percentage': self.edge,
+            'reasoning': 'fake',
+            'key_factors': ['factor'],
+        })}
+
+
+def _ensemble(clients, **kwargs):
+    ensemble = KalshiEnsemble(mode='premium', **kwargs)
+    ensemble.clients = clients
+    return ensemble
+
+
+def test_quorum_cancels_stragglers():
+    clients = {
+        'gpt4': FakeClient(edge=8.0),
+        'claude': FakeClient(edge=10.0),
+        'gemini': FakeClient(outcome='no', edge=-2.0, delay=0.02),
+        'llama3': FakeClient(edge=9.0, delay=5.0),
+    }
+    ensemble = _ensemble(clients, quorum=2, edge_tolerance=5.0)
+
+    prediction = asyncio.run(ensemble.predict({'ticker': 'KC', 'yes_price': 0.48}))
+
+    assert prediction.models_used == ['gpt4', 'claude']
+    assert prediction.predicted_outcome == 'yes'
+    assert clients['llama3'].cancelled == 1 and clients['gemini'].cancelled == 1
+    assert prediction.total_latency_ms < 1000
+
+
+def test_quorum_waits_when_models_disagree():
+    clients = {
+        'gpt4': FakeClient(edge=20.0),
+        'claude': FakeClient(edge=2.0, delay=0.02),
+        'gemini': FakeClient(edge=4.0, delay=0.05),
+        'llama3': FakeClient(outcome='no', edge=-3.0, delay=0.03),
+    }
+    ensemble = _ensemble(clients, quorum=2, edge_tolerance=5.0)
+
+    prediction = asyncio.run(ensemble.predict({'ticker': 'KC', 'yes_price': 0.48}))
+
+    # gpt4 and claude disagree on edge; llama3 disagrees on outcome; gemini completes the quorum
+    assert prediction.models_used == ['gpt4', 'claude', 'gemini', 'llama3']
+    assert all(client.cancelled == 0 for client in clients.values())
+
+
+def test_without_quorum_all_models_are_used():
+    clients = {'gpt4': FakeClient(), 'claude': FakeClient(fail=True), 'gemini': FakeClient(delay=0.03)}
+    ensemble = _ensemble(clients)
+
+    prediction = asyncio.run(ensemble.predict({'ticker': 'KC', 'yes_price': 0.48}))
+
+    assert prediction.models_used == ['gpt4', 'gemini']
+
+
+def test_predict_many_respects_provider_limits_and_dedupes():
+    clients = {'gpt4': FakeClient(delay=0.02), 'gemini': FakeClient(delay=0.02)}
+    ensemble = _ensemble(clients, provider_concurrency={'gpt4': 3, 'gemini': 5})
+    slate = make_synthetic_slate(20)
+
+    results = asyncio.run(ensemble.predict_many(slate + slate[:5]))
+
+    assert len(results) == 25
+    assert results[20] is results[0]
+    assert clients['gpt4'].calls == 20 and clients['gemini'].calls == 20
+    assert clients['gpt4'].max_active == 3 and clients['gemini'].max_active == 5
+
+
+def test_predict_many_caches_by_price_bucket():
+    clients = {'gpt4': FakeClient()}
+    ensemble = _ensemble(clients, price_bucket=0.05)
+    market = {'ticker': 'KC', 'yes_price': 0.50}
+
+    first = asyncio.run(ensemble.predict_many([market]))[0]
+    same_bucket = asyncio.run(ensemble.predict_many([{**market, 'yes_price': 0.51}]))[0]
+    moved = asyncio.run(ensemble.predict_many([{**market, 'yes_price': 0.60}]))[0]
+    with_context = asyncio.run(ensemble.predict(market, context={'weather': {'wind_speed': 20}}))
+
+    assert same_bucket is first and moved is not first and with_context is not first
+    assert clients['gpt4'].calls == 3
+
+
+def test_cache_evicts_expired_and_oldest_entries():
+    ensemble = _ensemble({'gpt4': FakeClient()}, cache_ttl=60, cache_max_size=3)
+
+    with patch('src.ai.kalshi_ensemble.time.monotonic', return_value=100.0):
+        for ticker in 'ABCD':
+            ensemble._store((ticker, 50, ''), ticker)
+        assert list(ensemble._cache) == [('B', 50, ''), ('C', 50, ''), ('D', 50, '')]
+
+        # A refreshed key moves to the back of the eviction order
+        ensemble._store(('B', 50, ''), 'B2')
+        ensemble._store(('E', 50, ''), 'E')
+        assert [key[0] for key in ensemble._cache] == ['D', 'B', 'E']
+    with patch('src.ai.kalshi_ensemble.time.monotonic', return_value=130.0):
+        ensemble._store(('F', 50, ''), 'F')
+    with patch('src.ai.kalshi_ensemble.time.monotonic', return_value=170.0):
+        ensemble._store(('G', 50, ''), 'G')
+        assert ensemble._cached(('F', 50, '')) == 'F'
+
+    assert [key[0] for key in ensemble._cache] == ['F', 'G']
+
+
+def test_predict_many_returns_failures_in_place():
+    clients = {'gpt4': FakeClient(fail=True)}
+    ensemble = _ensemble(clients)
+
+    results = asyncio.run(ensemble.predict_many([{'ticker': 'A'}, {'ticker': 'B'}]))
+
+    assert all(isinstance(result, Exception) for result in results)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,159 @@
+"""
+Tests for the shared Kalshi market index
+Covers incremental watermark refresh, alias matching and title lookups
+"""
+
+import pytest
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.kalshi_market_index import KalshiMarketIndex
+from src.espn_kalshi_matcher_optimized import build_market_lookup_index, match_game_to_market_fast
+
+T0 = datetime(2025, 11, 16, 12, 0, tzinfo=timezone.utc)
+
+
+def _row(ticker, title, home, away, volume=1000, status='active',
+         yes_price=0.55, changed_at=T0, close_time=T0 + timedelta(days=1)):
+    return {
+        'ticker': ticker,
+        'title': title,
+        'yes_price': yes_price,
+        'no_price': None if yes_price is None else round(1 - yes_price, 2),
+        'volume': volume,
+        'home_team': home,
+        'away_team': away,
+        'market_type': 'nfl',
+        'sector': 'nfl',
+        'close_time': close_time,
+        'status': status,
+        'expected_expiration_time': None,
+        'raw_market_type': None,
+        'changed_at': changed_at,
+    }
+
+
+@pytest.fixture
+def index():
+    return KalshiMarketIndex(db=MagicMock(), refresh_interval=0)
+
+
+def test_incremental_refresh_uses_watermark(index):
+    first = [_row('KXNFLGAME-25NOV16KCBUF-BUF', 'Kansas City at Buffalo Winner?', 'Buffalo', 'Kansas City')]
+    index._fetch_rows = MagicMock(return_value=first)
+    assert index.refresh() == 1
+    index._fetch_rows.assert_called_once_with(None)
+
+    later = T0 + timedelta(minutes=5)
+    update = [_row('KXNFLGAME-25NOV16KCBUF-BUF', 'Kansas City at Buffalo Winner?', 'Buffalo', 'Kansas City',
+                   yes_price=0.61, changed_at=later)]
+    index._fetch_rows = MagicMock(return_value=update)
+    assert index.refresh() == 1
+    index._fetch_rows.assert_called_once_with(T0 - index.watermark_lag)
+
+    assert len(index) == 1
+    assert index.all_markets()[0]['yes_price'] == 0.61
+    assert index._watermark == later
+
+
+def test_refresh_rereads_lag_window_for_late_commits(index):
+    index.watermark_lag = timedelta(minutes=5)
+    later = T0 + timedelta(minutes=3)
+    index._fetch_rows = MagicMock(return_value=[_row('KXNFLGAME-A-BUF', 'A at Buffalo', 'Buffalo', 'A',
+                                                     changed_at=later)])
+    index.refresh()
+
+    # Stamped before the watermark but committed after the previous read
+    late = _row('KXNFLGAME-B-MIA', 'B at Miami', 'Miami', 'B', changed_at=T0 + timedelta(minutes=1))
+    index._fetch_rows = MagicMock(return_value=[late])
+    index.refresh()
+
+    index._fetch_rows.assert_called_once_with(later - timedelta(minutes=5))
+    assert len(index) == 2 and index._watermark == later
+
+
+def test_refresh_interval_throttles(index):
+    index.refresh_interval = 60
+    index._fetch_rows = MagicMock(return_value=[])
+    index.refresh()
+    index.refresh()
+    assert index._fetch_rows.call_count == 1
+
+
+def test_closed_market_is_removed_from_all_indexes(index):
+    ticker = 'KXNFLGAME-25NOV16KCBUF-BUF'
+    index.apply(_row(ticker, 'Kansas City at Buffalo Winner?', 'Buffalo', 'Kansas City'))
+    assert index.lookup('nfl', 'kansas city_buffalo') is not None
+
+    index.apply(_row(ticker, 'Kansas City at Buffalo Winner?', 'Buffalo', 'Kansas City', status='closed'))
+
+    assert len(index) == 0
+    assert index.lookup('nfl', 'kansas city_buffalo') is None
+    assert index.find_by_title(['buffalo']) == []
+    assert not index._sport_keys['nfl'] and not index._title_index
+
+
+def test_match_game_via_aliases(index):
+    index.apply(_row('KXNFLGAME-25NOV16KCBUF-BUF', 'Kansas City at Buffalo Winner?', 'Buffalo', 'Kansas City'))
+
+    game = {'away_team': 'Chiefs', 'home_team': 'Bills', 'away_abbr': 'KC', 'home_abbr': 'BUF'}
+    odds = index.match_game(game, 'nfl')
+
+    assert odds['ticker'] == 'KXNFLGAME-25NOV16KCBUF-BUF'
+    assert odds['home_win_price'] == pytest.approx(0.55)
+    assert odds['away_win_price'] == pytest.approx(0.45)
+    assert index.match_game(game, 'nba') is None
+
+
+def test_match_game_prefers_highest_volume_active(index):
+    index.apply(_row('KXNFLGAME-A-BUF', 'Kansas City at Buffalo', 'Buffalo', 'Kansas City', volume=10))
+    index.apply(_row('KXNFLGAME-B-BUF', 'Kansas City at Buffalo', 'Buffalo', 'Kansas City', volume=900))
+    index.apply(_row('KXNFLGAME-C-BUF', 'Kansas City at Buffalo', 'Buffalo', 'Kansas City',
+                     volume=5000, status='open'))
+
+    game = {'away_team': 'Kansas City', 'home_team': 'Buffalo'}
+    assert index.match_game(game, 'nfl')['ticker'] == 'KXNFLGAME-B-BUF'
+
+
+def test_find_by_title_matches_whole_phrases(index):
+    index.apply(_row('KXNFLGAME-1-NYG', 'New York Giants at Dallas', 'Dallas', 'New York Giants', volume=5))
+    index.apply(_row('KXNFLGAME-2-NYJ', 'New York Jets at Miami', 'Miami', 'New York Jets', volume=50))
+
+    assert [m['ticker'] for m in index.find_by_title(['new york'])] == ['KXNFLGAME-2-NYJ', 'KXNFLGAME-1-NYG']
+    assert [m['ticker'] for m in index.find_by_title(['New York Giants'], ['Dallas'])] == ['KXNFLGAME-1-NYG']
+    assert index.find_by_title(['New York Giants'], ['Miami']) == []
+    assert index.find_by_title(['NE']) == []
+
+
+def test_find_by_title_substring_matches_like_ilike(index):
+    index.apply(_row('KXNBAGAME-1-NYK', 'New York Knicks at Boston Celtics', 'Boston Celtics', 'New York Knicks',
+                     volume=5))
+    index.apply(_row('KXNBAGAME-2-LAL', 'Los Angeles Lakers at Golden State', 'Golden State', 'Los Angeles Lakers',
+                     volume=50))
+
+    assert index.find_by_title(['Knick']) == []
+    assert [m['ticker'] for m in index.find_by_title(['Knick'], substring=True)] == ['KXNBAGAME-1-NYK']
+    assert [m['ticker'] for m in index.find_by_title(['celtic', 'LAKER'], substring=True)] == [
+        'KXNBAGAME-2-LAL', 'KXNBAGAME-1-NYK']
+    assert [m['ticker'] for m in index.find_by_title(['Knicks'], ['Bost'], substring=True)] == ['KXNBAGAME-1-NYK']
+    assert index.find_by_title(['Knicks'], ['Golden'], substring=True) == []
+
+
+def test_static_index_helpers_still_match():
+    market = _row('KXNBAGAME-25NOV19LALGSW-LAL', 'Lakers vs Warriors', 'warriors', 'lakers')
+    lookup = build_market_lookup_index([market])
+
+    odds = match_game_to_market_fast(
+        {'away_team': 'Lakers', 'home_team': 'Warriors', 'away_abbr': 'LAL', 'home_abbr': 'GSW'},
+        lookup
+    )
+    assert odds['ticker'] == market['ticker']
+    assert odds['away_win_price'] == pytest.approx(0.55)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
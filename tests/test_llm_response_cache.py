@@ -0,0 +1,116 @@
+"""
+Tests for the persistent LLM response cache
+Covers shared SQLite storage, TTL/LRU eviction, semantic near-duplicate hits and usage metrics
+"""
+
+import pytest
+import os
+import sys
+from unittest.mock import patch
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.services.llm_response_cache import PersistentResponseCache
+
+PARAMS = {'max_tokens': 500, 'temperature': 0.7}
+
+
+def _embed(texts):
+    """Bag-of-letters embedding: rewordings with the same letters land close together"""
+    vectors = np.zeros((len(texts), 26), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for char in text.lower():
+            if 'a' <= char <= 'z':
+                vectors[row, ord(char) - ord('a')] += 1
+    return vectors
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'llm_cache' / 'responses.sqlite')
+
+
+def test_exact_hits_are_shared_between_instances(path):
+    writer = PersistentResponseCache(path)
+    writer.set("What is a CSP?", 'groq', 'llama', "A cash secured put.", cost=0.002, **PARAMS)
+
+    reader = PersistentResponseCache(path)
+    hit = reader.get("What is a CSP?", 'groq', 'llama', **PARAMS)
+
+    assert hit == {'response': "A cash secured put.", 'tier': 'persistent', 'cost': 0.002}
+    assert reader.get("What is a CSP?", 'groq', 'llama', max_tokens=100, temperature=0.7) is None
+    assert reader.get("What is a CSP?", 'openai', 'llama', **PARAMS) is None
+
+
+def test_entries_expire_after_ttl(path):
+    cache = PersistentResponseCache(path, ttl=60)
+    with patch('src.services.llm_response_cache.time.time', return_value=1000.0):
+        cache.set("prompt", 'groq', 'llama', "answer", **PARAMS)
+    with patch('src.services.llm_response_cache.time.time', return_value=1059.0):
+        assert cache.get("prompt", 'groq', 'llama', **PARAMS)['response'] == "answer"
+    with patch('src.services.llm_response_cache.time.time', return_value=1061.0):
+        assert cache.get("prompt", 'groq', 'llama', **PARAMS) is None
+        cache.set("other", 'groq', 'llama', "answer", **PARAMS)
+    assert cache.get_stats()['total_entries'] == 1
+
+
+def test_least_recently_used_entries_are_evicted(path):
+    cache = PersistentResponseCache(path, max_entries=3)
+    clock = iter(range(1000, 2000))
+    with patch('src.services.llm_response_cache.time.time', side_effect=lambda: float(next(clock))):
+        for prompt in ['a', 'b', 'c']:
+            cache.set(prompt, 'groq', 'llama', prompt.upper(), **PARAMS)
+        cache.get('a', 'groq', 'llama', **PARAMS)
+        cache.set('d', 'groq', 'llama', 'D', **PARAMS)
+
+        found = [cache.get(p, 'groq', 'llama', **PARAMS) is not None for p in ['a', 'b', 'c', 'd']]
+
+    assert found == [True, False, True, True]
+
+
+def test_semantic_hit_for_reworded_prompt(path):
+    cache = PersistentResponseCache(path, embed=_embed, semantic_distance=0.05)
+    cache.set("What is the wheel strategy?", 'groq', 'llama', "Sell puts, then calls.", cost=0.01, **PARAMS)
+
+    hit = cache.get("what is the wheel strategy", 'groq', 'llama', **PARAMS)
+    assert hit['tier'] == 'semantic' and hit['response'] == "Sell puts, then calls."
+    assert hit['cost'] == 0.01 and hit['distance'] < 0.05
+
+    assert cache.get("Explain covered calls on NVDA", 'groq', 'llama', **PARAMS) is None
+    assert cache.get("what is the wheel strategy", 'groq', 'other-model', **PARAMS) is None
+
+
+def test_semantic_index_sees_other_writers_and_evictions(path):
+    reader = PersistentResponseCache(path, embed=_embed, max_entries=1)
+    assert reader.get("What is a put?", 'groq', 'llama', **PARAMS) is None
+
+    writer = PersistentResponseCache(path, embed=_embed, max_entries=1)
+    writer.set("What is a put?", 'groq', 'llama', "Right to sell.", **PARAMS)
+    assert reader.get("what is a put", 'groq', 'llama', **PARAMS)['response'] == "Right to sell."
+
+    writer.set("Completely different question", 'groq', 'llama', "Other.", **PARAMS)
+    assert reader.get("what is a put", 'groq', 'llama', **PARAMS) is None
+
+
+def test_two_level_cache_records_usage_metrics(path):
+    pytest.importorskip('loguru')
+    from src.services.llm_service import ResponseCache, UsageTracker
+
+    persistent = PersistentResponseCache(path, embed=_embed)
+    persistent.set("What is theta?", 'groq', 'llama', "Time decay.", cost=0.004, **PARAMS)
+
+    cache = ResponseCache(ttl=3600, persistent=persistent)
+    usage = UsageTracker()
+    for prompt in ["what is theta", "what is theta", "What is vega?"]:
+        usage.record_cache('groq', 'llama', cache.lookup(prompt, 'groq', 'llama', **PARAMS))
+
+    assert cache.lookup("what is theta", 'groq', 'llama', **PARAMS)['tier'] == 'memory'
+    totals = usage.get_cache_totals()
+    assert (totals['cache_hits'], totals['semantic_hits'], totals['cache_misses']) == (2, 1, 1)
+    assert totals['cost_saved'] == pytest.approx(0.008)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,89 @@
+"""
+Tests for the vectorized Black-Scholes pricing kernel
+Checks batch results against per-strike scalar formulas and the IV solver round trip
+"""
+
+import pytest
+import math
+import os
+import sys
+
+import numpy as np
+from scipy.stats import norm
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.options_pricing import bs_price, bs_greeks, bs_delta, implied_volatility, strike_for_delta
+
+
+def _scalar_put(S, K, T, r, sigma):
+    """Reference per-strike put formulas"""
+    d1 = (math.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * math.sqrt(T))
+    d2 = d1 - sigma * math.sqrt(T)
+    return {
+        'price': K * math.exp(-r * T) * norm.cdf(-d2) - S * norm.cdf(-d1),
+        'delta': norm.cdf(d1) - 1,
+        'gamma': norm.pdf(d1) / (S * sigma * math.sqrt(T)),
+        'theta': (-S * norm.pdf(d1) * sigma / (2 * math.sqrt(T))
+                  + r * K * math.exp(-r * T) * norm.cdf(-d2)) / 365,
+        'vega': S * norm.pdf(d1) * math.sqrt(T) / 100,
+        'prob_otm': norm.cdf(d2),
+    }
+
+
+def test_batch_matches_scalar_formulas():
+    strikes = np.linspace(60, 140, 41)
+    sigmas = np.linspace(0.15, 0.9, 41)
+    greeks = bs_greeks(100.0, strikes, 45 / 365, 0.045, sigmas, 'put')
+
+    for i, (k, vol) in enumerate(zip(strikes, sigmas)):
+        expected = _scalar_put(100.0, k, 45 / 365, 0.045, vol)
+        for key, value in expected.items():
+            assert greeks[key][i] == pytest.approx(value, abs=1e-10), key
+
+
+def test_put_call_parity_and_mixed_types():
+    K = np.array([90.0, 100.0, 110.0])
+    call = bs_price(100.0, K, 0.5, 0.04, 0.3, 'call')
+    put = bs_price(100.0, K, 0.5, 0.04, 0.3, 'put')
+    assert np.allclose(call - put, 100.0 - K * np.exp(-0.04 * 0.5))
+
+    mixed = bs_price(100.0, K, 0.5, 0.04, 0.3, ['call', 'put', 'call'])
+    assert np.allclose(mixed, [call[0], put[1], call[2]])
+
+
+def test_degenerate_rows():
+    greeks = bs_greeks(100.0, [90.0, 110.0, 95.0], [0.0, 0.0, 0.1], 0.05, [0.3, 0.3, 0.0], 'put')
+
+    assert np.allclose(greeks['price'], [0.0, 10.0, 0.0])
+    assert np.allclose(greeks['delta'], 0.0)
+    assert np.allclose(greeks['theta'], 0.0)
+    assert np.allclose(greeks['prob_otm'], [1.0, 0.0, 1.0])
+    assert bs_delta(0.0, 100.0, 0.1, 0.05, 0.3) == 0.0
+
+
+def test_implied_volatility_round_trip():
+    strikes = np.linspace(70, 130, 25)
+    sigmas = np.linspace(0.2, 1.5, 25)
+    for option_type in ('put', 'call'):
+        prices = bs_price(100.0, strikes, 60 / 365, 0.045, sigmas, option_type)
+        solved = implied_volatility(prices, 100.0, strikes, 60 / 365, 0.045, option_type)
+        recovered = bs_price(100.0, strikes, 60 / 365, 0.045, solved, option_type)
+        assert np.allclose(recovered, prices, atol=1e-5)
+
+
+def test_implied_volatility_rejects_arbitrage_prices():
+    # Below intrinsic and above the strike bound are both unsolvable
+    solved = implied_volatility([5.0, 120.0], 100.0, [110.0, 110.0], 0.25, 0.0, 'put')
+    assert np.isnan(solved).all()
+
+
+def test_strike_for_delta_inverts_delta():
+    targets = np.array([-0.10, -0.30, -0.50])
+    strikes = strike_for_delta(100.0, 30 / 365, 0.045, 0.35, targets, 'put')
+    assert np.allclose(bs_delta(100.0, strikes, 30 / 365, 0.045, 0.35, 'put'), targets)
+
+    call_strike = strike_for_delta(100.0, 30 / 365, 0.045, 0.35, 0.25, 'call')
+    assert bs_delta(100.0, call_strike, 30 / 365, 0.045, 0.35, 'call') == pytest.approx(0.25)
+
+    assert np.isnan(strike_for_delta(100.0, 0.0, 0.045, 0.35, -0.30, 'put'))
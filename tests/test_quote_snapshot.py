@@ -0,0 +1,113 @@
+"""
+Tests for the batched quote snapshot service and BuyZoneScanner
+Covers single-request quoting, TTL caching and the one-query zone scan
+"""
+
+import pytest
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.quote_snapshot import QuoteSnapshotService
+from src.zone_buy_scanner import BuyZoneScanner
+
+
+def _minute_bars(closes):
+    """Grouped 1-minute download frame: symbol -> list of closes"""
+    index = pd.date_range('2025-11-17 09:30', periods=3, freq='min')
+    frames = {symbol: pd.DataFrame({'Close': values, 'Volume': [100] * 3}, index=index)
+              for symbol, values in closes.items()}
+    return pd.concat(frames, axis=1)
+
+
+def test_batch_quotes_use_one_request():
+    downloader = MagicMock(return_value=_minute_bars({
+        'AAPL': [190.0, 190.5, 191.0],
+        'MSFT': [410.0, 411.0, None],
+    }))
+    quotes = QuoteSnapshotService(downloader=downloader)
+
+    prices = quotes.get_last_prices(['MSFT', 'AAPL', 'GONE', 'AAPL'])
+
+    assert prices == {'MSFT': 411.0, 'AAPL': 191.0}
+    downloader.assert_called_once()
+    assert downloader.call_args[0][0] == ['MSFT', 'AAPL', 'GONE']
+    assert downloader.call_args[1]['interval'] == '1m'
+
+
+def test_cached_quotes_expire_after_ttl():
+    downloader = MagicMock(return_value=_minute_bars({'AAPL': [1.0, 2.0, 3.0], 'SPY': [4.0, 5.0, 6.0]}))
+    quotes = QuoteSnapshotService(ttl=30, downloader=downloader)
+
+    with patch('src.quote_snapshot.time.monotonic', return_value=100.0):
+        quotes.get_last_prices(['AAPL', 'GONE'])
+    with patch('src.quote_snapshot.time.monotonic', return_value=120.0):
+        assert quotes.get_last_prices(['AAPL', 'GONE']) == {'AAPL': 3.0}
+        assert downloader.call_count == 1
+
+        # Only the symbol not yet cached is requested
+        assert quotes.get_last_prices(['AAPL', 'SPY']) == {'AAPL': 3.0, 'SPY': 6.0}
+        assert downloader.call_args[0][0] == ['SPY']
+    with patch('src.quote_snapshot.time.monotonic', return_value=140.0):
+        quotes.get_last_prices(['AAPL'])
+    assert downloader.call_count == 3
+
+
+def test_batches_are_split_by_batch_size():
+    downloader = MagicMock(return_value=pd.DataFrame())
+    quotes = QuoteSnapshotService(batch_size=2, downloader=downloader)
+
+    assert quotes.get_last_prices(['A', 'B', 'C']) == {}
+    assert [c[0][0] for c in downloader.call_args_list] == [['A', 'B'], ['C']]
+
+
+def test_failed_download_is_not_cached_as_missing():
+    bars = _minute_bars({'AAPL': [1.0, 2.0, 3.0]})
+    downloader = MagicMock(side_effect=[RuntimeError('rate limited'), pd.DataFrame(), bars])
+    quotes = QuoteSnapshotService(ttl=30, downloader=downloader)
+
+    with patch('src.quote_snapshot.time.monotonic', return_value=100.0):
+        assert quotes.get_last_price('AAPL') is None
+        assert quotes.get_last_price('AAPL') is None
+        assert quotes.get_last_price('AAPL') == 3.0
+    assert downloader.call_count == 3
+
+
+def _zone(midpoint, strength=80, status='FRESH'):
+    return {'zone_midpoint': midpoint, 'zone_bottom': midpoint - 1, 'zone_top': midpoint + 1,
+            'strength_score': strength, 'status': status, 'test_count': 0}
+
+
+def test_scan_uses_one_zone_query_and_one_quote_batch():
+    quotes = MagicMock()
+    quotes.get_last_prices.return_value = {'AAPL': 100.5, 'MSFT': 200.0}
+
+    with patch('src.zone_buy_scanner.ZoneDatabaseManager'), \
+         patch('src.zone_buy_scanner.TradingViewDBManager'):
+        scanner = BuyZoneScanner(quotes=quotes)
+
+    scanner.zone_db.get_active_zones_by_symbol.return_value = {
+        'AAPL': [_zone(100.0), _zone(120.0)],
+        'MSFT': [_zone(199.0, strength=90)],
+        'NVDA': [_zone(50.0)],
+        'TSLA': [],
+    }
+
+    df = scanner.scan_for_buy_zones(symbols=['AAPL', 'MSFT', 'NVDA', 'TSLA'], min_rating=0)
+
+    scanner.zone_db.get_active_zones_by_symbol.assert_called_once_with(
+        ['AAPL', 'MSFT', 'NVDA', 'TSLA'], zone_type='DEMAND', min_strength=50
+    )
+    quotes.get_last_prices.assert_called_once_with(['AAPL', 'MSFT', 'NVDA'])
+    scanner.zone_db.get_active_zones.assert_not_called()
+
+    assert df['Symbol'].tolist() == ['MSFT', 'AAPL']
+    assert df['Distance from Zone (%)'].tolist() == [0.5, 0.5]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,211 @@
+"""
+Tests for WebSocketServer fan-out
+Covers serialize-once broadcasting, per-client send queues, coalescing, drops and channel metrics
+"""
+
+import pytest
+import os
+import sys
+import json
+import asyncio
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+websockets = pytest.importorskip('websockets')
+
+from src.utils.realtime_websocket_pipeline import (
+    ClientSendQueue,
+    WebSocketServer,
+)
+
+
+class FakeSocket:
+    """Connection that records payloads and can be paused to simulate a slow client"""
+
+    def __init__(self):
+        self.sent = []
+        self.gate = asyncio.Event()
+        self.gate.set()
+        self.remote_address = ('test', 0)
+
+    async def send(self, payload):
+        await self.gate.wait()
+        self.sent.append(json.loads(payload))
+
+
+def _tick(symbol, price):
+    return {'channel': 'prices', 'data': {'symbol': symbol, 'price': price}, 'timestamp': 't'}
+
+
+def _server(clients, channel='prices', **kwargs):
+    server = WebSocketServer(**kwargs)
+    sockets = [FakeSocket() for _ in range(clients)]
+    for client_id, websocket in enumerate(sockets):
+        server.connections[client_id] = websocket
+        server.subscriptions[channel].add(client_id)
+        server._open_send_queue(client_id, websocket)
+    return server, sockets
+
+
+async def _settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def test_queue_coalesces_by_key_and_drops_oldest():
+    sender = ClientSendQueue(maxsize=3)
+
+    assert sender.put('prices', 'a1', ('prices', 'A')) == (False, None)
+    assert sender.put('trades', 't1') == (False, None)
+    assert sender.put('prices', 'a2', ('prices', 'A')) == (True, None)
+    assert sender.put('prices', 'b1', ('prices', 'B')) == (False, None)
+    assert sender.put('trades', 't2') == (False, 'prices')
+
+    assert [entry[1] for entry in sender.pending] == ['t1', 'b1', 't2']
+    assert sender.put('prices', 'a3', ('prices', 'A')) == (False, 'trades')
+    assert list(sender.keyed) == [('prices', 'B'), ('prices', 'A')]
+
+
+def test_broadcast_serializes_once_and_slow_client_does_not_stall_others():
+    async def scenario():
+        server, sockets = _server(20)
+        sockets[0].gate.clear()
+        await _settle()
+
+        with patch('src.utils.realtime_websocket_pipeline.json.dumps', wraps=json.dumps) as dumps:
+            for price in range(5):
+                await server._broadcast_to_channel('trades', {'channel': 'trades', 'data': {'id': price}})
+            await server._broadcast_to_channel('prices', _tick('AAPL', 1.0))
+        await _settle()
+
+        assert dumps.call_count == 6
+        assert all(len(websocket.sent) == 1 for websocket in sockets[1:])
+        # The tick is in flight to the stalled client; nothing else waits on it
+        assert sockets[0].sent == [] and len(server.send_queues[0]) == 0
+
+        sockets[0].gate.set()
+        await _settle()
+        assert sockets[0].sent == [_tick('AAPL', 1.0)]
+
+        for client_id in list(server.connections):
+            server._remove_client(client_id)
+        return server.get_stats()
+
+    stats = asyncio.run(scenario())
+    prices = stats['channels']['prices']
+    assert (prices['published'], prices['delivered'], prices['dropped']) == (1, 20, 0)
+    assert prices['latency_ms_max'] >= prices['latency_ms_p95'] >= 0
+    assert stats['messages_sent'] == 20 and stats['messages_queued'] == 0
+
+
+def test_slow_client_gets_latest_tick_per_symbol():
+    async def scenario():
+        server, (slow, fast) = _server(2, send_queue_size=4)
+        slow.gate.clear()
+        await _settle()
+
+        for price in range(50):
+            await server._broadcast_to_channel('prices', _tick('AAPL', price))
+            await asyncio.sleep(0)
+            await server._broadcast_to_channel('prices', _tick('MSFT', price))
+            await asyncio.sleep(0)
+        await _settle()
+        slow.gate.set()
+        await _settle()
+        return server, slow, fast
+
+    server, slow, fast = asyncio.run(scenario())
+
+    assert len(fast.sent) == 100
+    # The first tick was already in flight when the client stalled
+    assert [m['data'] for m in slow.sent] == [
+        {'symbol': 'AAPL', 'price': 0}, {'symbol': 'MSFT', 'price': 49}, {'symbol': 'AAPL', 'price': 49}]
+    assert server.get_stats()['channels']['prices']['coalesced'] == 97
+
+
+def test_full_queue_drops_oldest_and_counts_per_channel():
+    async def scenario():
+        server, (slow,) = _server(1, channel='trades', send_queue_size=3)
+        slow.gate.clear()
+        await _settle()
+
+        for i in range(10):
+            await server._broadcast_to_channel('trades', {'channel': 'trades', 'data': {'id': i}})
+            await asyncio.sleep(0)
+        await _settle()
+        slow.gate.set()
+        await _settle()
+        return server, slow
+
+    server, slow = asyncio.run(scenario())
+
+    assert [m['data']['id'] for m in slow.sent] == [0, 7, 8, 9]
+    stats = server.get_stats()
+    assert stats['messages_dropped'] == 6 and stats['channels']['trades']['dropped'] == 6
+
+
+def test_subscribe_replays_coalesced_buffer_then_confirms():
+    async def scenario():
+        server, _ = _server(0)
+        for price in range(3):
+            await server._broadcast_to_channel('prices', _tick('AAPL', price))
+
+        websocket = FakeSocket()
+        server.connections[7] = websocket
+        server._open_send_queue(7, websocket)
+        await server._subscribe_client(7, 'prices', websocket)
+        await _settle()
+        return websocket
+
+    websocket = asyncio.run(scenario())
+
+    assert websocket.sent == [_tick('AAPL', 2), {'action': 'subscribed', 'channel': 'prices'}]
+
+
+def test_closed_connection_is_removed():
+    class ClosedSocket(FakeSocket):
+        async def send(self, payload):
+            raise websockets.exceptions.ConnectionClosed(None, None)
+
+    async def scenario():
+        server = WebSocketServer()
+        server.connections[1] = ClosedSocket()
+        server.subscriptions['prices'].add(1)
+        server._open_send_queue(1, server.connections[1])
+
+        await server._broadcast_to_channel('prices', _tick('AAPL', 1.0))
+        await _settle()
+        return server
+
+    server = asyncio.run(scenario())
+
+    assert 1 not in server.connections and 1 not in server.send_queues
+    assert server.subscriptions['prices'] == set()
+
+
+def test_fast_clients_receive_every_tick_while_slow_clients_stall():
+    async def scenario():
+        server, sockets = _server(50)
+        for websocket in sockets[:2]:
+            websocket.gate.clear()
+        await _settle()
+
+        for price in range(20):
+            await server._broadcast_to_channel('prices', _tick(f'SYM{price % 10}', price))
+            await asyncio.sleep(0)
+        await _settle()
+        delivered = [len(websocket.sent) for websocket in sockets]
+
+        for client_id in list(server.connections):
+            server._remove_client(client_id)
+        return delivered, server.get_stats()
+
+    delivered, stats = asyncio.run(scenario())
+
+    assert delivered[:2] == [0, 0] and set(delivered[2:]) == {20}
+    assert stats['channels']['prices']['published'] == 20
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
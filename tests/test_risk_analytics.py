@@ -0,0 +1,116 @@
+"""
+Tests for the matrix-based RiskAnalytics Monte Carlo engine
+Covers seeding, return distributions and per-path drawdown/ruin statistics
+"""
+
+import pytest
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.ava.systems.risk_analytics import RiskAnalytics
+
+
+@pytest.fixture
+def analytics():
+    return RiskAnalytics()
+
+
+def test_seeded_runs_are_reproducible(analytics):
+    first = analytics.monte_carlo_simulation(10000, num_simulations=2000, seed=42)
+    second = analytics.monte_carlo_simulation(10000, num_simulations=2000, seed=42)
+    third = analytics.monte_carlo_simulation(10000, num_simulations=2000,
+                                             rng=np.random.default_rng(42))
+
+    assert first == second
+    assert first['mean_value'] == third['mean_value']
+    assert first['mean_value'] != analytics.monte_carlo_simulation(10000, num_simulations=2000, seed=7)['mean_value']
+
+
+def test_path_statistics_match_per_path_reference(analytics):
+    rng = np.random.default_rng(3)
+    returns = rng.normal(0.0, 0.04, size=(60, 25))
+
+    finals, drawdowns, ruin_days = analytics._simulate_paths(returns.copy(), 1000.0, ruin_threshold=0.2)
+
+    for path in range(returns.shape[1]):
+        values = [1000.0]
+        for r in returns[:, path]:
+            values.append(values[-1] * (1 + r))
+        values = np.array(values)
+
+        assert finals[path] == pytest.approx(values[-1])
+        assert drawdowns[path] == pytest.approx(analytics.calculate_max_drawdown(values)['max_drawdown_pct'])
+
+        hits = np.flatnonzero(values[1:] <= 800.0)
+        if len(hits):
+            assert ruin_days[path] == hits[0] + 1
+        else:
+            assert np.isnan(ruin_days[path])
+
+    assert np.isfinite(ruin_days).any() and np.isnan(ruin_days).any()
+
+
+def test_chunking_bounds_matrix_size(analytics):
+    result = analytics.monte_carlo_simulation(
+        10000, num_simulations=1001, days=30, seed=1, chunk_size=100, include_paths=True
+    )
+
+    assert result['paths']['final_values'].shape == (1001,)
+    assert np.all(np.isfinite(result['paths']['final_values']))
+    assert np.all(result['paths']['max_drawdown_pct'] <= 0)
+
+
+def test_normal_mean_matches_drift(analytics):
+    result = analytics.monte_carlo_simulation(
+        10000, annual_return=0.12, annual_volatility=0.2, num_simulations=20000, seed=5
+    )
+
+    expected = 10000 * (1 + 0.12 / 252) ** 252
+    assert result['mean_value'] == pytest.approx(expected, rel=0.01)
+    assert result['percentile_5'] < result['median_value'] < result['percentile_95']
+
+
+def test_student_t_keeps_volatility_with_fatter_tails(analytics):
+    rng = np.random.default_rng(9)
+    daily_vol = 0.2 / np.sqrt(252)
+
+    normal = analytics._draw_daily_returns(rng, 20000, 10, 'normal', 0.0, daily_vol, 4.0, None)
+    fat = analytics._draw_daily_returns(rng, 20000, 10, 'student_t', 0.0, daily_vol, 4.0, None)
+
+    assert fat.std() == pytest.approx(daily_vol, rel=0.05)
+    assert np.abs(fat).max() > np.abs(normal).max()
+
+
+def test_bootstrap_resamples_history(analytics):
+    result = analytics.monte_carlo_simulation(
+        1000, days=10, num_simulations=500, distribution='bootstrap',
+        historical_returns=[0.01], seed=2
+    )
+
+    assert result['min_value'] == pytest.approx(1000 * 1.01 ** 10)
+    assert result['max_drawdown']['worst_pct'] == 0
+    assert result['ruin']['probability'] == 0 and result['ruin']['median_days'] is None
+
+
+def test_total_loss_and_invalid_arguments(analytics):
+    crash = analytics.monte_carlo_simulation(
+        1000, days=5, num_simulations=10, distribution='bootstrap',
+        historical_returns=[-1.5], seed=0
+    )
+    assert crash['max_value'] == 0
+    assert crash['ruin']['probability'] == 100 and crash['ruin']['median_days'] == 1
+
+    with pytest.raises(ValueError):
+        analytics.monte_carlo_simulation(1000, distribution='cauchy')
+    with pytest.raises(ValueError):
+        analytics.monte_carlo_simulation(1000, distribution='bootstrap')
+    with pytest.raises(ValueError):
+        analytics.monte_carlo_simulation(1000, distribution='student_t', degrees_of_freedom=2)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,161 @@
+"""
+Tests for the incremental signal indexer
+Covers high-water marks, batched server-side reads and parallel embedding with ordered upserts
+"""
+
+import pytest
+import os
+import sys
+import json
+import time
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.signal_indexer import IncrementalSignalIndexer, signal_metadata
+
+
+def _signal(signal_id, outcome=None, updated_at=None, pnl_percent=None):
+    return {
+        'id': signal_id, 'primary_ticker': 'AAPL', 'setup_type': None, 'sentiment': 'bullish',
+        'entry': 190, 'target': 200, 'stop_loss': 185, 'option_strike': None, 'option_type': None,
+        'content': f'signal {signal_id}', 'author': 'trader', 'timestamp': datetime(2025, 11, 1),
+        'outcome': outcome, 'pnl_percent': pnl_percent, 'pnl_dollars': None,
+        'outcome_updated_at': updated_at,
+    }
+
+
+class FakeDatabase:
+    """Connection whose named cursor filters rows like CHANGED_SIGNALS_QUERY"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.cursors = []
+
+    def __call__(self):
+        conn = MagicMock()
+        conn.cursor.side_effect = self._cursor
+        return conn
+
+    def _cursor(self, name=None, cursor_factory=None):
+        cur = MagicMock()
+        cur.name = name
+        self.cursors.append(cur)
+
+        def execute(query, params):
+            cur.pending = [
+                row for row in sorted(self.rows, key=lambda r: r['id'])
+                if row['id'] > params['last_signal_id']
+                or (row['outcome_updated_at'] and row['outcome_updated_at'] > params['last_outcome_update'])
+            ]
+
+        def fetchmany(size):
+            batch, cur.pending = cur.pending[:size], cur.pending[size:]
+            return batch
+
+        cur.execute.side_effect = execute
+        cur.fetchmany.side_effect = fetchmany
+        return cur
+
+
+def _indexer(db, tmp_path, **kwargs):
+    collection = MagicMock()
+    indexer = IncrementalSignalIndexer(
+        collection=collection,
+        get_connection=db,
+        to_document=lambda signal: signal['content'],
+        state_path=str(tmp_path / 'state.json'),
+        **kwargs
+    )
+    return indexer, collection
+
+
+def _upserted_ids(collection):
+    return [id_ for call in collection.upsert.call_args_list for id_ in call.kwargs['ids']]
+
+
+def test_first_run_upserts_everything_in_fixed_batches(tmp_path):
+    db = FakeDatabase([_signal(i) for i in range(1, 8)])
+    indexer, collection = _indexer(db, tmp_path, batch_size=3)
+
+    result = indexer.run()
+
+    assert result['indexed'] == 7 and result['batches'] == 3
+    assert [len(call.kwargs['ids']) for call in collection.upsert.call_args_list] == [3, 3, 1]
+    assert _upserted_ids(collection) == [f'signal_{i}' for i in range(1, 8)]
+    assert db.cursors[0].name is not None and db.cursors[0].itersize == 3
+    assert json.load(open(tmp_path / 'state.json'))['last_signal_id'] == 7
+
+
+def test_second_run_picks_up_only_new_and_changed_signals(tmp_path):
+    rows = [_signal(i) for i in range(1, 6)]
+    db = FakeDatabase(rows)
+    indexer, collection = _indexer(db, tmp_path, batch_size=2)
+    indexer.run()
+    collection.reset_mock()
+
+    assert indexer.run()['indexed'] == 0
+    collection.upsert.assert_not_called()
+
+    rows[1].update(outcome='win', pnl_percent=12.5, outcome_updated_at=datetime(2025, 11, 20, tzinfo=timezone.utc))
+    rows.append(_signal(6))
+    result = indexer.run()
+
+    assert _upserted_ids(collection) == ['signal_2', 'signal_6']
+    metadata = collection.upsert.call_args_list[0].kwargs['metadatas'][0]
+    assert metadata['outcome'] == 'win' and metadata['pnl_percent'] == 12.5
+    assert result['last_outcome_update'] == '2025-11-20T00:00:00+00:00'
+
+    collection.reset_mock()
+    assert indexer.run()['indexed'] == 0
+
+
+def test_reset_reindexes_everything(tmp_path):
+    db = FakeDatabase([_signal(i) for i in range(1, 4)])
+    indexer, collection = _indexer(db, tmp_path)
+    indexer.run()
+
+    indexer.reset()
+    assert indexer.run()['indexed'] == 3
+
+
+def test_parallel_embedding_keeps_upsert_order(tmp_path):
+    def embed(documents):
+        # Earlier batches finish last
+        time.sleep(0.05 / int(documents[0].split()[-1]))
+        return [[float(doc.split()[-1])] * 2 for doc in documents]
+
+    db = FakeDatabase([_signal(i) for i in range(1, 11)])
+    indexer, collection = _indexer(db, tmp_path, embed=embed, batch_size=2, max_workers=3)
+
+    indexer.run()
+
+    assert _upserted_ids(collection) == [f'signal_{i}' for i in range(1, 11)]
+    embeddings = [e for call in collection.upsert.call_args_list for e in call.kwargs['embeddings']]
+    assert embeddings == [[float(i)] * 2 for i in range(1, 11)]
+
+
+def test_failed_batch_keeps_watermark_at_last_good_batch(tmp_path):
+    db = FakeDatabase([_signal(i) for i in range(1, 7)])
+    indexer, collection = _indexer(db, tmp_path, batch_size=2, max_workers=1)
+    collection.upsert.side_effect = [None, RuntimeError('chroma down'), None, None]
+
+    with pytest.raises(RuntimeError):
+        indexer.run()
+    assert indexer.load_state()['last_signal_id'] == 2
+
+    collection.upsert.side_effect = None
+    collection.reset_mock()
+    indexer.run()
+    assert _upserted_ids(collection) == ['signal_3', 'signal_4', 'signal_5', 'signal_6']
+
+
+def test_signal_metadata_defaults():
+    metadata = signal_metadata(_signal(1))
+    assert metadata['setup_type'] == 'general' and metadata['outcome'] == 'pending'
+    assert 'pnl_percent' not in metadata
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,430 @@
+"""
+Tests for the array-backed Smart Money Concepts detectors
+Verifies every detector matches the original bar-by-bar implementation
+"""
+
+import pytest
+import os
+import sys
+import logging
+from typing import List, Dict, Tuple
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.smart_money_indicators import SmartMoneyIndicators
+from fixtures import make_synthetic_ohlcv
+
+logger = logging.getLogger(__name__)
+
+
+def detect_order_blocks_rowwise(smc: SmartMoneyIndicators, df: pd.DataFrame) -> List[Dict]:
+    """Original per-bar order block scan"""
+    order_blocks = []
+
+    for i in range(2, len(df) - 1):
+        # Bullish Order Block
+        if (df['close'].iloc[i] < df['open'].iloc[i] and  # Red candle
+            df['close'].iloc[i+1] > df['open'].iloc[i+1] and  # Next is green
+            df['close'].iloc[i+1] > df['high'].iloc[i]):  # Breaks previous high
+
+            strength = _calculate_ob_strength(df, i, 'BULLISH')
+
+            order_blocks.append({
+                'type': 'BULLISH_OB',
+                'top': float(df['high'].iloc[i]),
+                'bottom': float(df['low'].iloc[i]),
+                'midpoint': float((df['high'].iloc[i] + df['low'].iloc[i]) / 2),
+                'index': int(i),
+                'timestamp': df.index[i] if hasattr(df.index[i], 'strftime') else None,
+                'strength': strength,
+                'volume': int(df['volume'].iloc[i]),
+                'mitigated': False
+            })
+
+        # Bearish Order Block
+        elif (df['close'].iloc[i] > df['open'].iloc[i] and  # Green candle
+              df['close'].iloc[i+1] < df['open'].iloc[i+1] and  # Next is red
+              df['close'].iloc[i+1] < df['low'].iloc[i]):  # Breaks previous low
+
+            strength = _calculate_ob_strength(df, i, 'BEARISH')
+
+            order_blocks.append({
+                'type': 'BEARISH_OB',
+                'top': float(df['high'].iloc[i]),
+                'bottom': float(df['low'].iloc[i]),
+                'midpoint': float((df['high'].iloc[i] + df['low'].iloc[i]) / 2),
+                'index': int(i),
+                'timestamp': df.index[i] if hasattr(df.index[i], 'strftime') else None,
+                'strength': strength,
+                'volume': int(df['volume'].iloc[i]),
+                'mitigated': False
+            })
+
+    logger.info(f"Detected {len(order_blocks)} order blocks")
+    return order_blocks
+
+
+def _calculate_ob_strength(df: pd.DataFrame, index: int, ob_type: str) -> int:
+    """Calculate order block strength (0-100)"""
+    strength = 50  # Base score
+
+    # Volume factor
+    avg_volume = df['volume'].iloc[max(0, index-20):index].mean()
+    if avg_volume > 0:
+        volume_ratio = df['volume'].iloc[index] / avg_volume
+        strength += min(25, volume_ratio * 10)
+
+    # Impulse strength
+    if ob_type == 'BULLISH':
+        impulse = (df['close'].iloc[index+1] - df['low'].iloc[index]) / df['low'].iloc[index]
+    else:
+        impulse = (df['high'].iloc[index] - df['close'].iloc[index+1]) / df['high'].iloc[index]
+
+    strength += min(25, impulse * 1000)
+
+    return min(100, int(strength))
+
+
+def detect_fair_value_gaps_rowwise(smc: SmartMoneyIndicators, df: pd.DataFrame) -> List[Dict]:
+    """Original per-bar FVG scan"""
+    fvgs = []
+
+    for i in range(len(df) - 2):
+        # Bullish FVG (gap up)
+        if df['low'].iloc[i+2] > df['high'].iloc[i]:
+            gap_size = df['low'].iloc[i+2] - df['high'].iloc[i]
+            gap_pct = (gap_size / df['close'].iloc[i]) * 100
+
+            if gap_pct >= smc.min_fvg_pct:
+                fvgs.append({
+                    'type': 'BULLISH_FVG',
+                    'top': float(df['low'].iloc[i+2]),
+                    'bottom': float(df['high'].iloc[i]),
+                    'midpoint': float((df['low'].iloc[i+2] + df['high'].iloc[i]) / 2),
+                    'index': int(i),
+                    'timestamp': df.index[i] if hasattr(df.index[i], 'strftime') else None,
+                    'gap_size': float(gap_size),
+                    'gap_pct': float(gap_pct),
+                    'filled': False,
+                    'fill_percentage': 0.0
+                })
+
+        # Bearish FVG (gap down)
+        elif df['high'].iloc[i+2] < df['low'].iloc[i]:
+            gap_size = df['low'].iloc[i] - df['high'].iloc[i+2]
+            gap_pct = (gap_size / df['close'].iloc[i]) * 100
+
+            if gap_pct >= smc.min_fvg_pct:
+                fvgs.append({
+                    'type': 'BEARISH_FVG',
+                    'top': float(df['low'].iloc[i]),
+                    'bottom': float(df['high'].iloc[i+2]),
+                    'midpoint': float((df['low'].iloc[i] + df['high'].iloc[i+2]) / 2),
+                    'index': int(i),
+                    'timestamp': df.index[i] if hasattr(df.index[i], 'strftime') else None,
+                    'gap_size': float(gap_size),
+                    'gap_pct': float(gap_pct),
+                    'filled': False,
+                    'fill_percentage': 0.0
+                })
+
+    # Check which FVGs have been filled
+    for fvg in fvgs:
+        fvg['filled'], fvg['fill_percentage'] = _check_fvg_filled(df, fvg)
+
+    logger.info(f"Detected {len(fvgs)} fair value gaps")
+    return fvgs
+
+
+def _check_fvg_filled(df: pd.DataFrame, fvg: Dict) -> Tuple[bool, float]:
+    """Check if FVG has been filled by subsequent price action"""
+    start_idx = fvg['index'] + 3
+
+    if start_idx >= len(df):
+        return False, 0.0
+
+    subsequent_prices = df.iloc[start_idx:]
+    gap_size = fvg['top'] - fvg['bottom']
+
+    if fvg['type'] == 'BULLISH_FVG':
+        # Check if price came back down into gap
+        lowest_reentry = subsequent_prices['low'].min()
+        if lowest_reentry <= fvg['top']:
+            fill_amount = fvg['top'] - max(lowest_reentry, fvg['bottom'])
+            fill_pct = (fill_amount / gap_size) * 100
+            return fill_pct >= 50, fill_pct
+    else:  # BEARISH_FVG
+        # Check if price came back up into gap
+        highest_reentry = subsequent_prices['high'].max()
+        if highest_reentry >= fvg['bottom']:
+            fill_amount = min(highest_reentry, fvg['top']) - fvg['bottom']
+            fill_pct = (fill_amount / gap_size) * 100
+            return fill_pct >= 50, fill_pct
+
+    return False, 0.0
+
+
+def detect_market_structure_rowwise(smc: SmartMoneyIndicators, df: pd.DataFrame) -> Dict:
+    """Original per-bar structure scan"""
+    swing_highs = find_swing_highs_rowwise(smc, df)
+    swing_lows = find_swing_lows_rowwise(smc, df)
+
+    if len(swing_highs) < 3 or len(swing_lows) < 3:
+        return {'bos': [], 'choch': [], 'current_trend': 'NEUTRAL'}
+
+    structure_breaks = []
+    current_trend = smc._determine_trend(df, swing_highs, swing_lows)
+
+    for i in range(len(df)):
+        if i < smc.swing_window:
+            continue
+
+        current_price = df['close'].iloc[i]
+
+        if current_trend == 'BULLISH':
+            # Look for BOS (break above previous high)
+            recent_highs = [h['price'] for h in swing_highs if h['index'] < i]
+            if recent_highs and current_price > max(recent_highs[-3:]):
+                structure_breaks.append({
+                    'type': 'BOS',
+                    'direction': 'BULLISH',
+                    'price': float(current_price),
+                    'index': int(i),
+                    'timestamp': df.index[i] if hasattr(df.index[i], 'strftime') else None
+                })
+
+            # Look for CHoCH (break below recent low = reversal)
+            recent_lows = [l['price'] for l in swing_lows if l['index'] < i]
+            if recent_lows and current_price < min(recent_lows[-3:]):
+                structure_breaks.append({
+                    'type': 'CHOCH',
+                    'direction': 'BEARISH',
+                    'price': float(current_price),
+                    'index': int(i),
+                    'timestamp': df.index[i] if hasattr(df.index[i], 'strftime') else None
+                })
+                current_trend = 'BEARISH'
+
+        elif current_trend == 'BEARISH':
+            # Look for BOS (break below previous low)
+            recent_lows = [l['price'] for l in swing_lows if l['index'] < i]
+            if recent_lows and current_price < min(recent_lows[-3:]):
+                structure_breaks.append({
+                    'type': 'BOS',
+                    'direction': 'BEARISH',
+                    'price': float(current_price),
+                    'index': int(i),
+                    'timestamp': df.index[i] if hasattr(df.index[i], 'strftime') else None
+                })
+
+            # Look for CHoCH (break above recent high = reversal)
+            recent_highs = [h['price'] for h in swing_highs if h['index'] < i]
+            if recent_highs and current_price > max(recent_highs[-3:]):
+                structure_breaks.append({
+                    'type': 'CHOCH',
+                    'direction': 'BULLISH',
+                    'price': float(current_price),
+                    'index': int(i),
+                    'timestamp': df.index[i] if hasattr(df.index[i], 'strftime') else None
+                })
+                current_trend = 'BULLISH'
+
+    logger.info(f"Detected {len(structure_breaks)} structure breaks")
+
+    return {
+        'bos': [s for s in structure_breaks if s['type'] == 'BOS'],
+        'choch': [s for s in structure_breaks if s['type'] == 'CHOCH'],
+        'current_trend': current_trend,
+        'swing_highs': swing_highs,
+        'swing_lows': swing_lows
+    }
+
+
+def detect_liquidity_pools_rowwise(smc: SmartMoneyIndicators, df: pd.DataFrame) -> List[Dict]:
+    """Original per-pool liquidity scan"""
+    swing_highs = find_swing_highs_rowwise(smc, df)
+    swing_lows = find_swing_lows_rowwise(smc, df)
+
+    liquidity_pools = []
+
+    # Buy-side liquidity (above highs)
+    for high in swing_highs:
+        # Check if multiple highs cluster nearby (within 2%)
+        nearby_highs = [h for h in swing_highs
+                       if abs(h['price'] - high['price']) / high['price'] < 0.02]
+
+        if len(nearby_highs) >= smc.min_liquidity_touches:
+            liquidity_pools.append({
+                'type': 'BUY_SIDE_LIQUIDITY',
+                'price': float(high['price']),
+                'touches': len(nearby_highs),
+                'strength': len(nearby_highs) * 10,
+                'swept': False,
+                'indices': [h['index'] for h in nearby_highs]
+            })
+
+    # Sell-side liquidity (below lows)
+    for low in swing_lows:
+        nearby_lows = [l for l in swing_lows
+                      if abs(l['price'] - low['price']) / low['price'] < 0.02]
+
+        if len(nearby_lows) >= smc.min_liquidity_touches:
+            liquidity_pools.append({
+                'type': 'SELL_SIDE_LIQUIDITY',
+                'price': float(low['price']),
+                'touches': len(nearby_lows),
+                'strength': len(nearby_lows) * 10,
+                'swept': False,
+                'indices': [l['index'] for l in nearby_lows]
+            })
+
+    # Check which pools have been swept
+    for pool in liquidity_pools:
+        pool['swept'] = _check_liquidity_swept(df, pool)
+
+    logger.info(f"Detected {len(liquidity_pools)} liquidity pools")
+    return liquidity_pools
+
+
+def _check_liquidity_swept(df: pd.DataFrame, pool: Dict) -> bool:
+    """Check if liquidity has been swept"""
+    max_index = max(pool['indices'])
+    if max_index >= len(df) - 1:
+        return False
+
+    subsequent_prices = df.iloc[max_index + 1:]
+
+    if pool['type'] == 'BUY_SIDE_LIQUIDITY':
+        # Check if price swept above
+        return subsequent_prices['high'].max() > pool['price'] * 1.001
+    else:
+        # Check if price swept below
+        return subsequent_prices['low'].min() < pool['price'] * 0.999
+
+
+def find_swing_highs_rowwise(smc: SmartMoneyIndicators, df: pd.DataFrame) -> List[Dict]:
+    """Original nested-loop swing high scan"""
+    swing_highs = []
+
+    for i in range(smc.swing_window, len(df) - smc.swing_window):
+        is_swing_high = True
+
+        # Check if highest in window
+        for j in range(i - smc.swing_window, i + smc.swing_window + 1):
+            if j != i and df['high'].iloc[j] >= df['high'].iloc[i]:
+                is_swing_high = False
+                break
+
+        if is_swing_high:
+            swing_highs.append({
+                'price': float(df['high'].iloc[i]),
+                'index': int(i),
+                'timestamp': df.index[i] if hasattr(df.index[i], 'strftime') else None
+            })
+
+    return swing_highs
+
+
+def find_swing_lows_rowwise(smc: SmartMoneyIndicators, df: pd.DataFrame) -> List[Dict]:
+    """Original nested-loop swing low scan"""
+    swing_lows = []
+
+    for i in range(smc.swing_window, len(df) - smc.swing_window):
+        is_swing_low = True
+
+        # Check if lowest in window
+        for j in range(i - smc.swing_window, i + smc.swing_window + 1):
+            if j != i and df['low'].iloc[j] <= df['low'].iloc[i]:
+                is_swing_low = False
+                break
+
+        if is_swing_low:
+            swing_lows.append({
+                'price': float(df['low'].iloc[i]),
+                'index': int(i),
+                'timestamp': df.index[i] if hasattr(df.index[i], 'strftime') else None
+            })
+
+    return swing_lows
+
+
+def get_all_smc_indicators_rowwise(smc: SmartMoneyIndicators, df: pd.DataFrame) -> Dict:
+    """Row-by-row counterpart of SmartMoneyIndicators.get_all_smc_indicators"""
+    return {
+        'order_blocks': detect_order_blocks_rowwise(smc, df),
+        'fair_value_gaps': detect_fair_value_gaps_rowwise(smc, df),
+        'market_structure': detect_market_structure_rowwise(smc, df),
+        'liquidity_pools': detect_liquidity_pools_rowwise(smc, df)
+    }
+
+PARAMS = [
+    dict(),
+    dict(swing_window=3, min_fvg_pct=0.02, min_liquidity_touches=3),
+    dict(swing_window=8, min_fvg_pct=0.0, min_liquidity_touches=2),
+]
+
+
+@pytest.mark.parametrize('params', PARAMS)
+@pytest.mark.parametrize('seed', [1, 13])
+def test_all_indicators_match_rowwise(params, seed):
+    smc = SmartMoneyIndicators(**params)
+    df = make_synthetic_ohlcv(1500, seed=seed)
+
+    expected = get_all_smc_indicators_rowwise(smc, df)
+    actual = smc.get_all_smc_indicators(df)
+
+    assert actual == expected
+    assert expected['order_blocks'] and expected['fair_value_gaps'] and expected['liquidity_pools']
+    assert any(f['filled'] for f in expected['fair_value_gaps'])
+
+
+def test_structure_breaks_match_rowwise():
+    smc = SmartMoneyIndicators()
+    df = make_synthetic_ohlcv(1500, seed=13)
+
+    structure = smc.detect_market_structure(df)
+
+    assert structure == detect_market_structure_rowwise(smc, df)
+    assert structure['bos'] and structure['choch']
+
+
+def test_public_detectors_match_rowwise():
+    smc = SmartMoneyIndicators(swing_window=4, min_fvg_pct=0.05)
+    df = make_synthetic_ohlcv(800, seed=5).reset_index(drop=True)
+
+    assert smc.detect_order_blocks(df) == detect_order_blocks_rowwise(smc, df)
+    assert smc.detect_fair_value_gaps(df) == detect_fair_value_gaps_rowwise(smc, df)
+    assert smc.detect_market_structure(df) == detect_market_structure_rowwise(smc, df)
+    assert smc.detect_liquidity_pools(df) == detect_liquidity_pools_rowwise(smc, df)
+    assert smc._find_swing_highs(df) == find_swing_highs_rowwise(smc, df)
+    assert smc._find_swing_lows(df) == find_swing_lows_rowwise(smc, df)
+    assert smc.detect_order_blocks(df)[0]['timestamp'] is None
+
+
+@pytest.mark.parametrize('n_bars', [0, 2, 3, 4, 11, 12])
+def test_short_frames_match_rowwise(n_bars):
+    smc = SmartMoneyIndicators()
+    df = make_synthetic_ohlcv(n_bars, seed=3)
+
+    assert smc.get_all_smc_indicators(df) == get_all_smc_indicators_rowwise(smc, df)
+
+
+def test_batch_matches_single_symbol_runs():
+    smc = SmartMoneyIndicators()
+    frames = {
+        'AAPL': make_synthetic_ohlcv(600, seed=10, start_price=190.0),
+        'MSFT': make_synthetic_ohlcv(400, seed=11, start_price=410.0),
+        'TINY': make_synthetic_ohlcv(5, seed=12),
+    }
+
+    results = smc.analyze_batch(frames)
+
+    assert list(results) == list(frames)
+    for symbol, df in frames.items():
+        assert results[symbol] == get_all_smc_indicators_rowwise(smc, df)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,229 @@
+"""
+Tests for the histogram-based volume profile engine
+Covers the analyzer and calculator against their original loops and the
+sliding-window profiles against per-window recomputation
+"""
+
+import pytest
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.volume_profile_analyzer import VolumeProfileAnalyzer, overlap_bin_ranges, volume_histogram
+from src.advanced_technical_indicators import VolumeProfileCalculator
+from fixtures import make_synthetic_ohlcv
+
+
+@pytest.fixture
+def bars():
+    return make_synthetic_ohlcv(400, seed=21)
+
+
+def _assert_profiles_equal(actual, expected):
+    assert actual.keys() == expected.keys()
+    for key in ('poc', 'vah', 'val', 'price_bins', 'bin_size'):
+        assert actual[key] == expected[key]
+    for key in ('poc_volume', 'value_area_volume', 'total_volume'):
+        assert actual[key] == pytest.approx(expected[key])
+    assert sorted(actual['volume_by_price']) == sorted(expected['volume_by_price'])
+    for price, volume in expected['volume_by_price'].items():
+        assert actual['volume_by_price'][price] == pytest.approx(volume)
+
+
+def _analyzer_rowwise(vpa, df):
+    """Original candle x bin overlap loop of VolumeProfileAnalyzer"""
+    if len(df) == 0:
+        return vpa._empty_profile()
+
+    # Create price bins
+    price_min = df['low'].min()
+    price_max = df['high'].max()
+    price_range = price_max - price_min
+
+    if price_range == 0:
+        return vpa._empty_profile()
+
+    bin_size = price_range / vpa.price_bins
+
+    # Allocate volume to price bins
+    volume_by_price = {}
+
+    for i in range(len(df)):
+        candle_low = df['low'].iloc[i]
+        candle_high = df['high'].iloc[i]
+        candle_volume = df['volume'].iloc[i]
+
+        # Find which bins this candle touches
+        bins_touched = []
+        for bin_num in range(vpa.price_bins):
+            bin_bottom = price_min + (bin_num * bin_size)
+            bin_top = bin_bottom + bin_size
+
+            # Check if candle overlaps this bin
+            if candle_high >= bin_bottom and candle_low <= bin_top:
+                bins_touched.append(bin_num)
+
+        # Distribute volume evenly across touched bins
+        if bins_touched:
+            volume_per_bin = candle_volume / len(bins_touched)
+            for bin_num in bins_touched:
+                bin_price = price_min + (bin_num * bin_size) + (bin_size / 2)
+                volume_by_price[bin_price] = volume_by_price.get(bin_price, 0) + volume_per_bin
+
+    if not volume_by_price:
+        return vpa._empty_profile()
+
+    # Find POC (highest volume)
+    poc_price = max(volume_by_price, key=volume_by_price.get)
+    poc_volume = volume_by_price[poc_price]
+
+    # Calculate Value Area (70% of volume)
+    total_volume = sum(volume_by_price.values())
+    value_area_volume = total_volume * vpa.value_area_pct
+
+    # Start from POC and expand until we have 70% of volume
+    sorted_prices = sorted(volume_by_price.keys(),
+                          key=lambda p: volume_by_price[p],
+                          reverse=True)
+
+    va_volume = 0
+    va_prices = []
+
+    for price in sorted_prices:
+        va_prices.append(price)
+        va_volume += volume_by_price[price]
+        if va_volume >= value_area_volume:
+            break
+
+    vah = max(va_prices)  # Value Area High
+    val = min(va_prices)  # Value Area Low
+
+    return {
+        'poc': float(poc_price),
+        'poc_volume': float(poc_volume),
+        'vah': float(vah),
+        'val': float(val),
+        'value_area_volume': float(va_volume),
+        'total_volume': float(total_volume),
+        'volume_by_price': {float(k): float(v) for k, v in volume_by_price.items()},
+        'price_bins': vpa.price_bins,
+        'bin_size': float(bin_size)
+    }
+
+
+@pytest.mark.parametrize('price_bins', [10, 50, 137])
+def test_analyzer_profile_matches_rowwise(bars, price_bins):
+    vpa = VolumeProfileAnalyzer(price_bins=price_bins)
+
+    _assert_profiles_equal(vpa.calculate_volume_profile(bars), _analyzer_rowwise(vpa, bars))
+    _assert_profiles_equal(vpa.calculate_volume_profile(bars.iloc[:7]),
+                           _analyzer_rowwise(vpa, bars.iloc[:7]))
+
+
+def test_overlap_ranges_include_touching_edges():
+    bottoms = np.array([0.0, 1.0, 2.0, 3.0])
+    first, last = overlap_bin_ranges(np.array([1.0, 0.2, 5.0]), np.array([2.0, 0.4, 6.0]),
+                                     bottoms, bottoms + 1.0)
+
+    assert first.tolist()[:2] == [0, 0] and last.tolist()[:2] == [2, 0]
+    assert first[2] > last[2]
+
+    volumes, touches = volume_histogram(first, last, np.array([30.0, 5.0, 99.0]), 4)
+    np.testing.assert_allclose(volumes, [15.0, 10.0, 10.0, 0.0])
+    assert touches.tolist() == [2, 1, 1, 0]
+
+
+def test_rolling_poc_matches_per_window_profiles_on_fixed_grid(bars):
+    vpa = VolumeProfileAnalyzer(price_bins=30)
+    window = 40
+    rolling = vpa.calculate_rolling_poc(bars, window=window, bin_size=0.25)
+
+    assert rolling.iloc[:window].isna().all().all()
+    lows, highs = bars['low'].to_numpy(), bars['high'].to_numpy()
+    price_min = lows.min()
+    n_bins = int(np.ceil((highs.max() - price_min) / 0.25))
+    bottoms = price_min + np.arange(n_bins) * 0.25
+    first, last = overlap_bin_ranges(lows, highs, bottoms, bottoms + 0.25)
+
+    for i in (window, window + 1, 150, len(bars) - 1):
+        hist, _ = volume_histogram(first[i - window:i], last[i - window:i],
+                                   bars['volume'].to_numpy(dtype=float)[i - window:i], n_bins)
+        assert rolling['total_volume'].iloc[i] == pytest.approx(hist.sum())
+        assert rolling['poc'].iloc[i] == pytest.approx(bottoms[np.argmax(hist)] + 0.125)
+        assert rolling['val'].iloc[i] <= rolling['poc'].iloc[i] <= rolling['vah'].iloc[i]
+
+
+def test_rolling_list_api_unchanged(bars):
+    vpa = VolumeProfileAnalyzer(price_bins=20)
+    profiles = vpa.calculate_rolling_volume_profile(bars.iloc[:80], window=50)
+
+    assert len(profiles) == 30
+    assert profiles[0]['index'] == 50
+    _assert_profiles_equal({k: v for k, v in profiles[-1].items() if k not in ('index', 'timestamp')},
+                           _analyzer_rowwise(vpa, bars.iloc[29:79]))
+
+
+def _calculator_rowwise(calc, df, price_bins=50):
+    levels = np.linspace(df['low'].min(), df['high'].max(), price_bins)
+    volume_at_price = np.zeros(price_bins)
+    for _, row in df.iterrows():
+        volume_at_price[np.argmin(np.abs(levels - row['close']))] += row['volume']
+    return levels, volume_at_price
+
+
+def _expand_rowwise(volume_at_price, poc_idx, target):
+    va_indices = [poc_idx]
+    current = volume_at_price[poc_idx]
+    while current < target:
+        above, below = max(va_indices) + 1, min(va_indices) - 1
+        volume_above = volume_at_price[above] if above < len(volume_at_price) else 0
+        volume_below = volume_at_price[below] if below >= 0 else 0
+        if volume_above > volume_below and above < len(volume_at_price):
+            va_indices.append(above)
+            current += volume_above
+        elif below >= 0:
+            va_indices.append(below)
+            current += volume_below
+        else:
+            break
+    return min(va_indices), max(va_indices)
+
+
+@pytest.mark.parametrize('seed', [21, 22, 23])
+def test_calculator_matches_nearest_level_loop(seed):
+    calc = VolumeProfileCalculator()
+    df = make_synthetic_ohlcv(300, seed=seed)
+    profile = calc.calculate_volume_profile(df)
+    levels, expected = _calculator_rowwise(calc, df)
+    low, high = _expand_rowwise(expected, int(np.argmax(expected)), expected.sum() * 0.7)
+
+    assert profile['volume_at_price'] == expected.tolist()
+    assert profile['poc']['price'] == levels[np.argmax(expected)]
+    assert (profile['val'], profile['vah']) == (levels[low], levels[high])
+
+
+def test_calculator_rolling_profile_matches_full_recompute(bars):
+    calc = VolumeProfileCalculator()
+    window = 60
+    df = bars.iloc[:200]
+    rolling = calc.calculate_rolling_profile(df, window=window, price_bins=40)
+
+    levels = np.linspace(df['low'].min(), df['high'].max(), 40)
+    for i in (window, 120, len(df) - 1):
+        hist = np.zeros(40)
+        for _, row in df.iloc[i - window:i].iterrows():
+            hist[np.argmin(np.abs(levels - row['close']))] += row['volume']
+        poc_idx = np.argmax(hist)
+        low, high = calc._expand_value_area(hist[np.newaxis, :], np.array([poc_idx]),
+                                            np.array([hist.sum() * 0.7]))
+
+        assert rolling['poc'].iloc[i] == levels[poc_idx]
+        assert rolling['val'].iloc[i] == levels[low[0]] and rolling['vah'].iloc[i] == levels[high[0]]
+    assert rolling.iloc[:window].isna().all().all()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
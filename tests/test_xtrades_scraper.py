@@ -55,6 +55,7 @@ def scraper_instance(mock_env_vars):
     """Create scraper instance with mocked driver"""
     with patch('xtrades_scraper.uc.Chrome') as mock_chrome:
         mock_driver_instance = MagicMock()
+        mock_driver_instance.execute_script.return_value = "complete"
         mock_chrome.return_value = mock_driver_instance
 
         scraper = XtradesScraper()
@@ -344,6 +345,44 @@ class TestProfileScraping:
         # Verify execute_script was called
         assert scraper_instance.driver.execute_script.called
 
+    @staticmethod
+    def _fake_feed(scraper, posts, loaded):
+        """Feed where every scroll loads four more posts"""
+        def execute_script(script, *args):
+            if script == XtradesScraper.CONTENT_SIZE_JS:
+                return [loaded[0] * 100, loaded[0]]
+            if script == XtradesScraper.POSTS_HTML_JS:
+                return posts[args[0]:loaded[0]]
+            loaded[0] = min(loaded[0] + 4, len(posts))
+
+        scraper.driver.execute_script.side_effect = execute_script
+
+    def test_scroll_stops_at_known_alert(self, scraper_instance):
+        """Incremental scrolling stops once an already stored alert has loaded"""
+        posts = [f"<app-post><p>alert {i}</p></app-post>" for i in range(20)]
+        loaded = [4]
+        self._fake_feed(scraper_instance, posts, loaded)
+
+        assert scraper_instance._scroll_page(scroll_pause=0.5, known_alerts={'alert 9'}) == 2
+        assert loaded[0] == 12
+
+        loaded[0] = 4
+        assert scraper_instance._scroll_page(scroll_pause=0.5, known_alerts={'alert 1'}) == 0
+        assert loaded[0] == 4
+
+    def test_scroll_waits_for_new_content(self, scraper_instance):
+        """Scrolls return as soon as posts load and end after three scrolls without new posts"""
+        posts = [f"<app-post><p>alert {i}</p></app-post>" for i in range(10)]
+        loaded = [4]
+        self._fake_feed(scraper_instance, posts, loaded)
+
+        started = datetime.now()
+        scrolls = scraper_instance._scroll_page(scroll_pause=0.2)
+        elapsed = (datetime.now() - started).total_seconds()
+
+        assert scrolls == 5 and loaded[0] == 10
+        assert elapsed < 1.5
+
 
 # ============================================================================
 # Integration Tests (require actual browser)
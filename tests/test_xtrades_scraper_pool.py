@@ -0,0 +1,149 @@
+"""
+Tests for the parallel Xtrades scraper pool
+Covers shared cookie sessions, browser reuse, per-profile incremental state and error isolation
+"""
+
+import pytest
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.xtrades_scraper_pool import XtradesScraperPool
+
+
+class FakeBrowsers:
+    """Factory for fake scrapers sharing one cookie jar"""
+
+    def __init__(self, delay=0.05, fail_login=False):
+        self.delay = delay
+        self.fail_login = fail_login
+        self.cookies = None
+        self.oauth_logins = 0
+        self.created = []
+        self.starting = 0
+        self.max_starting = 0
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            self.starting += 1
+            self.max_starting = max(self.max_starting, self.starting)
+        time.sleep(0.01)
+        scraper = FakeScraper(self)
+        self.created.append(scraper)
+        with self.lock:
+            self.starting -= 1
+        return scraper
+
+
+class FakeScraper:
+
+    def __init__(self, browsers):
+        self.browsers = browsers
+        self.alive = True
+        self.closed = False
+        self.calls = []
+
+    def login(self):
+        if self.browsers.fail_login:
+            raise RuntimeError('login failed')
+        if self.browsers.cookies is None:
+            # Only the first browser goes through OAuth and saves cookies
+            self.browsers.oauth_logins += 1
+            self.browsers.cookies = 'session'
+
+    def get_profile_alerts(self, username, max_alerts=None, known_alerts=None):
+        self.calls.append((username, known_alerts))
+        with self.browsers.lock:
+            self.browsers.active += 1
+            self.browsers.max_active = max(self.browsers.max_active, self.browsers.active)
+        try:
+            time.sleep(self.browsers.delay)
+            if username.startswith('crash'):
+                self.alive = False
+                raise RuntimeError('browser crashed')
+            if username.startswith('missing'):
+                raise LookupError(f"Profile '{username}' not found")
+            return [{'ticker': 'AAPL', 'profile_username': username}]
+        finally:
+            with self.browsers.lock:
+                self.browsers.active -= 1
+
+    def is_alive(self):
+        return self.alive
+
+    def close(self):
+        self.closed = True
+
+
+def test_profiles_scraped_in_parallel_with_one_oauth_login():
+    browsers = FakeBrowsers(delay=0.1)
+    pool = XtradesScraperPool(workers=4, scraper_factory=browsers)
+    profiles = [f"trader{i}" for i in range(12)]
+
+    started = time.perf_counter()
+    results = pool.scrape_profiles(profiles)
+    elapsed = time.perf_counter() - started
+
+    assert list(results) == profiles
+    assert all(alerts[0]['profile_username'] == name for name, alerts in results.items())
+    assert len(browsers.created) == 4 and browsers.max_active == 4
+    assert browsers.oauth_logins == 1 and browsers.max_starting == 1
+    assert elapsed < 12 * 0.1
+    assert pool.last_run_stats['alerts'] == 12 and pool.last_run_stats['browsers'] == 4
+
+
+def test_browsers_are_reused_between_cycles_and_closed():
+    browsers = FakeBrowsers(delay=0.01)
+    with XtradesScraperPool(workers=3, scraper_factory=browsers) as pool:
+        pool.scrape_profiles(['a', 'b', 'c'])
+        pool.scrape_profiles(['d', 'e', 'f', 'a'])
+        assert len(browsers.created) == 3
+
+    assert all(scraper.closed for scraper in browsers.created)
+
+
+def test_known_alerts_passed_per_profile():
+    browsers = FakeBrowsers(delay=0)
+    pool = XtradesScraperPool(workers=1, scraper_factory=browsers)
+
+    pool.scrape_profiles(['a', 'b'], known_alerts={'a': {'BTO AAPL'}, 'b': set()})
+    pool.scrape_profiles(['a'])
+
+    assert browsers.created[0].calls == [('a', {'BTO AAPL'}), ('b', set()), ('a', None)]
+
+
+def test_failures_are_returned_in_place_and_dead_browsers_replaced():
+    browsers = FakeBrowsers(delay=0.01)
+    pool = XtradesScraperPool(workers=2, scraper_factory=browsers)
+
+    results = pool.scrape_profiles(['missing1', 'crash1', 'ok1', 'ok2'])
+
+    assert isinstance(results['missing1'], LookupError)
+    assert isinstance(results['crash1'], RuntimeError)
+    assert results['ok1'] and results['ok2']
+    assert pool.last_run_stats['errors'] == 2
+
+    crashed = [scraper for scraper in browsers.created if not scraper.alive]
+    assert len(crashed) == 1 and crashed[0].closed
+    assert len(browsers.created) == 3
+
+
+def test_login_failure_fails_the_cycle_without_retrying_per_profile():
+    browsers = FakeBrowsers(fail_login=True)
+    pool = XtradesScraperPool(workers=3, scraper_factory=browsers)
+
+    results = pool.scrape_profiles([f"trader{i}" for i in range(6)])
+
+    assert all(isinstance(result, RuntimeError) for result in results.values())
+    assert len(browsers.created) == 1 and browsers.created[0].closed
+    assert pool.last_run_stats['browsers'] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
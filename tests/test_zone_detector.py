@@ -0,0 +1,424 @@
+"""
+Tests for prefix-sum zone detection and the universe-wide batch refresh
+Verifies the detector matches the per-swing implementation and the job batches I/O
+"""
+
+import pytest
+import os
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+from scipy.signal import find_peaks
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.zone_detector import ZoneDetector
+from src.zone_database_manager import ZoneDatabaseManager
+from src.zone_batch_detector import ZoneBatchDetector, load_ohlcv_bulk
+from fixtures import make_synthetic_universe
+
+def detect_zones_rowwise(detector: ZoneDetector, df: pd.DataFrame, symbol: str) -> List[Dict]:
+    """Per-swing reference for ZoneDetector.detect_zones, one DataFrame slice per swing"""
+    if len(df) < detector.lookback_periods:
+        return []
+
+    df = df.tail(detector.lookback_periods).copy()
+    df = df.reset_index(drop=True)
+
+    zones = detect_demand_zones_rowwise(detector, df, symbol)
+    zones.extend(detect_supply_zones_rowwise(detector, df, symbol))
+    return detector._filter_overlapping_zones(zones)
+
+
+def detect_demand_zones_rowwise(detector: ZoneDetector, df: pd.DataFrame, symbol: str) -> List[Dict]:
+    """Detect demand zones at swing lows, one DataFrame slice per swing"""
+
+    # Find swing lows using scipy
+    lows = df['low'].values
+    peaks, properties = find_peaks(-lows, distance=detector.swing_strength)
+
+    if len(peaks) == 0:
+        return []
+
+    zones = []
+
+    for peak_idx in peaks:
+        # Skip if too close to edges
+        if peak_idx < detector.swing_strength or peak_idx >= len(df) - detector.swing_strength:
+            continue
+
+        zone = _analyze_demand_zone(detector, df, peak_idx, symbol)
+        if zone:
+            zones.append(zone)
+
+    return zones
+
+
+def detect_supply_zones_rowwise(detector: ZoneDetector, df: pd.DataFrame, symbol: str) -> List[Dict]:
+    """Detect supply zones at swing highs, one DataFrame slice per swing"""
+
+    # Find swing highs using scipy
+    highs = df['high'].values
+    peaks, properties = find_peaks(highs, distance=detector.swing_strength)
+
+    if len(peaks) == 0:
+        return []
+
+    zones = []
+
+    for peak_idx in peaks:
+        # Skip if too close to edges
+        if peak_idx < detector.swing_strength or peak_idx >= len(df) - detector.swing_strength:
+            continue
+
+        zone = _analyze_supply_zone(detector, df, peak_idx, symbol)
+        if zone:
+            zones.append(zone)
+
+    return zones
+
+
+def _analyze_demand_zone(
+    detector: ZoneDetector,
+    df: pd.DataFrame,
+    swing_idx: int,
+    symbol: str
+) -> Optional[Dict]:
+    """
+    Analyze potential demand zone at swing low
+
+    Demand zones form when:
+    1. Price consolidates (tight range)
+    2. Then explodes upward (strong buying)
+    3. Volume on departure > volume on approach
+    """
+
+    # Find consolidation area before swing (approach)
+    consolidation = _find_consolidation(detector, df, swing_idx, direction='before')
+    if not consolidation:
+        return None
+
+    start_idx, end_idx = consolidation
+
+    # Zone boundaries (base of consolidation)
+    zone_bottom = df.loc[start_idx:end_idx, 'low'].min()
+    zone_top = df.loc[start_idx:end_idx, 'high'].max()
+    zone_midpoint = (zone_top + zone_bottom) / 2
+
+    # Validate zone size
+    zone_size_pct = ((zone_top - zone_bottom) / zone_bottom) * 100
+    if zone_size_pct < detector.min_zone_size_pct or zone_size_pct > detector.max_zone_size_pct:
+        return None
+
+    # Calculate volume metrics
+    approach_volume = df.loc[start_idx:end_idx, 'volume'].sum()
+
+    # Find departure (impulse move up)
+    departure_end = min(end_idx + 10, len(df) - 1)
+    departure_volume = df.loc[end_idx:departure_end, 'volume'].sum()
+
+    volume_ratio = departure_volume / approach_volume if approach_volume > 0 else 0
+
+    # Require strong volume on departure
+    if volume_ratio < detector.min_volume_ratio:
+        return None
+
+    # Calculate impulse move strength
+    departure_price = df.loc[departure_end, 'close']
+    impulse_pct = ((departure_price - zone_top) / zone_top) * 100
+
+    # Require meaningful impulse (at least 1x zone height, relaxed from 2x)
+    if impulse_pct < zone_size_pct * 1.0:
+        return None
+
+    # Calculate initial strength score (will be refined by ZoneAnalyzer)
+    strength_score = min(100, int(
+        (volume_ratio * 20) +  # Volume contribution
+        (impulse_pct * 5) +     # Impulse contribution
+        30                      # Base score for fresh zone
+    ))
+
+    # Build zone dictionary
+    zone = {
+        'symbol': symbol,
+        'zone_type': 'DEMAND',
+        'zone_top': float(zone_top),
+        'zone_bottom': float(zone_bottom),
+        'zone_midpoint': float(zone_midpoint),
+        'formed_date': df.loc[end_idx, 'timestamp'] if 'timestamp' in df.columns else datetime.now(),
+        'formation_candle_index': int(end_idx),
+        'approach_volume': int(approach_volume),
+        'departure_volume': int(departure_volume),
+        'volume_ratio': float(volume_ratio),
+        'strength_score': strength_score,
+        'time_at_zone': int(end_idx - start_idx + 1),
+        'status': 'FRESH',
+        'test_count': 0,
+        'is_active': True,
+        'notes': f'Swing low at index {swing_idx}, impulse: {impulse_pct:.1f}%'
+    }
+
+    return zone
+
+
+def _analyze_supply_zone(
+    detector: ZoneDetector,
+    df: pd.DataFrame,
+    swing_idx: int,
+    symbol: str
+) -> Optional[Dict]:
+    """
+    Analyze potential supply zone at swing high
+
+    Supply zones form when:
+    1. Price consolidates (tight range)
+    2. Then drops sharply (strong selling)
+    3. Volume on departure > volume on approach
+    """
+
+    # Find consolidation area before swing (approach)
+    consolidation = _find_consolidation(detector, df, swing_idx, direction='before')
+    if not consolidation:
+        return None
+
+    start_idx, end_idx = consolidation
+
+    # Zone boundaries (top of consolidation)
+    zone_bottom = df.loc[start_idx:end_idx, 'low'].min()
+    zone_top = df.loc[start_idx:end_idx, 'high'].max()
+    zone_midpoint = (zone_top + zone_bottom) / 2
+
+    # Validate zone size
+    zone_size_pct = ((zone_top - zone_bottom) / zone_bottom) * 100
+    if zone_size_pct < detector.min_zone_size_pct or zone_size_pct > detector.max_zone_size_pct:
+        return None
+
+    # Calculate volume metrics
+    approach_volume = df.loc[start_idx:end_idx, 'volume'].sum()
+
+    # Find departure (impulse move down)
+    departure_end = min(end_idx + 10, len(df) - 1)
+    departure_volume = df.loc[end_idx:departure_end, 'volume'].sum()
+
+    volume_ratio = departure_volume / approach_volume if approach_volume > 0 else 0
+
+    # Require strong volume on departure
+    if volume_ratio < detector.min_volume_ratio:
+        return None
+
+    # Calculate impulse move strength
+    departure_price = df.loc[departure_end, 'close']
+    impulse_pct = ((zone_bottom - departure_price) / zone_bottom) * 100
+
+    # Require meaningful impulse (at least 1x zone height, relaxed from 2x)
+    if impulse_pct < zone_size_pct * 1.0:
+        return None
+
+    # Calculate initial strength score
+    strength_score = min(100, int(
+        (volume_ratio * 20) +  # Volume contribution
+        (impulse_pct * 5) +     # Impulse contribution
+        30                      # Base score for fresh zone
+    ))
+
+    # Build zone dictionary
+    zone = {
+        'symbol': symbol,
+        'zone_type': 'SUPPLY',
+        'zone_top': float(zone_top),
+        'zone_bottom': float(zone_bottom),
+        'zone_midpoint': float(zone_midpoint),
+        'formed_date': df.loc[end_idx, 'timestamp'] if 'timestamp' in df.columns else datetime.now(),
+        'formation_candle_index': int(end_idx),
+        'approach_volume': int(approach_volume),
+        'departure_volume': int(departure_volume),
+        'volume_ratio': float(volume_ratio),
+        'strength_score': strength_score,
+        'time_at_zone': int(end_idx - start_idx + 1),
+        'status': 'FRESH',
+        'test_count': 0,
+        'is_active': True,
+        'notes': f'Swing high at index {swing_idx}, impulse: {impulse_pct:.1f}%'
+    }
+
+    return zone
+
+
+def _find_consolidation(
+    detector: ZoneDetector,
+    df: pd.DataFrame,
+    swing_idx: int,
+    direction: str = 'before',
+    max_candles: int = 10
+) -> Optional[Tuple[int, int]]:
+    """
+    Find consolidation area (tight price range) near swing point
+
+    Args:
+        df: Price data
+        swing_idx: Index of swing point
+        direction: 'before' or 'after' swing point
+        max_candles: Maximum consolidation length
+
+    Returns:
+        (start_idx, end_idx) or None
+    """
+
+    if direction == 'before':
+        # Look backward from swing
+        start_search = max(0, swing_idx - max_candles)
+        end_search = swing_idx
+
+        # Find tight consolidation
+        for window_size in range(3, max_candles + 1):
+            start = swing_idx - window_size
+            if start < 0:
+                continue
+
+            window = df.loc[start:swing_idx]
+            high_range = window['high'].max() - window['low'].min()
+            avg_price = window['close'].mean()
+
+            # Tight consolidation: range < 5% of price (relaxed from 2%)
+            if (high_range / avg_price) < 0.05:
+                return (start, swing_idx)
+
+        # If no tight consolidation, use last 3-5 candles
+        return (max(0, swing_idx - 5), swing_idx)
+
+    else:
+        # Look forward from swing
+        start_search = swing_idx
+        end_search = min(len(df) - 1, swing_idx + max_candles)
+
+        for window_size in range(3, max_candles + 1):
+            end = swing_idx + window_size
+            if end >= len(df):
+                continue
+
+            window = df.loc[swing_idx:end]
+            high_range = window['high'].max() - window['low'].min()
+            avg_price = window['close'].mean()
+
+            # Relaxed from 0.02 (2%) to 0.05 (5%)
+            if (high_range / avg_price) < 0.05:
+                return (swing_idx, end)
+
+        return (swing_idx, min(len(df) - 1, swing_idx + 5))
+
+
+PARAMS = [
+    dict(),
+    dict(lookback_periods=120, swing_strength=3, min_zone_size_pct=0.1, min_volume_ratio=1.0),
+    dict(lookback_periods=60, swing_strength=2, max_zone_size_pct=3.0),
+]
+
+
+@pytest.fixture(scope='module')
+def universe():
+    return make_synthetic_universe(30, n_bars=150, seed=5)
+
+
+@pytest.mark.parametrize('params', PARAMS)
+def test_detector_matches_rowwise(universe, params):
+    detector = ZoneDetector(**params)
+    found = 0
+    for symbol, df in universe.items():
+        expected = detect_zones_rowwise(detector, df, symbol)
+        assert detector.detect_zones(df, symbol) == expected
+        found += len(expected)
+    assert found > 0
+
+
+def test_detector_without_timestamp_column(universe):
+    detector = ZoneDetector(lookback_periods=120, min_volume_ratio=1.0)
+    df = universe['SYM0001'].drop(columns='timestamp')
+
+    zones = detector.detect_zones(df, 'SYM0001')
+    expected = detect_zones_rowwise(detector, df, 'SYM0001')
+
+    assert [{k: v for k, v in z.items() if k != 'formed_date'} for z in zones] == \
+        [{k: v for k, v in z.items() if k != 'formed_date'} for z in expected]
+
+
+def test_short_history_returns_no_zones(universe):
+    assert ZoneDetector().detect_zones(universe['SYM0000'].head(50), 'SYM0000') == []
+
+
+def test_process_pool_matches_in_process(universe):
+    frames = dict(list(universe.items())[:8])
+    serial = ZoneBatchDetector(db=MagicMock(), max_workers=1).detect(frames)
+    pooled = ZoneBatchDetector(db=MagicMock(), max_workers=2, chunk_size=3).detect(frames)
+
+    assert list(pooled) == list(frames)
+    assert pooled == serial
+
+
+def test_bulk_load_splits_grouped_download(universe):
+    raw = {}
+    for symbol in ['SYM0000', 'SYM0001']:
+        frame = universe[symbol].set_index('timestamp').rename(columns=str.capitalize)
+        frame.index.name = 'Date'
+        raw[symbol] = frame
+    data = pd.concat(raw, axis=1)
+    downloader = MagicMock(return_value=data)
+
+    frames = load_ohlcv_bulk(['SYM0000', 'SYM0001', 'MISSING'], downloader=downloader)
+
+    downloader.assert_called_once()
+    assert downloader.call_args[0][0] == ['SYM0000', 'SYM0001', 'MISSING']
+    assert list(frames) == ['SYM0000', 'SYM0001']
+    pd.testing.assert_frame_equal(frames['SYM0001'], universe['SYM0001'], check_freq=False)
+
+
+def test_refresh_saves_new_zones_in_one_batch(universe):
+    frames = dict(list(universe.items())[:6])
+    detector = ZoneDetector(lookback_periods=120, min_volume_ratio=1.0)
+    detected = {s: detector.detect_zones(df, s) for s, df in frames.items()}
+    symbol = next(s for s, zones in detected.items() if zones)
+    first = detected[symbol][0]
+
+    db = MagicMock()
+    db.get_active_zones_by_symbol.return_value = {symbol: [{
+        'zone_type': first['zone_type'],
+        'zone_top': first['zone_top'] + 0.1,
+        'zone_bottom': first['zone_bottom'] - 0.1,
+    }]}
+    db.save_zones_batch.side_effect = lambda zones: list(range(len(zones)))
+
+    batch = ZoneBatchDetector(db=db, detector=detector, max_workers=1)
+    summary = batch.refresh(list(frames) + ['NODATA'], frames=frames)
+
+    total = sum(len(zones) for zones in detected.values())
+    db.save_zones_batch.assert_called_once()
+    assert len(db.save_zones_batch.call_args[0][0]) == total - 1
+    assert summary['zones_found'] == total
+    assert summary['zones_saved'] == total - 1
+    assert summary['results'][symbol]['zones_saved'] == len(detected[symbol]) - 1
+    assert summary['results']['NODATA']['error'] == 'No data'
+    db.log_scan.assert_called_once()
+
+
+def test_save_zones_batch_uses_one_multirow_insert():
+    db = ZoneDatabaseManager(connection_string='postgresql://test')
+    zones = [
+        {'symbol': 'AAPL', 'zone_type': 'DEMAND', 'zone_top': 101.0, 'zone_bottom': 99.0, 'zone_midpoint': 100.0},
+        {'symbol': 'MSFT', 'zone_type': 'SUPPLY', 'zone_top': 420.0, 'zone_bottom': 415.0, 'zone_midpoint': 417.5},
+    ]
+
+    with patch.object(db, 'get_connection') as connect, \
+         patch('src.zone_database_manager.execute_values', return_value=[(7,), (8,)]) as execute:
+        assert db.save_zones_batch(zones) == [7, 8]
+
+    connect.assert_called_once()
+    rows = execute.call_args[0][2]
+    assert [row['symbol'] for row in rows] == ['AAPL', 'MSFT']
+    assert rows[0]['timeframe'] == '1d' and rows[1]['status'] == 'FRESH'
+    assert execute.call_args[1]['fetch'] is True
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])